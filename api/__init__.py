@@ -2,6 +2,8 @@ from typing import Any
 from functions.data_paths import LARENTALS_DB_PATH
 
 from .isp import register_isp_routes
+from .layers import register_layer_routes
+from .listing_payload import register_listing_payload_routes
 from .listings import register_listing_routes
 from .report_listing import register_report_listing_routes
 
@@ -19,3 +21,5 @@ def register_api_routes(server: Any, db_path: str = str(LARENTALS_DB_PATH)) -> N
     register_report_listing_routes(server, db_path=db_path)
     register_isp_routes(server, db_path=db_path)
     register_listing_routes(server, db_path=db_path)
+    register_listing_payload_routes(server, db_path=db_path)
+    register_layer_routes(server, db_path=db_path)
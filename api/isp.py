@@ -1,22 +1,14 @@
+from functools import lru_cache
 import sqlite3
 from typing import Any
 
-from flask import Blueprint, Response, jsonify
+from flask import Blueprint, Response, request
+from functions.provider_classification import PROVIDER_BUCKET_SQL, PROVIDER_SERVICE_TYPE_SQL
 from functions.data_paths import LARENTALS_DB_PATH
+from functions.listing_detail_cache import build_conditional_json_response, listing_detail_data_version
+from functions.sqlite_read_pool import read_only_connection
 
-LEASE_ISP_SQL = """
-  SELECT
-    DBA,
-
-    CASE
-      WHEN TechCode IN (10, 11, 12, 20) THEN 'DSL'
-      WHEN TechCode = 40 THEN 'Cable'
-      WHEN TechCode = 50 THEN 'Fiber'
-      WHEN TechCode = 60 THEN 'Satellite'
-      WHEN TechCode IN (70, 71, 72) THEN 'Terrestrial Fixed Wireless'
-      ELSE COALESCE(Service_Type, 'Unknown')
-    END AS Service_Type,
-
+PROVIDER_OPTION_SPEED_COLUMNS = """
     TechCode,
     MaxAdDn,
     MaxAdUp,
@@ -24,62 +16,128 @@ LEASE_ISP_SQL = """
     MaxUpTier,
     MinDnTier,
     MinUpTier,
+"""
 
-    CASE
-      WHEN TechCode = 50 THEN 'best'
-      WHEN TechCode IN (40, 43) AND COALESCE(MaxAdDn, 0) >= 1000 THEN 'best'
-      WHEN COALESCE(MaxAdDn, 0) >= 1000 THEN 'best'
-      WHEN TechCode IN (40, 43) THEN 'good'
-      WHEN TechCode IN (70, 71, 72) AND COALESCE(MaxAdDn, 0) >= 100 THEN 'good'
-      WHEN COALESCE(MaxAdDn, 0) >= 100 THEN 'good'
-      ELSE 'fallback'
-    END AS bucket
-
-  FROM lease_provider_options
-  WHERE listing_id = ?
+# Reads the classification stored by the broadband merge.
+PRECOMPUTED_PROVIDER_OPTION_SELECT = f"""
+    DBA,
+    service_type_label AS Service_Type,
+{PROVIDER_OPTION_SPEED_COLUMNS}
+    bucket
+"""
+
+# Databases merged before the classification columns existed.
+LEGACY_PROVIDER_OPTION_SELECT = f"""
+    DBA,
+    {PROVIDER_SERVICE_TYPE_SQL} AS Service_Type,
+{PROVIDER_OPTION_SPEED_COLUMNS}
+    {PROVIDER_BUCKET_SQL} AS bucket
+"""
+
+PROVIDER_OPTION_FILTER = """
     AND DBA IS NOT NULL
     AND NOT (COALESCE(MaxAdDn, 0) = 0 AND COALESCE(MaxAdUp, 0) = 0)
-  ORDER BY COALESCE(MaxAdDn, -1) DESC
-  LIMIT 8;
 """
 
-BUY_ISP_SQL = """
-  SELECT
-    DBA,
+PROVIDER_OPTION_LIMIT = 8
 
-    CASE
-      WHEN TechCode IN (10, 11, 12, 20) THEN 'DSL'
-      WHEN TechCode = 40 THEN 'Cable'
-      WHEN TechCode = 50 THEN 'Fiber'
-      WHEN TechCode = 60 THEN 'Satellite'
-      WHEN TechCode IN (70, 71, 72) THEN 'Terrestrial Fixed Wireless'
-      ELSE COALESCE(Service_Type, 'Unknown')
-    END AS Service_Type,
+PROVIDER_OPTION_TABLES = {
+    "lease": "lease_provider_options",
+    "buy": "buy_provider_options",
+}
 
-    TechCode,
-    MaxAdDn,
-    MaxAdUp,
-    MaxDnTier,
-    MaxUpTier,
-    MinDnTier,
-    MinUpTier,
+PROVIDER_OPTION_COLUMNS = (
+    "DBA",
+    "Service_Type",
+    "TechCode",
+    "MaxAdDn",
+    "MaxAdUp",
+    "MaxDnTier",
+    "MaxUpTier",
+    "MinDnTier",
+    "MinUpTier",
+    "bucket",
+)
+
+
+def provider_options_precomputed(conn: sqlite3.Connection, page_type: str) -> bool:
+    """Return whether the provider-options table stores the popup classification.
+
+    Reads SQLite's in-memory schema, so the check is cheap per request.
+
+    Args:
+        conn: Open SQLite connection.
+        page_type: ``lease`` or ``buy``.
+
+    Returns:
+        Whether ``service_type_label`` and ``bucket`` columns exist.
+    """
+    rows = conn.execute(
+        "SELECT COUNT(*) FROM pragma_table_info(?) WHERE name IN ('service_type_label', 'bucket')",
+        (PROVIDER_OPTION_TABLES[page_type],),
+    ).fetchone()
+    return rows[0] == 2
+
+
+@lru_cache(maxsize=None)
+def build_provider_options_sql(page_type: str, precomputed: bool) -> str:
+    """Build the single-listing provider-options query.
+
+    Options are ordered fastest download first, which the merge's
+    ``(listing_id, MaxAdDn DESC)`` index serves directly.
 
-    CASE
-      WHEN TechCode = 50 THEN 'best'
-      WHEN TechCode IN (40, 43) AND COALESCE(MaxAdDn, 0) >= 1000 THEN 'best'
-      WHEN COALESCE(MaxAdDn, 0) >= 1000 THEN 'best'
-      WHEN TechCode IN (40, 43) THEN 'good'
-      WHEN TechCode IN (70, 71, 72) AND COALESCE(MaxAdDn, 0) >= 100 THEN 'good'
-      WHEN COALESCE(MaxAdDn, 0) >= 100 THEN 'good'
-      ELSE 'fallback'
-    END AS bucket
-
-  FROM buy_provider_options
+    Args:
+        page_type: ``lease`` or ``buy``.
+        precomputed: Whether to read the stored classification columns.
+
+    Returns:
+        SQL text with one positional placeholder for the listing id.
+    """
+    select = PRECOMPUTED_PROVIDER_OPTION_SELECT if precomputed else LEGACY_PROVIDER_OPTION_SELECT
+    return f"""
+  SELECT
+{select}
+  FROM {PROVIDER_OPTION_TABLES[page_type]}
   WHERE listing_id = ?
-    AND DBA IS NOT NULL
-    AND NOT (COALESCE(MaxAdDn, 0) = 0 AND COALESCE(MaxAdUp, 0) = 0)
-  ORDER BY COALESCE(MaxAdDn, -1) DESC
-  LIMIT 8;
+{PROVIDER_OPTION_FILTER}
+  ORDER BY MaxAdDn DESC
+  LIMIT {PROVIDER_OPTION_LIMIT};
+"""
+
+
+def build_provider_options_batch_sql(page_type: str, id_count: int, precomputed: bool = True) -> str:
+    """Build a query returning the top provider options for many listings at once.
+
+    Each listing keeps the same ordering and per-listing limit as the
+    single-listing queries, enforced with a window function instead of
+    ``LIMIT``.
+
+    Args:
+        page_type: ``lease`` or ``buy``.
+        id_count: Number of listing ids bound into the ``IN`` clause.
+        precomputed: Whether to read the stored classification columns.
+
+    Returns:
+        SQL text with ``id_count`` positional placeholders.
+    """
+    select = PRECOMPUTED_PROVIDER_OPTION_SELECT if precomputed else LEGACY_PROVIDER_OPTION_SELECT
+    placeholders = ", ".join("?" for _ in range(id_count))
+    return f"""
+  SELECT listing_id, {", ".join(PROVIDER_OPTION_COLUMNS)}
+  FROM (
+    SELECT
+      listing_id,
+{select},
+      ROW_NUMBER() OVER (
+        PARTITION BY listing_id
+        ORDER BY MaxAdDn DESC
+      ) AS option_rank
+    FROM {PROVIDER_OPTION_TABLES[page_type]}
+    WHERE listing_id IN ({placeholders})
+{PROVIDER_OPTION_FILTER}
+  )
+  WHERE option_rank <= {PROVIDER_OPTION_LIMIT}
+  ORDER BY listing_id, option_rank;
 """
 
 
@@ -111,6 +169,39 @@ def build_provider_option_payload(rows: list[sqlite3.Row]) -> list[dict[str, Any
     return result
 
 
+def fetch_provider_options_batch(
+    conn: sqlite3.Connection,
+    page_type: str,
+    listing_ids: list[str],
+) -> dict[str, list[dict[str, Any]]]:
+    """Load normalized ISP options for many listings with a single query.
+
+    Args:
+        conn: Open SQLite connection using ``sqlite3.Row`` rows.
+        page_type: ``lease`` or ``buy``.
+        listing_ids: Listing identifiers to look up.
+
+    Returns:
+        Mapping of each requested listing id to its provider options. Listings
+        without options map to an empty list.
+    """
+    if not listing_ids:
+        return {}
+
+    rows_by_listing: dict[str, list[sqlite3.Row]] = {listing_id: [] for listing_id in listing_ids}
+    sql = build_provider_options_batch_sql(
+        page_type,
+        len(listing_ids),
+        precomputed=provider_options_precomputed(conn, page_type),
+    )
+    for row in conn.execute(sql, listing_ids).fetchall():
+        listing_rows = rows_by_listing.get(str(row["listing_id"]))
+        if listing_rows is not None:
+            listing_rows.append(row)
+
+    return {listing_id: build_provider_option_payload(rows) for listing_id, rows in rows_by_listing.items()}
+
+
 def register_isp_routes(server: Any, db_path: str = str(LARENTALS_DB_PATH)) -> None:
     """Register HTTP routes for fetching ISP options on-demand.
 
@@ -131,13 +222,29 @@ def register_isp_routes(server: Any, db_path: str = str(LARENTALS_DB_PATH)) -> N
             listing_id: MLS identifier supplied in the route path.
 
         Returns:
-            JSON response containing provider options ordered by download speed.
+            JSON response containing provider options ordered by download speed,
+            or a 304 when the client's copy is current.
         """
-        with sqlite3.connect(db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            rows = conn.execute(LEASE_ISP_SQL, (listing_id,)).fetchall()
 
-        return jsonify(build_provider_option_payload(rows))
+        def load_options() -> list[dict[str, Any]]:
+            """Load and normalize the listing's provider options.
+
+            Returns:
+                Provider options ordered by download speed.
+            """
+            with read_only_connection(db_path) as conn:
+                sql = build_provider_options_sql("lease", provider_options_precomputed(conn, "lease"))
+                rows = conn.execute(sql, (listing_id,)).fetchall()
+            return build_provider_option_payload(rows)
+
+        return build_conditional_json_response(
+            "lease-isp-options",
+            listing_id,
+            listing_detail_data_version(db_path, include_lookups=False),
+            load_options,
+            if_none_match=request.if_none_match,
+            if_modified_since=request.if_modified_since,
+        )
 
     @bp.get("/api/buy/isp-options/<listing_id>")
     def get_buy_isp_options(listing_id: str) -> Response:
@@ -147,12 +254,28 @@ def register_isp_routes(server: Any, db_path: str = str(LARENTALS_DB_PATH)) -> N
             listing_id: MLS identifier supplied in the route path.
 
         Returns:
-            JSON response containing provider options ordered by download speed.
+            JSON response containing provider options ordered by download speed,
+            or a 304 when the client's copy is current.
         """
-        with sqlite3.connect(db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            rows = conn.execute(BUY_ISP_SQL, (listing_id,)).fetchall()
 
-        return jsonify(build_provider_option_payload(rows))
+        def load_options() -> list[dict[str, Any]]:
+            """Load and normalize the listing's provider options.
+
+            Returns:
+                Provider options ordered by download speed.
+            """
+            with read_only_connection(db_path) as conn:
+                sql = build_provider_options_sql("buy", provider_options_precomputed(conn, "buy"))
+                rows = conn.execute(sql, (listing_id,)).fetchall()
+            return build_provider_option_payload(rows)
+
+        return build_conditional_json_response(
+            "buy-isp-options",
+            listing_id,
+            listing_detail_data_version(db_path, include_lookups=False),
+            load_options,
+            if_none_match=request.if_none_match,
+            if_modified_since=request.if_modified_since,
+        )
 
     server.register_blueprint(bp)
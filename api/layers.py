@@ -0,0 +1,203 @@
+from typing import Any
+import math
+
+from flask import Blueprint, Response, abort, request, send_file
+import orjson
+
+from functions.data_paths import LARENTALS_DB_PATH
+from functions.heatmap_grids import get_heatmap_grid
+from functions.layer_artifacts import LayerArtifact, get_layer_artifact
+from functions.layers import LayersClass
+from functions.listing_payload_cache import choose_content_encoding
+from functions.listing_spatial_index import BoundingBox
+from functions.marker_clusters import get_cluster_pyramid
+
+LAYER_CLUSTERS_CACHE_CONTROL = "public, max-age=300"
+LAYER_HEAT_CACHE_CONTROL = "public, max-age=300"
+VERSIONED_LAYER_DATA_CACHE_CONTROL = "public, max-age=31536000, immutable"
+UNVERSIONED_LAYER_DATA_CACHE_CONTROL = "public, no-cache"
+
+
+def layer_data_version(layer_key: str) -> str:
+    """Load a layer through the shared layer cache and return its version token.
+
+    The token is the time the current cached copy was loaded, so TTL-expired
+    layers (ALPR cameras, schools) get a new version when they are reloaded.
+
+    Args:
+        layer_key: Registered layer key such as ``oil_well``.
+
+    Returns:
+        The layer data version.
+    """
+    LayersClass.load_layer_data(layer_key)
+    cached_at, _ = LayersClass.geojson_cache[LayersClass.get_layer_config(layer_key).dataset]
+    return repr(cached_at)
+
+
+def build_layer_data_response(
+    artifact: LayerArtifact,
+    *,
+    accepted_encodings: list[str],
+    requested_version: str | None,
+    if_none_match: Any,
+) -> Response:
+    """Serve a layer artifact as a file send (or from memory), or a bodiless 304.
+
+    Args:
+        artifact: Artifact for the layer's current source version.
+        accepted_encodings: Content encodings the client accepts with non-zero quality.
+        requested_version: Version token from the request URL, if any.
+        if_none_match: Werkzeug ``ETags`` parsed from the ``If-None-Match`` header.
+
+    Returns:
+        The negotiated artifact body, or a 304 when the client copy is current.
+    """
+    content_encoding = choose_content_encoding(accepted_encodings)
+    body = artifact.body_for(content_encoding)
+    if any(if_none_match.contains(etag) for etag in artifact.all_etags()):
+        response = Response(status=304)
+    else:
+        if body is not None:
+            response = Response(body, mimetype="application/json")
+        else:
+            response = send_file(
+                artifact.path_for(content_encoding),
+                mimetype="application/json",
+                conditional=False,
+                etag=False,
+                max_age=None,
+            )
+        if content_encoding:
+            response.headers["Content-Encoding"] = content_encoding
+
+    response.set_etag(artifact.etag_for(content_encoding))
+    response.headers["Cache-Control"] = (
+        VERSIONED_LAYER_DATA_CACHE_CONTROL
+        if requested_version == artifact.version
+        else UNVERSIONED_LAYER_DATA_CACHE_CONTROL
+    )
+    response.headers["Vary"] = "Accept-Encoding"
+    return response
+
+
+def register_layer_routes(server: Any, db_path: str = str(LARENTALS_DB_PATH)) -> None:
+    """Register API routes serving optional map-layer data.
+
+    Args:
+        server: The Flask server instance (typically `app.server` in Dash).
+        db_path: Path to the SQLite database file. Layer data is read from
+            layer artifacts, so this is accepted only for signature parity
+            with the other API registrars.
+
+    Returns:
+        None.
+    """
+    del db_path
+    bp = Blueprint("layers_api", __name__)
+
+    @bp.get("/api/layers/<layer_key>/clusters")
+    def get_layer_clusters(layer_key: str) -> Response:
+        """Serve precomputed clusters for a clustered point layer.
+
+        Expects a ``zoom`` query parameter and an optional
+        ``bbox=west,south,east,north``.
+
+        Args:
+            layer_key: Registered layer key supplied in the route path.
+
+        Returns:
+            A FeatureCollection of clusters (with hulls) and single points.
+
+        Raises:
+            werkzeug.exceptions.HTTPException: If the layer is unknown or not
+                clustered, or the query parameters are invalid.
+        """
+        spec = LayersClass.LAYER_CONFIGS.get(layer_key)
+        if spec is None or not spec.cluster:
+            abort(404, f"Unknown clustered layer: {layer_key}")
+
+        try:
+            zoom = float(request.args.get("zoom", ""))
+            if not math.isfinite(zoom):
+                raise ValueError("zoom must be a finite number")
+            bbox = BoundingBox.parse(request.args["bbox"]) if "bbox" in request.args else None
+        except ValueError as exc:
+            abort(400, str(exc))
+
+        pyramid = get_cluster_pyramid(
+            f"layer:{spec.dataset}",
+            layer_data_version(layer_key),
+            lambda: LayersClass.load_layer_data(layer_key),
+            spec.supercluster_options,
+        )
+        response = Response(orjson.dumps(pyramid.feature_collection(zoom, bbox)), mimetype="application/json")
+        response.headers["Cache-Control"] = LAYER_CLUSTERS_CACHE_CONTROL
+        return response
+
+    @bp.get("/api/layers/<layer_key>/heat")
+    def get_layer_heat(layer_key: str) -> Response:
+        """Serve the pre-aggregated heat cells and markers of a heat layer's viewport.
+
+        Expects a ``zoom`` query parameter and an optional
+        ``bbox=west,south,east,north``.
+
+        Args:
+            layer_key: Registered layer key supplied in the route path.
+
+        Returns:
+            The heat cells of the zoom's band and the markers in view.
+
+        Raises:
+            werkzeug.exceptions.HTTPException: If the layer is unknown or has
+                no heat grid, or the query parameters are invalid.
+        """
+        spec = LayersClass.LAYER_CONFIGS.get(layer_key)
+        if spec is None or not spec.heat_grid:
+            abort(404, f"Unknown heat layer: {layer_key}")
+
+        try:
+            zoom = float(request.args.get("zoom", ""))
+            if not math.isfinite(zoom):
+                raise ValueError("zoom must be a finite number")
+            bbox = BoundingBox.parse(request.args["bbox"]) if "bbox" in request.args else None
+        except ValueError as exc:
+            abort(400, str(exc))
+
+        grid = get_heatmap_grid(
+            spec.dataset,
+            layer_data_version(layer_key),
+            lambda: LayersClass.load_layer_data(layer_key),
+        )
+        response = Response(orjson.dumps(grid.viewport(zoom, bbox)), mimetype="application/json")
+        response.headers["Cache-Control"] = LAYER_HEAT_CACHE_CONTROL
+        return response
+
+    @bp.get("/api/layers/<layer_key>/data")
+    def get_layer_data(layer_key: str) -> Response:
+        """Serve a layer's pre-compressed GeoJSON artifact.
+
+        Args:
+            layer_key: Registered layer key supplied in the route path.
+
+        Returns:
+            The artifact body for the negotiated encoding, or a 304.
+
+        Raises:
+            werkzeug.exceptions.HTTPException: If the layer is unknown or has
+                no static source file.
+        """
+        if layer_key not in LayersClass.LAYER_CONFIGS:
+            abort(404, f"Unknown layer: {layer_key}")
+        artifact = get_layer_artifact(layer_key)
+        if artifact is None:
+            abort(404, f"Layer {layer_key} has no static artifact")
+
+        return build_layer_data_response(
+            artifact,
+            accepted_encodings=[value for value, quality in request.accept_encodings if quality > 0],
+            requested_version=request.args.get("v"),
+            if_none_match=request.if_none_match,
+        )
+
+    server.register_blueprint(bp)
@@ -0,0 +1,331 @@
+import math
+from pathlib import Path
+from typing import Any, Callable, Mapping
+
+from flask import Blueprint, Response, abort, request
+import orjson
+
+from functions.data_paths import LARENTALS_DB_PATH, LISTING_PAYLOAD_ARTIFACT_DIR
+from functions.listing_filters import (
+    filter_listing_indices,
+    get_listing_filter_index,
+    validate_listing_filter_state,
+)
+from functions.listing_payload_cache import (
+    EncodedListingPayload,
+    choose_content_encoding,
+    iter_payload_body,
+    listing_payload_url,
+    load_listing_payload_delta,
+)
+from functions.listing_spatial_index import (
+    LISTING_VIEWPORT_MAX_FEATURES,
+    BoundingBox,
+    build_viewport_feature_collection,
+    get_listing_grid_index,
+)
+
+ListingPayloadSource = Callable[[], EncodedListingPayload]
+
+VERSIONED_PAYLOAD_CACHE_CONTROL = "public, max-age=31536000, immutable"
+UNVERSIONED_PAYLOAD_CACHE_CONTROL = "public, no-cache"
+DELTA_CACHE_CONTROL = "private, no-cache"
+LISTING_FILTER_RESULT_FORMATS = ("ids", "features")
+
+
+def _default_payload_sources() -> dict[str, ListingPayloadSource]:
+    """Resolve the page component classes that build the listing payloads.
+
+    Page modules are imported lazily so API registration does not depend on
+    Dash page import order.
+
+    Returns:
+        A mapping of page type to a callable returning the encoded payload.
+    """
+    from pages.buy_components import BuyComponents
+    from pages.lease_components import LeaseComponents
+
+    return {
+        "lease": LeaseComponents.get_cached_encoded_payload,
+        "buy": BuyComponents.get_cached_encoded_payload,
+    }
+
+
+def build_listing_payload_response(
+    encoded: EncodedListingPayload,
+    *,
+    accepted_encodings: list[str],
+    requested_version: str | None,
+    if_none_match: Any,
+) -> Response:
+    """Build the HTTP response for a pre-encoded listing payload.
+
+    Args:
+        encoded: Encoded payload for the current data version.
+        accepted_encodings: Content encodings the client accepts with non-zero quality.
+        requested_version: Version token from the request URL, if any.
+        if_none_match: Werkzeug ``ETags`` parsed from the ``If-None-Match`` header.
+
+    Returns:
+        A 200 response carrying the negotiated body, or a bodiless 304.
+    """
+    content_encoding = choose_content_encoding(accepted_encodings)
+    cache_control = (
+        VERSIONED_PAYLOAD_CACHE_CONTROL
+        if requested_version == encoded.version
+        else UNVERSIONED_PAYLOAD_CACHE_CONTROL
+    )
+
+    if any(if_none_match.contains(etag) for etag in encoded.all_etags()):
+        response = Response(status=304)
+    else:
+        body = encoded.body_for(content_encoding)
+        if isinstance(body, bytes):
+            response = Response(body, mimetype="application/json")
+        else:
+            # Memory-mapped artifacts are streamed without copying the whole file.
+            response = Response(
+                iter_payload_body(body),
+                mimetype="application/json",
+                direct_passthrough=True,
+            )
+            response.content_length = len(body)
+        if content_encoding:
+            response.headers["Content-Encoding"] = content_encoding
+
+    response.set_etag(encoded.etag_for(content_encoding))
+    response.headers["Cache-Control"] = cache_control
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["X-Listing-Payload-Version"] = encoded.version
+    return response
+
+
+def build_listing_delta_body(
+    page_type: str,
+    encoded: EncodedListingPayload,
+    since_version: str | None,
+    artifact_dir: str | Path,
+) -> dict[str, Any]:
+    """Build the delta response body, or a pointer to the full payload.
+
+    Args:
+        page_type: Page key such as ``lease`` or ``buy``.
+        encoded: Encoded payload for the current data version.
+        since_version: Version the client already holds, if any.
+        artifact_dir: Directory holding the published change logs.
+
+    Returns:
+        ``{"type": "delta", ...}`` with upserted features and removed ids, or
+        ``{"type": "full", ...}`` with the versioned full-payload URL.
+    """
+    delta = (
+        load_listing_payload_delta(page_type, since_version, encoded.version, artifact_dir)
+        if since_version
+        else None
+    )
+    if delta is None:
+        return {
+            "type": "full",
+            "version": encoded.version,
+            "url": listing_payload_url(page_type, encoded.version),
+        }
+    return {"type": "delta", **delta}
+
+
+def build_listing_filter_body(
+    encoded: EncodedListingPayload,
+    filters: Mapping[str, Any],
+    result_format: str = "ids",
+) -> dict[str, Any]:
+    """Filter the current listing payload server-side.
+
+    Args:
+        encoded: Encoded payload for the current data version.
+        filters: Filter state using the responsive filter UI's keys.
+        result_format: ``ids`` for matching MLS numbers only, or ``features``
+            for a GeoJSON FeatureCollection of the matches.
+
+    Returns:
+        The payload version, match count, and the matching ids or features.
+    """
+    index = get_listing_filter_index(encoded.page_type, encoded.version, lambda: encoded.identity)
+    positions = filter_listing_indices(index, filters)
+    body: dict[str, Any] = {"version": encoded.version, "count": int(positions.size)}
+    if result_format == "features":
+        body.update(type="FeatureCollection", features=[index.features[position] for position in positions])
+    else:
+        body["mls_numbers"] = index.mls_numbers[positions].tolist()
+    return body
+
+
+def register_listing_payload_routes(
+    server: Any,
+    db_path: str = str(LARENTALS_DB_PATH),
+    payload_sources: Mapping[str, ListingPayloadSource] | None = None,
+    artifact_dir: str | Path = LISTING_PAYLOAD_ARTIFACT_DIR,
+) -> None:
+    """Register the versioned listing-payload routes used by the map stores.
+
+    Args:
+        server: The Flask server instance (typically `app.server` in Dash).
+        db_path: Path to the SQLite database file. The payload builders read
+            the canonical database themselves, so this is accepted only for
+            signature parity with the other API registrars.
+        payload_sources: Optional mapping of page type to encoded-payload
+            callables. Defaults to the lease and buy page component builders.
+        artifact_dir: Directory holding published payload change logs.
+
+    Returns:
+        None.
+    """
+    del db_path
+    bp = Blueprint("listing_payload_api", __name__)
+    resolved_sources: dict[str, ListingPayloadSource] = dict(payload_sources or {})
+
+    def resolve_source(page_type: str) -> ListingPayloadSource | None:
+        """Return the payload source for a page, loading defaults on first use.
+
+        Args:
+            page_type: Page key from the request path.
+
+        Returns:
+            The encoded-payload callable, or ``None`` for unknown pages.
+        """
+        if not resolved_sources:
+            resolved_sources.update(_default_payload_sources())
+        return resolved_sources.get(page_type)
+
+    @bp.get("/api/<page_type>/listings-payload")
+    def get_listing_payload(page_type: str) -> Response:
+        """Serve the full listing FeatureCollection as pre-compressed JSON.
+
+        Args:
+            page_type: Page key supplied in the route path.
+
+        Returns:
+            The encoded payload, or a 304 when the client copy is current.
+
+        Raises:
+            werkzeug.exceptions.HTTPException: If the page type is unknown.
+        """
+        source = resolve_source(page_type)
+        if source is None:
+            abort(404, f"Unknown listing payload: {page_type}")
+
+        return build_listing_payload_response(
+            source(),
+            accepted_encodings=[
+                value for value, quality in request.accept_encodings if quality > 0
+            ],
+            requested_version=request.args.get("v"),
+            if_none_match=request.if_none_match,
+        )
+
+    @bp.get("/api/<page_type>/listings-delta")
+    def get_listing_payload_delta(page_type: str) -> Response:
+        """Serve the listing changes since a client-held payload version.
+
+        Args:
+            page_type: Page key supplied in the route path.
+
+        Returns:
+            A JSON delta, or a pointer to the full payload when no usable
+            delta exists.
+
+        Raises:
+            werkzeug.exceptions.HTTPException: If the page type is unknown.
+        """
+        source = resolve_source(page_type)
+        if source is None:
+            abort(404, f"Unknown listing payload: {page_type}")
+
+        body = build_listing_delta_body(
+            page_type,
+            source(),
+            request.args.get("since"),
+            artifact_dir,
+        )
+        response = Response(orjson.dumps(body), mimetype="application/json")
+        response.headers["Cache-Control"] = DELTA_CACHE_CONTROL
+        return response
+
+    @bp.post("/api/<page_type>/listings-filter")
+    def filter_listings(page_type: str) -> Response:
+        """Apply a map filter state server-side and return the matching listings.
+
+        Expects a JSON body ``{"filters": {...}, "format": "ids" | "features"}``.
+
+        Args:
+            page_type: Page key supplied in the route path.
+
+        Returns:
+            A JSON response with the matching MLS numbers or features.
+
+        Raises:
+            werkzeug.exceptions.HTTPException: If the page type is unknown or
+                the request body is invalid.
+        """
+        source = resolve_source(page_type)
+        if source is None:
+            abort(404, f"Unknown listing payload: {page_type}")
+
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            abort(400, "Expected a JSON object body")
+        filters = payload.get("filters") or {}
+        result_format = payload.get("format") or "ids"
+        if not isinstance(filters, dict):
+            abort(400, "filters must be a JSON object")
+        if result_format not in LISTING_FILTER_RESULT_FORMATS:
+            abort(400, f"format must be one of {', '.join(LISTING_FILTER_RESULT_FORMATS)}")
+        try:
+            validate_listing_filter_state(filters)
+        except ValueError as exc:
+            abort(400, str(exc))
+
+        body = build_listing_filter_body(source(), filters, result_format)
+        response = Response(orjson.dumps(body), mimetype="application/json")
+        response.headers["Cache-Control"] = DELTA_CACHE_CONTROL
+        return response
+
+    @bp.get("/api/<page_type>/listings-bbox")
+    def get_listings_in_viewport(page_type: str) -> Response:
+        """Serve only the listings inside a map viewport.
+
+        Expects ``bbox=west,south,east,north`` and ``zoom`` query parameters,
+        plus an optional ``limit`` for zoomed-out views.
+
+        Args:
+            page_type: Page key supplied in the route path.
+
+        Returns:
+            A FeatureCollection of the listings inside the viewport.
+
+        Raises:
+            werkzeug.exceptions.HTTPException: If the page type is unknown or
+                the query parameters are invalid.
+        """
+        source = resolve_source(page_type)
+        if source is None:
+            abort(404, f"Unknown listing payload: {page_type}")
+
+        try:
+            bbox = BoundingBox.parse(request.args.get("bbox", ""))
+            zoom = float(request.args.get("zoom", "0"))
+            if not math.isfinite(zoom):
+                raise ValueError("zoom must be a finite number")
+            limit = int(request.args.get("limit", LISTING_VIEWPORT_MAX_FEATURES))
+        except ValueError as exc:
+            abort(400, str(exc))
+        if not 0 < limit <= LISTING_VIEWPORT_MAX_FEATURES:
+            abort(400, f"limit must be between 1 and {LISTING_VIEWPORT_MAX_FEATURES}")
+
+        encoded = source()
+        grid = get_listing_grid_index(encoded.page_type, encoded.version, lambda: encoded.identity)
+        body = build_viewport_feature_collection(grid, bbox, zoom, limit)
+        response = Response(orjson.dumps(body), mimetype="application/json")
+        response.headers["Cache-Control"] = UNVERSIONED_PAYLOAD_CACHE_CONTROL
+        response.headers["X-Listing-Payload-Version"] = encoded.version
+        return response
+
+    server.register_blueprint(bp)
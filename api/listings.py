@@ -1,19 +1,30 @@
+from functools import lru_cache
 import sqlite3
 from typing import Any
 
-from flask import Blueprint, Response, abort, jsonify
+from flask import Blueprint, Response, abort, jsonify, request
+from api.isp import fetch_provider_options_batch
 from functions.data_paths import LARENTALS_DB_PATH
+from functions.listing_detail_cache import build_conditional_json_response, listing_detail_data_version
+from functions.sqlite_read_pool import read_only_connection
 from functions.lahd import (
+    LAHD_SUMMARY_ENRICHMENT_FIELDS,
+    LAHD_SUMMARY_SOURCE_COLUMN,
     is_listing_in_los_angeles_city,
     live_lahd_datasets_available,
     lookup_lahd_property_for_listing,
     out_of_scope_lahd_listing_lookup_result,
+    stored_lahd_listing_summary,
     unavailable_lahd_listing_lookup_result,
 )
-from functions.rso import lookup_rso_property_for_listing
+from functions.rso import (
+    RSO_SUMMARY_ENRICHMENT_FIELDS,
+    RSO_SUMMARY_SOURCE_COLUMN,
+    lookup_rso_property_for_listing,
+    stored_rso_listing_summary,
+)
 
-LEASE_LISTING_DETAIL_SQL = """
-  SELECT
+LEASE_LISTING_DETAIL_COLUMNS = """
     mls_number,
     subtype,
     list_price,
@@ -39,13 +50,9 @@ LEASE_LISTING_DETAIL_SQL = """
     listing_url,
     mls_photo,
     COALESCE(laundry_category, 'Unknown') AS laundry
-  FROM lease
-  WHERE mls_number = ?
-  LIMIT 1
 """
 
-BUY_LISTING_DETAIL_SQL = """
-  SELECT
+BUY_LISTING_DETAIL_COLUMNS = """
     mls_number,
     subtype,
     list_price,
@@ -65,12 +72,126 @@ BUY_LISTING_DETAIL_SQL = """
     listed_date,
     listing_url,
     mls_photo
-  FROM buy
+"""
+
+LISTING_DETAIL_COLUMNS = {
+    "lease": LEASE_LISTING_DETAIL_COLUMNS,
+    "buy": BUY_LISTING_DETAIL_COLUMNS,
+}
+
+LISTING_DETAIL_BATCH_MAX_IDS = 100
+
+_LAHD_SUMMARY_COLUMNS = (*LAHD_SUMMARY_ENRICHMENT_FIELDS, LAHD_SUMMARY_SOURCE_COLUMN)
+_RSO_SUMMARY_COLUMNS = (*RSO_SUMMARY_ENRICHMENT_FIELDS, RSO_SUMMARY_SOURCE_COLUMN)
+
+# Columns written by enrich-jurisdiction and enrich-housing-summaries that the
+# popups read instead of recomputing per request.
+LISTING_DETAIL_ENRICHMENT_COLUMNS = {
+    "lease": ("in_la_city", *_LAHD_SUMMARY_COLUMNS, *_RSO_SUMMARY_COLUMNS),
+    "buy": ("in_la_city", *_LAHD_SUMMARY_COLUMNS),
+}
+
+
+def listing_enrichment_columns(conn: sqlite3.Connection, page_type: str) -> tuple[str, ...]:
+    """Return the stored enrichment columns the detail query can join.
+
+    Reads SQLite's in-memory schema, so the check is cheap per request.
+
+    Args:
+        conn: Open SQLite connection.
+        page_type: ``lease`` or ``buy``.
+
+    Returns:
+        The columns of ``LISTING_DETAIL_ENRICHMENT_COLUMNS[page_type]`` that
+        exist in ``<page_type>_enrichment``, in that order.
+    """
+    existing = {
+        row[0]
+        for row in conn.execute("SELECT name FROM pragma_table_info(?)", (f"{page_type}_enrichment",))
+    }
+    return tuple(column for column in LISTING_DETAIL_ENRICHMENT_COLUMNS[page_type] if column in existing)
+
+
+def _listing_detail_source(page_type: str, enrichment_columns: tuple[str, ...]) -> str:
+    """Build the SELECT list and FROM clause shared by the listing-detail queries.
+
+    Args:
+        page_type: ``lease`` or ``buy``; also the source table name.
+        enrichment_columns: Stored enrichment columns to join.
+
+    Returns:
+        SQL text ending with the FROM clause.
+    """
+    if not enrichment_columns:
+        return f"""
+  SELECT
+{LISTING_DETAIL_COLUMNS[page_type]}
+  FROM {page_type}"""
+    joined = ",\n".join(f"    enrichment.{column}" for column in enrichment_columns)
+    return f"""
+  SELECT
+{LISTING_DETAIL_COLUMNS[page_type].rstrip()},
+{joined}
+  FROM {page_type}
+  LEFT JOIN {page_type}_enrichment AS enrichment USING (mls_number)"""
+
+
+@lru_cache(maxsize=None)
+def build_listing_detail_sql(page_type: str, enrichment_columns: tuple[str, ...] = ()) -> str:
+    """Build the single-listing detail query.
+
+    Args:
+        page_type: ``lease`` or ``buy``; also the source table name.
+        enrichment_columns: Stored enrichment columns to join.
+
+    Returns:
+        SQL text with one positional placeholder for the MLS id.
+    """
+    return f"""{_listing_detail_source(page_type, enrichment_columns)}
   WHERE mls_number = ?
   LIMIT 1
 """
 
 
+def build_listing_detail_batch_sql(page_type: str, id_count: int, enrichment_columns: tuple[str, ...] = ()) -> str:
+    """Build a listing-detail query for many MLS ids at once.
+
+    Args:
+        page_type: ``lease`` or ``buy``; also the source table name.
+        id_count: Number of MLS ids bound into the ``IN`` clause.
+        enrichment_columns: Stored enrichment columns to join.
+
+    Returns:
+        SQL text with ``id_count`` positional placeholders.
+    """
+    placeholders = ", ".join("?" for _ in range(id_count))
+    return f"""{_listing_detail_source(page_type, enrichment_columns)}
+  WHERE mls_number IN ({placeholders})
+"""
+
+
+def resolve_listing_jurisdiction(payload: dict[str, Any]) -> bool | None:
+    """Return whether a listing is in the City of Los Angeles.
+
+    Reads the ``in_la_city`` value stored by ``enrich-jurisdiction`` and only
+    tests the boundary for listings the enrichment has not covered yet.
+
+    Args:
+        payload: Listing detail payload with city and coordinates.
+
+    Returns:
+        Whether the listing is in the city, or ``None`` when undetermined.
+    """
+    stored = payload.get("in_la_city")
+    if stored is not None:
+        return bool(stored)
+    return is_listing_in_los_angeles_city(
+        city=payload.get("city"),
+        latitude=payload.get("latitude"),
+        longitude=payload.get("longitude"),
+    )
+
+
 def build_listing_detail_payload(row: sqlite3.Row | None) -> dict[str, Any] | None:
     """Convert a single SQLite row into the popup-detail JSON payload.
 
@@ -83,7 +204,94 @@ def build_listing_detail_payload(row: sqlite3.Row | None) -> dict[str, Any] | No
     if row is None:
         return None
 
-    return {key: row[key] for key in row.keys()}
+    payload = {key: row[key] for key in row.keys()}
+    payload["in_la_city"] = resolve_listing_jurisdiction(payload)
+    return payload
+
+
+def attach_listing_summaries(payload: dict[str, Any], page_type: str) -> dict[str, Any]:
+    """Attach the LAHD (and, for leases, RSO) summaries to a detail payload.
+
+    Summary columns joined from the enrichment table are read by the summary
+    builders and then dropped from the payload.
+
+    Args:
+        payload: Listing detail payload from ``build_listing_detail_payload``.
+        page_type: ``lease`` or ``buy``.
+
+    Returns:
+        The same payload, with ``lahd_property_summary`` and, for leases,
+        ``rso_property_summary`` set.
+    """
+    payload["lahd_property_summary"] = build_lahd_listing_summary(payload)
+    if page_type == "lease":
+        payload["rso_property_summary"] = build_rso_listing_summary(payload)
+    for column in (*_LAHD_SUMMARY_COLUMNS, *_RSO_SUMMARY_COLUMNS):
+        payload.pop(column, None)
+    return payload
+
+
+def normalize_listing_detail_batch_ids(raw_ids: Any) -> list[str]:
+    """Validate and de-duplicate the MLS ids posted to the batch detail route.
+
+    Args:
+        raw_ids: The ``ids`` value from the request body.
+
+    Returns:
+        Unique, non-empty MLS ids in request order.
+
+    Raises:
+        ValueError: If ``raw_ids`` is not a list of strings/numbers or exceeds
+            ``LISTING_DETAIL_BATCH_MAX_IDS`` unique ids.
+    """
+    if not isinstance(raw_ids, list) or not all(
+        isinstance(raw_id, (str, int)) and not isinstance(raw_id, bool) for raw_id in raw_ids
+    ):
+        raise ValueError("ids must be a JSON array of MLS numbers")
+
+    listing_ids = list(dict.fromkeys(str(raw_id).strip() for raw_id in raw_ids))
+    listing_ids = [listing_id for listing_id in listing_ids if listing_id]
+    if len(listing_ids) > LISTING_DETAIL_BATCH_MAX_IDS:
+        raise ValueError(f"At most {LISTING_DETAIL_BATCH_MAX_IDS} ids may be requested at once")
+    return listing_ids
+
+
+def build_listing_detail_batch(
+    conn: sqlite3.Connection,
+    page_type: str,
+    listing_ids: list[str],
+) -> dict[str, dict[str, Any]]:
+    """Load popup details for many listings over one connection.
+
+    Each entry matches the single-listing detail payload, plus the listing's
+    ISP options under ``isp_options``.
+
+    Args:
+        conn: Open SQLite connection using ``sqlite3.Row`` rows.
+        page_type: ``lease`` or ``buy``.
+        listing_ids: MLS ids to look up.
+
+    Returns:
+        Mapping of found MLS ids to their detail payloads.
+    """
+    if not listing_ids:
+        return {}
+
+    sql = build_listing_detail_batch_sql(
+        page_type,
+        len(listing_ids),
+        listing_enrichment_columns(conn, page_type),
+    )
+    rows = conn.execute(sql, listing_ids).fetchall()
+    provider_options = fetch_provider_options_batch(conn, page_type, listing_ids)
+
+    details: dict[str, dict[str, Any]] = {}
+    for row in rows:
+        payload = attach_listing_summaries(build_listing_detail_payload(row), page_type)
+        listing_id = str(payload["mls_number"])
+        payload["isp_options"] = provider_options.get(listing_id, [])
+        details[listing_id] = payload
+    return details
 
 
 def register_listing_routes(server: Any, db_path: str = str(LARENTALS_DB_PATH)) -> None:
@@ -106,22 +314,39 @@ def register_listing_routes(server: Any, db_path: str = str(LARENTALS_DB_PATH))
             listing_id: MLS identifier supplied in the route path.
 
         Returns:
-            JSON response containing listing details and enrichment summaries.
+            JSON response containing listing details and enrichment summaries,
+            or a 304 when the client's copy is current.
 
         Raises:
             werkzeug.exceptions.HTTPException: If the listing does not exist.
         """
-        with sqlite3.connect(db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            row = conn.execute(LEASE_LISTING_DETAIL_SQL, (listing_id,)).fetchone()
 
-        payload = build_listing_detail_payload(row)
-        if payload is None:
+        def load_details() -> dict[str, Any] | None:
+            """Load the listing row and attach its LAHD/RSO summaries.
+
+            Returns:
+                The popup payload, or ``None`` when the listing does not exist.
+            """
+            with read_only_connection(db_path) as conn:
+                sql = build_listing_detail_sql("lease", listing_enrichment_columns(conn, "lease"))
+                row = conn.execute(sql, (listing_id,)).fetchone()
+
+            payload = build_listing_detail_payload(row)
+            if payload is not None:
+                attach_listing_summaries(payload, "lease")
+            return payload
+
+        response = build_conditional_json_response(
+            "lease-listing-details",
+            listing_id,
+            listing_detail_data_version(db_path),
+            load_details,
+            if_none_match=request.if_none_match,
+            if_modified_since=request.if_modified_since,
+        )
+        if response is None:
             abort(404, f"Lease listing not found: {listing_id}")
-
-        payload["lahd_property_summary"] = build_lahd_listing_summary(payload)
-        payload["rso_property_summary"] = build_rso_listing_summary(payload)
-        return jsonify(payload)
+        return response
 
     @bp.get("/api/buy/listing-details/<listing_id>")
     def get_buy_listing_details(listing_id: str) -> Response:
@@ -131,21 +356,77 @@ def register_listing_routes(server: Any, db_path: str = str(LARENTALS_DB_PATH))
             listing_id: MLS identifier supplied in the route path.
 
         Returns:
-            JSON response containing listing details and the LAHD summary.
+            JSON response containing listing details and the LAHD summary, or
+            a 304 when the client's copy is current.
 
         Raises:
             werkzeug.exceptions.HTTPException: If the listing does not exist.
         """
-        with sqlite3.connect(db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            row = conn.execute(BUY_LISTING_DETAIL_SQL, (listing_id,)).fetchone()
 
-        payload = build_listing_detail_payload(row)
-        if payload is None:
+        def load_details() -> dict[str, Any] | None:
+            """Load the listing row and attach its LAHD summary.
+
+            Returns:
+                The popup payload, or ``None`` when the listing does not exist.
+            """
+            with read_only_connection(db_path) as conn:
+                sql = build_listing_detail_sql("buy", listing_enrichment_columns(conn, "buy"))
+                row = conn.execute(sql, (listing_id,)).fetchone()
+
+            payload = build_listing_detail_payload(row)
+            if payload is not None:
+                attach_listing_summaries(payload, "buy")
+            return payload
+
+        response = build_conditional_json_response(
+            "buy-listing-details",
+            listing_id,
+            listing_detail_data_version(db_path),
+            load_details,
+            if_none_match=request.if_none_match,
+            if_modified_since=request.if_modified_since,
+        )
+        if response is None:
             abort(404, f"Buy listing not found: {listing_id}")
+        return response
 
-        payload["lahd_property_summary"] = build_lahd_listing_summary(payload)
-        return jsonify(payload)
+    @bp.post("/api/<page_type>/listing-details/batch")
+    def get_listing_details_batch(page_type: str) -> Response:
+        """Return popup details, ISP options and LAHD/RSO summaries for many listings.
+
+        Expects a JSON body ``{"ids": [...]}``. Used to prefetch popups for the
+        listings revealed when a marker cluster expands.
+
+        Args:
+            page_type: ``lease`` or ``buy`` supplied in the route path.
+
+        Returns:
+            JSON response ``{"listings": {mls_number: {...}}, "missing": [...]}``.
+
+        Raises:
+            werkzeug.exceptions.HTTPException: If the page type is unknown or
+                the request body is invalid.
+        """
+        if page_type not in LISTING_DETAIL_COLUMNS:
+            abort(404, f"Unknown listing page: {page_type}")
+
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            abort(400, "Expected a JSON object body")
+        try:
+            listing_ids = normalize_listing_detail_batch_ids(body.get("ids"))
+        except ValueError as exc:
+            abort(400, str(exc))
+
+        with read_only_connection(db_path) as conn:
+            details = build_listing_detail_batch(conn, page_type, listing_ids)
+
+        return jsonify(
+            {
+                "listings": details,
+                "missing": [listing_id for listing_id in listing_ids if listing_id not in details],
+            }
+        )
 
     server.register_blueprint(bp)
 
@@ -153,23 +434,25 @@ def register_listing_routes(server: Any, db_path: str = str(LARENTALS_DB_PATH))
 def build_lahd_listing_summary(payload: dict[str, Any]) -> dict[str, Any]:
     """Return a Housing Department summary only for listings in LA City scope.
 
+    Uses the summary stored by ``enrich-housing-summaries`` when the payload
+    carries a current one, and a live lookup otherwise.
+
     Args:
         payload: Structured request, listing, or artifact payload to validate or summarize.
 
     Returns:
         A mapping containing the constructed LAHD listing summary.
     """
-    in_scope = is_listing_in_los_angeles_city(
-        city=payload.get("city"),
-        latitude=payload.get("latitude"),
-        longitude=payload.get("longitude"),
-    )
+    in_scope = resolve_listing_jurisdiction(payload)
     if in_scope is False:
         return out_of_scope_lahd_listing_lookup_result()
 
     if not live_lahd_datasets_available():
         return unavailable_lahd_listing_lookup_result()
 
+    stored = stored_lahd_listing_summary(payload)
+    if stored is not None:
+        return stored
     return lookup_lahd_property_for_listing(
         address=payload.get("full_street_address"),
         latitude=payload.get("latitude"),
@@ -180,19 +463,18 @@ def build_lahd_listing_summary(payload: dict[str, Any]) -> dict[str, Any]:
 def build_rso_listing_summary(payload: dict[str, Any]) -> dict[str, Any]:
     """Return a conservative LA City RSO summary for a rental listing popup.
 
+    Uses the summary stored by ``enrich-housing-summaries`` when the payload
+    carries a current one, and a live lookup otherwise.
+
     Args:
         payload: Structured request, listing, or artifact payload to validate or summarize.
 
     Returns:
         A mapping containing the constructed RSO listing summary.
     """
-    in_scope = is_listing_in_los_angeles_city(
-        city=payload.get("city"),
-        latitude=payload.get("latitude"),
-        longitude=payload.get("longitude"),
-    )
+    in_scope = resolve_listing_jurisdiction(payload)
     if in_scope is False:
         return {"jurisdiction_in_scope": False, "data_available": True, "matched": False}
 
-    summary = lookup_rso_property_for_listing(payload.get("full_street_address"))
+    summary = stored_rso_listing_summary(payload) or lookup_rso_property_for_listing(payload.get("full_street_address"))
     return {**summary, "jurisdiction_in_scope": True}
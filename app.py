@@ -14,7 +14,9 @@ from functions.lahd import (
   prewarm_lahd_listing_lookup_cache,
   prewarm_lahd_live_dataset_status_cache,
 )
+from functions.layer_artifacts import prewarm_layer_artifacts
 from functions.rso import prewarm_rso_property_lookup_cache
+from functions.warm_start import warm_start_session
 from functions.mcp_usage_logging import register_mcp_usage_logging
 from functions.source_map_logging import register_source_map_error_filter
 from functions.mcp_listings import configure_listings_mcp
@@ -29,7 +31,6 @@ import dash
 import dash_bootstrap_components as dbc
 import dash_mantine_components as dmc
 import logging
-import time
 
 logging.getLogger().setLevel(logging.INFO)
 
@@ -177,27 +178,40 @@ def create_viewport_listener() -> EventListener:
 def prewarm_startup_caches() -> None:
   """Populate expensive local caches before the first browser/API request.
 
+  Prepared listing frames and lookup indexes are loaded from warm-start
+  snapshots when their sources are unchanged, and each stage's duration is
+  logged so slow boots can be traced to a specific step.
+
   Returns:
       None.
   """
-  start_time = time.perf_counter()
-  prewarm_lahd_live_dataset_status_cache()
-  prewarm_lahd_listing_lookup_cache()
-  prewarm_rso_property_lookup_cache()
-
-  # Import after Dash is initialized because page modules call dash.register_page.
-  from pages.buy_components import BuyComponents
-  from pages.buy_page import get_buy_components
-  from pages.lease_components import LeaseComponents
-  from pages.lease_page import get_lease_components
-
-  get_lease_components()
-  get_buy_components()
-  LeaseComponents.get_cached_geojson_payload()
-  BuyComponents.get_cached_geojson_payload()
-
-  duration = time.perf_counter() - start_time
-  logging.info(f"Prewarmed startup caches in {duration:.2f} seconds.")
+  with warm_start_session() as session:
+    with session.stage("lahd_live_status"):
+      prewarm_lahd_live_dataset_status_cache()
+    with session.stage("lahd_lookup"):
+      prewarm_lahd_listing_lookup_cache()
+    with session.stage("rso_lookup"):
+      prewarm_rso_property_lookup_cache()
+
+    # Import after Dash is initialized because page modules call dash.register_page.
+    from pages.buy_components import BuyComponents
+    from pages.buy_page import get_buy_components
+    from pages.lease_components import LeaseComponents
+    from pages.lease_page import get_lease_components
+
+    with session.stage("lease_components"):
+      get_lease_components()
+    with session.stage("buy_components"):
+      get_buy_components()
+    with session.stage("lease_payload"):
+      LeaseComponents.get_cached_encoded_payload()
+    with session.stage("buy_payload"):
+      BuyComponents.get_cached_encoded_payload()
+    with session.stage("layer_artifacts"):
+      prewarm_layer_artifacts([*LeaseComponents.OPTIONAL_LAYER_KEYS, *BuyComponents.OPTIONAL_LAYER_KEYS])
+
+  duration = sum(stage.seconds for stage in session.stages)
+  logging.info(f"Prewarmed startup caches in {duration:.2f} seconds:\n{session.breakdown()}")
 
 app.layout = dmc.MantineProvider(
   dmc.Container([
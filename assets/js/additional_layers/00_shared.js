@@ -448,6 +448,83 @@
         return window.larentalsLeafletHeatPromise;
     }
 
+    /**
+     * @typedef {{
+     *   zoom: number,
+     *   cell_zoom: number | null,
+     *   heat_points: Array<[number, number, number]>,
+     *   marker_points: unknown[][],
+     * }} HeatViewportPayload
+     */
+
+    /**
+     * Create a loader for the pre-aggregated heat cells and markers in view.
+     *
+     * Heat layers no longer ship every point; their anchor carries a
+     * `heat_cells_url` that returns the cells of the current zoom band and the
+     * markers inside a bbox. The loader pads the viewport so small pans reuse
+     * the previous response, and a newer request supersedes an in-flight one.
+     *
+     * @param {string} url Heat route URL stored on the anchor feature.
+     * @returns {(map: L.Map) => Promise<HeatViewportPayload | null>} Loader resolving with the viewport payload, or `null` when superseded.
+     */
+    function createHeatViewportLoader(url) {
+        let lastBounds = null;
+        let lastPayload = null;
+        let activeController = null;
+        let requestSequence = 0;
+
+        return function loadHeatViewport(map) {
+            const zoom = Math.floor(map.getZoom());
+            if (lastPayload && lastPayload.zoom === zoom && lastBounds.contains(map.getBounds())) {
+                return Promise.resolve(lastPayload);
+            }
+
+            const bounds = map.getBounds().pad(0.25);
+            const bbox = [bounds.getWest(), bounds.getSouth(), bounds.getEast(), bounds.getNorth()]
+                .map(function(value) {
+                    return Number(value).toFixed(4);
+                })
+                .join(",");
+
+            if (activeController) {
+                activeController.abort();
+            }
+            const controller = typeof AbortController === "function" ? new AbortController() : null;
+            const sequence = ++requestSequence;
+            activeController = controller;
+
+            const separator = url.indexOf("?") >= 0 ? "&" : "?";
+            return fetch(url + separator + "zoom=" + zoom + "&bbox=" + encodeURIComponent(bbox), {
+                credentials: "same-origin",
+                headers: { Accept: "application/json" },
+                signal: controller ? controller.signal : undefined,
+            })
+                .then(function(response) {
+                    if (!response.ok) {
+                        throw new Error("Heat cells request failed with HTTP " + response.status);
+                    }
+                    return response.json();
+                })
+                .then(function(payload) {
+                    if (sequence !== requestSequence) {
+                        return null;
+                    }
+                    activeController = null;
+                    lastBounds = bounds;
+                    lastPayload = payload;
+                    return payload;
+                })
+                .catch(function(error) {
+                    if (sequence !== requestSequence || (error && error.name === "AbortError")) {
+                        return null;
+                    }
+                    activeController = null;
+                    throw error;
+                });
+        };
+    }
+
     window.additionalLayerPopups = Object.assign({}, window.additionalLayerPopups, {
         constants: Object.assign({}, window.additionalLayerPopups && window.additionalLayerPopups.constants, {
             BREAKFAST_BURRITO_ICON_URL: BREAKFAST_BURRITO_ICON_URL,
@@ -455,6 +532,7 @@
         runtime: Object.assign({}, window.additionalLayerPopups && window.additionalLayerPopups.runtime, {
             bindAdditionalLayerPopup: bindAdditionalLayerPopup,
             buildResponsivePopupOptions: buildResponsivePopupOptions,
+            createHeatViewportLoader: createHeatViewportLoader,
             createPopupMarker: createPopupMarker,
             ensureLeafletHeatLoaded: ensureLeafletHeatLoaded,
             getPopupBuilder: getPopupBuilder,
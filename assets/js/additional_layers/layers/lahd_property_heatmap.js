@@ -7,12 +7,14 @@
     const popupApi = window.additionalLayerPopups;
     const popupRuntime = popupApi && popupApi.runtime;
     const buildResponsivePopupOptions = popupRuntime && popupRuntime.buildResponsivePopupOptions;
+    const createHeatViewportLoader = popupRuntime && popupRuntime.createHeatViewportLoader;
     const ensureLeafletHeatLoaded = popupRuntime && popupRuntime.ensureLeafletHeatLoaded;
     const getPopupBuilder = popupRuntime && popupRuntime.getPopupBuilder;
     const registerLayerRenderer = popupRuntime && popupRuntime.registerLayerRenderer;
 
     if (
         typeof buildResponsivePopupOptions !== "function" ||
+        typeof createHeatViewportLoader !== "function" ||
         typeof ensureLeafletHeatLoaded !== "function" ||
         typeof getPopupBuilder !== "function" ||
         typeof registerLayerRenderer !== "function"
@@ -91,23 +93,13 @@
     }
 
     /**
-     * Create the invisible anchor marker used to mount the LAHD heat layer.
+     * Parse heat-cell tuples returned by the heat route.
      *
-     * @param {{ properties?: Record<string, unknown> }} feature GeoJSON anchor feature.
-     * @param {unknown} latlng Leaflet lat/lng argument supplied by Dash Leaflet.
-     * @returns {L.Marker} Invisible marker that owns the heat layer lifecycle.
+     * @param {unknown} rawHeatPoints Candidate `[lat, lon, weight]` tuples.
+     * @returns {LahdHeatPointTuple[]} Finite heat points.
      */
-    function drawLahdPropertyHeatLayer(feature, latlng) {
-        const properties = feature && feature.properties ? feature.properties : {};
-        const rawHeatPoints = Array.isArray(properties.heat_points)
-            ? properties.heat_points
-            : [];
-        const rawMarkerPoints = Array.isArray(properties.marker_points)
-            ? properties.marker_points
-            : [];
-
-        /** @type {LahdHeatPointTuple[]} */
-        const heatPoints = rawHeatPoints
+    function parseHeatPoints(rawHeatPoints) {
+        return (Array.isArray(rawHeatPoints) ? rawHeatPoints : [])
             .map(function(point) {
                 if (!Array.isArray(point) || point.length < 3) {
                     return null;
@@ -125,9 +117,16 @@
             .filter(function(point) {
                 return Array.isArray(point);
             });
+    }
 
-        /** @type {LahdMarkerPointTuple[]} */
-        const markerPoints = rawMarkerPoints
+    /**
+     * Parse property marker tuples returned by the heat route.
+     *
+     * @param {unknown} rawMarkerPoints Candidate marker tuples.
+     * @returns {LahdMarkerPointTuple[]} Markers with finite counts and an address.
+     */
+    function parseMarkerPoints(rawMarkerPoints) {
+        return (Array.isArray(rawMarkerPoints) ? rawMarkerPoints : [])
             .map(function(point) {
                 if (!Array.isArray(point) || point.length < 14) {
                     return null;
@@ -183,12 +182,24 @@
             .filter(function(point) {
                 return Array.isArray(point);
             });
+    }
 
+    /**
+     * Create the invisible anchor marker used to mount the LAHD heat layer.
+     *
+     * @param {{ properties?: Record<string, unknown> }} feature GeoJSON anchor feature.
+     * @param {unknown} latlng Leaflet lat/lng argument supplied by Dash Leaflet.
+     * @returns {L.Marker} Invisible marker that owns the heat layer lifecycle.
+     */
+    function drawLahdPropertyHeatLayer(feature, latlng) {
+        const properties = feature && feature.properties ? feature.properties : {};
         const popupBuilder = getPopupBuilder("buildLahdPropertyPopupContent");
         const markerZoomMin = Number(properties.marker_zoom_min) || 15;
         const heatZoomMax = Number(properties.heat_zoom_max) || 16;
         const maxProblemScore = Math.max(1, Number(properties.max_problem_score) || 1);
         const markerScoreBreaks = normalizeMarkerBreaks(properties.marker_score_breaks);
+        const heatCellsUrl = String(properties.heat_cells_url || "").trim();
+        const loadHeatViewport = heatCellsUrl ? createHeatViewportLoader(heatCellsUrl) : null;
         const markerRenderer = L.canvas({ padding: 0.5 });
 
         const anchorMarker = L.marker(latlng, {
@@ -443,23 +454,18 @@
         }
 
         /**
-         * Refresh visible zoomed-in property markers.
+         * Replace the zoomed-in property markers with the ones returned for the viewport.
          *
          * @param {L.Map} map Active Leaflet map.
+         * @param {LahdMarkerPointTuple[]} markerPoints Markers inside the padded viewport.
          * @returns {void}
          */
-        function refreshMarkerLayer(map) {
+        function refreshMarkerLayer(map, markerPoints) {
             const markerLayer = createMarkerLayer(map);
-            const paddedBounds = map.getBounds().pad(0.2);
-            const visiblePoints = markerPoints
-                .filter(function(point) {
-                    return paddedBounds.contains([point[0], point[1]]);
-                })
-                .slice(0, 1400);
 
             markerLayer.clearLayers();
 
-            visiblePoints.forEach(function(point) {
+            markerPoints.forEach(function(point) {
                 const markerProperties = {
                     problem_score: point[2],
                     documented_issue_count: point[3],
@@ -511,7 +517,39 @@
         }
 
         /**
-         * Sync heat and marker presentation to the current zoom.
+         * Mount the heat layer, or swap in the cells returned for a new viewport.
+         *
+         * @param {LahdHeatPointTuple[]} heatPoints Aggregated heat cells for the viewport.
+         * @returns {Promise<void>} Promise that settles once the heat layer is current.
+         */
+        function mountHeatLayer(heatPoints) {
+            return ensureLeafletHeatLoaded().then(function() {
+                const liveMap = anchorMarker._map;
+
+                if (!liveMap || liveMap.getZoom() >= heatZoomMax) {
+                    return;
+                }
+
+                if (!liveMap.getPane("lahdPropertyHeatPane")) {
+                    const heatPane = liveMap.createPane("lahdPropertyHeatPane");
+                    heatPane.style.zIndex = "392";
+                    heatPane.style.pointerEvents = "none";
+                }
+
+                if (!anchorMarker._lahdPropertyHeatLayer) {
+                    anchorMarker._lahdPropertyHeatLayer = L.heatLayer(heatPoints, heatOptions);
+                } else {
+                    anchorMarker._lahdPropertyHeatLayer.setLatLngs(heatPoints);
+                }
+
+                if (!liveMap.hasLayer(anchorMarker._lahdPropertyHeatLayer)) {
+                    anchorMarker._lahdPropertyHeatLayer.addTo(liveMap);
+                }
+            });
+        }
+
+        /**
+         * Sync heat and marker presentation to the current zoom and viewport.
          *
          * @returns {void}
          */
@@ -526,46 +564,34 @@
             const showHeat = zoom < heatZoomMax;
             syncLegend(map, { showHeat: showHeat, showMarkers: showMarkers });
 
-            if (showMarkers && markerPoints.length) {
-                refreshMarkerLayer(map);
-            } else {
+            if (!showMarkers) {
                 hideMarkerLayer(map);
             }
-
-            if (!showHeat) {
-                if (
-                    anchorMarker._lahdPropertyHeatLayer &&
-                    map.hasLayer(anchorMarker._lahdPropertyHeatLayer)
-                ) {
-                    map.removeLayer(anchorMarker._lahdPropertyHeatLayer);
-                }
-                return;
+            if (
+                !showHeat &&
+                anchorMarker._lahdPropertyHeatLayer &&
+                map.hasLayer(anchorMarker._lahdPropertyHeatLayer)
+            ) {
+                map.removeLayer(anchorMarker._lahdPropertyHeatLayer);
             }
-
-            if (!heatPoints.length) {
+            if (!loadHeatViewport || (!showHeat && !showMarkers)) {
                 return;
             }
 
-            ensureLeafletHeatLoaded()
-                .then(function() {
+            loadHeatViewport(map)
+                .then(function(payload) {
                     const liveMap = anchorMarker._map;
-
-                    if (!liveMap || liveMap.getZoom() >= heatZoomMax) {
+                    if (!payload || !liveMap) {
                         return;
                     }
 
-                    if (!liveMap.getPane("lahdPropertyHeatPane")) {
-                        const heatPane = liveMap.createPane("lahdPropertyHeatPane");
-                        heatPane.style.zIndex = "392";
-                        heatPane.style.pointerEvents = "none";
-                    }
-
-                    if (!anchorMarker._lahdPropertyHeatLayer) {
-                        anchorMarker._lahdPropertyHeatLayer = L.heatLayer(heatPoints, heatOptions);
+                    if (liveMap.getZoom() >= markerZoomMin) {
+                        refreshMarkerLayer(liveMap, parseMarkerPoints(payload.marker_points));
                     }
 
-                    if (!liveMap.hasLayer(anchorMarker._lahdPropertyHeatLayer)) {
-                        anchorMarker._lahdPropertyHeatLayer.addTo(liveMap);
+                    const heatPoints = parseHeatPoints(payload.heat_points);
+                    if (heatPoints.length || anchorMarker._lahdPropertyHeatLayer) {
+                        return mountHeatLayer(heatPoints);
                     }
                 })
                 .catch(function(error) {
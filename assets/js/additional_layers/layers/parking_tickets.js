@@ -7,12 +7,14 @@
     const popupApi = window.additionalLayerPopups;
     const popupRuntime = popupApi && popupApi.runtime;
     const buildResponsivePopupOptions = popupRuntime && popupRuntime.buildResponsivePopupOptions;
+    const createHeatViewportLoader = popupRuntime && popupRuntime.createHeatViewportLoader;
     const ensureLeafletHeatLoaded = popupRuntime && popupRuntime.ensureLeafletHeatLoaded;
     const getPopupBuilder = popupRuntime && popupRuntime.getPopupBuilder;
     const registerLayerRenderer = popupRuntime && popupRuntime.registerLayerRenderer;
 
     if (
         typeof buildResponsivePopupOptions !== "function" ||
+        typeof createHeatViewportLoader !== "function" ||
         typeof ensureLeafletHeatLoaded !== "function" ||
         typeof getPopupBuilder !== "function" ||
         typeof registerLayerRenderer !== "function"
@@ -42,8 +44,7 @@
     /**
      * @typedef {{
      *   layer_role?: unknown,
-     *   heat_points?: unknown,
-     *   marker_points?: unknown,
+     *   heat_cells_url?: unknown,
      *   heat_max_intensity?: unknown,
      *   max_citation_count?: unknown,
      *   marker_frequency_breaks?: unknown,
@@ -74,117 +75,13 @@
      */
 
     /**
-     * Return the inclusive upper percentile threshold from a sorted count distribution.
+     * Parse heat-cell tuples returned by the heat route.
      *
-     * @param {number[]} counts Sorted positive citation counts.
-     * @param {number} fraction Percentile fraction in the inclusive `(0, 1]` range.
-     * @returns {number} Integer threshold for the requested percentile.
+     * @param {unknown} rawHeatPoints Candidate `[lat, lon, weight]` tuples.
+     * @returns {HeatPointTuple[]} Finite heat points.
      */
-    function pickPercentileThreshold(counts, fraction) {
-        if (!Array.isArray(counts) || !counts.length) {
-            return 0;
-        }
-
-        const clampedFraction = Math.min(1, Math.max(0, Number(fraction) || 0));
-        const index = Math.min(
-            counts.length - 1,
-            Math.max(0, Math.ceil(clampedFraction * counts.length) - 1)
-        );
-        return Math.max(1, Math.round(Number(counts[index]) || 0));
-    }
-
-    /**
-     * Round a citation count up to a label-friendly threshold.
-     *
-     * @param {number} value Candidate citation-count threshold.
-     * @returns {number} Rounded-up threshold suitable for a legend label.
-     */
-    function roundUpToFriendlyCount(value) {
-        const numericValue = Math.max(1, Math.round(Number(value) || 0));
-
-        if (numericValue <= 25) {
-            return Math.ceil(numericValue / 5) * 5;
-        }
-        if (numericValue <= 100) {
-            return Math.ceil(numericValue / 10) * 10;
-        }
-        if (numericValue <= 500) {
-            return Math.ceil(numericValue / 25) * 25;
-        }
-        if (numericValue <= 1000) {
-            return Math.ceil(numericValue / 50) * 50;
-        }
-        return Math.ceil(numericValue / 100) * 100;
-    }
-
-    /**
-     * Derive hybrid marker tiers that stay user-readable while isolating outliers.
-     *
-     * The first tiers use fixed yearly frequencies:
-     * - monthly-ish: 12 per year
-     * - weekly-ish: 52 per year
-     * - several per week: 156 per year
-     *
-     * The highest tier is reserved for statistical outliers using the larger of:
-     * - 520 citations/year (roughly 10 per week)
-     * - the rounded 99th-percentile threshold in the current dataset
-     *
-     * @param {number[]} counts Positive citation counts.
-     * @returns {number[]} Ascending integer thresholds for five marker tiers.
-     */
-    function deriveHybridMarkerBreaks(counts) {
-        const sanitizedCounts = Array.isArray(counts)
-            ? counts
-                .map(function(value) {
-                    return Number(value);
-                })
-                .filter(function(value) {
-                    return Number.isFinite(value) && value > 0;
-                })
-                .sort(function(a, b) {
-                    return a - b;
-                })
-            : [];
-
-        const baselineBreaks = [12, 52, 156, 520];
-        if (!sanitizedCounts.length) {
-            return baselineBreaks;
-        }
-
-        const percentile99 = pickPercentileThreshold(sanitizedCounts, 0.99);
-        const extremeThreshold = Math.max(
-            baselineBreaks[3],
-            roundUpToFriendlyCount(percentile99)
-        );
-
-        return [baselineBreaks[0], baselineBreaks[1], baselineBreaks[2], extremeThreshold];
-    }
-
-    /**
-     * Create the invisible anchor marker used to mount a true Leaflet heat layer.
-     *
-     * Dash Leaflet renders one Leaflet layer per GeoJSON feature. For the parking
-     * heatmap we only return a single invisible point feature and store the real
-     * weighted hotspots and marker hotspots on that feature. This hook manages a
-     * true `L.heatLayer(...)` plus a zoomed-in marker layer so the presentation can
-     * transition as users zoom closer to street level.
-     *
-     * @param {{ properties?: Record<string, unknown> }} feature GeoJSON anchor feature for the parking heatmap.
-     * @param {unknown} latlng Leaflet lat/lng argument supplied by the layer renderer.
-     * @returns {L.Marker} Invisible marker that owns the heat layer lifecycle.
-     */
-    function drawParkingHeatLayer(feature, latlng) {
-        /** @type {ParkingHeatPointProperties} */
-        const properties = feature && feature.properties ? feature.properties : {};
-        const rawHeatPoints = Array.isArray(properties.heat_points)
-            ? properties.heat_points
-            : [];
-        const rawMarkerPoints = Array.isArray(properties.marker_points)
-            ? properties.marker_points
-            : [];
-
-        /** @type {HeatPointTuple[]} */
-        const heatPoints = rawHeatPoints
+    function parseHeatPoints(rawHeatPoints) {
+        return (Array.isArray(rawHeatPoints) ? rawHeatPoints : [])
             .map(function(point) {
                 if (!Array.isArray(point) || point.length < 3) {
                     return null;
@@ -202,8 +99,16 @@
             .filter(function(point) {
                 return Array.isArray(point);
             });
-        /** @type {MarkerPointTuple[]} */
-        const markerPoints = rawMarkerPoints
+    }
+
+    /**
+     * Parse street-level marker tuples returned by the heat route.
+     *
+     * @param {unknown} rawMarkerPoints Candidate marker tuples.
+     * @returns {MarkerPointTuple[]} Markers with finite numbers and a location.
+     */
+    function parseMarkerPoints(rawMarkerPoints) {
+        return (Array.isArray(rawMarkerPoints) ? rawMarkerPoints : [])
             .map(function(point) {
                 if (!Array.isArray(point) || point.length < 6) {
                     return null;
@@ -233,18 +138,56 @@
             .filter(function(point) {
                 return Array.isArray(point);
             });
+    }
+
+    /**
+     * Normalize the marker tier thresholds computed by the layer builder.
+     *
+     * The builder derives hybrid tiers over every marker: fixed monthly,
+     * weekly and several-per-week frequencies plus an outlier tier. The
+     * renderer only receives the markers in view, so it cannot derive them.
+     *
+     * @param {unknown} rawBreaks Candidate thresholds from the anchor feature.
+     * @returns {number[]} Ascending integer thresholds for five marker tiers.
+     */
+    function normalizeMarkerBreaks(rawBreaks) {
+        const breaks = Array.isArray(rawBreaks)
+            ? rawBreaks
+                .map(function(value) {
+                    return Math.round(Number(value));
+                })
+                .filter(function(value) {
+                    return Number.isFinite(value) && value > 0;
+                })
+            : [];
+
+        return breaks.length === 4 ? breaks : [12, 52, 156, 520];
+    }
+
+    /**
+     * Create the invisible anchor marker used to mount a true Leaflet heat layer.
+     *
+     * Dash Leaflet renders one Leaflet layer per GeoJSON feature. For the parking
+     * heatmap we only return a single invisible point feature whose
+     * `heat_cells_url` serves the pre-aggregated heat cells and marker hotspots
+     * of a viewport. This hook manages a true `L.heatLayer(...)` plus a
+     * zoomed-in marker layer, refetching on zoom and pan, so the presentation
+     * can transition as users zoom closer to street level.
+     *
+     * @param {{ properties?: Record<string, unknown> }} feature GeoJSON anchor feature for the parking heatmap.
+     * @param {unknown} latlng Leaflet lat/lng argument supplied by the layer renderer.
+     * @returns {L.Marker} Invisible marker that owns the heat layer lifecycle.
+     */
+    function drawParkingHeatLayer(feature, latlng) {
+        /** @type {ParkingHeatPointProperties} */
+        const properties = feature && feature.properties ? feature.properties : {};
         const popupBuilder = getPopupBuilder("buildParkingTicketsPopupContent");
         const markerZoomMin = Number(properties.marker_zoom_min) || 15;
         const heatZoomMax = Number(properties.heat_zoom_max) || 16;
         const maxCitationCount = Math.max(1, Number(properties.max_citation_count) || 1);
-        const markerCitationCounts = markerPoints
-            .map(function(point) {
-                return Number(point[2]);
-            })
-            .filter(function(value) {
-                return Number.isFinite(value) && value > 0;
-            });
-        const markerFrequencyBreaks = deriveHybridMarkerBreaks(markerCitationCounts);
+        const markerFrequencyBreaks = normalizeMarkerBreaks(properties.marker_frequency_breaks);
+        const heatCellsUrl = String(properties.heat_cells_url || "").trim();
+        const loadHeatViewport = heatCellsUrl ? createHeatViewportLoader(heatCellsUrl) : null;
 
         const anchorMarker = L.marker(latlng, {
             opacity: 0,
@@ -516,18 +459,19 @@
             return anchorMarker._parkingTicketsMarkerLayer;
         }
 
-        function refreshMarkerLayer(map) {
+        /**
+         * Replace the street-level markers with the ones returned for the viewport.
+         *
+         * @param {L.Map} map Active Leaflet map.
+         * @param {MarkerPointTuple[]} markerPoints Markers inside the padded viewport.
+         * @returns {void}
+         */
+        function refreshMarkerLayer(map, markerPoints) {
             const markerLayer = createMarkerLayer(map);
-            const paddedBounds = map.getBounds().pad(0.2);
-            const visiblePoints = markerPoints
-                .filter(function(point) {
-                    return paddedBounds.contains([point[0], point[1]]);
-                })
-                .slice(0, 1200);
 
             markerLayer.clearLayers();
 
-            visiblePoints.forEach(function(point) {
+            markerPoints.forEach(function(point) {
                 const markerProperties = {
                     location: point[5],
                     citation_count: point[2],
@@ -565,6 +509,41 @@
             }
         }
 
+        /**
+         * Mount the heat layer, or swap in the cells returned for a new viewport.
+         *
+         * @param {HeatPointTuple[]} heatPoints Aggregated heat cells for the viewport.
+         * @returns {Promise<void>} Promise that settles once the heat layer is current.
+         */
+        function mountHeatLayer(heatPoints) {
+            return ensureLeafletHeatLoaded().then(function() {
+                const liveMap = anchorMarker._map;
+
+                if (!liveMap) {
+                    return;
+                }
+                if (liveMap.getZoom() >= heatZoomMax) {
+                    return;
+                }
+
+                if (!liveMap.getPane("parkingTicketsHeatPane")) {
+                    const heatPane = liveMap.createPane("parkingTicketsHeatPane");
+                    heatPane.style.zIndex = "390";
+                    heatPane.style.pointerEvents = "none";
+                }
+
+                if (!anchorMarker._parkingTicketsHeatLayer) {
+                    anchorMarker._parkingTicketsHeatLayer = L.heatLayer(heatPoints, heatOptions);
+                } else {
+                    anchorMarker._parkingTicketsHeatLayer.setLatLngs(heatPoints);
+                }
+
+                if (!liveMap.hasLayer(anchorMarker._parkingTicketsHeatLayer)) {
+                    anchorMarker._parkingTicketsHeatLayer.addTo(liveMap);
+                }
+            });
+        }
+
         function syncParkingTicketsPresentation() {
             const map = anchorMarker._map;
             if (!map) {
@@ -576,49 +555,34 @@
             const showHeat = zoom < heatZoomMax;
             syncLegend(map, { showHeat: showHeat, showMarkers: showMarkers });
 
-            if (showMarkers && markerPoints.length) {
-                refreshMarkerLayer(map);
-            } else {
+            if (!showMarkers) {
                 hideMarkerLayer(map);
             }
-
-            if (!showHeat) {
-                if (
-                    anchorMarker._parkingTicketsHeatLayer &&
-                    map.hasLayer(anchorMarker._parkingTicketsHeatLayer)
-                ) {
-                    map.removeLayer(anchorMarker._parkingTicketsHeatLayer);
-                }
-                return;
+            if (
+                !showHeat &&
+                anchorMarker._parkingTicketsHeatLayer &&
+                map.hasLayer(anchorMarker._parkingTicketsHeatLayer)
+            ) {
+                map.removeLayer(anchorMarker._parkingTicketsHeatLayer);
             }
-
-            if (!heatPoints.length) {
+            if (!loadHeatViewport || (!showHeat && !showMarkers)) {
                 return;
             }
 
-            ensureLeafletHeatLoaded()
-                .then(function() {
+            loadHeatViewport(map)
+                .then(function(payload) {
                     const liveMap = anchorMarker._map;
-
-                    if (!liveMap) {
+                    if (!payload || !liveMap) {
                         return;
                     }
-                    if (liveMap.getZoom() >= heatZoomMax) {
-                        return;
-                    }
-
-                    if (!liveMap.getPane("parkingTicketsHeatPane")) {
-                        const heatPane = liveMap.createPane("parkingTicketsHeatPane");
-                        heatPane.style.zIndex = "390";
-                        heatPane.style.pointerEvents = "none";
-                    }
 
-                    if (!anchorMarker._parkingTicketsHeatLayer) {
-                        anchorMarker._parkingTicketsHeatLayer = L.heatLayer(heatPoints, heatOptions);
+                    if (liveMap.getZoom() >= markerZoomMin) {
+                        refreshMarkerLayer(liveMap, parseMarkerPoints(payload.marker_points));
                     }
 
-                    if (!liveMap.hasLayer(anchorMarker._parkingTicketsHeatLayer)) {
-                        anchorMarker._parkingTicketsHeatLayer.addTo(liveMap);
+                    const heatPoints = parseHeatPoints(payload.heat_points);
+                    if (heatPoints.length || anchorMarker._parkingTicketsHeatLayer) {
+                        return mountHeatLayer(heatPoints);
                     }
                 })
                 .catch(function(error) {
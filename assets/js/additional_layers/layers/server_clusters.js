@@ -0,0 +1,276 @@
+/**
+ * Render overlays whose clusters are precomputed on the server.
+ */
+(function() {
+    "use strict";
+
+    const popupApi = window.additionalLayerPopups;
+    const popupRuntime = popupApi && popupApi.runtime;
+    const createHeatViewportLoader = popupRuntime && popupRuntime.createHeatViewportLoader;
+    const registerLayerRenderer = popupRuntime && popupRuntime.registerLayerRenderer;
+
+    if (typeof createHeatViewportLoader !== "function" || typeof registerLayerRenderer !== "function") {
+        console.error("Additional layer popup runtime did not load before the server cluster renderer.");
+        return;
+    }
+
+    // Same size classes as Dash Leaflet's default cluster icon.
+    const CLUSTER_SIZE_CLASSES = Object.freeze([
+        { minCount: 0, className: "marker-cluster marker-cluster-small" },
+        { minCount: 100, className: "marker-cluster marker-cluster-medium" },
+        { minCount: 1000, className: "marker-cluster marker-cluster-large" },
+    ]);
+
+    /**
+     * @typedef {{
+     *   cluster?: boolean,
+     *   cluster_id?: number,
+     *   point_count?: number,
+     *   point_count_abbreviated?: number | string,
+     *   hull?: Array<[number, number]> | null,
+     * } & Record<string, unknown>} ServerClusterProperties
+     */
+
+    /**
+     * Look up a renderer registered on the Dash Leaflet namespace.
+     *
+     * @param {unknown} rendererName Registered renderer name.
+     * @returns {Function|null} Renderer function, or `null` when unknown.
+     */
+    function getLayerRenderer(rendererName) {
+        const namespace = window.myNamespace && window.myNamespace.mySubNamespace;
+        const renderer = namespace && typeof rendererName === "string" ? namespace[rendererName] : null;
+        return typeof renderer === "function" ? renderer : null;
+    }
+
+    /**
+     * Convert a server hull ring to Leaflet lat/lng pairs.
+     *
+     * @param {ServerClusterProperties} properties Cluster feature properties.
+     * @returns {Array<[number, number]>} Hull vertices as `[lat, lng]`, empty when absent.
+     */
+    function hullLatLngs(properties) {
+        const hull = Array.isArray(properties.hull) ? properties.hull : [];
+        return hull
+            .filter(function(vertex) {
+                return Array.isArray(vertex) && vertex.length >= 2;
+            })
+            .map(function(vertex) {
+                return [vertex[1], vertex[0]];
+            });
+    }
+
+    /**
+     * Stand in for a Supercluster index so cluster renderers draw the server hull.
+     *
+     * Cluster renderers compute a convex hull over `index.getLeaves(...)`; the
+     * hull of the precomputed hull's vertices is that same hull.
+     *
+     * @param {ServerClusterProperties} properties Cluster feature properties.
+     * @returns {{getLeaves: () => Array<Object>}} Index-like object.
+     */
+    function buildHullIndex(properties) {
+        const leaves = hullLatLngs(properties).map(function(latLng) {
+            return { type: "Feature", properties: {}, geometry: { type: "Point", coordinates: [latLng[1], latLng[0]] } };
+        });
+        return {
+            getLeaves: function() {
+                return leaves;
+            },
+        };
+    }
+
+    /**
+     * Build the default count marker for clusters without a custom renderer.
+     *
+     * @param {{ properties: ServerClusterProperties }} feature Cluster feature.
+     * @param {L.LatLng} latlng Cluster position.
+     * @param {{ map: L.Map, currentPolygon: L.Layer | null }} context Shared hover state.
+     * @returns {L.Marker} Cluster marker that outlines its hull on hover.
+     */
+    function drawDefaultCluster(feature, latlng, context) {
+        const properties = feature.properties;
+        const count = Number(properties.point_count) || 0;
+        let className = "";
+        CLUSTER_SIZE_CLASSES.forEach(function(entry) {
+            if (count > entry.minCount) {
+                className = entry.className;
+            }
+        });
+        const marker = L.marker(latlng, {
+            icon: L.divIcon({
+                html: "<div><span>" + String(properties.point_count_abbreviated || count) + "</span></div>",
+                className: className,
+                iconSize: L.point(40, 40),
+            }),
+        });
+        const hull = hullLatLngs(properties);
+
+        /**
+         * Outline the cluster's hull while the pointer is over it.
+         *
+         * @returns {void}
+         */
+        function showHull() {
+            hideHull();
+            if (hull.length >= 3) {
+                context.currentPolygon = L.polygon(hull, { interactive: false, weight: 2 }).addTo(context.map);
+            }
+        }
+
+        /**
+         * Remove the hull outline shown for any cluster.
+         *
+         * @returns {void}
+         */
+        function hideHull() {
+            if (context.currentPolygon) {
+                context.map.removeLayer(context.currentPolygon);
+                context.currentPolygon = null;
+            }
+        }
+
+        marker.on("mouseover", showHull);
+        marker.on("mouseout", hideHull);
+        marker.on("remove", hideHull);
+        return marker;
+    }
+
+    /**
+     * Create the invisible anchor that draws a layer's server clusters for the viewport.
+     *
+     * The anchor fetches `clusters_url` with the same padded, abortable
+     * viewport loader as the heat layers, then draws single points with the
+     * layer's `point_to_layer` renderer and clusters with its
+     * `cluster_to_layer` renderer (or a default count marker). Clicking a
+     * cluster zooms to its hull.
+     *
+     * @param {{ properties?: Record<string, unknown> }} feature Anchor feature built by the server.
+     * @param {unknown} latlng Leaflet lat/lng argument supplied by the layer renderer.
+     * @returns {L.Marker} Invisible marker that owns the cluster layer lifecycle.
+     */
+    function drawServerClusterLayer(feature, latlng) {
+        const properties = feature && feature.properties ? feature.properties : {};
+        const clustersUrl = String(properties.clusters_url || "").trim();
+        const loadClusters = clustersUrl ? createHeatViewportLoader(clustersUrl) : null;
+        const drawPoint = getLayerRenderer(properties.point_to_layer);
+        const drawCluster = getLayerRenderer(properties.cluster_to_layer);
+
+        const anchorMarker = L.marker(latlng, {
+            opacity: 0,
+            interactive: false,
+            keyboard: false,
+            bubblingMouseEvents: false,
+        });
+        const context = { map: null, currentPolygon: null };
+
+        /**
+         * Draw one cluster and make it zoom to its members on click.
+         *
+         * @param {{ properties: ServerClusterProperties }} clusterFeature Cluster feature.
+         * @param {L.LatLng} clusterLatLng Cluster position.
+         * @returns {L.Layer} Cluster marker.
+         */
+        function renderCluster(clusterFeature, clusterLatLng) {
+            const marker = drawCluster
+                ? drawCluster(clusterFeature, clusterLatLng, buildHullIndex(clusterFeature.properties), context)
+                : drawDefaultCluster(clusterFeature, clusterLatLng, context);
+            marker.on("click", function() {
+                const hull = hullLatLngs(clusterFeature.properties);
+                if (hull.length >= 3) {
+                    context.map.fitBounds(L.latLngBounds(hull));
+                } else {
+                    context.map.setView(clusterLatLng, context.map.getZoom() + 2);
+                }
+            });
+            return marker;
+        }
+
+        /**
+         * Replace the drawn clusters and points with the viewport payload.
+         *
+         * @param {L.Map} map Active Leaflet map.
+         * @param {{ features?: Array<Object> }} payload Cluster route response.
+         * @returns {void}
+         */
+        function renderPayload(map, payload) {
+            if (!anchorMarker._serverClusterLayer) {
+                anchorMarker._serverClusterLayer = L.layerGroup().addTo(map);
+            }
+            const group = anchorMarker._serverClusterLayer;
+            group.clearLayers();
+            (payload.features || []).forEach(function(item) {
+                const coordinates = item && item.geometry && item.geometry.coordinates;
+                if (!Array.isArray(coordinates) || coordinates.length < 2) {
+                    return;
+                }
+                const itemLatLng = L.latLng(coordinates[1], coordinates[0]);
+                const layer = item.properties && item.properties.cluster
+                    ? renderCluster(item, itemLatLng)
+                    : drawPoint
+                        ? drawPoint(item, itemLatLng)
+                        : L.marker(itemLatLng);
+                if (layer) {
+                    group.addLayer(layer);
+                }
+            });
+        }
+
+        /**
+         * Load and draw the clusters for the current viewport.
+         *
+         * @returns {void}
+         */
+        function syncServerClusters() {
+            const map = anchorMarker._map;
+            if (!map || !loadClusters) {
+                return;
+            }
+
+            loadClusters(map)
+                .then(function(payload) {
+                    const liveMap = anchorMarker._map;
+                    if (payload && liveMap) {
+                        renderPayload(liveMap, payload);
+                    }
+                })
+                .catch(function(error) {
+                    console.error("Server clusters could not be loaded.", error);
+                });
+        }
+
+        anchorMarker.on("add", function() {
+            const map = anchorMarker._map;
+            if (!map) {
+                return;
+            }
+
+            context.map = map;
+            anchorMarker._serverClusterSync = syncServerClusters;
+            map.on("moveend", anchorMarker._serverClusterSync);
+            syncServerClusters();
+        });
+
+        anchorMarker.on("remove", function() {
+            const map = context.map;
+
+            if (map && anchorMarker._serverClusterSync) {
+                map.off("moveend", anchorMarker._serverClusterSync);
+            }
+            if (map && anchorMarker._serverClusterLayer) {
+                map.removeLayer(anchorMarker._serverClusterLayer);
+            }
+            if (map && context.currentPolygon) {
+                map.removeLayer(context.currentPolygon);
+            }
+            anchorMarker._serverClusterLayer = null;
+            anchorMarker._serverClusterSync = null;
+            context.currentPolygon = null;
+            context.map = null;
+        });
+
+        return anchorMarker;
+    }
+
+    registerLayerRenderer("drawServerClusterLayer", drawServerClusterLayer);
+})();
@@ -0,0 +1,90 @@
+/**
+ * Expand compact point-layer payloads into GeoJSON FeatureCollections.
+ *
+ * Mirrors `decode_compact_layer` in functions/compact_layers.py: coordinates
+ * are delta-encoded integers at `precision` decimal places, and each property
+ * is a column holding either plain `values` or dictionary `codes`.
+ */
+(function () {
+  "use strict";
+
+  const COMPACT_LAYER_TYPE = "CompactFeatureCollection";
+  const COMPACT_LAYER_FORMAT_VERSION = 1;
+  const RESERVED_MEMBERS = new Set(["type", "format", "precision", "count", "coordinates", "properties"]);
+
+  /**
+   * Report whether a payload uses the compact layer encoding.
+   *
+   * @param {unknown} payload - Decoded layer payload.
+   * @returns {boolean} True for a compact payload.
+   */
+  function isCompactLayer(payload) {
+    return Boolean(payload) && payload.type === COMPACT_LAYER_TYPE;
+  }
+
+  /**
+   * Expand one property column into a value per feature.
+   *
+   * @param {{values?: Array, dictionary?: Array<string>, codes?: Array<number|null>}} column - Encoded column.
+   * @returns {Array} Column values in feature order.
+   */
+  function decodeColumn(column) {
+    if (!column.dictionary) {
+      return column.values;
+    }
+    const dictionary = column.dictionary;
+    return column.codes.map((code) => (code === null ? null : dictionary[code]));
+  }
+
+  /**
+   * Expand a compact layer payload; GeoJSON payloads are returned unchanged.
+   *
+   * @param {Object} payload - Compact payload or GeoJSON FeatureCollection.
+   * @returns {Object} GeoJSON FeatureCollection.
+   */
+  function decodeCompactLayer(payload) {
+    if (!isCompactLayer(payload)) {
+      return payload;
+    }
+    if (payload.format !== COMPACT_LAYER_FORMAT_VERSION) {
+      throw new Error(`Unsupported compact layer format ${payload.format}`);
+    }
+
+    const precision = payload.precision;
+    const scale = Math.pow(10, precision);
+    const keys = Object.keys(payload.properties);
+    const columns = keys.map((key) => decodeColumn(payload.properties[key]));
+    const deltas = payload.coordinates;
+    const features = new Array(payload.count);
+    let lon = 0;
+    let lat = 0;
+
+    for (let index = 0; index < payload.count; index += 1) {
+      lon += deltas[2 * index];
+      lat += deltas[2 * index + 1];
+      const properties = {};
+      for (let column = 0; column < keys.length; column += 1) {
+        properties[keys[column]] = columns[column][index];
+      }
+      features[index] = {
+        type: "Feature",
+        geometry: {
+          type: "Point",
+          coordinates: [Number((lon / scale).toFixed(precision)), Number((lat / scale).toFixed(precision))],
+        },
+        properties,
+      };
+    }
+
+    const collection = {};
+    Object.keys(payload).forEach((key) => {
+      if (!RESERVED_MEMBERS.has(key)) {
+        collection[key] = payload[key];
+      }
+    });
+    return Object.assign(collection, {type: "FeatureCollection", features});
+  }
+
+  window.larentals = window.larentals || {};
+  window.larentals.compactLayers = {isCompactLayer, decodeCompactLayer};
+})();
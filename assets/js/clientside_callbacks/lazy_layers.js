@@ -0,0 +1,65 @@
+/**
+ * Load optional map overlays from their static, pre-compressed artifacts
+ * the first time the user enables them. Server-clustered overlays load their
+ * anchor instead, which fetches clusters per viewport once it is on the map.
+ */
+(function () {
+  "use strict";
+
+  /**
+   * Fetch a layer artifact, expanding compact point layers, and fail on non-2xx responses.
+   *
+   * @param {string} url - Versioned same-origin layer artifact URL.
+   * @returns {Promise<Object>} Decoded GeoJSON FeatureCollection.
+   */
+  function fetchLayer(url) {
+    return fetch(url, {
+      credentials: "same-origin",
+      headers: {Accept: "application/json"},
+    }).then((response) => {
+      if (!response.ok) {
+        throw new Error(`Layer request failed with HTTP ${response.status}`);
+      }
+      return response.json();
+    }).then((payload) => window.larentals.compactLayers.decodeCompactLayer(payload));
+  }
+
+  window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    clientside: Object.assign({}, window.dash_clientside && window.dash_clientside.clientside, {
+      /**
+       * Resolve lazy overlay payloads for the pattern-matched GeoJSON layers.
+       *
+       * Layers that are enabled, not yet loaded, and listed in the page's
+       * layer sources are fetched by URL; the versioned URL lets the browser
+       * cache each artifact until its source changes. Every other output
+       * (including the server-filtered Schools layer) is left untouched.
+       *
+       * @param {Array<string>|null} selectedOverlays - Enabled overlay names.
+       * @param {Array<Object>|null} layerIds - Pattern-matching layer ids.
+       * @param {Array<Object|null>|null} currentData - Loaded payloads, aligned with `layerIds`.
+       * @param {Object|null} layerSources - `{layer_key: {name, url, anchor?}}` from the page store.
+       * @returns {Promise<Array>|Array} Payloads or `no_update` per layer.
+       */
+      loadLazyLayerData: function(selectedOverlays, layerIds, currentData, layerSources) {
+        const noUpdate = window.dash_clientside.no_update;
+        const selected = new Set(selectedOverlays || []);
+        const sources = layerSources || {};
+        const existing = currentData || [];
+
+        return Promise.all((layerIds || []).map((layerId, index) => {
+          const source = sources[layerId.layer];
+          if (!source || !selected.has(source.name) || existing[index] != null) {
+            return noUpdate;
+          }
+          if (source.anchor) {
+            return source.anchor;
+          }
+          return fetchLayer(source.url).catch((error) => {
+            console.error(`Failed to load ${layerId.layer} layer`, error);
+            return noUpdate;
+          });
+        }));
+      }
+    })
+  });
+})();
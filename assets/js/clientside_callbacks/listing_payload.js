@@ -0,0 +1,303 @@
+/**
+ * Load listing map payloads, persisting them in IndexedDB so returning
+ * visitors only download the listings that changed since their last visit,
+ * and fill the map from the viewport route while the payload downloads.
+ */
+(function () {
+  "use strict";
+
+  const DB_NAME = "wheretolive-listing-payloads";
+  const STORE_NAME = "payloads";
+  const FEATURE_ID = "mls_number";
+  const VIEWPORT_PADDING = 0.25;
+
+  // Pages whose full payload has been handed to the map store.
+  const deliveredPages = new Set();
+  // Last viewport request per page: padded bounds, zoom, and an abort handle.
+  const viewportRequests = {};
+
+  /**
+   * Open the IndexedDB database that persists listing payloads between visits.
+   *
+   * @returns {Promise<IDBDatabase|null>} Open database, or null when unavailable.
+   */
+  function openPayloadDb() {
+    if (!window.indexedDB) {
+      return Promise.resolve(null);
+    }
+    return new Promise((resolve) => {
+      const request = window.indexedDB.open(DB_NAME, 1);
+      request.onupgradeneeded = () => request.result.createObjectStore(STORE_NAME);
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => resolve(null);
+      request.onblocked = () => resolve(null);
+    });
+  }
+
+  /**
+   * Read the persisted payload for one page.
+   *
+   * @param {string} pageType - Page key such as "lease" or "buy".
+   * @returns {Promise<{version: string, payload: Object}|null>} Stored entry.
+   */
+  function readStoredPayload(pageType) {
+    return openPayloadDb().then((db) => {
+      if (!db) {
+        return null;
+      }
+      return new Promise((resolve) => {
+        const request = db.transaction(STORE_NAME, "readonly").objectStore(STORE_NAME).get(pageType);
+        request.onsuccess = () => resolve(request.result || null);
+        request.onerror = () => resolve(null);
+      });
+    }).catch(() => null);
+  }
+
+  /**
+   * Persist a page's payload; failures (quota, private mode) are ignored.
+   *
+   * @param {string} pageType - Page key such as "lease" or "buy".
+   * @param {string} version - Server payload version.
+   * @param {Object} payload - GeoJSON FeatureCollection.
+   * @returns {Promise<void>} Resolves once the write settles.
+   */
+  function writeStoredPayload(pageType, version, payload) {
+    return openPayloadDb().then((db) => {
+      if (!db) {
+        return;
+      }
+      return new Promise((resolve) => {
+        const transaction = db.transaction(STORE_NAME, "readwrite");
+        transaction.objectStore(STORE_NAME).put({version, payload}, pageType);
+        transaction.oncomplete = () => resolve();
+        transaction.onerror = () => resolve();
+        transaction.onabort = () => resolve();
+      });
+    }).catch(() => undefined);
+  }
+
+  /**
+   * Fetch JSON and fail on non-2xx responses.
+   *
+   * @param {string} url - Same-origin URL to fetch.
+   * @returns {Promise<Object>} Decoded JSON body.
+   */
+  function fetchJson(url) {
+    return fetch(url, {
+      credentials: "same-origin",
+      headers: {Accept: "application/json"},
+    }).then((response) => {
+      if (!response.ok) {
+        throw new Error(`Listing payload request failed with HTTP ${response.status}`);
+      }
+      return response.json();
+    });
+  }
+
+  /**
+   * Apply a server delta to a stored FeatureCollection.
+   *
+   * @param {Object} payload - Previously stored FeatureCollection.
+   * @param {Object} delta - Delta with `upserted` features and `removed` ids.
+   * @returns {Object} New FeatureCollection for the delta's version.
+   */
+  function applyDelta(payload, delta) {
+    const removed = new Set(delta.removed || []);
+    const upserted = new Map();
+    (delta.upserted || []).forEach((feature) => {
+      upserted.set(String(feature.properties[FEATURE_ID]), feature);
+    });
+
+    const features = [];
+    (payload.features || []).forEach((feature) => {
+      const featureId = String(((feature && feature.properties) || {})[FEATURE_ID]);
+      if (removed.has(featureId)) {
+        return;
+      }
+      if (upserted.has(featureId)) {
+        features.push(upserted.get(featureId));
+        upserted.delete(featureId);
+        return;
+      }
+      features.push(feature);
+    });
+    upserted.forEach((feature) => features.push(feature));
+    return Object.assign({}, payload, {features});
+  }
+
+  /**
+   * Resolve the current payload from the local copy, a delta, or a full fetch.
+   *
+   * @param {string} payloadUrl - Versioned listing-payload URL.
+   * @returns {Promise<Object>} GeoJSON FeatureCollection for the current version.
+   */
+  function resolvePayload(payloadUrl) {
+    const url = new URL(payloadUrl, window.location.origin);
+    const version = url.searchParams.get("v") || "";
+    const pageType = url.pathname.split("/")[2];
+    const fetchFull = () => fetchJson(payloadUrl).then((payload) => {
+      writeStoredPayload(pageType, version, payload);
+      return payload;
+    });
+
+    return readStoredPayload(pageType).then((stored) => {
+      if (!stored || !stored.payload) {
+        return fetchFull();
+      }
+      if (stored.version === version) {
+        return stored.payload;
+      }
+
+      const deltaUrl = url.pathname.replace(/listings-payload$/, "listings-delta")
+        + `?since=${encodeURIComponent(stored.version)}`;
+      return fetchJson(deltaUrl).then((delta) => {
+        if (delta.type !== "delta" || delta.version !== version) {
+          return fetchFull();
+        }
+        const payload = applyDelta(stored.payload, delta);
+        writeStoredPayload(pageType, version, payload);
+        return payload;
+      }).catch(fetchFull);
+    });
+  }
+
+  /**
+   * Derive the page key from a listing-payload URL.
+   *
+   * @param {string} payloadUrl - Versioned listing-payload URL.
+   * @returns {string} Page key such as "lease" or "buy".
+   */
+  function pageTypeFromUrl(payloadUrl) {
+    return new URL(payloadUrl, window.location.origin).pathname.split("/")[2];
+  }
+
+  /**
+   * Return whether filters other than the page defaults have been applied.
+   *
+   * @param {string} pageType - Page key such as "lease" or "buy".
+   * @returns {boolean} True when the applied state narrows the listings.
+   */
+  function hasAppliedFilters(pageType) {
+    const filters = window.larentals?.responsiveFilters;
+    const applied = filters?.applied?.[pageType];
+    const defaults = filters?.defaults?.[pageType];
+    return Boolean(applied && defaults && JSON.stringify(applied) !== JSON.stringify(defaults));
+  }
+
+  /**
+   * Pad Leaflet-style `[[south, west], [north, east]]` bounds on every side.
+   *
+   * @param {Array<Array<number>>} bounds - Map viewport bounds.
+   * @returns {{west: number, south: number, east: number, north: number}} Padded box.
+   */
+  function padBounds(bounds) {
+    const [[south, west], [north, east]] = bounds;
+    const padLng = (east - west) * VIEWPORT_PADDING;
+    const padLat = (north - south) * VIEWPORT_PADDING;
+    return {west: west - padLng, south: south - padLat, east: east + padLng, north: north + padLat};
+  }
+
+  window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    clientside: Object.assign({}, window.dash_clientside && window.dash_clientside.clientside, {
+      /**
+       * Load the listing FeatureCollection for the map store.
+       *
+       * Returning visitors reuse the copy persisted in IndexedDB and only
+       * download the listings that changed since their stored version; first
+       * visits fetch the versioned full payload, which the browser HTTP cache
+       * can also revalidate with `If-None-Match`.
+       *
+       * @param {number} nIntervals - Boot interval tick count (unused).
+       * @param {string|null} payloadUrl - Versioned listing-payload URL.
+       * @returns {Promise<Object>|Object} GeoJSON payload or a Dash sentinel.
+       */
+      loadListingPayload: function(nIntervals, payloadUrl) {
+        if (!payloadUrl) {
+          return window.dash_clientside.no_update;
+        }
+
+        const pageType = pageTypeFromUrl(payloadUrl);
+        deliveredPages.delete(pageType);
+        return resolvePayload(payloadUrl).then((payload) => {
+          deliveredPages.add(pageType);
+          return payload;
+        }).catch((error) => {
+          console.error("Failed to load listing payload", error);
+          return window.dash_clientside.no_update;
+        });
+      },
+
+      /**
+       * Show the listings in the current viewport until the full payload loads.
+       *
+       * Each pan or zoom asks `/api/<page>/listings-bbox` for the listings in
+       * a padded box around the viewport, so the map is populated before a
+       * slow connection finishes downloading every listing. Once the full
+       * payload reaches the map store, or filters are applied (which the
+       * responsive filters resolve server-side), the loader stands down.
+       *
+       * @param {Array<Array<number>>|null} bounds - Map `[[south, west], [north, east]]` bounds.
+       * @param {number|null} zoom - Map zoom level.
+       * @param {string|null} payloadUrl - Versioned listing-payload URL.
+       * @returns {Promise<Object>|Object} Viewport FeatureCollection or a Dash sentinel.
+       */
+      loadListingViewport: function(bounds, zoom, payloadUrl) {
+        const noUpdate = window.dash_clientside.no_update;
+        if (!payloadUrl || !Array.isArray(bounds) || !Number.isFinite(zoom)) {
+          return noUpdate;
+        }
+        const pageType = pageTypeFromUrl(payloadUrl);
+        if (deliveredPages.has(pageType) || hasAppliedFilters(pageType)) {
+          return noUpdate;
+        }
+
+        const [[south, west], [north, east]] = bounds;
+        const level = Math.floor(zoom);
+        const previous = viewportRequests[pageType];
+        if (
+          previous && previous.zoom === level &&
+          previous.box.west <= west && previous.box.south <= south &&
+          previous.box.east >= east && previous.box.north >= north
+        ) {
+          return noUpdate;
+        }
+        if (previous && previous.controller) {
+          previous.controller.abort();
+        }
+
+        const box = padBounds(bounds);
+        const controller = typeof AbortController === "function" ? new AbortController() : null;
+        const request = {box, zoom: level, controller};
+        viewportRequests[pageType] = request;
+        const bbox = [box.west, box.south, box.east, box.north].map((value) => value.toFixed(4)).join(",");
+        const url = new URL(payloadUrl, window.location.origin).pathname.replace(/listings-payload$/, "listings-bbox")
+          + `?zoom=${level}&bbox=${encodeURIComponent(bbox)}`;
+
+        return fetch(url, {
+          credentials: "same-origin",
+          headers: {Accept: "application/json"},
+          signal: controller ? controller.signal : undefined,
+        }).then((response) => {
+          if (!response.ok) {
+            throw new Error(`Listing viewport request failed with HTTP ${response.status}`);
+          }
+          return response.json();
+        }).then((payload) => {
+          if (viewportRequests[pageType] !== request || deliveredPages.has(pageType) || hasAppliedFilters(pageType)) {
+            return noUpdate;
+          }
+          request.controller = null;
+          return payload;
+        }).catch((error) => {
+          if (viewportRequests[pageType] === request) {
+            delete viewportRequests[pageType];
+          }
+          if (!error || error.name !== "AbortError") {
+            console.error("Failed to load listing viewport", error);
+          }
+          return noUpdate;
+        });
+      }
+    })
+  });
+})();
@@ -21,6 +21,7 @@
   ui.restoring = ui.restoring || {};
   ui.openedAt = ui.openedAt || {};
   ui.pageStartedAt = ui.pageStartedAt || {};
+  ui.serverFilterRequests = ui.serverFilterRequests || {};
 
   /**
    * Describe the pair of exact-value controls backing one hybrid range.
@@ -341,16 +342,77 @@
     return null;
   }
 
+  /**
+   * Ask the server which listings match a filter state.
+   * Used until the full listing payload has reached this browser.
+   * @param {ListingPage} page Listing mode being filtered.
+   * @param {FilterState} state Filter values to apply.
+   * @param {"ids" | "features"} format Result shape to request.
+   * @returns {Promise<Object | null>} Response body, or null when the request fails.
+   */
+  function fetchServerFilter(page, state, format) {
+    return fetch(`/api/${page}/listings-filter`, {
+      method: "POST",
+      credentials: "same-origin",
+      headers: { "Content-Type": "application/json", Accept: "application/json" },
+      body: JSON.stringify({ filters: state, format }),
+    }).then(function (response) {
+      if (!response.ok) throw new Error(`Listing filter request failed with HTTP ${response.status}`);
+      return response.json();
+    }).catch(function (error) {
+      console.error("Failed to filter listings on the server", error);
+      return null;
+    });
+  }
+
+  /**
+   * Start a server filter request that later client-side results supersede.
+   * @param {ListingPage} page Listing mode being filtered.
+   * @param {"preview" | "apply"} kind Which callback issued the request.
+   * @param {FilterState} state Filter values to apply.
+   * @param {"ids" | "features"} format Result shape to request.
+   * @returns {Promise<Object | null>} Response body, or null when it failed or went stale.
+   */
+  function requestServerFilter(page, kind, state, format) {
+    const key = `${page}:${kind}`;
+    const token = (ui.serverFilterRequests[key] || 0) + 1;
+    ui.serverFilterRequests[key] = token;
+    return fetchServerFilter(page, state, format).then(function (body) {
+      return ui.serverFilterRequests[key] === token ? body : null;
+    });
+  }
+
+  /**
+   * Invalidate pending server filter requests of one kind.
+   * @param {ListingPage} page Listing mode being filtered.
+   * @param {"preview" | "apply"} kind Which callback issued the requests.
+   * @returns {void}
+   */
+  function supersedeServerFilter(page, kind) {
+    const key = `${page}:${kind}`;
+    ui.serverFilterRequests[key] = (ui.serverFilterRequests[key] || 0) + 1;
+  }
+
   /**
    * Calculate and store the result count for uncommitted filter values.
+   * Until the full listings load, the server counts the matches instead.
    * @param {ListingPage} page Listing mode being previewed.
    * @param {FilterState} state Draft filter values.
    * @param {FeatureCollection} fullGeojson Unfiltered listing features.
-   * @returns {{count: number | null, updatedAt?: number}} Preview metadata.
+   * @returns {{count: number | null, updatedAt?: number} | Promise<Object>} Preview metadata.
    */
   function preview(page, state, fullGeojson) {
     const result = filterState(page, state, fullGeojson);
-    if (!result) return { count: null };
+    if (!result) {
+      if (!state || fullGeojson) return { count: null };
+      return requestServerFilter(page, "preview", state, "ids").then(function (body) {
+        if (!body) return window.dash_clientside.no_update;
+        ui.previewCounts[page] = body.count;
+        scheduleRender(page);
+        return { count: body.count, updatedAt: Date.now() };
+      });
+    }
+    supersedeServerFilter(page, "preview");
     const count = result.features.length;
     ui.previewCounts[page] = count;
     scheduleRender(page);
@@ -359,15 +421,36 @@
 
   /**
    * Apply committed filter values and update result-count analytics.
+   * Filters committed before the full listings load are applied by the
+   * server, and the client-side result replaces them once the listings arrive.
    * @param {ListingPage} page Listing mode being filtered.
    * @param {FilterState} state Committed filter values.
    * @param {FeatureCollection} fullGeojson Unfiltered listing features.
-   * @returns {FeatureCollection | *} Filtered features or Dash's no-update value.
+   * @returns {FeatureCollection | Promise<FeatureCollection> | *} Filtered features or Dash's no-update value.
    */
   function apply(page, state, fullGeojson) {
     const result = filterState(page, state, fullGeojson);
-    if (!result) return window.dash_clientside.no_update;
+    if (!result) {
+      if (!state || fullGeojson || equal(state, ui.defaults[page])) {
+        return window.dash_clientside.no_update;
+      }
+      return requestServerFilter(page, "apply", state, "features").then(function (body) {
+        if (!body) return window.dash_clientside.no_update;
+        return commit(page, state, { type: "FeatureCollection", features: body.features });
+      });
+    }
+    supersedeServerFilter(page, "apply");
+    return commit(page, state, result);
+  }
 
+  /**
+   * Record an applied result and report it to analytics.
+   * @param {ListingPage} page Listing mode being filtered.
+   * @param {FilterState} state Committed filter values.
+   * @param {FeatureCollection} result Listings matching the filters.
+   * @returns {FeatureCollection} The result, for the map layer.
+   */
+  function commit(page, state, result) {
     const count = result.features.length;
     ui.applied[page] = clone(state);
     ui.appliedCounts[page] = count;
@@ -1124,7 +1207,7 @@
        * Preview the number of rentals matching draft values.
        * @param {FilterState} state Draft rental filters.
        * @param {FeatureCollection} fullGeojson Source rental listings.
-       * @returns {{count: number | null, updatedAt?: number}} Preview metadata.
+       * @returns {{count: number | null, updatedAt?: number} | Promise<Object>} Preview metadata.
        */
       previewLeaseFilterState: function (state, fullGeojson) {
         return preview("lease", state, fullGeojson);
@@ -1133,7 +1216,7 @@
        * Preview the number of homes matching draft values.
        * @param {FilterState} state Draft for-sale filters.
        * @param {FeatureCollection} fullGeojson Source for-sale listings.
-       * @returns {{count: number | null, updatedAt?: number}} Preview metadata.
+       * @returns {{count: number | null, updatedAt?: number} | Promise<Object>} Preview metadata.
        */
       previewBuyFilterState: function (state, fullGeojson) {
         return preview("buy", state, fullGeojson);
@@ -1142,7 +1225,7 @@
        * Apply committed rental filters to the map data.
        * @param {FilterState} state Applied rental filters.
        * @param {FeatureCollection} fullGeojson Source rental listings.
-       * @returns {FeatureCollection | *} Filtered data or Dash's no-update value.
+       * @returns {FeatureCollection | Promise<FeatureCollection> | *} Filtered data or Dash's no-update value.
        */
       applyLeaseFilterState: function (state, fullGeojson) {
         return apply("lease", state, fullGeojson);
@@ -1151,7 +1234,7 @@
        * Apply committed for-sale filters to the map data.
        * @param {FilterState} state Applied for-sale filters.
        * @param {FeatureCollection} fullGeojson Source for-sale listings.
-       * @returns {FeatureCollection | *} Filtered data or Dash's no-update value.
+       * @returns {FeatureCollection | Promise<FeatureCollection> | *} Filtered data or Dash's no-update value.
        */
       applyBuyFilterState: function (state, fullGeojson) {
         return apply("buy", state, fullGeojson);
@@ -2,7 +2,7 @@
 // Popup-driven ISP availability loader for Dash Leaflet popups.
 // This is what's responsible for the "ISP Options" row in the popup.
 // Uses same-origin + Dash requests_pathname_prefix (works with VS Code port forwarding)
-// Exposes window.larentals.isp.{renderIspOptionsPlaceholderHtml, hydrateIspOptionsInPopup, renderIspOptionsHtml}
+// Exposes window.larentals.isp.{renderIspOptionsPlaceholderHtml, hydrateIspOptionsInPopup, renderIspOptionsHtml, primeIspOptions}
 
 (function () {
   "use strict";
@@ -187,6 +187,23 @@
     return p;
   }
 
+  /**
+   * Seed the ISP cache with options already delivered by the batch listing-detail route.
+   *
+   * @param {unknown} listingIdRaw Listing id the options belong to.
+   * @param {unknown} rawOptions Provider option rows for the listing.
+   * @returns {void} Does not return a value; populates the shared fetch cache.
+   */
+  function primeIspOptions(listingIdRaw, rawOptions) {
+    const listingId = normalizeNullableString(listingIdRaw);
+    if (!listingId || !Array.isArray(rawOptions)) return;
+
+    const cacheKey = `${getIspApiBasePath()}::${listingId}`;
+    if (ispFetchCache.has(cacheKey)) return;
+
+    ispFetchCache.set(cacheKey, Promise.resolve(coerceIspOptions(rawOptions)));
+  }
+
   /**
    * Format Mbps into a human-friendly string.
    *
@@ -509,5 +526,6 @@
     renderIspOptionsPlaceholderHtml,
     hydrateIspOptionsInPopup,
     renderIspOptionsHtml,
+    primeIspOptions,
   };
 })();
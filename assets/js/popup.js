@@ -24,6 +24,21 @@
     /** @type {Map<string, Promise<Record<string, unknown>>>} */
     const listingDetailFetchCache = new Map();
 
+    /**
+     * Upper bound for one prefetch burst. Expanding a cluster reveals a handful
+     * of markers; larger bursts are full map redraws and are not prefetched.
+     */
+    const LISTING_DETAIL_PREFETCH_MAX_IDS = 50;
+
+    /** Delay used to collect the markers created by one cluster expansion. */
+    const LISTING_DETAIL_PREFETCH_DELAY_MS = 150;
+
+    /** @type {Set<string>} */
+    const pendingPrefetchListingIds = new Set();
+
+    /** @type {ReturnType<typeof setTimeout>|null} */
+    let listingDetailPrefetchTimer = null;
+
     document.addEventListener("click", function trackListingLinkClick(event) {
         const target = event.target;
         const link = target && typeof target.closest === "function"
@@ -386,6 +401,78 @@
         return p;
     }
 
+    /**
+     * Fetch details for several listings in one request and seed the per-listing caches.
+     *
+     * Each listing gets its own cached promise so a popup opened while the batch
+     * is in flight reuses it. ISP options from the batch response are handed to
+     * `isp.js` so the popup does not make a second request for them. If the
+     * batch request fails, popups fall back to the single-listing route.
+     *
+     * @param {Array<string>} listingIds Listing identifiers to prefetch.
+     * @returns {void}
+     */
+    function prefetchListingDetails(listingIds) {
+        const base = getListingDetailApiBasePath();
+        const ids = Array.from(new Set(listingIds.map(normalizeListingId))).filter(
+            (id) => id && !listingDetailFetchCache.has(`${base}::${id}`),
+        );
+        if (!ids.length) return;
+
+        const batch = fetch(buildSameOriginDashUrl(`${base}batch`), {
+            method: "POST",
+            headers: { Accept: "application/json", "Content-Type": "application/json" },
+            credentials: "same-origin",
+            body: JSON.stringify({ ids }),
+        }).then((res) => {
+            if (!res.ok) throw new Error(`Listing detail batch fetch failed (${res.status})`);
+            return res.json();
+        });
+
+        ids.forEach((id) => {
+            const cacheKey = `${base}::${id}`;
+            const p = batch.then(
+                (body) => {
+                    const detail = body?.listings?.[id];
+                    if (!detail) {
+                        listingDetailFetchCache.delete(cacheKey);
+                        throw new Error(`Listing not found: ${id}`);
+                    }
+                    window.larentals?.isp?.primeIspOptions?.(detail.mls_number ?? id, detail.isp_options);
+                    return detail;
+                },
+                () => {
+                    listingDetailFetchCache.delete(cacheKey);
+                    return fetchListingDetails(id);
+                },
+            );
+            // Avoid unhandled rejections for listings whose popup is never opened.
+            p.catch(() => {});
+            listingDetailFetchCache.set(cacheKey, p);
+        });
+    }
+
+    /**
+     * Queue a newly rendered listing marker for a batched detail prefetch.
+     *
+     * @param {string} listingId Listing identifier of the rendered marker.
+     * @returns {void}
+     */
+    function queueListingDetailPrefetch(listingId) {
+        if (!listingId) return;
+        pendingPrefetchListingIds.add(listingId);
+
+        if (listingDetailPrefetchTimer !== null) return;
+        listingDetailPrefetchTimer = setTimeout(() => {
+            listingDetailPrefetchTimer = null;
+            const ids = Array.from(pendingPrefetchListingIds);
+            pendingPrefetchListingIds.clear();
+            if (ids.length <= LISTING_DETAIL_PREFETCH_MAX_IDS) {
+                prefetchListingDetails(ids);
+            }
+        }, LISTING_DETAIL_PREFETCH_DELAY_MS);
+    }
+
     /**
      * Render the popup title block, linking the address when a listing URL exists.
      *
@@ -802,6 +889,7 @@
                 let openRequestSeq = 0;
 
                 layer.bindPopup(renderPopupLoadingContent(summaryData), buildPopupOptions(layer));
+                queueListingDetailPrefetch(listingId);
 
                 layer.on("popupopen", function handlePopupOpen() {
                     openRequestSeq += 1;
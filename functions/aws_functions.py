@@ -1,8 +1,10 @@
+from functions.lazy_imports import lazy_import
 from loguru import logger
 from typing import Dict
-import boto3
 import sys
 
+boto3 = lazy_import("boto3")
+
 logger.add(sys.stderr, format="{time} {level} {message}", filter="my_module", level="INFO")
 
 def load_ssm_parameters(
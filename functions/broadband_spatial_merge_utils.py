@@ -6,10 +6,16 @@ import geopandas as gpd
 import pandas as pd
 import sqlite3
 
+from functions.listing_data_version import bump_listing_data_version
+from functions.provider_classification import PROVIDER_BUCKET_SQL, PROVIDER_SERVICE_TYPE_SQL
+
 ListingTable = Literal["lease", "buy"]
 JoinHow = Literal["left", "inner"]
 Predicate = Literal["intersects", "within", "contains"]
 
+PROVIDER_CLASSIFICATION_SOURCE_COLUMNS = frozenset({"TechCode", "MaxAdDn", "Service_Type"})
+PROVIDER_SPEED_COLUMNS = frozenset({"MaxAdDn", "MaxAdUp"})
+
 @dataclass(frozen=True)
 class ProviderJoinConfig:
     """
@@ -20,6 +26,8 @@ class ProviderJoinConfig:
     geopackage_path: str
     geopackage_layer: str
     output_table: str = "listing_provider_options"
+    # Per-listing best speeds; defaults to "<listing_table>_provider_summary".
+    summary_table: Optional[str] = None
     listing_id_col: str = "mls_number"
     lat_col: str = "latitude"
     lon_col: str = "longitude"
@@ -176,12 +184,80 @@ def write_provider_options_from_geopackage(cfg: ProviderJoinConfig) -> int:
             index=False,
             dtype={col: provider_sql_types[col] for col in out_df.columns if col in provider_sql_types},
         )
+        if PROVIDER_CLASSIFICATION_SOURCE_COLUMNS.issubset(out_df.columns):
+            add_provider_classification_columns(conn, cfg.output_table)
+        # Covers the popup's per-listing "fastest first" lookup.
+        index_columns = "listing_id, MaxAdDn DESC" if "MaxAdDn" in out_df.columns else "listing_id"
         conn.execute(
             f"CREATE INDEX IF NOT EXISTS idx_{cfg.output_table}_listing_id "
-            f"ON {cfg.output_table}(listing_id)"
+            f"ON {cfg.output_table}({index_columns})"
         )
+        if PROVIDER_SPEED_COLUMNS.issubset(out_df.columns):
+            summary_table = cfg.summary_table or f"{cfg.listing_table}_provider_summary"
+            summary_rows = write_provider_summary_table(conn, cfg.output_table, summary_table)
+            logger.debug(f"Wrote {summary_rows:,} listing speed summaries to '{summary_table}'")
+        bump_listing_data_version(conn)
         conn.commit()
     finally:
         conn.close()
 
     return int(out_df.shape[0])
+
+
+def add_provider_classification_columns(conn: sqlite3.Connection, options_table: str) -> None:
+    """Store each provider row's popup service type and speed bucket.
+
+    Adds ``service_type_label`` and ``bucket`` columns (``Service_Type`` already
+    exists, and SQLite column names are case-insensitive) so popup queries read
+    the classification instead of evaluating it per request.
+
+    Args:
+        conn: Open SQLite connection.
+        options_table: Provider-options table written by the merge.
+
+    Returns:
+        None.
+    """
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({options_table})")}
+    for column in ("service_type_label", "bucket"):
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {options_table} ADD COLUMN {column} TEXT")
+    conn.execute(
+        f"""
+        UPDATE {options_table}
+        SET service_type_label = {PROVIDER_SERVICE_TYPE_SQL},
+            bucket = {PROVIDER_BUCKET_SQL}
+        """
+    )
+
+
+def write_provider_summary_table(conn: sqlite3.Connection, options_table: str, summary_table: str) -> int:
+    """Materialize the best download/upload speed per listing.
+
+    Args:
+        conn: Open SQLite connection.
+        options_table: Provider-options table written by the merge.
+        summary_table: Destination table, replaced if it exists.
+
+    Returns:
+        Number of listings summarized.
+    """
+    conn.execute(f"DROP TABLE IF EXISTS {summary_table}")
+    conn.execute(
+        f"""
+        CREATE TABLE {summary_table} (
+          listing_id TEXT PRIMARY KEY,
+          best_dn REAL,
+          best_up REAL
+        )
+        """
+    )
+    conn.execute(
+        f"""
+        INSERT INTO {summary_table} (listing_id, best_dn, best_up)
+        SELECT listing_id, MAX(MaxAdDn), MAX(MaxAdUp)
+        FROM {options_table}
+        GROUP BY listing_id
+        """
+    )
+    return int(conn.execute(f"SELECT COUNT(*) FROM {summary_table}").fetchone()[0])
@@ -0,0 +1,391 @@
+"""Memory-mappable column files for read-only lookup indexes.
+
+The LAHD and RSO lookups are gzipped JSON artifacts that every worker used to
+decompress, parse and re-index at startup. A column file holds an index's
+prebuilt NumPy arrays in one flat file instead:
+
+- an 8-byte magic, an 8-byte little-endian header length and a JSON header
+  with the dtype, shape and offset of every array plus scalar attributes;
+- the raw array bytes, each aligned to 64 bytes.
+
+Opening a column file maps it read-only and wraps each array with
+``np.frombuffer`` -- no parsing proportional to the record count, and the
+pages are shared by every worker through the OS page cache.
+
+Text columns are stored as UTF-8 bytes plus offsets (:class:`StringColumn`),
+and exact-match key indexes as sorted fixed-width byte keys with their rows
+(:class:`KeyIndex`), so both work the same whether built in memory or mapped.
+
+A column file records the digest of the artifact it was built from; callers
+only use it while that artifact is unchanged.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator, Mapping, Sequence
+import hashlib
+import mmap
+import os
+
+from loguru import logger
+import numpy as np
+import orjson
+
+from functions.shared_cache import atomic_write_bytes
+
+COLUMN_FILE_MAGIC = b"WTLACOL1"
+COLUMN_FILE_ALIGNMENT = 64
+COLUMN_FILE_SUFFIX = ".columns"
+_HEADER_LENGTH_BYTES = 8
+
+
+def column_file_path(artifact_path: Path) -> Path:
+    """Return the column-file sibling of a lookup artifact.
+
+    Args:
+        artifact_path: Source artifact, such as ``lahd_property_lookup.json.gz``.
+
+    Returns:
+        The column-file path, such as ``lahd_property_lookup.columns``.
+    """
+    name = artifact_path.name
+    for suffix in (".gz", ".json"):
+        name = name.removesuffix(suffix)
+    return artifact_path.with_name(f"{name}{COLUMN_FILE_SUFFIX}")
+
+
+def artifact_digest(path: Path) -> str:
+    """Return a content digest identifying one version of a source artifact.
+
+    Content rather than modification time is used because the artifacts are
+    checked out and copied into images, which does not preserve mtimes.
+
+    Args:
+        path: Source artifact.
+
+    Returns:
+        A hex BLAKE2b digest of the file contents.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    with path.open("rb") as source_file:
+        return hashlib.file_digest(source_file, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+
+
+@lru_cache(maxsize=16)
+def _cached_artifact_digest(path: str, mtime_ns: int, size: int) -> str:
+    """Hash one version of an artifact once per process.
+
+    Args:
+        path: Source artifact path.
+        mtime_ns: Modification time included in the cache key.
+        size: File size included in the cache key.
+
+    Returns:
+        The artifact digest.
+    """
+    return artifact_digest(Path(path))
+
+
+def current_artifact_digest(path: Path) -> str | None:
+    """Return the digest of an artifact, hashing it again only after it changes.
+
+    Args:
+        path: Source artifact.
+
+    Returns:
+        The artifact digest, or ``None`` when the file is missing or unreadable.
+    """
+    try:
+        stat = path.stat()
+        return _cached_artifact_digest(str(path), stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
+
+@dataclass(frozen=True)
+class StringColumn:
+    """Optional strings stored as one UTF-8 buffer plus row offsets.
+
+    Empty strings and ``None`` are both stored as empty and read back as
+    ``None``.
+
+    Attributes:
+        offsets: ``len + 1`` byte offsets into ``data``.
+        data: Concatenated UTF-8 bytes.
+    """
+
+    offsets: np.ndarray = field(repr=False)
+    data: np.ndarray = field(repr=False)
+
+    @classmethod
+    def from_values(cls, values: Sequence[Any]) -> StringColumn:
+        """Encode a sequence of optional strings.
+
+        Args:
+            values: Strings, or ``None``/non-strings for missing values.
+
+        Returns:
+            The encoded column.
+        """
+        encoded = [value.encode("utf-8") if isinstance(value, str) else b"" for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+        return cls(offsets=offsets, data=np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+    def __len__(self) -> int:
+        """Return the number of rows.
+
+        Returns:
+            The row count.
+        """
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> str | None:
+        """Decode one row.
+
+        Args:
+            row: Row position.
+
+        Returns:
+            The string, or ``None`` when it is empty.
+        """
+        start, stop = int(self.offsets[row]), int(self.offsets[row + 1])
+        return self.data[start:stop].tobytes().decode("utf-8") if stop > start else None
+
+    def arrays(self, name: str) -> dict[str, np.ndarray]:
+        """Return the column's arrays for a column file.
+
+        Args:
+            name: Column name used as the array-name prefix.
+
+        Returns:
+            Array name to array.
+        """
+        return {f"{name}.offsets": self.offsets, f"{name}.data": self.data}
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray], name: str) -> StringColumn:
+        """Rebuild a column from column-file arrays.
+
+        Args:
+            arrays: Arrays read from a column file.
+            name: Column name used as the array-name prefix.
+
+        Returns:
+            The string column.
+        """
+        return cls(offsets=arrays[f"{name}.offsets"], data=arrays[f"{name}.data"])
+
+
+@dataclass(frozen=True)
+class KeyIndex:
+    """Exact-match index from ASCII keys to row positions.
+
+    Attributes:
+        keys: Sorted, unique, fixed-width byte keys.
+        rows: Row position for each key.
+    """
+
+    keys: np.ndarray = field(repr=False)
+    rows: np.ndarray = field(repr=False)
+
+    @classmethod
+    def from_mapping(cls, mapping: Mapping[str, int]) -> KeyIndex:
+        """Build the index from a ``key -> row`` mapping.
+
+        Args:
+            mapping: Keys (ASCII after normalization) and their rows.
+
+        Returns:
+            The sorted key index.
+        """
+        if not mapping:
+            return cls(keys=np.empty(0, dtype="S1"), rows=np.empty(0, dtype=np.int64))
+        keys = np.array([key.encode("ascii", "replace") for key in mapping], dtype=np.bytes_)
+        rows = np.fromiter(mapping.values(), dtype=np.int64, count=len(mapping))
+        order = np.argsort(keys, kind="stable")
+        return cls(keys=keys[order], rows=rows[order])
+
+    def __len__(self) -> int:
+        """Return the number of keys.
+
+        Returns:
+            The key count.
+        """
+        return len(self.keys)
+
+    def get(self, key: str) -> int | None:
+        """Return the row for ``key``.
+
+        Args:
+            key: Normalized key.
+
+        Returns:
+            The row position, or ``None`` when the key is absent.
+        """
+        if not key or not len(self.keys):
+            return None
+        try:
+            encoded = key.encode("ascii")
+        except UnicodeEncodeError:
+            return None
+        if len(encoded) > self.keys.dtype.itemsize:
+            return None
+        position = int(np.searchsorted(self.keys, encoded))
+        if position < len(self.keys) and self.keys[position] == encoded:
+            return int(self.rows[position])
+        return None
+
+    def items(self) -> Iterator[tuple[str, int]]:
+        """Iterate over ``(key, row)`` pairs in key order.
+
+        Yields:
+            Each decoded key and its row.
+        """
+        for key, row in zip(self.keys.tolist(), self.rows.tolist()):
+            yield key.decode("ascii"), row
+
+    def arrays(self, name: str) -> dict[str, np.ndarray]:
+        """Return the index's arrays for a column file.
+
+        Args:
+            name: Index name used as the array-name prefix.
+
+        Returns:
+            Array name to array.
+        """
+        return {f"{name}.keys": self.keys, f"{name}.rows": self.rows}
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray], name: str) -> KeyIndex:
+        """Rebuild an index from column-file arrays.
+
+        Args:
+            arrays: Arrays read from a column file.
+            name: Index name used as the array-name prefix.
+
+        Returns:
+            The key index.
+        """
+        return cls(keys=arrays[f"{name}.keys"], rows=arrays[f"{name}.rows"])
+
+
+@dataclass(frozen=True)
+class ColumnFile:
+    """Arrays and attributes read from a column file.
+
+    Attributes:
+        kind: Index kind the file was written for.
+        attributes: Scalar attributes stored in the header.
+        arrays: Array name to read-only array (views of the mapping when mapped).
+    """
+
+    kind: str
+    attributes: dict[str, Any]
+    arrays: dict[str, np.ndarray] = field(repr=False)
+
+
+def _aligned(offset: int) -> int:
+    """Round an offset up to the column-file alignment.
+
+    Args:
+        offset: Byte offset.
+
+    Returns:
+        The next aligned offset.
+    """
+    return -(-offset // COLUMN_FILE_ALIGNMENT) * COLUMN_FILE_ALIGNMENT
+
+
+def write_column_file(
+    path: Path,
+    *,
+    kind: str,
+    arrays: Mapping[str, np.ndarray],
+    attributes: Mapping[str, Any],
+) -> Path:
+    """Write arrays and attributes to a column file atomically.
+
+    Args:
+        path: Destination path.
+        kind: Index kind, checked again on open.
+        arrays: Array name to array; every array is stored little-endian.
+        attributes: JSON-serializable scalar attributes.
+
+    Returns:
+        The written path.
+    """
+    layout: dict[str, dict[str, Any]] = {}
+    payloads: list[tuple[int, bytes]] = []
+    offset = 0
+    for name, array in arrays.items():
+        contiguous = np.ascontiguousarray(array)
+        if contiguous.dtype.byteorder == ">":
+            contiguous = contiguous.astype(contiguous.dtype.newbyteorder("<"))
+        offset = _aligned(offset)
+        layout[name] = {"dtype": contiguous.dtype.str, "shape": list(contiguous.shape), "offset": offset}
+        payloads.append((offset, contiguous.tobytes()))
+        offset += contiguous.nbytes
+
+    header = orjson.dumps({"kind": kind, "attributes": dict(attributes), "arrays": layout})
+    data_start = _aligned(len(COLUMN_FILE_MAGIC) + _HEADER_LENGTH_BYTES + len(header))
+    body = bytearray(data_start + offset)
+    body[: len(COLUMN_FILE_MAGIC)] = COLUMN_FILE_MAGIC
+    body[len(COLUMN_FILE_MAGIC) : len(COLUMN_FILE_MAGIC) + _HEADER_LENGTH_BYTES] = len(header).to_bytes(
+        _HEADER_LENGTH_BYTES, "little"
+    )
+    body[len(COLUMN_FILE_MAGIC) + _HEADER_LENGTH_BYTES : len(COLUMN_FILE_MAGIC) + _HEADER_LENGTH_BYTES + len(header)] = header
+    for array_offset, payload in payloads:
+        body[data_start + array_offset : data_start + array_offset + len(payload)] = payload
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_bytes(path, bytes(body))
+    return path
+
+
+def open_column_file(path: Path, *, kind: str) -> ColumnFile | None:
+    """Memory-map a column file read-only.
+
+    Args:
+        path: Column file to open.
+        kind: Expected index kind.
+
+    Returns:
+        The mapped arrays and attributes, or ``None`` when the file is
+        missing, of another kind or malformed.
+    """
+    try:
+        with path.open("rb") as column_file:
+            if os.fstat(column_file.fileno()).st_size == 0:
+                return None
+            mapped = mmap.mmap(column_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except OSError:
+        return None
+
+    try:
+        header_start = len(COLUMN_FILE_MAGIC) + _HEADER_LENGTH_BYTES
+        if mapped[: len(COLUMN_FILE_MAGIC)] != COLUMN_FILE_MAGIC:
+            raise ValueError("bad magic")
+        header_length = int.from_bytes(mapped[len(COLUMN_FILE_MAGIC) : header_start], "little")
+        header = orjson.loads(mapped[header_start : header_start + header_length])
+        if header.get("kind") != kind:
+            return None
+        data_start = _aligned(header_start + header_length)
+        arrays: dict[str, np.ndarray] = {}
+        for name, spec in header["arrays"].items():
+            dtype = np.dtype(spec["dtype"])
+            shape = tuple(int(size) for size in spec["shape"])
+            count = int(np.prod(shape, dtype=np.int64))
+            offset = data_start + int(spec["offset"])
+            if offset + count * dtype.itemsize > len(mapped):
+                raise ValueError(f"array {name} runs past the end of the file")
+            arrays[name] = np.frombuffer(mapped, dtype=dtype, count=count, offset=offset).reshape(shape)
+    except (ValueError, KeyError, TypeError, orjson.JSONDecodeError) as exc:
+        logger.warning(f"Ignoring malformed column file {path}: {exc}")
+        return None
+    return ColumnFile(kind=kind, attributes=dict(header.get("attributes") or {}), arrays=arrays)
@@ -0,0 +1,187 @@
+"""Compact encoding for point overlay layers.
+
+Overlay GeoJSON repeats every property key and full-precision coordinates
+for each feature, and most layers carry source columns no popup ever reads.
+The compact form keeps only the properties a layer's popup and marker
+templates use and stores them column by column, so each key is written once:
+
+- coordinates are quantized to ``precision`` decimal places and delta-encoded
+  as integers in one flat ``[lon, lat, lon, lat, ...]`` array;
+- a string column with many repeats is stored as a ``dictionary`` of distinct
+  values plus one integer code per feature (``null`` stays ``null``);
+- other columns are stored as a plain ``values`` list.
+
+Non-feature members of the collection (``metadata``, ``name``, ...) are kept
+as-is. :func:`decode_compact_layer` and the browser decoder in
+``assets/js/clientside_callbacks/compact_layers.js`` expand the payload back
+into an ordinary FeatureCollection.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, TypeAlias
+
+GeoJsonDict: TypeAlias = dict[str, Any]
+
+COMPACT_LAYER_TYPE = "CompactFeatureCollection"
+COMPACT_LAYER_FORMAT_VERSION = 1
+# Five decimal places of a degree is about 1.1 m, finer than any marker needs.
+DEFAULT_COMPACT_PRECISION = 5
+# Dictionary-encode a string column when at most this share of its values is distinct.
+DICTIONARY_MAX_DISTINCT_RATIO = 0.5
+
+
+@dataclass(frozen=True)
+class CompactLayerSpec:
+    """Which properties a point layer ships, and at what coordinate precision.
+
+    Attributes:
+        properties: Property keys read by the layer's popup and marker templates.
+        precision: Decimal places kept for longitude and latitude.
+    """
+
+    properties: tuple[str, ...]
+    precision: int = DEFAULT_COMPACT_PRECISION
+
+
+def is_compact_layer(payload: Any) -> bool:
+    """Report whether a payload uses the compact layer encoding.
+
+    Args:
+        payload: Decoded layer payload.
+
+    Returns:
+        ``True`` for a compact payload, ``False`` for GeoJSON or anything else.
+    """
+    return isinstance(payload, dict) and payload.get("type") == COMPACT_LAYER_TYPE
+
+
+def project_layer_properties(geojson_data: GeoJsonDict, properties: tuple[str, ...]) -> GeoJsonDict:
+    """Drop every feature property a layer's templates do not read.
+
+    Args:
+        geojson_data: GeoJSON FeatureCollection.
+        properties: Property keys to keep.
+
+    Returns:
+        A new FeatureCollection whose features carry only ``properties``.
+    """
+    features = [
+        {
+            **feature,
+            "properties": {
+                key: value for key, value in (feature.get("properties") or {}).items() if key in properties
+            },
+        }
+        for feature in geojson_data.get("features", [])
+    ]
+    return {**geojson_data, "features": features}
+
+
+def _encode_column(values: list[Any]) -> dict[str, list[Any]]:
+    """Encode one property column, dictionary-coding repeated strings.
+
+    Args:
+        values: Column values in feature order; ``None`` marks a missing value.
+
+    Returns:
+        ``{"dictionary": [...], "codes": [...]}`` or ``{"values": [...]}``.
+    """
+    present = [value for value in values if value is not None]
+    if present and all(isinstance(value, str) for value in present):
+        distinct = list(dict.fromkeys(present))
+        if len(distinct) <= len(present) * DICTIONARY_MAX_DISTINCT_RATIO:
+            codes = {value: code for code, value in enumerate(distinct)}
+            return {"dictionary": distinct, "codes": [None if value is None else codes[value] for value in values]}
+    return {"values": values}
+
+
+def encode_compact_layer(geojson_data: GeoJsonDict, spec: CompactLayerSpec) -> GeoJsonDict:
+    """Encode a point FeatureCollection in the compact layer format.
+
+    Args:
+        geojson_data: GeoJSON FeatureCollection of Point features.
+        spec: Properties to keep and coordinate precision.
+
+    Returns:
+        The compact payload.
+
+    Raises:
+        ValueError: If a feature is not a Point with two coordinates.
+    """
+    features = geojson_data.get("features") or []
+    scale = 10**spec.precision
+    coordinates: list[int] = []
+    previous_lon = previous_lat = 0
+    for index, feature in enumerate(features):
+        geometry = feature.get("geometry") or {}
+        point = geometry.get("coordinates")
+        if geometry.get("type") != "Point" or not isinstance(point, (list, tuple)) or len(point) < 2:
+            raise ValueError(f"Compact layers only hold Point features; feature {index} is {geometry.get('type')!r}.")
+        lon, lat = round(float(point[0]) * scale), round(float(point[1]) * scale)
+        coordinates.extend((lon - previous_lon, lat - previous_lat))
+        previous_lon, previous_lat = lon, lat
+
+    rows = [feature.get("properties") or {} for feature in features]
+    columns: dict[str, dict[str, list[Any]]] = {}
+    for key in spec.properties:
+        values = [row.get(key) for row in rows]
+        if any(value is not None for value in values):
+            columns[key] = _encode_column(values)
+
+    members = {key: value for key, value in geojson_data.items() if key not in {"type", "features"}}
+    return {
+        **members,
+        "type": COMPACT_LAYER_TYPE,
+        "format": COMPACT_LAYER_FORMAT_VERSION,
+        "precision": spec.precision,
+        "count": len(features),
+        "coordinates": coordinates,
+        "properties": columns,
+    }
+
+
+def decode_compact_layer(payload: GeoJsonDict) -> GeoJsonDict:
+    """Expand a compact layer payload back into a GeoJSON FeatureCollection.
+
+    Args:
+        payload: Compact payload produced by :func:`encode_compact_layer`.
+
+    Returns:
+        The FeatureCollection with quantized coordinates and the kept properties.
+
+    Raises:
+        ValueError: If the payload is not a supported compact layer.
+    """
+    if not is_compact_layer(payload) or payload.get("format") != COMPACT_LAYER_FORMAT_VERSION:
+        raise ValueError("Payload is not a supported compact layer.")
+
+    precision = int(payload["precision"])
+    scale = 10**precision
+    count = int(payload["count"])
+    columns: dict[str, list[Any]] = {}
+    for key, column in payload["properties"].items():
+        if "dictionary" in column:
+            dictionary = column["dictionary"]
+            columns[key] = [None if code is None else dictionary[code] for code in column["codes"]]
+        else:
+            columns[key] = column["values"]
+
+    deltas = payload["coordinates"]
+    features: list[GeoJsonDict] = []
+    lon = lat = 0
+    for index in range(count):
+        lon += deltas[2 * index]
+        lat += deltas[2 * index + 1]
+        features.append(
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [round(lon / scale, precision), round(lat / scale, precision)]},
+                "properties": {key: values[index] for key, values in columns.items()},
+            }
+        )
+
+    reserved = {"type", "format", "precision", "count", "coordinates", "properties"}
+    members = {key: value for key, value in payload.items() if key not in reserved}
+    return {**members, "type": "FeatureCollection", "features": features}
@@ -13,6 +13,10 @@ CACHE_DIR = DATA_DIR / "cache"
 CHECKPOINT_DIR = DATA_DIR / "checkpoints"
 
 LARENTALS_DB_PATH = RUNTIME_DIR / "larentals.db"
+LISTING_PAYLOAD_ARTIFACT_DIR = RUNTIME_DIR / "listing_payloads"
+WARM_START_SNAPSHOT_DIR = RUNTIME_DIR / "warm_start"
+LAYER_ARTIFACT_DIR = RUNTIME_DIR / "layer_artifacts"
+LAHD_RECORD_DETAIL_CACHE_PATH = RUNTIME_DIR / "lahd_record_details.sqlite3"
 
 BROADBAND_SOURCE_DIR = SOURCE_DIR / "broadband"
 EDUCATION_SOURCE_DIR = SOURCE_DIR / "education"
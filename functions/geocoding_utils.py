@@ -1,5 +1,6 @@
-from geopy.exc import GeocoderTimedOut, GeocoderServiceError
-from geopy.geocoders import GoogleV3, Nominatim
+from __future__ import annotations
+
+from functions.lazy_imports import lazy_import
 from functions.listing_pipeline_checkpoint import (
     ListingCheckpointStore,
     SUCCESS_STATUSES,
@@ -8,10 +9,16 @@ from functions.listing_pipeline_checkpoint import (
 )
 from functions.listing_report_utils import normalize_mls_number
 from loguru import logger
-from typing import Tuple, Optional
+from typing import TYPE_CHECKING, Tuple, Optional
 import pandas as pd
 import sys
 
+if TYPE_CHECKING:
+    from geopy.geocoders import GoogleV3
+
+geopy_exc = lazy_import("geopy.exc")
+geopy_geocoders = lazy_import("geopy.geocoders")
+
 # Initialize logging
 logger.add(sys.stderr, format="{time} {level} {message}", filter="my_module", level="INFO")
 
@@ -65,7 +72,7 @@ def return_coordinates(
     """
     if use_nominatim:
         try:
-            nomi = Nominatim(user_agent=nominatim_user_agent)
+            nomi = geopy_geocoders.Nominatim(user_agent=nominatim_user_agent)
             location = nomi.geocode(
                 {
                     "street": address,
@@ -79,7 +86,7 @@ def return_coordinates(
             if location:
                 return location.latitude, location.longitude
             logger.error(f"[{row_index}/{total_rows}] Nominatim: no result for '{address}'")
-        except (GeocoderTimedOut, GeocoderServiceError, Exception) as e:
+        except (geopy_exc.GeocoderTimedOut, geopy_exc.GeocoderServiceError, Exception) as e:
             logger.error(f"[{row_index}/{total_rows}] Nominatim error: {e}")
         return None, None
 
@@ -89,7 +96,7 @@ def return_coordinates(
         if loc:
             return loc.latitude, loc.longitude
         logger.warning(f"[{row_index}/{total_rows}] GoogleV3: no result for '{address}'")
-    except (GeocoderTimedOut, GeocoderServiceError, Exception) as e:
+    except (geopy_exc.GeocoderTimedOut, geopy_exc.GeocoderServiceError, Exception) as e:
         logger.warning(f"[{row_index}/{total_rows}] GoogleV3 error: {e}")
     return None, None
 
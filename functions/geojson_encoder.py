@@ -0,0 +1,208 @@
+"""Columnar GeoJSON encoder for listing and layer GeoDataFrames.
+
+``GeoDataFrame.to_json`` builds a Python dict per feature, serializes it with
+the standard-library encoder, and callers then parse the string back into
+dicts. This encoder instead walks each typed column once, turns it into a
+list of pre-encoded JSON fragments with orjson (deduplicating repeated
+strings), and stitches every feature together with a single bytes template.
+No per-feature dict is ever constructed.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Mapping, Sequence
+
+import geopandas as gpd
+import numpy as np
+import orjson
+import pandas as pd
+import shapely
+
+GEOJSON_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+_NULL = b"null"
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+
+
+def _json_default(value: Any) -> Any:
+    """Convert scalar types orjson cannot serialize natively.
+
+    Args:
+        value: Unsupported scalar encountered while encoding a column.
+
+    Returns:
+        A JSON-serializable replacement value.
+    """
+    if isinstance(value, pd.Timestamp):
+        return value.strftime(GEOJSON_DATETIME_FORMAT)
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return str(value)
+
+
+def _split_numeric_array(values: np.ndarray) -> list[bytes]:
+    """Encode a numeric or boolean array and split it into per-row fragments.
+
+    Numeric JSON tokens never contain commas, so splitting the encoded array
+    is safe and keeps the whole column in orjson's C loop.
+
+    Args:
+        values: One-dimensional integer, float, or boolean NumPy array.
+
+    Returns:
+        One JSON fragment per row; NaN values become ``null``.
+    """
+    if values.size == 0:
+        return []
+    return orjson.dumps(np.ascontiguousarray(values), option=_ORJSON_OPTIONS)[1:-1].split(b",")
+
+
+def _encode_object_values(values: pd.Series) -> list[bytes]:
+    """Encode an object/string column, encoding each distinct value only once.
+
+    Args:
+        values: Column containing strings, nullable scalars, or arbitrary objects.
+
+    Returns:
+        One JSON fragment per row; missing values become ``null``.
+    """
+    try:
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    except TypeError:
+        # Unhashable values such as lists cannot be deduplicated.
+        return [
+            _NULL if _is_missing_scalar(value) else orjson.dumps(value, default=_json_default, option=_ORJSON_OPTIONS)
+            for value in values.tolist()
+        ]
+
+    lookup = np.empty(len(uniques) + 1, dtype=object)
+    for index, value in enumerate(uniques.tolist() if hasattr(uniques, "tolist") else list(uniques)):
+        lookup[index] = orjson.dumps(value, default=_json_default, option=_ORJSON_OPTIONS)
+    lookup[-1] = _NULL
+    return lookup[codes].tolist()
+
+
+def _is_missing_scalar(value: Any) -> bool:
+    """Return whether a scalar should be emitted as JSON ``null``.
+
+    Args:
+        value: Candidate scalar value from an object column.
+
+    Returns:
+        ``True`` for ``None``, NaN, ``pd.NA``, and ``NaT``.
+    """
+    if value is None or value is pd.NA or value is pd.NaT:
+        return True
+    return isinstance(value, float) and value != value
+
+
+def encode_column_fragments(
+    series: pd.Series,
+    *,
+    decimals: int | None = None,
+    datetime_format: str = GEOJSON_DATETIME_FORMAT,
+) -> list[bytes]:
+    """Encode one DataFrame column into per-row JSON value fragments.
+
+    Args:
+        series: Column to encode.
+        decimals: Optional number of decimal places applied to float columns.
+        datetime_format: ``strftime`` format used for datetime-like columns.
+
+    Returns:
+        A list of JSON fragments aligned with the column's rows.
+    """
+    dtype = series.dtype
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        # Missing dates serialize as empty strings, matching the legacy payload.
+        return _encode_object_values(series.dt.strftime(datetime_format).fillna(""))
+
+    if isinstance(dtype, np.dtype) and dtype.kind in "biuf":
+        values = series.to_numpy()
+        if decimals is not None and dtype.kind == "f":
+            values = np.round(values, decimals)
+        return _split_numeric_array(values)
+
+    if decimals is not None and pd.api.types.is_float_dtype(dtype):
+        series = series.round(decimals)
+    return _encode_object_values(series)
+
+
+def encode_geometry_fragments(geometry: gpd.GeoSeries) -> list[bytes]:
+    """Encode a geometry column into per-row GeoJSON geometry fragments.
+
+    Point-only columns take a fast path that formats coordinates straight from
+    the coordinate arrays; other geometry types use shapely's vectorized
+    GeoJSON writer.
+
+    Args:
+        geometry: Geometry column of the GeoDataFrame being encoded.
+
+    Returns:
+        One GeoJSON geometry fragment (or ``null``) per row.
+    """
+    geometries = geometry.to_numpy()
+    if geometries.size == 0:
+        return []
+
+    missing = shapely.is_missing(geometries)
+    type_ids = shapely.get_type_id(geometries)
+    if bool(np.all(missing | (type_ids == shapely.GeometryType.POINT))):
+        x_fragments = _split_numeric_array(shapely.get_x(geometries))
+        y_fragments = _split_numeric_array(shapely.get_y(geometries))
+        return [
+            _NULL if is_missing else b'{"type":"Point","coordinates":[%b,%b]}' % (x, y)
+            for is_missing, x, y in zip(missing.tolist(), x_fragments, y_fragments)
+        ]
+
+    encoded = shapely.to_geojson(geometries)
+    return [
+        _NULL if value is None else value.encode("utf-8")
+        for value in encoded.tolist()
+    ]
+
+
+def encode_geojson_feature_collection(
+    gdf: pd.DataFrame,
+    *,
+    round_columns: Mapping[str, int] | None = None,
+    property_columns: Sequence[str] | None = None,
+) -> bytes:
+    """Encode a GeoDataFrame as GeoJSON FeatureCollection bytes in one pass.
+
+    Args:
+        gdf: GeoDataFrame (or DataFrame with a ``geometry`` column) to encode.
+        round_columns: Optional mapping of float column name to decimal places.
+        property_columns: Optional ordered subset of non-geometry columns to
+            emit as feature properties. Defaults to every non-geometry column.
+
+    Returns:
+        UTF-8 JSON bytes equivalent to ``gdf.to_json(drop_id=True)``.
+    """
+    geometry_name = gdf.geometry.name if isinstance(gdf, gpd.GeoDataFrame) else "geometry"
+    columns = [
+        column
+        for column in (property_columns if property_columns is not None else gdf.columns)
+        if column != geometry_name
+    ]
+    rounding = dict(round_columns or {})
+
+    fragments: list[list[bytes]] = [
+        encode_column_fragments(gdf[column], decimals=rounding.get(column))
+        for column in columns
+    ]
+    if geometry_name in gdf.columns:
+        fragments.append(encode_geometry_fragments(gdf[geometry_name]))
+    else:
+        fragments.append([_NULL] * len(gdf))
+
+    key_fragments = [
+        orjson.dumps(str(column)).replace(b"%", b"%%") + b":%b"
+        for column in columns
+    ]
+    template = (
+        b'{"type":"Feature","properties":{'
+        + b",".join(key_fragments)
+        + b'},"geometry":%b}'
+    )
+    features = [template % row for row in zip(*fragments)]
+    return b'{"type":"FeatureCollection","features":[' + b",".join(features) + b"]}"
@@ -0,0 +1,473 @@
+"""Zoom-aware, pre-aggregated heatmap grids for the parking and LAHD layers.
+
+The parking-ticket and LAHD heatmaps used to ship one anchor feature whose
+properties held every weighted heat point and every street-level marker, so
+the browser downloaded and re-weighted the full dataset even when zoomed out
+over the whole county. Leaflet.heat already sums points that fall in the same
+``radius / 2`` pixel cell before drawing, so summing them ahead of time in
+cells no larger than that changes nothing on screen.
+
+The builders therefore emit a multi-resolution grid: for each zoom band,
+heat points are summed into Web Mercator tile cells (keyed by quadkey) at a
+cell zoom where one cell is at most 8 px wide on screen, with the weighted
+centroid as the cell position. The heat route returns only the cells of the
+band for the requested zoom inside the requested bbox, plus the markers in
+view once the map is zoomed in far enough, so payload size and client work
+are bounded by the viewport rather than by the dataset.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping, Sequence
+import math
+import threading
+
+import numpy as np
+
+from functions.listing_spatial_index import BoundingBox
+from functions.marker_clusters import _project
+
+# Bump when the serialized grid layout changes; older grids are rebuilt from heat points.
+HEATMAP_GRID_FORMAT = 1
+HEATMAP_MAX_VIEWPORT_MARKERS = 1400
+HEATMAP_DEFAULT_MARKER_ZOOM_MIN = 15
+HEATMAP_DEFAULT_HEAT_ZOOM_MAX = 16
+HEATMAP_ANCHOR_POINT_PROPERTIES = ("heat_points", "marker_points", "heat_grid")
+
+
+@dataclass(frozen=True)
+class HeatmapGridBand:
+    """Range of map zooms served from one cell resolution.
+
+    Attributes:
+        min_zoom: Lowest map zoom served by the band.
+        max_zoom: Highest map zoom served by the band.
+        cell_zoom: Tile zoom whose tiles are the band's cells.
+    """
+
+    min_zoom: int
+    max_zoom: int
+    cell_zoom: int
+
+
+# A tile at ``cell_zoom`` spans 256 / 2 ** (cell_zoom - zoom) pixels at map zoom ``zoom``, so
+# ``cell_zoom = max_zoom + 5`` keeps cells at most 8 px wide throughout each band, below the
+# ``radius / 2`` (10-11 px) cells Leaflet.heat merges points into for both layers.
+HEATMAP_GRID_BANDS: tuple[HeatmapGridBand, ...] = (
+    HeatmapGridBand(min_zoom=0, max_zoom=10, cell_zoom=15),
+    HeatmapGridBand(min_zoom=11, max_zoom=12, cell_zoom=17),
+    HeatmapGridBand(min_zoom=13, max_zoom=14, cell_zoom=19),
+    HeatmapGridBand(min_zoom=15, max_zoom=15, cell_zoom=20),
+)
+
+
+def _quadkey_integers(tile_x: np.ndarray, tile_y: np.ndarray, zoom: int) -> np.ndarray:
+    """Interleave tile coordinates into base-4 quadkey integers.
+
+    Args:
+        tile_x: Tile columns at ``zoom``.
+        tile_y: Tile rows at ``zoom``.
+        zoom: Tile zoom (at most 31).
+
+    Returns:
+        Integers whose base-4 digits, most significant first, are the quadkey.
+    """
+    keys = np.zeros(tile_x.shape, dtype=np.int64)
+    for bit in range(zoom):
+        digit = ((tile_x >> bit) & 1) | (((tile_y >> bit) & 1) << 1)
+        keys |= digit << (2 * bit)
+    return keys
+
+
+def _tiles_from_quadkey_integers(keys: np.ndarray, zoom: int) -> tuple[np.ndarray, np.ndarray]:
+    """Invert ``_quadkey_integers``.
+
+    Args:
+        keys: Quadkey integers.
+        zoom: Tile zoom the keys were built at.
+
+    Returns:
+        Tile columns and rows.
+    """
+    tile_x = np.zeros(keys.shape, dtype=np.int64)
+    tile_y = np.zeros(keys.shape, dtype=np.int64)
+    for bit in range(zoom):
+        tile_x |= ((keys >> (2 * bit)) & 1) << bit
+        tile_y |= ((keys >> (2 * bit + 1)) & 1) << bit
+    return tile_x, tile_y
+
+
+def _tile_coordinates(
+    longitude: np.ndarray, latitude: np.ndarray, zoom: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the Web Mercator tile containing each coordinate.
+
+    Args:
+        longitude: Longitudes in degrees.
+        latitude: Latitudes in degrees.
+        zoom: Tile zoom.
+
+    Returns:
+        Tile columns and rows, clamped to the tile grid.
+    """
+    scale = 2**zoom
+    x, y = _project(longitude, latitude)
+    tile_x = np.clip(np.floor(x * scale), 0, scale - 1).astype(np.int64)
+    tile_y = np.clip(np.floor(y * scale), 0, scale - 1).astype(np.int64)
+    return tile_x, tile_y
+
+
+def _heat_point_array(heat_points: Sequence[Sequence[Any]] | None) -> np.ndarray:
+    """Collect usable ``[lat, lon, weight]`` heat points into an array.
+
+    Args:
+        heat_points: Leaflet.heat point tuples; malformed or non-positive
+            points are skipped.
+
+    Returns:
+        An ``(n, 3)`` float array of latitude, longitude and weight.
+    """
+    rows: list[tuple[float, float, float]] = []
+    for point in heat_points or []:
+        if not isinstance(point, (list, tuple)) or len(point) < 3:
+            continue
+        try:
+            lat, lon, weight = float(point[0]), float(point[1]), float(point[2])
+        except (TypeError, ValueError):
+            continue
+        if math.isfinite(lat) and math.isfinite(lon) and math.isfinite(weight) and weight > 0:
+            rows.append((lat, lon, weight))
+    return np.asarray(rows, dtype=float).reshape(-1, 3)
+
+
+def build_heat_grid(
+    heat_points: Sequence[Sequence[Any]] | None,
+    bands: Sequence[HeatmapGridBand] = HEATMAP_GRID_BANDS,
+) -> dict[str, Any]:
+    """Aggregate weighted heat points into one quadkey cell grid per zoom band.
+
+    Each cell carries the summed weight of its points and their
+    weight-averaged position, so the total weight of every band equals the
+    total weight of the input.
+
+    Args:
+        heat_points: ``[lat, lon, weight]`` tuples as stored on a heat anchor.
+        bands: Zoom bands to aggregate, in ascending zoom order.
+
+    Returns:
+        A JSON-serializable grid: ``{"format", "bands": [{"min_zoom",
+        "max_zoom", "cell_zoom", "cells": [[quadkey, lat, lon, weight], ...]}]}``
+        with cells in quadkey order.
+    """
+    points = _heat_point_array(heat_points)
+    latitude, longitude, weight = points[:, 0], points[:, 1], points[:, 2]
+    serialized_bands: list[dict[str, Any]] = []
+    for band in bands:
+        tile_x, tile_y = _tile_coordinates(longitude, latitude, band.cell_zoom)
+        keys, cell_of_point = np.unique(
+            _quadkey_integers(tile_x, tile_y, band.cell_zoom), return_inverse=True
+        )
+        cell_weight = np.bincount(cell_of_point, weights=weight, minlength=keys.size)
+        cell_lat = np.bincount(cell_of_point, weights=weight * latitude, minlength=keys.size) / cell_weight
+        cell_lon = np.bincount(cell_of_point, weights=weight * longitude, minlength=keys.size) / cell_weight
+        serialized_bands.append(
+            {
+                "min_zoom": band.min_zoom,
+                "max_zoom": band.max_zoom,
+                "cell_zoom": band.cell_zoom,
+                "cells": [
+                    [np.base_repr(key, 4).zfill(band.cell_zoom), lat, lon, total]
+                    for key, lat, lon, total in zip(
+                        keys.tolist(),
+                        np.round(cell_lat, 6).tolist(),
+                        np.round(cell_lon, 6).tolist(),
+                        np.round(cell_weight, 4).tolist(),
+                    )
+                ],
+            }
+        )
+    return {"format": HEATMAP_GRID_FORMAT, "bands": serialized_bands}
+
+
+@dataclass(frozen=True)
+class HeatmapGridLevel:
+    """Aggregated cells for one zoom band.
+
+    Attributes:
+        band: Zoom band the cells serve.
+        tile_x: Cell tile column at ``band.cell_zoom``.
+        tile_y: Cell tile row at ``band.cell_zoom``.
+        latitude: Weighted cell latitude.
+        longitude: Weighted cell longitude.
+        weight: Summed cell weight.
+    """
+
+    band: HeatmapGridBand
+    tile_x: np.ndarray = field(repr=False)
+    tile_y: np.ndarray = field(repr=False)
+    latitude: np.ndarray = field(repr=False)
+    longitude: np.ndarray = field(repr=False)
+    weight: np.ndarray = field(repr=False)
+
+    @classmethod
+    def from_serialized(cls, payload: Mapping[str, Any]) -> HeatmapGridLevel:
+        """Load a band produced by ``build_heat_grid``.
+
+        Args:
+            payload: One entry of the grid's ``bands`` list.
+
+        Returns:
+            The band's cells as arrays.
+        """
+        band = HeatmapGridBand(
+            min_zoom=int(payload["min_zoom"]),
+            max_zoom=int(payload["max_zoom"]),
+            cell_zoom=int(payload["cell_zoom"]),
+        )
+        cells = payload.get("cells") or []
+        keys = np.asarray([int(cell[0], 4) if cell[0] else 0 for cell in cells], dtype=np.int64)
+        tile_x, tile_y = _tiles_from_quadkey_integers(keys, band.cell_zoom)
+        values = np.asarray([cell[1:4] for cell in cells], dtype=float).reshape(-1, 3)
+        return cls(
+            band=band,
+            tile_x=tile_x,
+            tile_y=tile_y,
+            latitude=values[:, 0],
+            longitude=values[:, 1],
+            weight=values[:, 2],
+        )
+
+    def visible(self, bbox: BoundingBox | None) -> np.ndarray:
+        """Return the positions of cells whose tile intersects a viewport.
+
+        Args:
+            bbox: Viewport bounds, or ``None`` for every cell.
+
+        Returns:
+            Cell positions in quadkey order.
+        """
+        if bbox is None:
+            return np.arange(self.weight.size)
+        tile_x, tile_y = _tile_coordinates(
+            np.array([bbox.west, bbox.east]), np.array([bbox.north, bbox.south]), self.band.cell_zoom
+        )
+        return np.flatnonzero(
+            (self.tile_x >= tile_x[0])
+            & (self.tile_x <= tile_x[1])
+            & (self.tile_y >= tile_y[0])
+            & (self.tile_y <= tile_y[1])
+        )
+
+
+@dataclass(frozen=True)
+class HeatmapGrid:
+    """Viewport-servable heat cells and markers for one heat layer version.
+
+    Attributes:
+        version: Layer data version the grid was built from.
+        levels: One level per zoom band, in ascending zoom order.
+        marker_points: Street-level marker tuples as stored on the anchor.
+        marker_latitude: Marker latitudes.
+        marker_longitude: Marker longitudes.
+        marker_zoom_min: Lowest zoom at which markers are shown.
+        heat_zoom_max: Zoom at and above which the heat surface is hidden.
+    """
+
+    version: str
+    levels: tuple[HeatmapGridLevel, ...] = field(repr=False)
+    marker_points: list[list[Any]] = field(repr=False)
+    marker_latitude: np.ndarray = field(repr=False)
+    marker_longitude: np.ndarray = field(repr=False)
+    marker_zoom_min: int = HEATMAP_DEFAULT_MARKER_ZOOM_MIN
+    heat_zoom_max: int = HEATMAP_DEFAULT_HEAT_ZOOM_MAX
+
+    def level_for(self, zoom: int) -> HeatmapGridLevel | None:
+        """Return the band serving a map zoom.
+
+        Args:
+            zoom: Integer map zoom; zooms outside every band use the nearest band.
+
+        Returns:
+            The matching level, or ``None`` when the grid has no bands.
+        """
+        if not self.levels:
+            return None
+        for level in self.levels:
+            if zoom <= level.band.max_zoom:
+                return level
+        return self.levels[-1]
+
+    def viewport(self, zoom: float, bbox: BoundingBox | None = None) -> dict[str, Any]:
+        """Return the heat cells and markers a map viewport needs.
+
+        Args:
+            zoom: Map zoom; fractional zooms round down.
+            bbox: Optional viewport; cells and markers outside it are omitted.
+
+        Returns:
+            ``{"version", "zoom", "cell_zoom", "heat_points", "marker_points"}``
+            where ``heat_points`` are ``[lat, lon, weight]`` cells (empty once
+            the heat surface is hidden) and ``marker_points`` holds at most
+            ``HEATMAP_MAX_VIEWPORT_MARKERS`` markers (empty below
+            ``marker_zoom_min``).
+        """
+        level_zoom = max(int(math.floor(zoom)), 0)
+        payload: dict[str, Any] = {
+            "version": self.version,
+            "zoom": level_zoom,
+            "cell_zoom": None,
+            "heat_points": [],
+            "marker_points": [],
+        }
+
+        level = self.level_for(level_zoom) if level_zoom < self.heat_zoom_max else None
+        if level is not None:
+            positions = level.visible(bbox)
+            payload["cell_zoom"] = level.band.cell_zoom
+            payload["heat_points"] = np.column_stack(
+                (level.latitude[positions], level.longitude[positions], level.weight[positions])
+            ).tolist()
+
+        if level_zoom >= self.marker_zoom_min and self.marker_points:
+            visible = np.ones(self.marker_latitude.size, dtype=bool)
+            if bbox is not None:
+                visible = (
+                    (self.marker_longitude >= bbox.west)
+                    & (self.marker_longitude <= bbox.east)
+                    & (self.marker_latitude >= bbox.south)
+                    & (self.marker_latitude <= bbox.north)
+                )
+            payload["marker_points"] = [
+                self.marker_points[position]
+                for position in np.flatnonzero(visible)[:HEATMAP_MAX_VIEWPORT_MARKERS].tolist()
+            ]
+        return payload
+
+
+def _heat_anchor_properties(geojson: Mapping[str, Any] | None) -> dict[str, Any]:
+    """Return the properties of a heat layer's anchor feature.
+
+    Args:
+        geojson: Heat layer FeatureCollection.
+
+    Returns:
+        The first feature's properties, or an empty dict for an empty layer.
+    """
+    for feature in (geojson or {}).get("features") or []:
+        properties = (feature or {}).get("properties")
+        if isinstance(properties, dict):
+            return properties
+    return {}
+
+
+def heatmap_grid_from_geojson(geojson: Mapping[str, Any] | None, *, version: str) -> HeatmapGrid:
+    """Load the grid and markers stored on a heat layer's anchor feature.
+
+    Anchors written before the builders emitted ``heat_grid`` (or with an
+    older grid format) are aggregated from their ``heat_points`` instead.
+
+    Args:
+        geojson: Heat layer FeatureCollection as returned by its loader.
+        version: Layer data version.
+
+    Returns:
+        The heatmap grid.
+    """
+    properties = _heat_anchor_properties(geojson)
+    grid = properties.get("heat_grid")
+    if not isinstance(grid, dict) or grid.get("format") != HEATMAP_GRID_FORMAT:
+        grid = build_heat_grid(properties.get("heat_points"))
+
+    marker_points = [
+        point
+        for point in properties.get("marker_points") or []
+        if isinstance(point, list)
+        and len(point) >= 2
+        and all(isinstance(value, (int, float)) and math.isfinite(value) for value in point[:2])
+    ]
+    markers = np.asarray([point[:2] for point in marker_points], dtype=float).reshape(-1, 2)
+    return HeatmapGrid(
+        version=version,
+        levels=tuple(HeatmapGridLevel.from_serialized(band) for band in grid.get("bands") or []),
+        marker_points=marker_points,
+        marker_latitude=markers[:, 0],
+        marker_longitude=markers[:, 1],
+        marker_zoom_min=int(properties.get("marker_zoom_min") or HEATMAP_DEFAULT_MARKER_ZOOM_MIN),
+        heat_zoom_max=int(properties.get("heat_zoom_max") or HEATMAP_DEFAULT_HEAT_ZOOM_MAX),
+    )
+
+
+def strip_heat_anchor_points(geojson: Mapping[str, Any], heat_cells_url: str) -> dict[str, Any]:
+    """Drop the per-point arrays from a heat layer before it is sent to the browser.
+
+    The anchor keeps its legend and styling properties and gains
+    ``heat_cells_url``, from which the renderer fetches the cells and markers
+    of its viewport.
+
+    Args:
+        geojson: Heat layer FeatureCollection as returned by its loader.
+        heat_cells_url: URL of the layer's heat route.
+
+    Returns:
+        A shallow copy of the layer with slim anchor features.
+    """
+    return {
+        **geojson,
+        "features": [
+            {
+                **feature,
+                "properties": {
+                    **{
+                        key: value
+                        for key, value in (feature.get("properties") or {}).items()
+                        if key not in HEATMAP_ANCHOR_POINT_PROPERTIES
+                    },
+                    "heat_cells_url": heat_cells_url,
+                },
+            }
+            for feature in geojson.get("features") or []
+        ],
+    }
+
+
+_heatmap_grids: dict[str, HeatmapGrid] = {}
+_heatmap_grids_lock = threading.Lock()
+
+
+def get_heatmap_grid(
+    dataset: str,
+    version: str,
+    load_geojson: Callable[[], Mapping[str, Any]],
+) -> HeatmapGrid:
+    """Return a heat layer's grid, loading it once per data version.
+
+    Args:
+        dataset: Cache key such as ``parking_tickets_density``.
+        version: Current data version.
+        load_geojson: Callable returning the heat layer FeatureCollection.
+
+    Returns:
+        The cached grid for ``version``.
+    """
+    cached = _heatmap_grids.get(dataset)
+    if cached is not None and cached.version == version:
+        return cached
+
+    with _heatmap_grids_lock:
+        cached = _heatmap_grids.get(dataset)
+        if cached is not None and cached.version == version:
+            return cached
+        grid = heatmap_grid_from_geojson(load_geojson(), version=version)
+        _heatmap_grids[dataset] = grid
+        return grid
+
+
+def clear_heatmap_grids() -> None:
+    """Drop every cached heatmap grid.
+
+    Returns:
+        None.
+    """
+    with _heatmap_grids_lock:
+        _heatmap_grids.clear()
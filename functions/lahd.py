@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, TypeAlias, TypedDict
+from typing import Any, Sequence, TypeAlias, TypedDict
 import concurrent.futures
 import gzip
 import math
@@ -12,16 +13,37 @@ import re
 import time
 
 from loguru import logger
+import numpy as np
 import orjson
 import requests
-from shapely.geometry import Point, shape
+import shapely
+from shapely.geometry import shape
 from shapely.geometry.base import BaseGeometry
 from functions.data_paths import (
     LA_CITY_BOUNDARY_PATH,
     LAHD_PROPERTY_GEOCODE_CACHE_PATH,
     LAHD_PROPERTY_HEATMAP_PATH,
     LAHD_PROPERTY_LOOKUP_PATH,
+    LAHD_RECORD_DETAIL_CACHE_PATH,
 )
+from functions.column_files import (
+    artifact_digest,
+    column_file_path,
+    current_artifact_digest,
+    open_column_file,
+    write_column_file,
+)
+from functions.heatmap_grids import build_heat_grid
+from functions.lahd_lookup_index import (
+    LAHD_LOOKUP_COLUMN_FILE_KIND,
+    LAHD_LOOKUP_COUNT_FIELDS,
+    LAHD_LOOKUP_TEXT_FIELDS,
+    LahdLookupIndex,
+    build_lahd_lookup_index,
+    empty_lahd_lookup_index,
+)
+from functions.shared_ttl_cache import shared_ttl_cache
+from functions.warm_start import source_version, warm_start_snapshot
 
 
 LAHD_INVESTIGATION_DATASET_URL = "https://data.lacity.org/resource/eagk-wq48.json"
@@ -37,6 +59,12 @@ LAHD_ARTIFACT_VERSION = 1
 LAHD_DEFAULT_AGGREGATE_LIMIT = 25000
 LAHD_DEFAULT_LOOKUP_LIMIT = 50000
 LAHD_RECORD_DETAIL_LIMIT = 5000
+# Live record details are shared by every worker through an on-disk cache:
+# fresh for six hours, then served stale for up to a week while refreshed.
+# Snapshot fallbacks (Socrata unavailable) are retried after five minutes.
+LAHD_RECORD_DETAIL_CACHE_TTL_SECONDS = 6 * 60 * 60
+LAHD_RECORD_DETAIL_CACHE_STALE_SECONDS = 7 * 24 * 60 * 60
+LAHD_RECORD_DETAIL_FALLBACK_TTL_SECONDS = 5 * 60
 LAHD_MAX_HEAT_POINTS = 10000
 LAHD_MAX_MARKER_POINTS = 3000
 LAHD_HEAT_INTENSITY_FLOOR = 0.12
@@ -58,6 +86,24 @@ MarkerPointTuple: TypeAlias = list[float | int | str | None]
 
 LAHD_LISTING_LOOKUP_MAX_DISTANCE_METERS = 65.0
 LAHD_LOOKUP_SPATIAL_CELL_DEGREES = 0.001
+# Enrichment column -> ``LahdListingLookupResult`` field for stored listing summaries.
+LAHD_SUMMARY_ENRICHMENT_FIELDS: dict[str, str] = {
+    "lahd_matched": "matched",
+    "lahd_match_type": "match_type",
+    "lahd_match_distance_m": "match_distance_meters",
+    "lahd_address": "address",
+    "lahd_apn": "apn",
+    "lahd_problem_score": "problem_score",
+    "lahd_documented_issue_count": "documented_issue_count",
+    "lahd_unresolved_issue_count": "unresolved_issue_count",
+    "lahd_investigation_case_count": "investigation_case_count",
+    "lahd_open_case_count": "open_case_count",
+    "lahd_violations_cited": "violations_cited",
+    "lahd_unresolved_violation_count": "unresolved_violation_count",
+    "lahd_latest_case_date": "latest_case_date",
+}
+# Digest of the lookup artifact a stored summary was computed from.
+LAHD_SUMMARY_SOURCE_COLUMN = "lahd_summary_source"
 _LA_CITY_LISTING_CITY_LABELS = {
     "ARLETA",
     "CANOGA PARK",
@@ -737,7 +783,51 @@ def _build_lahd_detail_fallback_from_lookup(apn: str, exc: Exception) -> JsonDic
     }
 
 
-@lru_cache(maxsize=512)
+def _lahd_record_detail_cache_path() -> Path:
+    """Return the shared record-detail cache file, resolved on every call.
+
+    Returns:
+        The current ``LAHD_RECORD_DETAIL_CACHE_PATH``, so tests can point the
+        cache at a temporary file.
+    """
+    return LAHD_RECORD_DETAIL_CACHE_PATH
+
+
+def _lahd_record_detail_cache_key(apn: str, row_limit: int = LAHD_RECORD_DETAIL_LIMIT) -> str:
+    """Return the shared-cache key for a record-detail request.
+
+    Args:
+        apn: Assessor Parcel Number identifying the property.
+        row_limit: Maximum live case and violation records retained per collection.
+
+    Returns:
+        The normalized APN and effective row limit.
+    """
+    return f"{_normalize_apn(apn)}:{max(1, min(int(row_limit), LAHD_RECORD_DETAIL_LIMIT))}"
+
+
+def _lahd_record_detail_cache_ttl(details: JsonDict) -> float:
+    """Return how long a record-detail payload stays fresh in the shared cache.
+
+    Args:
+        details: Payload returned by ``fetch_lahd_property_record_details``.
+
+    Returns:
+        The lifetime in seconds; snapshot fallbacks expire sooner.
+    """
+    if details.get("detail_status", {}).get("live_records_available"):
+        return LAHD_RECORD_DETAIL_CACHE_TTL_SECONDS
+    return LAHD_RECORD_DETAIL_FALLBACK_TTL_SECONDS
+
+
+@shared_ttl_cache(
+    _lahd_record_detail_cache_path,
+    namespace="lahd-record-details",
+    ttl_seconds=LAHD_RECORD_DETAIL_CACHE_TTL_SECONDS,
+    stale_seconds=LAHD_RECORD_DETAIL_CACHE_STALE_SECONDS,
+    key=_lahd_record_detail_cache_key,
+    ttl_for=_lahd_record_detail_cache_ttl,
+)
 def fetch_lahd_property_record_details(
     apn: str,
     row_limit: int = LAHD_RECORD_DETAIL_LIMIT,
@@ -1093,23 +1183,94 @@ def _normalize_city_label(value: object) -> str:
     return re.sub(r"\s+", " ", str(value or "").strip().upper())
 
 
+@dataclass(frozen=True)
+class LaCityJurisdiction:
+    """Prepared City of Los Angeles boundary for point-in-city tests.
+
+    Points on the boundary line count as inside, matching ``covers``.
+
+    Attributes:
+        boundary: Unioned city boundary, prepared for repeated predicates.
+    """
+
+    boundary: BaseGeometry
+
+    def covers(self, longitude: float, latitude: float) -> bool:
+        """Return whether one coordinate falls within the city.
+
+        Args:
+            longitude: Longitude in decimal degrees.
+            latitude: Latitude in decimal degrees.
+
+        Returns:
+            Whether the boundary covers the coordinate.
+        """
+        return bool(shapely.intersects_xy(self.boundary, longitude, latitude))
+
+    def covers_many(self, longitudes: np.ndarray, latitudes: np.ndarray) -> np.ndarray:
+        """Return which coordinates fall within the city in one vectorized pass.
+
+        Args:
+            longitudes: Longitudes in decimal degrees.
+            latitudes: Latitudes in decimal degrees, aligned with ``longitudes``.
+
+        Returns:
+            Boolean array, ``True`` where the boundary covers the coordinate.
+        """
+        return shapely.intersects_xy(self.boundary, longitudes, latitudes)
+
+
 @lru_cache(maxsize=2)
-def _load_la_city_boundary(
+def _load_la_city_jurisdiction(
     boundary_path: str,
     boundary_mtime_ns: int,
-) -> BaseGeometry | None:
-    """Load the official City of Los Angeles boundary geometry.
+) -> LaCityJurisdiction | None:
+    """Load the official City of Los Angeles boundary as a prepared geometry.
 
     Args:
         boundary_path: Filesystem path to the jurisdiction boundary GeoJSON.
         boundary_mtime_ns: File modification time included in the cache key.
 
     Returns:
-        The loaded la city boundary.
+        The prepared jurisdiction, or ``None`` when the boundary cannot be read.
     """
-    del boundary_mtime_ns
+    boundary = warm_start_snapshot(
+        "la-city-boundary",
+        {"boundary": boundary_path, "mtime_ns": boundary_mtime_ns, "code": source_version(__file__)},
+        lambda: _read_la_city_boundary(Path(boundary_path)),
+    )
+    if boundary is None:
+        return None
+    # Preparation is not pickled with the warm-start snapshot, so do it here.
+    shapely.prepare(boundary)
+    return LaCityJurisdiction(boundary)
+
+
+def load_la_city_jurisdiction(boundary_path: Path = LA_CITY_BOUNDARY_PATH) -> LaCityJurisdiction | None:
+    """Return the prepared City of Los Angeles jurisdiction for a boundary file.
 
-    path = Path(boundary_path)
+    Args:
+        boundary_path: Filesystem path to the jurisdiction boundary GeoJSON.
+
+    Returns:
+        The prepared jurisdiction, or ``None`` when the boundary is missing or unreadable.
+    """
+    try:
+        boundary_mtime_ns = boundary_path.stat().st_mtime_ns
+    except OSError:
+        return None
+    return _load_la_city_jurisdiction(str(boundary_path), boundary_mtime_ns)
+
+
+def _read_la_city_boundary(path: Path) -> BaseGeometry | None:
+    """Parse and union the City of Los Angeles boundary features.
+
+    Args:
+        path: Filesystem path to the jurisdiction boundary GeoJSON.
+
+    Returns:
+        The unioned boundary geometry, or ``None`` when it cannot be read.
+    """
     try:
         payload = orjson.loads(path.read_bytes())
     except (OSError, orjson.JSONDecodeError) as exc:
@@ -1171,24 +1332,76 @@ def is_listing_in_los_angeles_city(
         return None if normalized_city in _LA_CITY_LISTING_CITY_LABELS else False
 
     if lat is not None and lon is not None:
-        try:
-            boundary_mtime_ns = boundary_path.stat().st_mtime_ns
-        except OSError:
-            boundary_mtime_ns = 0
-
-        boundary = _load_la_city_boundary(str(boundary_path), boundary_mtime_ns) if boundary_mtime_ns else None
-        if boundary is not None:
-            if boundary.covers(Point(lon, lat)):
-                return True
-            if normalized_city in _LA_CITY_LISTING_CITY_LABELS:
-                return True
-            return False
+        jurisdiction = load_la_city_jurisdiction(boundary_path)
+        if jurisdiction is not None:
+            return jurisdiction.covers(lon, lat) or normalized_city in _LA_CITY_LISTING_CITY_LABELS
 
     if normalized_city == "LOS ANGELES":
         return True
     return None
 
 
+def listings_in_los_angeles_city(
+    cities: Sequence[object],
+    latitudes: Sequence[object],
+    longitudes: Sequence[object],
+    *,
+    boundary_path: Path = LA_CITY_BOUNDARY_PATH,
+) -> list[bool | None]:
+    """Return ``is_listing_in_los_angeles_city`` for many listings at once.
+
+    Used by the enrichment pipeline: the boundary test runs as one vectorized
+    pass over every in-bounds coordinate instead of once per listing.
+
+    Args:
+        cities: MLS city or community labels.
+        latitudes: Property latitudes, aligned with ``cities``.
+        longitudes: Property longitudes, aligned with ``cities``.
+        boundary_path: Filesystem path to the jurisdiction boundary GeoJSON.
+
+    Returns:
+        One ``True``/``False``/``None`` result per listing, with the same
+        meaning as ``is_listing_in_los_angeles_city``.
+    """
+    labels = [_normalize_city_label(city) for city in cities]
+    community = np.fromiter((label in _LA_CITY_LISTING_CITY_LABELS for label in labels), dtype=bool, count=len(labels))
+    named_los_angeles = np.fromiter((label == "LOS ANGELES" for label in labels), dtype=bool, count=len(labels))
+    lats = np.array([_coerce_float(value) for value in latitudes], dtype=np.float64)
+    lons = np.array([_coerce_float(value) for value in longitudes], dtype=np.float64)
+
+    has_coordinates = ~(np.isnan(lats) | np.isnan(lons))
+    in_bounds = (
+        has_coordinates
+        & (lats >= LAHD_COORDINATE_BOUNDS["min_lat"])
+        & (lats <= LAHD_COORDINATE_BOUNDS["max_lat"])
+        & (lons >= LAHD_COORDINATE_BOUNDS["min_lon"])
+        & (lons <= LAHD_COORDINATE_BOUNDS["max_lon"])
+    )
+    jurisdiction = load_la_city_jurisdiction(boundary_path) if in_bounds.any() else None
+    covered = np.zeros(len(labels), dtype=bool)
+    if jurisdiction is not None:
+        covered[in_bounds] = jurisdiction.covers_many(lons[in_bounds], lats[in_bounds])
+        decided = in_bounds
+    else:
+        decided = np.zeros(len(labels), dtype=bool)
+
+    # 1 = inside, 0 = outside, -1 = undetermined.
+    codes = np.select(
+        [
+            has_coordinates & ~in_bounds,
+            decided,
+            named_los_angeles,
+        ],
+        [
+            np.where(community, -1, 0),
+            (covered | community).astype(np.int8),
+            1,
+        ],
+        default=-1,
+    )
+    return [None if code < 0 else bool(code) for code in codes.tolist()]
+
+
 def _load_geocode_cache(cache_path: Path) -> dict[str, JsonDict]:
     """Load cached LAHD property coordinate results.
 
@@ -1437,26 +1650,6 @@ def _attach_coordinates(
     return geocoded
 
 
-def _distance_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    """Estimate the distance between two nearby coordinates in meters.
-
-    Args:
-        lat1: Latitude of the first point, in decimal degrees.
-        lon1: Longitude of the first point, in decimal degrees.
-        lat2: Latitude of the second point, in decimal degrees.
-        lon2: Longitude of the second point, in decimal degrees.
-
-    Returns:
-        The approximate distance between the coordinates, in meters.
-    """
-    lat1_rad = math.radians(lat1)
-    lat2_rad = math.radians(lat2)
-    mean_lat = (lat1_rad + lat2_rad) / 2
-    x = math.radians(lon2 - lon1) * math.cos(mean_lat)
-    y = math.radians(lat2 - lat1)
-    return 6371000 * math.sqrt((x * x) + (y * y))
-
-
 def _normalize_property_address_for_lookup(value: object) -> str:
     """Normalize a listing or LAHD address to a parcel-level street-address key.
 
@@ -1524,22 +1717,6 @@ def _coerce_marker_lookup_record(point: object) -> JsonDict | None:
     return record
 
 
-def _lahd_spatial_bucket(lat: float, lon: float) -> tuple[int, int]:
-    """Return the lookup-grid bucket for a latitude/longitude pair.
-
-    Args:
-        lat: Latitude in decimal degrees.
-        lon: Longitude in decimal degrees.
-
-    Returns:
-        A tuple containing the LAHD spatial bucket.
-    """
-    return (
-        math.floor(lat / LAHD_LOOKUP_SPATIAL_CELL_DEGREES),
-        math.floor(lon / LAHD_LOOKUP_SPATIAL_CELL_DEGREES),
-    )
-
-
 def _lahd_spatial_neighbor_span() -> int:
     """Return the number of adjacent coordinate buckets to inspect for nearby matches.
 
@@ -1550,31 +1727,6 @@ def _lahd_spatial_neighbor_span() -> int:
     return max(1, math.ceil(conservative_degrees / LAHD_LOOKUP_SPATIAL_CELL_DEGREES))
 
 
-def _candidate_lahd_records_near(
-    spatial_index: dict[tuple[int, int], list[JsonDict]],
-    *,
-    latitude: float,
-    longitude: float,
-) -> list[JsonDict]:
-    """Return lookup records in nearby coordinate buckets for distance matching.
-
-    Args:
-        spatial_index: LAHD records grouped into coordinate buckets for nearby lookup.
-        latitude: Property latitude in decimal degrees.
-        longitude: Property longitude in decimal degrees.
-
-    Returns:
-        A list containing the candidate LAHD records near.
-    """
-    bucket_lat, bucket_lon = _lahd_spatial_bucket(latitude, longitude)
-    span = _lahd_spatial_neighbor_span()
-    candidates: list[JsonDict] = []
-    for lat_offset in range(-span, span + 1):
-        for lon_offset in range(-span, span + 1):
-            candidates.extend(spatial_index.get((bucket_lat + lat_offset, bucket_lon + lon_offset), []))
-    return candidates
-
-
 def _empty_lahd_listing_lookup_result(
     *,
     data_available: bool,
@@ -1665,97 +1817,202 @@ def _matched_lahd_listing_lookup_result(
     }
 
 
-@lru_cache(maxsize=4)
-def _load_lahd_listing_lookup(
-    artifact_path: str,
-    artifact_mtime_ns: int,
-) -> dict[str, Any]:
-    """Load the LAHD property lookup records for listing popups.
+def lahd_listing_summary_enrichment_values(
+    summary: LahdListingLookupResult,
+    source_digest: str,
+) -> dict[str, object]:
+    """Flatten a listing summary into its enrichment-table columns.
 
     Args:
+        summary: Result of ``lookup_lahd_property_for_listing``.
+        source_digest: Digest of the lookup artifact the summary came from.
+
+    Returns:
+        Enrichment column name to value.
+    """
+    values: dict[str, object] = {column: summary[field] for column, field in LAHD_SUMMARY_ENRICHMENT_FIELDS.items()}
+    values["lahd_matched"] = int(summary["matched"])
+    values[LAHD_SUMMARY_SOURCE_COLUMN] = source_digest
+    return values
+
+
+def stored_lahd_listing_summary(
+    row: dict[str, Any],
+    artifact_path: Path = LAHD_LOCAL_LOOKUP_ARTIFACT_PATH,
+) -> LahdListingLookupResult | None:
+    """Rebuild a listing summary from stored enrichment columns.
+
+    Args:
+        row: Listing row carrying the ``lahd_*`` enrichment columns.
         artifact_path: Filesystem path to the local data artifact.
-        artifact_mtime_ns: Artifact modification time used to invalidate the cache.
 
     Returns:
-        A mapping containing the loaded LAHD listing lookup.
+        The stored summary, or ``None`` when none was stored or it was
+        computed from another version of the lookup artifact.
     """
-    del artifact_mtime_ns
+    source = row.get(LAHD_SUMMARY_SOURCE_COLUMN)
+    if source is None or source != current_artifact_digest(artifact_path):
+        return None
+    summary = _empty_lahd_listing_lookup_result(data_available=True)
+    for column, field in LAHD_SUMMARY_ENRICHMENT_FIELDS.items():
+        if row.get(column) is not None:
+            summary[field] = row[column]  # type: ignore[literal-required]
+    summary["matched"] = bool(row.get("lahd_matched"))
+    return summary
 
-    path = Path(artifact_path)
-    if not path.exists():
-        return {"records": [], "address_index": {}, "apn_index": {}, "spatial_index": {}, "metadata": {}}
 
+def _prepare_lahd_listing_lookup(path: Path) -> dict[str, Any]:
+    """Parse the LAHD lookup artifact into record columns with precomputed index keys.
+
+    Args:
+        path: Filesystem path to the local data artifact.
+
+    Returns:
+        A mapping with coerced record ``columns`` (``lat``, ``lon`` and the
+        count and text fields), their normalized ``address_keys`` and
+        ``apn_keys``, and artifact ``metadata``.
+    """
+    empty: dict[str, Any] = {"columns": {}, "address_keys": [], "apn_keys": [], "metadata": {}}
     try:
         with gzip.open(path, "rb") as artifact_file:
             payload = orjson.loads(artifact_file.read())
     except (OSError, orjson.JSONDecodeError) as exc:
         logger.warning(f"Failed loading LAHD listing lookup from {path}: {exc}")
-        return {"records": [], "address_index": {}, "apn_index": {}, "spatial_index": {}, "metadata": {}}
+        return empty
 
     marker_points = payload.get("records") if isinstance(payload, dict) else None
     if not isinstance(marker_points, list):
         features = payload.get("features") if isinstance(payload, dict) else None
         if not isinstance(features, list) or not features:
-            return {"records": [], "address_index": {}}
+            return empty
 
         properties = features[0].get("properties") if isinstance(features[0], dict) else None
         marker_points = properties.get("marker_points") if isinstance(properties, dict) else None
         if not isinstance(marker_points, list):
-            return {"records": [], "address_index": {}, "apn_index": {}, "spatial_index": {}, "metadata": {}}
+            return empty
 
     records = [
         record
         for record in (_coerce_marker_lookup_record(point) for point in marker_points)
         if record is not None
     ]
-    address_index: dict[str, JsonDict] = {}
-    apn_index: dict[str, JsonDict] = {}
-    spatial_index: dict[tuple[int, int], list[JsonDict]] = {}
-    for record in records:
-        address_key = _normalize_property_address_for_lookup(record.get("address"))
-        if not address_key:
-            continue
-        existing = address_index.get(address_key)
-        if existing is None or _parse_int(record.get("problem_score")) > _parse_int(existing.get("problem_score")):
-            address_index[address_key] = record
-
-        apn = _normalize_apn(record.get("apn"))
-        if apn:
-            existing_by_apn = apn_index.get(apn)
-            if existing_by_apn is None or _parse_int(record.get("problem_score")) > _parse_int(
-                existing_by_apn.get("problem_score")
-            ):
-                apn_index[apn] = record
-
-        spatial_index.setdefault(_lahd_spatial_bucket(float(record["lat"]), float(record["lon"])), []).append(record)
-
     metadata = payload.get("metadata") if isinstance(payload, dict) and isinstance(payload.get("metadata"), dict) else {}
+    column_names = ("lat", "lon", *LAHD_LOOKUP_COUNT_FIELDS, *LAHD_LOOKUP_TEXT_FIELDS)
     return {
-        "records": records,
-        "address_index": address_index,
-        "apn_index": apn_index,
-        "spatial_index": spatial_index,
+        "columns": {name: [record.get(name) for record in records] for name in column_names},
+        "address_keys": [_normalize_property_address_for_lookup(record.get("address")) for record in records],
+        "apn_keys": [_normalize_apn(record.get("apn")) for record in records],
         "metadata": metadata,
     }
 
 
-def _load_lahd_lookup_artifact(artifact_path: Path = LAHD_LOCAL_LOOKUP_ARTIFACT_PATH) -> dict[str, Any]:
+def _index_prepared_lahd_listing_lookup(prepared: dict[str, Any]) -> LahdLookupIndex:
+    """Build the columnar address, APN, and spatial index over prepared LAHD records.
+
+    Args:
+        prepared: Output of ``_prepare_lahd_listing_lookup``.
+
+    Returns:
+        The LAHD listing lookup index.
+    """
+    return build_lahd_lookup_index(
+        prepared.get("columns") or {},
+        prepared.get("address_keys") or [],
+        prepared.get("apn_keys") or [],
+        cell_degrees=LAHD_LOOKUP_SPATIAL_CELL_DEGREES,
+        metadata=prepared.get("metadata") or {},
+    )
+
+
+def _open_lahd_lookup_columns(path: Path) -> LahdLookupIndex | None:
+    """Map the LAHD column file when it was built from the current artifact.
+
+    Args:
+        path: LAHD lookup artifact.
+
+    Returns:
+        The mapped index, or ``None`` when no current column file exists.
+    """
+    column_file = open_column_file(column_file_path(path), kind=LAHD_LOOKUP_COLUMN_FILE_KIND)
+    if column_file is None:
+        return None
+    if column_file.attributes.get("cell_degrees") != LAHD_LOOKUP_SPATIAL_CELL_DEGREES:
+        logger.info(f"Ignoring LAHD column file with another spatial cell size for {path}.")
+        return None
+    if column_file.attributes.get("source_digest") != current_artifact_digest(path):
+        logger.info(f"Ignoring LAHD column file built from another version of {path}.")
+        return None
+    return LahdLookupIndex.from_column_file(column_file)
+
+
+@lru_cache(maxsize=4)
+def _load_lahd_listing_lookup(
+    artifact_path: str,
+    artifact_mtime_ns: int,
+) -> LahdLookupIndex:
+    """Load the LAHD property lookup records for listing popups.
+
+    A current column file (``build-lahd-property-lookup --columns``, run by
+    the Docker build) is memory-mapped with no parse step and shared by every
+    worker through the page cache. Without one, the artifact is parsed and
+    indexed in-process.
+
+    Args:
+        artifact_path: Filesystem path to the local data artifact.
+        artifact_mtime_ns: Artifact modification time used to invalidate the cache.
+
+    Returns:
+        The LAHD listing lookup index.
+    """
+    path = Path(artifact_path)
+    if not path.exists():
+        return empty_lahd_lookup_index(LAHD_LOOKUP_SPATIAL_CELL_DEGREES)
+
+    mapped = _open_lahd_lookup_columns(path)
+    if mapped is not None:
+        return mapped
+    return _index_prepared_lahd_listing_lookup(_prepare_lahd_listing_lookup(path))
+
+
+def _load_lahd_lookup_artifact(artifact_path: Path = LAHD_LOCAL_LOOKUP_ARTIFACT_PATH) -> LahdLookupIndex:
     """Load the cached LAHD lookup artifact with indexes.
 
     Args:
         artifact_path: Filesystem path to the local data artifact.
 
     Returns:
-        A mapping containing the loaded LAHD lookup artifact.
+        The LAHD listing lookup index, empty when the artifact is missing.
     """
     try:
         artifact_mtime_ns = artifact_path.stat().st_mtime_ns
     except OSError:
-        return {"records": [], "address_index": {}, "apn_index": {}, "spatial_index": {}, "metadata": {}}
+        return empty_lahd_lookup_index(LAHD_LOOKUP_SPATIAL_CELL_DEGREES)
 
     return _load_lahd_listing_lookup(str(artifact_path), artifact_mtime_ns)
 
 
+def write_lahd_lookup_column_file(artifact_path: Path = LAHD_LOCAL_LOOKUP_ARTIFACT_PATH) -> Path:
+    """Write the memory-mappable column file for a LAHD lookup artifact.
+
+    Args:
+        artifact_path: LAHD lookup artifact to index.
+
+    Returns:
+        The written column-file path.
+    """
+    source_digest = artifact_digest(artifact_path)
+    index = _index_prepared_lahd_listing_lookup(_prepare_lahd_listing_lookup(artifact_path))
+    output_path = write_column_file(
+        column_file_path(artifact_path),
+        kind=LAHD_LOOKUP_COLUMN_FILE_KIND,
+        arrays=index.column_arrays(),
+        attributes={**index.column_attributes(), "source_digest": source_digest},
+    )
+    _load_lahd_listing_lookup.cache_clear()
+    logger.info(f"Wrote {len(index)} LAHD lookup rows to {output_path}.")
+    return output_path
+
+
 def lookup_lahd_property_record_by_apn(
     apn: object,
     artifact_path: Path = LAHD_LOCAL_LOOKUP_ARTIFACT_PATH,
@@ -1774,8 +2031,8 @@ def lookup_lahd_property_record_by_apn(
         return None
 
     lookup = _load_lahd_lookup_artifact(artifact_path)
-    apn_index: dict[str, JsonDict] = lookup.get("apn_index") or {}
-    return apn_index.get(normalized_apn)
+    row = lookup.row_for_apn(normalized_apn)
+    return lookup.record(row) if row is not None else None
 
 
 def get_lahd_property_lookup_metadata(
@@ -1789,9 +2046,7 @@ def get_lahd_property_lookup_metadata(
     Returns:
         The requested LAHD property lookup metadata.
     """
-    lookup = _load_lahd_lookup_artifact(artifact_path)
-    metadata = lookup.get("metadata")
-    return metadata if isinstance(metadata, dict) else {}
+    return _load_lahd_lookup_artifact(artifact_path).metadata
 
 
 def prewarm_lahd_listing_lookup_cache() -> None:
@@ -1803,19 +2058,14 @@ def prewarm_lahd_listing_lookup_cache() -> None:
     started_at = time.time()
     try:
         lookup = _load_lahd_lookup_artifact(LAHD_LOCAL_LOOKUP_ARTIFACT_PATH)
-        try:
-            boundary_mtime_ns = LA_CITY_BOUNDARY_PATH.stat().st_mtime_ns
-        except OSError:
-            boundary_mtime_ns = 0
-        if boundary_mtime_ns:
-            _load_la_city_boundary(str(LA_CITY_BOUNDARY_PATH), boundary_mtime_ns)
+        load_la_city_jurisdiction(LA_CITY_BOUNDARY_PATH)
     except Exception as exc:
         logger.warning(f"Failed prewarming LAHD listing lookup cache: {exc}")
         return
 
     logger.info(
         "Prewarmed LAHD listing lookup cache with "
-        f"{len(lookup.get('records') or []):,} records in {time.time() - started_at:.2f}s."
+        f"{len(lookup):,} records in {time.time() - started_at:.2f}s."
     )
 
 
@@ -1846,16 +2096,14 @@ def lookup_lahd_property_for_listing(
         return _empty_lahd_listing_lookup_result(data_available=False)
 
     lookup = _load_lahd_listing_lookup(str(artifact_path), artifact_mtime_ns)
-    records: list[JsonDict] = lookup.get("records") or []
-    address_index: dict[str, JsonDict] = lookup.get("address_index") or {}
-    spatial_index: dict[tuple[int, int], list[JsonDict]] = lookup.get("spatial_index") or {}
-    if not records:
+    if not len(lookup):
         return _empty_lahd_listing_lookup_result(data_available=False)
 
     address_key = _normalize_property_address_for_lookup(address)
-    if address_key and address_key in address_index:
+    address_row = lookup.row_for_address(address_key) if address_key else None
+    if address_row is not None:
         return _matched_lahd_listing_lookup_result(
-            address_index[address_key],
+            lookup.record(address_row),
             match_type="address",
         )
 
@@ -1868,21 +2116,11 @@ def lookup_lahd_property_for_listing(
     if not math.isfinite(lat) or not math.isfinite(lon) or not _coordinates_in_bounds(lat, lon):
         return _empty_lahd_listing_lookup_result(data_available=True)
 
-    candidate_records = _candidate_lahd_records_near(spatial_index, latitude=lat, longitude=lon) if spatial_index else records
-    if not candidate_records:
-        return _empty_lahd_listing_lookup_result(data_available=True)
-
-    nearest_record: JsonDict | None = None
-    nearest_distance = math.inf
-    for record in candidate_records:
-        distance = _distance_meters(lat, lon, float(record["lat"]), float(record["lon"]))
-        if distance < nearest_distance:
-            nearest_distance = distance
-            nearest_record = record
-
-    if nearest_record is not None and nearest_distance <= LAHD_LISTING_LOOKUP_MAX_DISTANCE_METERS:
+    nearest = lookup.nearest(lat, lon, span=_lahd_spatial_neighbor_span())
+    if nearest is not None and nearest[1] <= LAHD_LISTING_LOOKUP_MAX_DISTANCE_METERS:
+        nearest_row, nearest_distance = nearest
         return _matched_lahd_listing_lookup_result(
-            nearest_record,
+            lookup.record(nearest_row),
             match_type="nearby_parcel",
             match_distance_meters=nearest_distance,
         )
@@ -2010,6 +2248,7 @@ def _build_heat_anchor_feature(
         anchor_lon = round(sum(record["lon"] for record in heat_records) / len(heat_records), 6)
 
     max_problem_score = max((int(record["problem_score"]) for record in heat_records), default=0)
+    heat_points = _build_heat_points(heat_records)
     first_dates = [record["first_case_date"] for record in marker_records if record["first_case_date"]]
     latest_dates = [record["latest_case_date"] for record in marker_records if record["latest_case_date"]]
 
@@ -2021,7 +2260,8 @@ def _build_heat_anchor_feature(
         },
         "properties": {
             "layer_role": "lahd_property_heat_anchor",
-            "heat_points": _build_heat_points(heat_records),
+            "heat_points": heat_points,
+            "heat_grid": build_heat_grid(heat_points),
             "marker_points": _build_marker_points(marker_records),
             "heat_max_intensity": 1.0,
             "max_problem_score": max_problem_score,
@@ -0,0 +1,377 @@
+"""Columnar LAHD lookup index for listing popups.
+
+The LAHD lookup artifact holds ~50k property records. Keeping each as a
+Python dict, plus address/APN dict indexes and a grid of dict lists, costs
+tens of megabytes per worker, and every nearest-parcel search measured
+distances in a Python loop over the neighbouring buckets. This index stores
+the records column-wise instead:
+
+- coordinates as float arrays and the ten count fields as one integer matrix;
+- addresses, APNs and case dates as UTF-8 string columns;
+- the address and APN indexes as sorted key arrays searched with
+  ``searchsorted``;
+- the spatial index as row positions sorted by grid cell, so a
+  nearest-within-radius search is one ``searchsorted`` call, a few slices
+  and one vectorized distance computation.
+
+Result dicts are only materialized for the winning row. Because the index is
+nothing but arrays, ``build-lahd-property-lookup --columns`` can write it to
+a column file (see ``functions.column_files``) that workers memory-map
+instead of parsing and indexing the JSON artifact.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Sequence
+import math
+
+import numpy as np
+
+from functions.column_files import ColumnFile, KeyIndex, StringColumn
+
+LAHD_LOOKUP_COUNT_FIELDS: tuple[str, ...] = (
+    "problem_score",
+    "documented_issue_count",
+    "unresolved_issue_count",
+    "investigation_case_count",
+    "open_case_count",
+    "violations_cited",
+    "unresolved_violation_count",
+    "violation_row_count",
+    "closed_case_count",
+    "violations_cleared",
+)
+LAHD_LOOKUP_TEXT_FIELDS: tuple[str, ...] = ("address", "apn", "first_case_date", "latest_case_date")
+LAHD_LOOKUP_COLUMN_FILE_KIND = "lahd-listing-lookup/1"
+_GRID_ATTRIBUTES: tuple[str, ...] = ("cell_degrees", "origin_row", "origin_column", "columns", "rows")
+_ARRAY_FIELDS: tuple[str, ...] = (
+    "latitude",
+    "longitude",
+    "counts",
+    "cell_ids",
+    "positions",
+    "cell_latitude",
+    "cell_longitude",
+)
+_METERS_PER_DEGREE = math.radians(6371000)
+_HALF_RADIANS_PER_DEGREE = math.pi / 360
+
+
+@dataclass(frozen=True)
+class LahdLookupIndex:
+    """Columnar LAHD lookup records with address, APN and spatial indexes.
+
+    Attributes:
+        latitude: Record latitudes.
+        longitude: Record longitudes.
+        counts: Record counts, one column per ``LAHD_LOOKUP_COUNT_FIELDS`` entry.
+        texts: One string column per ``LAHD_LOOKUP_TEXT_FIELDS`` entry.
+        address_rows: Normalized address key to the best-scoring row.
+        apn_rows: Normalized APN to the best-scoring row.
+        cell_degrees: Spatial grid cell edge length in degrees.
+        origin_row: Grid row (latitude bucket) of the southernmost cell.
+        origin_column: Grid column (longitude bucket) of the westernmost cell.
+        columns: Number of grid columns.
+        rows: Number of grid rows.
+        cell_ids: Sorted cell id for each spatially indexed row.
+        positions: Row positions ordered by ``cell_ids``.
+        cell_latitude: Latitudes ordered by ``cell_ids``.
+        cell_longitude: Longitudes ordered by ``cell_ids``.
+        metadata: Artifact metadata.
+    """
+
+    latitude: np.ndarray = field(repr=False)
+    longitude: np.ndarray = field(repr=False)
+    counts: np.ndarray = field(repr=False)
+    texts: dict[str, StringColumn] = field(repr=False)
+    address_rows: KeyIndex = field(repr=False)
+    apn_rows: KeyIndex = field(repr=False)
+    cell_degrees: float
+    origin_row: int
+    origin_column: int
+    columns: int
+    rows: int
+    cell_ids: np.ndarray = field(repr=False)
+    positions: np.ndarray = field(repr=False)
+    cell_latitude: np.ndarray = field(repr=False)
+    cell_longitude: np.ndarray = field(repr=False)
+    metadata: dict[str, Any] = field(default_factory=dict, repr=False)
+
+    def __len__(self) -> int:
+        """Return the number of records.
+
+        Returns:
+            The record count.
+        """
+        return int(self.latitude.size)
+
+    def column_arrays(self) -> dict[str, np.ndarray]:
+        """Return every array of the index, named for a column file.
+
+        Returns:
+            Array name to array.
+        """
+        arrays = {name: getattr(self, name) for name in _ARRAY_FIELDS}
+        for name, column in self.texts.items():
+            arrays.update(column.arrays(name))
+        arrays.update(self.address_rows.arrays("address_rows"))
+        arrays.update(self.apn_rows.arrays("apn_rows"))
+        return arrays
+
+    def column_attributes(self) -> dict[str, Any]:
+        """Return the scalar attributes of the index for a column file.
+
+        Returns:
+            Grid parameters and artifact metadata.
+        """
+        attributes: dict[str, Any] = {name: getattr(self, name) for name in _GRID_ATTRIBUTES}
+        attributes["metadata"] = self.metadata
+        return attributes
+
+    @classmethod
+    def from_column_file(cls, column_file: ColumnFile) -> LahdLookupIndex:
+        """Wrap the arrays of a mapped column file without copying them.
+
+        Args:
+            column_file: Column file written from ``column_arrays``.
+
+        Returns:
+            The lookup index backed by the mapped arrays.
+        """
+        arrays = column_file.arrays
+        attributes = column_file.attributes
+        return cls(
+            **{name: arrays[name] for name in _ARRAY_FIELDS},
+            texts={name: StringColumn.from_arrays(arrays, name) for name in LAHD_LOOKUP_TEXT_FIELDS},
+            address_rows=KeyIndex.from_arrays(arrays, "address_rows"),
+            apn_rows=KeyIndex.from_arrays(arrays, "apn_rows"),
+            cell_degrees=float(attributes["cell_degrees"]),
+            **{name: int(attributes[name]) for name in _GRID_ATTRIBUTES if name != "cell_degrees"},
+            metadata=dict(attributes.get("metadata") or {}),
+        )
+
+    def record(self, row: int) -> dict[str, Any]:
+        """Materialize one row as a lookup record dict.
+
+        Args:
+            row: Row position.
+
+        Returns:
+            The record with coordinates, counts and text fields.
+        """
+        record: dict[str, Any] = {"lat": float(self.latitude[row]), "lon": float(self.longitude[row])}
+        record.update(zip(LAHD_LOOKUP_COUNT_FIELDS, self.counts[row].tolist()))
+        for name in LAHD_LOOKUP_TEXT_FIELDS:
+            record[name] = self.texts[name][row]
+        record["address"] = record["address"] or ""
+        return record
+
+    def row_for_address(self, address_key: str) -> int | None:
+        """Return the best-scoring row for a normalized address key.
+
+        Args:
+            address_key: Normalized property address.
+
+        Returns:
+            The row position, or ``None`` when the address is not indexed.
+        """
+        return self.address_rows.get(address_key)
+
+    def row_for_apn(self, apn: str) -> int | None:
+        """Return the best-scoring row for a normalized APN.
+
+        Args:
+            apn: Digit-only APN.
+
+        Returns:
+            The row position, or ``None`` when the APN is not indexed.
+        """
+        return self.apn_rows.get(apn)
+
+    def _bucket(self, value: float) -> int:
+        """Return the grid bucket of a coordinate.
+
+        Args:
+            value: Latitude or longitude in degrees.
+
+        Returns:
+            The bucket number.
+        """
+        return math.floor(value / self.cell_degrees)
+
+    def nearest(self, latitude: float, longitude: float, *, span: int) -> tuple[int, float] | None:
+        """Find the nearest indexed row in the surrounding grid cells.
+
+        Candidates are scanned in the same order as the dict-of-buckets index
+        did (south to north, west to east, then record order), so ties go to
+        the same record.
+
+        Args:
+            latitude: Query latitude in degrees.
+            longitude: Query longitude in degrees.
+            span: Number of neighbouring cells to search on each side.
+
+        Returns:
+            ``(row, distance_meters)`` for the nearest candidate, or ``None``
+            when no record lies in the searched cells.
+        """
+        if self.positions.size == 0:
+            return None
+        center_row = self._bucket(latitude) - self.origin_row
+        center_column = self._bucket(longitude) - self.origin_column
+        first_row = max(center_row - span, 0)
+        last_row = min(center_row + span, self.rows - 1)
+        first_column = max(center_column - span, 0)
+        last_column = min(center_column + span, self.columns - 1)
+        if first_row > last_row or first_column > last_column:
+            return None
+
+        # Cells in one grid row are contiguous ids, so each row is one slice
+        # of the cell-ordered arrays; one searchsorted finds every slice edge.
+        row_ids = np.arange(first_row, last_row + 1, dtype=np.int64) * self.columns
+        edges = np.searchsorted(
+            self.cell_ids,
+            np.concatenate((row_ids + first_column, row_ids + (last_column + 1))),
+        ).tolist()
+        row_count = len(edges) // 2
+        slices = [
+            (start, stop) for start, stop in zip(edges[:row_count], edges[row_count:]) if stop > start
+        ]
+        if not slices:
+            return None
+        candidate_latitude = np.concatenate([self.cell_latitude[start:stop] for start, stop in slices])
+        candidate_longitude = np.concatenate([self.cell_longitude[start:stop] for start, stop in slices])
+
+        # Equirectangular distance, kept in squared degrees until the winner is known.
+        north = candidate_latitude - latitude
+        east = (candidate_longitude - longitude) * np.cos((candidate_latitude + latitude) * _HALF_RADIANS_PER_DEGREE)
+        squared = east * east + north * north
+        best = int(np.argmin(squared))
+        distance = _METERS_PER_DEGREE * math.sqrt(float(squared[best]))
+        for start, stop in slices:
+            if best < stop - start:
+                return int(self.positions[start + best]), distance
+            best -= stop - start
+        raise AssertionError("nearest candidate outside the searched slices")
+
+
+def _best_rows(keys: Sequence[str], scores: np.ndarray, indexed: np.ndarray) -> KeyIndex:
+    """Map each non-empty key to its highest-scoring row, earliest on ties.
+
+    Args:
+        keys: Normalized key per row.
+        scores: Problem score per row.
+        indexed: Rows allowed to take part.
+
+    Returns:
+        The key index.
+    """
+    best: dict[str, int] = {}
+    score_list = scores.tolist()
+    for row in np.flatnonzero(indexed).tolist():
+        key = keys[row]
+        if not key:
+            continue
+        existing = best.get(key)
+        if existing is None or score_list[row] > score_list[existing]:
+            best[key] = row
+    return KeyIndex.from_mapping(best)
+
+
+def build_lahd_lookup_index(
+    columns: dict[str, Sequence[Any]],
+    address_keys: Sequence[str],
+    apn_keys: Sequence[str],
+    *,
+    cell_degrees: float,
+    metadata: dict[str, Any] | None = None,
+) -> LahdLookupIndex:
+    """Build the columnar index from prepared lookup columns.
+
+    Only records with a non-empty normalized address are indexed for address,
+    APN and spatial matching, matching the previous dict indexes.
+
+    Args:
+        columns: ``lat``, ``lon``, count and text columns of equal length.
+        address_keys: Normalized address key per record.
+        apn_keys: Normalized APN per record.
+        cell_degrees: Spatial grid cell edge length in degrees.
+        metadata: Artifact metadata.
+
+    Returns:
+        The columnar lookup index.
+    """
+    latitude = np.asarray(columns.get("lat", ()), dtype=np.float64)
+    longitude = np.asarray(columns.get("lon", ()), dtype=np.float64)
+    size = latitude.size
+    counts = np.zeros((size, len(LAHD_LOOKUP_COUNT_FIELDS)), dtype=np.int64)
+    for column, name in enumerate(LAHD_LOOKUP_COUNT_FIELDS):
+        values = columns.get(name)
+        if values is not None and len(values):
+            counts[:, column] = np.asarray(values, dtype=np.int64)
+    texts = {name: StringColumn.from_values(columns.get(name, (None,) * size)) for name in LAHD_LOOKUP_TEXT_FIELDS}
+
+    indexed = np.fromiter((bool(key) for key in address_keys), dtype=bool, count=size)
+    scores = counts[:, 0]
+    address_rows = _best_rows(address_keys, scores, indexed)
+    apn_rows = _best_rows(apn_keys, scores, indexed)
+
+    valid = np.flatnonzero(indexed)
+    if valid.size == 0:
+        return LahdLookupIndex(
+            latitude=latitude,
+            longitude=longitude,
+            counts=counts,
+            texts=texts,
+            address_rows=address_rows,
+            apn_rows=apn_rows,
+            cell_degrees=cell_degrees,
+            origin_row=0,
+            origin_column=0,
+            columns=0,
+            rows=0,
+            cell_ids=np.empty(0, dtype=np.int64),
+            positions=np.empty(0, dtype=np.int64),
+            cell_latitude=np.empty(0, dtype=np.float64),
+            cell_longitude=np.empty(0, dtype=np.float64),
+            metadata=metadata or {},
+        )
+
+    bucket_rows = np.floor(latitude[valid] / cell_degrees).astype(np.int64)
+    bucket_columns = np.floor(longitude[valid] / cell_degrees).astype(np.int64)
+    origin_row = int(bucket_rows.min())
+    origin_column = int(bucket_columns.min())
+    grid_columns = int(bucket_columns.max()) - origin_column + 1
+    cell_ids = (bucket_rows - origin_row) * grid_columns + (bucket_columns - origin_column)
+    order = np.argsort(cell_ids, kind="stable")
+    return LahdLookupIndex(
+        latitude=latitude,
+        longitude=longitude,
+        counts=counts,
+        texts=texts,
+        address_rows=address_rows,
+        apn_rows=apn_rows,
+        cell_degrees=cell_degrees,
+        origin_row=origin_row,
+        origin_column=origin_column,
+        columns=grid_columns,
+        rows=int(bucket_rows.max()) - origin_row + 1,
+        cell_ids=cell_ids[order],
+        positions=valid[order],
+        cell_latitude=latitude[valid[order]],
+        cell_longitude=longitude[valid[order]],
+        metadata=metadata or {},
+    )
+
+
+def empty_lahd_lookup_index(cell_degrees: float) -> LahdLookupIndex:
+    """Return an index with no records.
+
+    Args:
+        cell_degrees: Spatial grid cell edge length in degrees.
+
+    Returns:
+        An empty lookup index.
+    """
+    return build_lahd_lookup_index({}, [], [], cell_degrees=cell_degrees)
@@ -0,0 +1,388 @@
+"""Static, pre-compressed artifacts for optional map layers.
+
+Optional overlays (oil wells, supermarkets, ALPR cameras, the parking and
+LAHD heatmaps, ...) only change when their source file changes. Each one is
+encoded once per source version: the layer's GeoJSON is serialized and
+written next to gzip and brotli variants as content-hashed files, with a
+small per-layer manifest. Point layers that declare a ``compact`` spec are
+written in the compact layer encoding (see :mod:`functions.compact_layers`),
+which the browser expands after download. Heat layers are written without
+their per-point arrays; the browser fetches the heat cells of its viewport
+from the layer heat route (see :mod:`functions.heatmap_grids`). Overlays
+flagged ``server_clusters`` are still published, but the map loads an anchor
+feature instead and fetches precomputed clusters of its viewport from the
+layer cluster route (see :mod:`functions.marker_clusters`). The layer route then answers with a
+plain file send of the negotiated variant, so enabling an overlay costs a
+worker neither JSON parsing nor compression.
+
+Publishing is coordinated across workers with the same file-lock pattern as
+the listing payload artifacts: the first worker to miss builds and publishes
+while the others wait and then read the manifest. When the artifact directory
+cannot be locked or written, the worker keeps its own in-memory encode and
+serves that instead.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+import gzip
+import hashlib
+import threading
+
+import brotli
+from loguru import logger
+import orjson
+
+from functions.compact_layers import encode_compact_layer
+from functions.data_paths import LAYER_ARTIFACT_DIR
+from functions.heatmap_grids import strip_heat_anchor_points
+from functions.layers import LayersClass
+from functions.marker_clusters import build_cluster_anchor_layer
+from functions.shared_cache import atomic_write_bytes, exclusive_build_lock
+from functions.warm_start import source_version
+
+LAYER_ARTIFACT_ROUTE_TEMPLATE = "/api/layers/{layer_key}/data"
+LAYER_HEAT_ROUTE_TEMPLATE = "/api/layers/{layer_key}/heat"
+LAYER_CLUSTER_ROUTE_TEMPLATE = "/api/layers/{layer_key}/clusters"
+# Bump when the artifact body encoding changes so published artifacts are rebuilt.
+LAYER_ARTIFACT_FORMAT_VERSION = 3
+LAYER_ARTIFACT_GZIP_LEVEL = 9
+# Artifacts are compressed once per source version, so use brotli's best ratio.
+LAYER_ARTIFACT_BROTLI_QUALITY = 11
+_VARIANT_SUFFIXES: dict[str | None, str] = {
+    None: ".json",
+    "gzip": ".json.gz",
+    "br": ".json.br",
+}
+
+
+@dataclass(frozen=True)
+class LayerArtifact:
+    """Published files for one layer source version.
+
+    Attributes:
+        layer_key: Registered layer key.
+        version: Source file version the artifact was built from.
+        digest: Short content hash of the identity-encoded GeoJSON.
+        files: Artifact path per content encoding (``None`` for identity).
+        bodies: Encoded bytes per content encoding, set only for an artifact
+            that was encoded in memory and not published.
+    """
+
+    layer_key: str
+    version: str
+    digest: str
+    files: dict[str | None, Path]
+    bodies: dict[str | None, bytes] = field(default_factory=dict, compare=False, repr=False)
+
+    def path_for(self, content_encoding: str | None) -> Path:
+        """Return the file holding one encoded representation.
+
+        Args:
+            content_encoding: ``br``, ``gzip``, or ``None`` for identity.
+
+        Returns:
+            The artifact file path.
+        """
+        return self.files[content_encoding]
+
+    def body_for(self, content_encoding: str | None) -> bytes | None:
+        """Return the in-memory bytes of one encoded representation.
+
+        Args:
+            content_encoding: ``br``, ``gzip``, or ``None`` for identity.
+
+        Returns:
+            The encoded bytes, or ``None`` when the artifact is served from files.
+        """
+        return self.bodies.get(content_encoding)
+
+    def etag_for(self, content_encoding: str | None) -> str:
+        """Return the strong entity tag for one encoded representation.
+
+        Args:
+            content_encoding: ``br``, ``gzip``, or ``None`` for identity.
+
+        Returns:
+            An unquoted ETag derived from the content hash and encoding.
+        """
+        return f"{self.digest}-{content_encoding}" if content_encoding else self.digest
+
+    def all_etags(self) -> tuple[str, ...]:
+        """Return every ETag this artifact may have been served under.
+
+        Returns:
+            Unquoted ETags for the identity, gzip, and brotli representations.
+        """
+        return tuple(self.etag_for(encoding) for encoding in _VARIANT_SUFFIXES)
+
+
+def layer_source_version(layer_key: str) -> str | None:
+    """Return the version of a layer's static source file.
+
+    Args:
+        layer_key: Registered layer key.
+
+    Returns:
+        The source version, or ``None`` when the layer has no static source
+        or the file does not exist.
+    """
+    source = LayersClass.get_layer_config(layer_key).static_source
+    if source is None:
+        return None
+    version = source_version(source)
+    return None if version == "missing" else version
+
+
+def layer_artifact_url(layer_key: str, version: str) -> str:
+    """Build the versioned browser URL for a layer artifact.
+
+    Args:
+        layer_key: Registered layer key.
+        version: Source version embedded for browser cache busting.
+
+    Returns:
+        The relative URL the map fetches when the overlay is enabled.
+    """
+    return f"{LAYER_ARTIFACT_ROUTE_TEMPLATE.format(layer_key=layer_key)}?v={version}"
+
+
+def lazy_layer_sources(layer_keys: Iterable[str]) -> dict[str, dict[str, Any]]:
+    """Describe the statically served overlays of a page for the browser.
+
+    Args:
+        layer_keys: Optional layer keys exposed by the page.
+
+    Returns:
+        ``{layer_key: {"name": overlay name, "url": artifact URL}}`` for every
+        layer whose source file is present. Server-clustered layers also carry
+        ``"anchor"``, the layer data the map uses instead of the artifact.
+    """
+    sources: dict[str, dict[str, Any]] = {}
+    for layer_key in layer_keys:
+        version = layer_source_version(layer_key)
+        if version is not None:
+            spec = LayersClass.get_layer_config(layer_key)
+            sources[layer_key] = {
+                "name": spec.name,
+                "url": layer_artifact_url(layer_key, version),
+            }
+            if spec.server_clusters:
+                sources[layer_key]["anchor"] = build_cluster_anchor_layer(
+                    f"{LAYER_CLUSTER_ROUTE_TEMPLATE.format(layer_key=layer_key)}?v={version}",
+                    point_to_layer=spec.point_to_layer,
+                    cluster_to_layer=spec.cluster_to_layer,
+                )
+    return sources
+
+
+def _manifest_path(artifact_dir: Path, layer_key: str) -> Path:
+    """Return the manifest path pointing at a layer's current artifact files.
+
+    Args:
+        artifact_dir: Directory holding published layer artifacts.
+        layer_key: Registered layer key.
+
+    Returns:
+        The manifest path.
+    """
+    return artifact_dir / f"{layer_key}.manifest.json"
+
+
+def _read_layer_artifact(layer_key: str, version: str, artifact_dir: Path) -> LayerArtifact | None:
+    """Load a layer's manifest when it matches ``version`` and its files are intact.
+
+    Args:
+        layer_key: Registered layer key.
+        version: Source version the caller is about to serve.
+        artifact_dir: Directory holding published layer artifacts.
+
+    Returns:
+        The published artifact, or ``None`` when it must be (re)built.
+    """
+    try:
+        manifest = orjson.loads(_manifest_path(artifact_dir, layer_key).read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    if (
+        manifest.get("layer_key") != layer_key
+        or manifest.get("version") != version
+        or manifest.get("format") != LAYER_ARTIFACT_FORMAT_VERSION
+    ):
+        return None
+
+    try:
+        files: dict[str | None, Path] = {}
+        for encoding, entry in zip(_VARIANT_SUFFIXES, manifest["files"]):
+            path = artifact_dir / entry["name"]
+            if path.stat().st_size != int(entry["size"]):
+                return None
+            files[encoding] = path
+    except (KeyError, TypeError, ValueError, OSError):
+        return None
+    return LayerArtifact(layer_key=layer_key, version=version, digest=str(manifest["digest"]), files=files)
+
+
+def encode_layer_artifact(layer_key: str, version: str) -> LayerArtifact:
+    """Encode a layer's identity, gzip and brotli bodies in memory.
+
+    Layers with a ``compact`` spec are encoded in the compact layer encoding;
+    heat layers are encoded with slim anchors pointing at their heat route.
+
+    Args:
+        layer_key: Registered layer key.
+        version: Source version being encoded.
+
+    Returns:
+        An unpublished artifact holding the encoded bodies.
+    """
+    spec = LayersClass.get_layer_config(layer_key)
+    payload = LayersClass.build_layer_data(layer_key)
+    if spec.compact is not None:
+        payload = encode_compact_layer(payload, spec.compact)
+    if spec.heat_grid:
+        payload = strip_heat_anchor_points(payload, LAYER_HEAT_ROUTE_TEMPLATE.format(layer_key=layer_key))
+    identity = orjson.dumps(payload)
+    digest = hashlib.sha256(identity).hexdigest()[:20]
+    bodies: dict[str | None, bytes] = {
+        None: identity,
+        "gzip": gzip.compress(identity, compresslevel=LAYER_ARTIFACT_GZIP_LEVEL, mtime=0),
+        "br": brotli.compress(identity, mode=brotli.MODE_TEXT, quality=LAYER_ARTIFACT_BROTLI_QUALITY),
+    }
+    return LayerArtifact(layer_key=layer_key, version=version, digest=digest, files={}, bodies=bodies)
+
+
+def write_layer_artifact(encoded: LayerArtifact, artifact_dir: Path) -> LayerArtifact:
+    """Publish an in-memory artifact as content-hashed files plus a manifest.
+
+    Args:
+        encoded: Artifact returned by :func:`encode_layer_artifact`.
+        artifact_dir: Directory receiving the artifacts, created if missing.
+
+    Returns:
+        The published artifact, backed by files only.
+    """
+    layer_key, version, digest, bodies = encoded.layer_key, encoded.version, encoded.digest, encoded.bodies
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+    files: dict[str | None, Path] = {}
+    manifest_files: list[dict[str, Any]] = []
+    for encoding, suffix in _VARIANT_SUFFIXES.items():
+        path = artifact_dir / f"{layer_key}-{digest}{suffix}"
+        body = bodies[encoding]
+        if not path.is_file() or path.stat().st_size != len(body):
+            atomic_write_bytes(path, body)
+        files[encoding] = path
+        manifest_files.append({"name": path.name, "size": len(body)})
+
+    atomic_write_bytes(
+        _manifest_path(artifact_dir, layer_key),
+        orjson.dumps(
+            {
+                "layer_key": layer_key,
+                "version": version,
+                "format": LAYER_ARTIFACT_FORMAT_VERSION,
+                "digest": digest,
+                "files": manifest_files,
+            },
+            option=orjson.OPT_INDENT_2,
+        ),
+    )
+    current_names = {path.name for path in files.values()}
+    for stale_path in artifact_dir.glob(f"{layer_key}-*.json*"):
+        if stale_path.name not in current_names:
+            stale_path.unlink(missing_ok=True)
+
+    logger.info(
+        f"Published {layer_key} layer artifact v{version} ({len(bodies[None]):,} B raw, "
+        f"{len(bodies['gzip']):,} B gzip, {len(bodies['br']):,} B br)."
+    )
+    return LayerArtifact(layer_key=layer_key, version=version, digest=digest, files=files)
+
+
+def publish_layer_artifact(layer_key: str, version: str, artifact_dir: Path) -> LayerArtifact:
+    """Encode a layer once and publish its identity, gzip and brotli files.
+
+    Args:
+        layer_key: Registered layer key.
+        version: Source version being published.
+        artifact_dir: Directory receiving the artifacts, created if missing.
+
+    Returns:
+        The published artifact.
+    """
+    return write_layer_artifact(encode_layer_artifact(layer_key, version), artifact_dir)
+
+
+_layer_artifacts: dict[str, LayerArtifact] = {}
+_layer_artifacts_lock = threading.Lock()
+
+
+def get_layer_artifact(layer_key: str, artifact_dir: str | Path | None = None) -> LayerArtifact | None:
+    """Return the published artifact for a layer's current source version.
+
+    Args:
+        layer_key: Registered layer key.
+        artifact_dir: Directory of published layer artifacts; defaults to the
+            runtime layer artifact directory.
+
+    Returns:
+        The artifact, or ``None`` when the layer has no static source file.
+        When the artifact directory cannot be locked or written, an in-memory
+        artifact encoded by this worker.
+    """
+    version = layer_source_version(layer_key)
+    if version is None:
+        return None
+    cached = _layer_artifacts.get(layer_key)
+    if cached is not None and cached.version == version:
+        return cached
+
+    directory = Path(artifact_dir) if artifact_dir is not None else LAYER_ARTIFACT_DIR
+    with _layer_artifacts_lock:
+        cached = _layer_artifacts.get(layer_key)
+        if cached is not None and cached.version == version:
+            return cached
+
+        artifact = _read_layer_artifact(layer_key, version, directory)
+        if artifact is None:
+            encoded: LayerArtifact | None = None
+            try:
+                with exclusive_build_lock(directory / f".{layer_key}.lock"):
+                    artifact = _read_layer_artifact(layer_key, version, directory)
+                    if artifact is None:
+                        encoded = encode_layer_artifact(layer_key, version)
+                        artifact = write_layer_artifact(encoded, directory)
+            except OSError as exc:
+                logger.warning(f"Could not share {layer_key} layer artifact via {directory}: {exc}")
+                artifact = encoded or encode_layer_artifact(layer_key, version)
+        _layer_artifacts[layer_key] = artifact
+        return artifact
+
+
+def prewarm_layer_artifacts(layer_keys: Iterable[str], artifact_dir: str | Path | None = None) -> None:
+    """Publish (or verify) the static artifacts of the given layers at startup.
+
+    Args:
+        layer_keys: Layer keys to publish.
+        artifact_dir: Directory of published layer artifacts.
+
+    Returns:
+        None.
+    """
+    for layer_key in dict.fromkeys(layer_keys):
+        try:
+            get_layer_artifact(layer_key, artifact_dir)
+        except Exception as exc:
+            logger.warning(f"Failed publishing {layer_key} layer artifact: {exc}")
+
+
+def clear_layer_artifacts() -> None:
+    """Forget every layer artifact this worker has resolved.
+
+    Returns:
+        None.
+    """
+    with _layer_artifacts_lock:
+        _layer_artifacts.clear()
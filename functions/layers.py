@@ -1,14 +1,18 @@
 from dataclasses import dataclass
-from dash import no_update
 from dash_extensions.javascript import Namespace
 from dotenv import load_dotenv
 from functions.alpr_cameras import load_alpr_camera_geojson
+from functions.compact_layers import CompactLayerSpec, project_layer_properties
 from functions.lahd import build_lahd_property_heat_geojson
 from functions.parking_tickets import build_parking_tickets_heat_geojson
+from functions.point_layers import prepare_point_layer
 from functions.data_paths import (
+    ALPR_CAMERAS_PATH,
     BREAKFAST_BURRITOS_PATH,
     FARMERS_MARKETS_PATH,
+    LAHD_PROPERTY_HEATMAP_PATH,
     OIL_WELLS_PATH,
+    PARKING_TICKETS_HEATMAP_PATH,
     SCHOOLS_SOCAL_PATH,
     SUPERMARKETS_PATH,
     CA_PUBLIC_SCHOOLS_GPKG_PATH,
@@ -18,6 +22,7 @@ from typing import Any, Callable, ClassVar, Optional, Sequence, TypedDict, TypeA
 import dash_leaflet as dl
 import geopandas as gpd
 import json
+import orjson
 import os
 from pathlib import Path
 import pandas as pd
@@ -161,8 +166,23 @@ class LayerConfig:
         bubbling_mouse_events: Whether layer mouse events should bubble to the map.
         supercluster_options: Optional supercluster configuration passed to `dl.GeoJSON`.
         valid_bounds: Optional lon/lat bounding box used to discard clearly invalid points.
+        clean_points: Whether loading also drops Points without usable
+            coordinates and exact repeats of an earlier feature. Off by
+            default: it costs a full pass over the features on every load.
         cache_ttl_seconds: Optional TTL for in-process layer cache entries. `None`
             means cache indefinitely for the current worker process.
+        source_path: Optional on-disk artifact read by `loader`. Layers with a
+            `filepath` or `source_path` are published as static, pre-compressed
+            artifacts versioned by that file.
+        compact: Optional point-layer compaction: the properties the layer's
+            popup and marker templates read, and the coordinate precision.
+            Static artifacts of such layers use the compact layer encoding.
+        heat_grid: Whether the layer is a heat anchor whose heat cells and
+            markers are served per viewport by the layer heat route instead
+            of being shipped in its static artifact.
+        server_clusters: Whether the map loads the layer as precomputed
+            clusters and points per viewport from the layer cluster route
+            instead of clustering its static artifact in the browser.
     """
     name: str
     dataset: str
@@ -175,7 +195,21 @@ class LayerConfig:
     bubbling_mouse_events: bool = False
     supercluster_options: Optional[dict[str, Any]] = None
     valid_bounds: Optional[tuple[float, float, float, float]] = None
+    clean_points: bool = False
     cache_ttl_seconds: int | None = None
+    source_path: str | None = None
+    compact: CompactLayerSpec | None = None
+    heat_grid: bool = False
+    server_clusters: bool = False
+
+    @property
+    def static_source(self) -> str | None:
+        """Return the file a static layer artifact is derived from.
+
+        Returns:
+            `filepath` or `source_path`, or `None` when the layer is built dynamically.
+        """
+        return self.filepath or self.source_path
 
 
 def _normalize_school_text(value: object) -> str | None:
@@ -832,7 +866,23 @@ class LayersClass:
             point_to_layer='drawOilIcon',
             cluster_to_layer='drawOilCluster',
             supercluster_options=DEFAULT_SUPERCLUSTER_OPTIONS,
+            server_clusters=True,
             valid_bounds=(-125.0, -113.0, 32.0, 35.5),
+            compact=CompactLayerSpec(
+                properties=(
+                    'API',
+                    'APINumber',
+                    'AbandonedD',
+                    'Completion',
+                    'CountyName',
+                    'FieldName',
+                    'LatestUpdate',
+                    'OperatorNa',
+                    'SPUDDate',
+                    'WellNumber',
+                    'WellStatus',
+                ),
+            ),
         ),
         'crime': LayerConfig(
             name='Crime',
@@ -848,6 +898,20 @@ class LayersClass:
             point_to_layer='drawFarmersMarketIcon',
             bubbling_mouse_events=False,
             supercluster_options=DEFAULT_SUPERCLUSTER_OPTIONS,
+            compact=CompactLayerSpec(
+                properties=(
+                    'name',
+                    'addrln1',
+                    'addrln2',
+                    'city',
+                    'state',
+                    'zip',
+                    'hours',
+                    'url',
+                    'link',
+                    'isCounty',
+                ),
+            ),
         ),
         'breakfast_burritos': LayerConfig(
             name='Breakfast Burritos',
@@ -857,6 +921,25 @@ class LayersClass:
             bubbling_mouse_events=False,
             supercluster_options=DEFAULT_SUPERCLUSTER_OPTIONS,
             valid_bounds=(-125.0, -113.0, 32.0, 35.5),
+            clean_points=True,
+            compact=CompactLayerSpec(
+                properties=(
+                    'name',
+                    'review_status',
+                    'rating',
+                    'neighborhood',
+                    'price',
+                    'size',
+                    'value_rating',
+                    'address',
+                    'maps_url',
+                    'whats_inside',
+                    'picture_url',
+                    'review_url',
+                    'source_url',
+                    'source_sheet_url',
+                ),
+            ),
         ),
         'supermarkets_grocery': LayerConfig(
             name='Supermarkets & Grocery Stores',
@@ -865,7 +948,23 @@ class LayersClass:
             point_to_layer='drawSupermarketIcon',
             bubbling_mouse_events=False,
             supercluster_options=DEFAULT_SUPERCLUSTER_OPTIONS,
+            server_clusters=True,
             valid_bounds=(-125.0, -113.0, 32.0, 35.5),
+            clean_points=True,
+            compact=CompactLayerSpec(
+                properties=(
+                    'dba_name',
+                    'business_name',
+                    'full_address',
+                    'street_address',
+                    'city',
+                    'zip_code',
+                    'naics',
+                    'primary_naics_description',
+                    'business_type',
+                    'location_start_date',
+                ),
+            ),
         ),
         'alpr_cameras': LayerConfig(
             name='Flock & Other License Plate Reader Cameras',
@@ -875,7 +974,24 @@ class LayersClass:
             cluster_to_layer='drawAlprCameraCluster',
             bubbling_mouse_events=False,
             supercluster_options=DEFAULT_SUPERCLUSTER_OPTIONS,
+            server_clusters=True,
             cache_ttl_seconds=21600,
+            source_path=str(ALPR_CAMERAS_PATH),
+            compact=CompactLayerSpec(
+                properties=(
+                    'brand',
+                    'operator',
+                    'ref',
+                    'mountType',
+                    'surveillanceZone',
+                    'direction',
+                    'directions',
+                    'directionCardinal',
+                    'startDate',
+                    'osmTimestamp',
+                    'osmUrl',
+                ),
+            ),
         ),
         'schools': LayerConfig(
             name='Schools',
@@ -886,6 +1002,33 @@ class LayersClass:
             bubbling_mouse_events=False,
             supercluster_options=DEFAULT_SUPERCLUSTER_OPTIONS,
             cache_ttl_seconds=21600,
+            compact=CompactLayerSpec(
+                properties=(
+                    'school_name',
+                    'district_name',
+                    'school_type',
+                    'school_level',
+                    'grade_span_display',
+                    'grade_bands',
+                    'charter_label',
+                    'magnet_label',
+                    'title_i_label',
+                    'offers_tk_flag',
+                    'offers_kindergarten_flag',
+                    'funding_type',
+                    'open_date',
+                    'recently_opened_flag',
+                    'locale',
+                    'website_url',
+                    'full_address',
+                    'enrollment_total',
+                    'el_pct',
+                    'frpm_pct',
+                    'sed_pct',
+                    'swd_pct',
+                    'school_preview_url',
+                ),
+            ),
         ),
         'parking_tickets_density': LayerConfig(
             name='Parking Tickets Heatmap (2025)',
@@ -896,6 +1039,8 @@ class LayersClass:
             zoom_to_bounds_on_click=False,
             bubbling_mouse_events=False,
             cache_ttl_seconds=3600,
+            source_path=str(PARKING_TICKETS_HEATMAP_PATH),
+            heat_grid=True,
         ),
         'lahd_property_heatmap': LayerConfig(
             name='Housing Department Cases & Code Violations Heatmap',
@@ -906,6 +1051,8 @@ class LayersClass:
             zoom_to_bounds_on_click=False,
             bubbling_mouse_events=False,
             cache_ttl_seconds=3600,
+            source_path=str(LAHD_PROPERTY_HEATMAP_PATH),
+            heat_grid=True,
         ),
     }
     geojson_cache: ClassVar[dict[str, tuple[float, GeoJsonDict]]] = {}
@@ -1026,23 +1173,62 @@ class LayersClass:
                 return cached_data
 
         start_time = time.time()
+        loaded_data = cls.build_layer_data(layer_key)
+        cls.geojson_cache[dataset] = (time.time(), loaded_data)
+        duration = time.time() - start_time
+        logger.info(f"Loaded '{dataset}' dataset in {duration:.2f} seconds.")
+        return loaded_data
+
+    @classmethod
+    def build_layer_data(cls, layer_key: str) -> GeoJsonDict:
+        """Read a registered layer payload from its source, bypassing the process cache.
+
+        Args:
+            layer_key: Internal layer identifier, such as `"farmers_markets"`.
+
+        Returns:
+            The parsed GeoJSON object, restricted to `valid_bounds` and without
+            invalid or duplicate points when the layer is configured for it.
+
+        Raises:
+            ValueError: If the layer has neither a filepath nor a loader.
+        """
+        spec = cls.get_layer_config(layer_key)
         if spec.loader is not None:
             loaded_data = spec.loader()
         elif spec.filepath is not None:
-            with open(spec.filepath, 'r') as f:
-                loaded_data = json.load(f)
+            with open(spec.filepath, 'rb') as f:
+                loaded_data = orjson.loads(f.read())
         else:
             raise ValueError(
                 f"Layer '{layer_key}' is missing both filepath and loader configuration."
             )
 
-        if spec is not None and spec.valid_bounds is not None:
-            loaded_data = cls.filter_geojson_to_bounds(loaded_data, spec.valid_bounds)
+        if spec.valid_bounds is None and not spec.clean_points:
+            return loaded_data
+        return prepare_point_layer(
+            loaded_data,
+            bounds=spec.valid_bounds,
+            validate=spec.clean_points,
+            deduplicate=spec.clean_points,
+        )
 
-        cls.geojson_cache[dataset] = (time.time(), loaded_data)
-        duration = time.time() - start_time
-        logger.info(f"Loaded '{dataset}' dataset in {duration:.2f} seconds.")
-        return loaded_data
+    @classmethod
+    def project_layer_data(cls, layer_key: str, geojson_data: GeoJsonDict) -> GeoJsonDict:
+        """Keep only the feature properties a layer's popup and marker templates read.
+
+        Args:
+            layer_key: Internal layer identifier, such as `"schools"`.
+            geojson_data: GeoJSON payload about to be sent to the browser.
+
+        Returns:
+            The payload restricted to the layer's `compact` properties, or the
+            payload unchanged when the layer declares none.
+        """
+        spec = cls.get_layer_config(layer_key)
+        if spec.compact is None:
+            return geojson_data
+        return project_layer_properties(geojson_data, spec.compact.properties)
 
     @classmethod
     def get_layer_config_by_dataset(cls, dataset: str) -> LayerConfig | None:
@@ -1073,35 +1259,10 @@ class LayersClass:
 
         Returns:
             A GeoJSON payload whose point features fall within the supplied bounds.
-            Non-point features are preserved unchanged.
+            Non-point features are preserved unchanged; the input object itself
+            is returned when no point falls outside.
         """
-        min_lon, max_lon, min_lat, max_lat = bounds
-        features = geojson_data.get("features", [])
-        filtered_features: list[GeoJsonDict] = []
-        dropped_count = 0
-
-        for feature in features:
-            geometry = feature.get("geometry") or {}
-            coords = geometry.get("coordinates") or []
-            if geometry.get("type") != "Point" or len(coords) < 2:
-                filtered_features.append(feature)
-                continue
-
-            lon, lat = coords[0], coords[1]
-            if min_lon <= lon <= max_lon and min_lat <= lat <= max_lat:
-                filtered_features.append(feature)
-            else:
-                dropped_count += 1
-
-        if dropped_count:
-            logger.warning(
-                f"Filtered {dropped_count} out-of-bounds point features from GeoJSON payload."
-            )
-
-        return {
-            **geojson_data,
-            "features": filtered_features,
-        }
+        return prepare_point_layer(geojson_data, bounds=bounds, validate=False, deduplicate=False)
 
     @classmethod
     def create_geojson_layer(
@@ -1124,6 +1285,17 @@ class LayersClass:
         spec = cls.get_layer_config(layer_key)
         ns = Namespace("myNamespace", "mySubNamespace")
 
+        if spec.server_clusters:
+            # The layer's data is a single anchor whose renderer draws the
+            # server's clusters for the viewport with the layer's renderers.
+            return dl.GeoJSON(
+                id=component_id if component_id is not None else str(uuid.uuid4()),
+                data=data,
+                cluster=False,
+                bubblingMouseEvents=spec.bubbling_mouse_events,
+                pointToLayer=ns("drawServerClusterLayer"),
+            )
+
         geojson_kwargs = dict(
             id=component_id if component_id is not None else str(uuid.uuid4()),
             data=data,
@@ -1249,63 +1421,6 @@ class LayersClass:
             sortLayers=True,
         )
 
-    @classmethod
-    def resolve_lazy_layer_data(
-        cls,
-        selected_overlays: Optional[Sequence[str]],
-        layer_ids: Optional[Sequence[LazyLayerGeoJsonId]],
-        current_data: Optional[Sequence[GeoJsonDict | None]],
-        *,
-        excluded_layer_keys: Sequence[str] = (),
-    ) -> list[Any]:
-        """Resolve which lazy overlay payloads should be loaded for a callback update.
-
-        This helper is designed for a Dash callback whose output targets
-        `({"type": "lazy-layer-geojson", ...}, "data")`.
-
-        Args:
-            selected_overlays: Names currently enabled in `dl.LayersControl.overlays`.
-            layer_ids: Pattern-matching ids for the targeted GeoJSON components.
-            current_data: Existing GeoJSON payloads for those components.
-            excluded_layer_keys: Layer keys that must not be loaded.
-
-        Returns:
-            A list aligned to `layer_ids`, containing either:
-            - a newly loaded GeoJSON payload when the layer was enabled and not yet loaded
-            - `no_update` when nothing should change for that output
-        """
-        if not layer_ids:
-            return []
-
-        selected_overlay_names = set(selected_overlays or [])
-        existing_payloads = list(current_data or [])
-        if len(existing_payloads) < len(layer_ids):
-            existing_payloads.extend([None] * (len(layer_ids) - len(existing_payloads)))
-
-        resolved_payloads: list[Any] = []
-        excluded_keys = set(excluded_layer_keys)
-        for layer_id, existing_payload in zip(layer_ids, existing_payloads):
-            layer_key = layer_id["layer"]
-            spec = cls.get_layer_config(layer_key)
-
-            if layer_key in excluded_keys:
-                resolved_payloads.append(no_update)
-                continue
-
-            if spec.name not in selected_overlay_names:
-                resolved_payloads.append(no_update)
-                continue
-
-            if existing_payload is not None:
-                resolved_payloads.append(no_update)
-                continue
-
-            resolved_payloads.append(
-                cls.load_layer_data(layer_key)
-            )
-
-        return resolved_payloads
-
     @classmethod
     def overlay_is_selected(
         cls,
@@ -0,0 +1,91 @@
+"""Deferred imports for dependencies that only pipelines and rare paths need.
+
+The web entry point imports ``functions.*`` modules that are shared with the
+listing pipelines. Binding a pipeline-only dependency (boto3, imagekitio,
+geopy, BeautifulSoup, ...) with :func:`lazy_import` keeps the import out of
+worker boot; the module is imported on first attribute access instead.
+Annotations that name such a dependency should sit behind
+``typing.TYPE_CHECKING`` in a module using postponed annotations.
+"""
+
+from __future__ import annotations
+
+from types import ModuleType
+from typing import Any
+import importlib
+import threading
+
+
+class LazyModule:
+    """Module proxy that imports its target on first attribute access."""
+
+    __slots__ = ("_name", "_module", "_lock")
+
+    def __init__(self, name: str) -> None:
+        """Record the module to import later.
+
+        Args:
+            name: Absolute dotted module name.
+
+        Returns:
+            None.
+        """
+        self._name = name
+        self._module: ModuleType | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        """Report whether the target module has been imported through this proxy.
+
+        Returns:
+            ``True`` once an attribute has been accessed.
+        """
+        return self._module is not None
+
+    def _load(self) -> ModuleType:
+        """Import the target module once.
+
+        Returns:
+            The imported module.
+        """
+        module = self._module
+        if module is None:
+            with self._lock:
+                module = self._module
+                if module is None:
+                    module = importlib.import_module(self._name)
+                    self._module = module
+        return module
+
+    def __getattr__(self, attribute: str) -> Any:
+        """Import the target module and return one of its attributes.
+
+        Args:
+            attribute: Attribute name looked up on the module.
+
+        Returns:
+            The module attribute.
+        """
+        return getattr(self._load(), attribute)
+
+    def __repr__(self) -> str:
+        """Describe the proxy and whether it has loaded.
+
+        Returns:
+            A short debugging representation.
+        """
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name: str) -> Any:
+    """Return a proxy for ``name`` that imports the module on first use.
+
+    Args:
+        name: Absolute dotted module name, e.g. ``"geopy.geocoders"``.
+
+    Returns:
+        A :class:`LazyModule` standing in for the module.
+    """
+    return LazyModule(name)
@@ -0,0 +1,88 @@
+"""Version token for the listing data, stored inside the SQLite database.
+
+Every writer that changes what the listing map payloads are built from (the
+buy/lease table swap, enrichment upserts, the broadband merge and the lease
+terms backfill) replaces the token in the same transaction as its write.
+Serving workers key published payload artifacts by this token rather than by
+the database file's modification time, so artifacts built wherever the
+database was written stay valid after the file is copied to the serving host.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+import os
+import sqlite3
+import uuid
+
+from functions.sqlite_read_pool import read_only_connection
+
+LISTING_DATA_VERSION_TABLE = "listing_data_version"
+
+
+def bump_listing_data_version(conn: sqlite3.Connection) -> str:
+    """Record that the listing data changed, inside the caller's transaction.
+
+    Args:
+        conn: Writable connection to the canonical listing database.
+
+    Returns:
+        The new data version token.
+    """
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {LISTING_DATA_VERSION_TABLE} (
+          id INTEGER PRIMARY KEY CHECK (id = 1),
+          version TEXT NOT NULL
+        )
+        """
+    )
+    version = uuid.uuid4().hex
+    conn.execute(
+        f"""
+        INSERT INTO {LISTING_DATA_VERSION_TABLE} (id, version) VALUES (1, ?)
+        ON CONFLICT(id) DO UPDATE SET version = excluded.version
+        """,
+        (version,),
+    )
+    return version
+
+
+@lru_cache(maxsize=8)
+def _read_listing_data_version(db_path: str, mtime_ns: int, size: int) -> str | None:
+    """Read the stored data version once per database file version.
+
+    Args:
+        db_path: Filesystem path to the SQLite database.
+        mtime_ns: Modification time included in the cache key.
+        size: File size included in the cache key.
+
+    Returns:
+        The stored token, or ``None`` when the database has none.
+    """
+    try:
+        with read_only_connection(db_path) as conn:
+            row = conn.execute(
+                f"SELECT version FROM {LISTING_DATA_VERSION_TABLE} WHERE id = 1"
+            ).fetchone()
+    except sqlite3.Error:
+        return None
+    return str(row[0]) if row else None
+
+
+def read_listing_data_version(db_path: str | Path) -> str | None:
+    """Return the data version stored in a listing database.
+
+    Args:
+        db_path: Filesystem path to the SQLite database.
+
+    Returns:
+        The stored token, or ``None`` when the file is missing or predates
+        data versions.
+    """
+    try:
+        stat = os.stat(db_path)
+    except OSError:
+        return None
+    return _read_listing_data_version(str(db_path), stat.st_mtime_ns, stat.st_size)
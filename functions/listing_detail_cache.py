@@ -0,0 +1,237 @@
+"""HTTP validators and a bounded response cache for per-listing popup data.
+
+Listing details and ISP options only change when the database is
+republished or the LAHD/RSO lookup artifacts are rebuilt, so responses are
+keyed by a data version derived from those files. A request whose
+``If-None-Match``/``If-Modified-Since`` matches the current version gets a
+304 without touching SQLite; other requests are served from a small LRU of
+encoded bodies keyed by ``(route, listing id, version)``.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any, Callable
+import os
+import threading
+
+from flask import Response
+import orjson
+
+from functions.data_paths import LAHD_PROPERTY_LOOKUP_PATH, LARENTALS_DB_PATH, RSO_PROPERTY_LOOKUP_PATH
+from functions.lahd import live_lahd_datasets_available
+
+LISTING_DETAIL_CACHE_CONTROL = "public, max-age=300"
+LISTING_DETAIL_CACHE_MAX_ENTRIES = 4096
+
+
+@dataclass(frozen=True)
+class ListingDetailDataVersion:
+    """Version of the data behind per-listing popup responses."""
+
+    token: str
+    last_modified: datetime | None
+
+    def etag_for(self, route: str, listing_id: str) -> str:
+        """Return the ETag for one route and listing under this version.
+
+        Args:
+            route: Route name, such as ``lease-details``.
+            listing_id: MLS identifier.
+
+        Returns:
+            An unquoted, strong ETag.
+        """
+        digest = blake2b(f"{route}\0{listing_id}\0{self.token}".encode(), digest_size=12)
+        return digest.hexdigest()
+
+
+def _mtime_ns(path: str | Path) -> int:
+    """Return a file's nanosecond modification time, or zero if it is missing.
+
+    Args:
+        path: File to stat.
+
+    Returns:
+        The modification time in nanoseconds.
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def listing_detail_data_version(
+    db_path: str | Path = LARENTALS_DB_PATH,
+    *,
+    include_lookups: bool = True,
+    lahd_lookup_path: Path | None = None,
+    rso_lookup_path: Path | None = None,
+) -> ListingDetailDataVersion:
+    """Derive the current data version from the database and lookup artifacts.
+
+    LAHD live-dataset availability is probed once per process and changes
+    which LAHD summary is returned, so it is part of the token as well.
+
+    Args:
+        db_path: Filesystem path to the SQLite database.
+        include_lookups: Whether the response embeds LAHD/RSO summaries. ISP
+            options depend on the database alone.
+        lahd_lookup_path: LAHD property lookup artifact; defaults to the
+            published lookup.
+        rso_lookup_path: RSO property lookup artifact; defaults to the
+            published lookup.
+
+    Returns:
+        The version token and the newest source modification time.
+    """
+    if not include_lookups:
+        mtimes: tuple[int, ...] = (_mtime_ns(db_path),)
+        token = str(mtimes[0])
+    else:
+        mtimes = (
+            _mtime_ns(db_path),
+            _mtime_ns(lahd_lookup_path or LAHD_PROPERTY_LOOKUP_PATH),
+            _mtime_ns(rso_lookup_path or RSO_PROPERTY_LOOKUP_PATH),
+        )
+        live = "live" if live_lahd_datasets_available() else "offline"
+        token = "-".join((*(str(mtime) for mtime in mtimes), live))
+    newest = max(mtimes)
+    last_modified = datetime.fromtimestamp(newest // 1_000_000_000, tz=timezone.utc) if newest else None
+    return ListingDetailDataVersion(token=token, last_modified=last_modified)
+
+
+class ListingDetailResponseCache:
+    """Thread-safe LRU of encoded JSON bodies keyed by ``(route, id, version)``."""
+
+    def __init__(self, max_entries: int = LISTING_DETAIL_CACHE_MAX_ENTRIES) -> None:
+        """Create an empty cache.
+
+        Args:
+            max_entries: Number of bodies kept before the least recently used is evicted.
+
+        Returns:
+            None.
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str, str], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: tuple[str, str, str], build: Callable[[], bytes | None]) -> bytes | None:
+        """Return a cached body, building and storing it on a miss.
+
+        ``None`` results (listing not found) are not cached.
+
+        Args:
+            key: ``(route, listing id, version token)``.
+            build: Callable producing the encoded body, or ``None``.
+
+        Returns:
+            The encoded body, or ``None``.
+        """
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return body
+            self.misses += 1
+
+        body = build()
+        if body is None:
+            return None
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return body
+
+    def clear(self) -> None:
+        """Drop every cached body and reset the counters.
+
+        Returns:
+            None.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached bodies.
+
+        Returns:
+            The entry count.
+        """
+        with self._lock:
+            return len(self._entries)
+
+
+listing_detail_response_cache = ListingDetailResponseCache()
+
+
+def build_conditional_json_response(
+    route: str,
+    listing_id: str,
+    version: ListingDetailDataVersion,
+    build: Callable[[], Any],
+    *,
+    if_none_match: Any,
+    if_modified_since: datetime | None,
+    cache: ListingDetailResponseCache = listing_detail_response_cache,
+) -> Response | None:
+    """Serve a per-listing JSON payload with validators, a 304 or a cached body.
+
+    Args:
+        route: Route name used in the ETag and cache key.
+        listing_id: MLS identifier supplied in the route path.
+        version: Current data version.
+        build: Callable returning the JSON-serializable payload, or ``None``
+            when the listing does not exist.
+        if_none_match: Werkzeug ``ETags`` parsed from the ``If-None-Match`` header.
+        if_modified_since: Parsed ``If-Modified-Since`` header, if any.
+        cache: Response cache holding encoded bodies.
+
+    Returns:
+        A 200 or 304 response, or ``None`` when the listing does not exist.
+    """
+    etag = version.etag_for(route, listing_id)
+    if if_none_match:
+        not_modified = if_none_match.contains(etag)
+    else:
+        not_modified = (
+            if_modified_since is not None
+            and version.last_modified is not None
+            and version.last_modified <= if_modified_since
+        )
+
+    if not_modified:
+        response = Response(status=304)
+    else:
+
+        def encode() -> bytes | None:
+            """Build and encode the payload for the cache.
+
+            Returns:
+                The JSON body, or ``None`` when the listing does not exist.
+            """
+            payload = build()
+            return None if payload is None else orjson.dumps(payload)
+
+        body = cache.get_or_build((route, listing_id, version.token), encode)
+        if body is None:
+            return None
+        response = Response(body, mimetype="application/json")
+
+    response.set_etag(etag)
+    if version.last_modified is not None:
+        response.last_modified = version.last_modified
+    response.headers["Cache-Control"] = LISTING_DETAIL_CACHE_CONTROL
+    return response
@@ -20,6 +20,7 @@ from functions.data_paths import (
     CA_SCHOOL_DISTRICTS_GEOJSON_PATH,
     LARENTALS_DB_PATH,
 )
+from functions.listing_data_version import bump_listing_data_version
 
 DEFAULT_DB_PATH = LARENTALS_DB_PATH
 LISTING_TABLES: tuple[str, str] = ("buy", "lease")
@@ -43,6 +44,7 @@ DEFAULT_CA_SCHOOL_DISTRICTS_GEOJSON_PATH = CA_SCHOOL_DISTRICTS_GEOJSON_PATH
 COMMON_ENRICHMENT_COLUMNS: tuple[tuple[str, str], ...] = (
     ("mls_number", "TEXT PRIMARY KEY"),
     ("coverage_city_only_flag", "INTEGER"),
+    ("in_la_city", "INTEGER"),
     ("census_tract", "TEXT"),
     ("school_district_name", "TEXT"),
     ("school_district_type", "TEXT"),
@@ -85,6 +87,28 @@ COMMON_ENRICHMENT_COLUMNS: tuple[tuple[str, str], ...] = (
     ("lahd_ccris_case_count", "INTEGER"),
     ("dbs_open_code_case_count", "INTEGER"),
     ("has_open_housing_or_code_case", "INTEGER"),
+    ("lahd_matched", "INTEGER"),
+    ("lahd_match_type", "TEXT"),
+    ("lahd_match_distance_m", "REAL"),
+    ("lahd_address", "TEXT"),
+    ("lahd_apn", "TEXT"),
+    ("lahd_problem_score", "INTEGER"),
+    ("lahd_documented_issue_count", "INTEGER"),
+    ("lahd_unresolved_issue_count", "INTEGER"),
+    ("lahd_investigation_case_count", "INTEGER"),
+    ("lahd_open_case_count", "INTEGER"),
+    ("lahd_violations_cited", "INTEGER"),
+    ("lahd_unresolved_violation_count", "INTEGER"),
+    ("lahd_latest_case_date", "TEXT"),
+    ("lahd_summary_source", "TEXT"),
+    ("rso_matched", "INTEGER"),
+    ("rso_coverage", "TEXT"),
+    ("rso_units", "INTEGER"),
+    ("rso_unit_range", "TEXT"),
+    ("rso_apn", "TEXT"),
+    ("rso_address", "TEXT"),
+    ("rso_year", "INTEGER"),
+    ("rso_summary_source", "TEXT"),
     ("source_version", "TEXT"),
     ("enriched_at", "TEXT"),
 )
@@ -1024,6 +1048,7 @@ def upsert_listing_enrichment_rows(
             for _, row in rows_df[columns_to_write].iterrows()
         ]
         conn.executemany(sql, records)
+        bump_listing_data_version(conn)
         conn.commit()
 
     return len(records)
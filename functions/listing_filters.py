@@ -0,0 +1,1030 @@
+"""Server-side listing filters mirroring the lease and buy clientside filters.
+
+``filterAndClusterLease`` (``filters_lease.js``) and ``filterAndClusterBuy``
+(``filters_buy.js``) scan every feature in the browser. This module applies
+the same rules to NumPy column arrays extracted once per payload version, so
+constrained clients can ask the server for the matching listings instead.
+
+Filter states use the same keys as the responsive filter UI
+(``window.larentals.filters.filterLeaseState`` / ``filterBuyState``). Values
+follow JavaScript comparison semantics where they matter: ``null`` bounds
+compare as ``0`` and missing prices, bedrooms and bathrooms count as ``0``.
+Unlike the browser, a filter whose keys are all absent from the state does not
+constrain the results.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping, Sequence
+import math
+import re
+import threading
+
+import numpy as np
+import orjson
+import pandas as pd
+import shapely
+from shapely.geometry import shape
+
+LISTING_FILTER_TIMEZONE = "America/Los_Angeles"
+NUMERIC_FILTER_COLUMNS: tuple[str, ...] = (
+    "list_price",
+    "bedrooms",
+    "total_bathrooms",
+    "sqft",
+    "ppsqft",
+    "parking_spaces",
+    "year_built",
+    "lot_size",
+    "hoa_fee",
+    "security_deposit",
+    "pet_deposit",
+    "key_deposit",
+    "other_deposit",
+    "best_dn",
+    "best_up",
+)
+TEXT_FILTER_COLUMNS: tuple[str, ...] = (
+    "subtype",
+    "pet_policy",
+    "terms",
+    "furnished",
+    "laundry_category",
+    "hoa_fee_frequency",
+    "rent_control_status",
+    "zip_code",
+)
+_NO_PETS_POLICIES = ("No", "No, Size Limit")
+_ZIP_RE = re.compile(r"\d{5}")
+_CHECKLIST_FILTER_KEYS = frozenset({"terms", "furnished", "laundry", "subtypes", "hoaFrequency"})
+_SCALAR_RANGE_FILTER_KEYS = frozenset({"downloadRange", "uploadRange"})
+_ZIP_BOUNDARY_KEYS = frozenset({"zip_codes", "zip_code", "features", "feature", "error"})
+_UNSET = object()
+
+Mask = np.ndarray
+
+
+@dataclass(frozen=True)
+class ListingFilterIndex:
+    """Column arrays for one listing payload version.
+
+    Attributes:
+        page_type: Page key owning the payload, such as ``lease`` or ``buy``.
+        version: Payload version the arrays were extracted from.
+        features: Original GeoJSON features, for returning matches.
+        mls_numbers: Listing ids aligned with the arrays.
+        numeric: Float arrays per numeric column; missing values are NaN.
+        text: Object arrays per text column holding the raw property values.
+        listed_date_present: Whether each ``listed_date`` is a non-empty string.
+        listed_date_ms: Parsed ``listed_date`` as epoch milliseconds (NaN if invalid).
+        longitude: Point longitudes (NaN when the geometry is unusable).
+        latitude: Point latitudes (NaN when the geometry is unusable).
+    """
+
+    page_type: str
+    version: str
+    features: list[dict[str, Any]] = field(repr=False)
+    mls_numbers: np.ndarray = field(repr=False)
+    numeric: dict[str, np.ndarray] = field(repr=False)
+    text: dict[str, np.ndarray] = field(repr=False)
+    listed_date_present: np.ndarray = field(repr=False)
+    listed_date_ms: np.ndarray = field(repr=False)
+    longitude: np.ndarray = field(repr=False)
+    latitude: np.ndarray = field(repr=False)
+
+    def __len__(self) -> int:
+        """Return the number of indexed listings.
+
+        Returns:
+            The feature count.
+        """
+        return len(self.features)
+
+
+def _epoch_ms(values: Sequence[Any]) -> np.ndarray:
+    """Parse ISO date strings the way browsers' ``new Date(...)`` does.
+
+    Date-only strings are read as UTC midnight and date-time strings as local
+    time in ``LISTING_FILTER_TIMEZONE``, matching how LA visitors' browsers
+    evaluate the clientside date filters.
+
+    Args:
+        values: Date strings; other values are treated as invalid dates.
+
+    Returns:
+        Epoch milliseconds as floats, NaN for unparseable values.
+    """
+    strings = pd.Series([value if isinstance(value, str) else None for value in values], dtype=object)
+    if strings.empty:
+        return np.empty(0, dtype=float)
+
+    parsed = pd.to_datetime(strings, errors="coerce", format="ISO8601")
+    date_only = strings.str.len().eq(10).fillna(False).to_numpy(dtype=bool)
+    local = parsed.dt.tz_localize(LISTING_FILTER_TIMEZONE, ambiguous="NaT", nonexistent="shift_forward")
+    utc = parsed.dt.tz_localize("UTC")
+
+    def to_ms(series: pd.Series) -> np.ndarray:
+        """Convert tz-aware timestamps to float epoch milliseconds.
+
+        Args:
+            series: Timezone-aware timestamps, possibly containing NaT.
+
+        Returns:
+            Epoch milliseconds with NaN for NaT.
+        """
+        naive = series.dt.tz_convert("UTC").dt.tz_localize(None)
+        result = naive.to_numpy(dtype="datetime64[ms]").astype("int64").astype(float)
+        result[naive.isna().to_numpy()] = np.nan
+        return result
+
+    return np.where(date_only, to_ms(utc), to_ms(local))
+
+
+def _js_date_ms(value: Any) -> float | None:
+    """Return epoch milliseconds for a filter date bound, or ``None`` when unset.
+
+    Args:
+        value: Date string from the filter state.
+
+    Returns:
+        Milliseconds since the epoch, NaN for invalid dates, or ``None`` when
+        the value is falsy.
+    """
+    if not value:
+        return None
+    return float(_epoch_ms([str(value)])[0])
+
+
+def _js_number(value: Any) -> float:
+    """Coerce a filter-state value with JavaScript ``Number(...)`` semantics.
+
+    Args:
+        value: Scalar from the filter state.
+
+    Returns:
+        ``0`` for ``null``/empty strings, the numeric value, or NaN.
+    """
+    if value is None or value is False:
+        return 0.0
+    if value is True:
+        return 1.0
+    if isinstance(value, str):
+        stripped = value.strip()
+        if not stripped:
+            return 0.0
+        try:
+            return float(stripped)
+        except ValueError:
+            return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _is_blank(value: Any) -> bool:
+    """Return whether a filter upper bound is blank, meaning open-ended.
+
+    Args:
+        value: Selected maximum from the filter state.
+
+    Returns:
+        ``True`` for ``None`` and empty strings.
+    """
+    return value is None or value == ""
+
+
+def _to_float_array(values: Sequence[Any]) -> np.ndarray:
+    """Convert property values to floats, mapping non-numeric values to NaN.
+
+    Args:
+        values: Raw property values for one column.
+
+    Returns:
+        A float64 array aligned with ``values``.
+    """
+    cleaned = [None if isinstance(value, bool) else value for value in values]
+    return pd.to_numeric(pd.Series(cleaned, dtype=object), errors="coerce").to_numpy(dtype=float)
+
+
+def _point_coordinates(features: Sequence[Mapping[str, Any]]) -> tuple[np.ndarray, np.ndarray]:
+    """Extract point coordinates, applying the clientside lat/lon swap repair.
+
+    Args:
+        features: GeoJSON features.
+
+    Returns:
+        Longitude and latitude arrays with NaN for unusable geometries.
+    """
+    first = np.full(len(features), np.nan)
+    second = np.full(len(features), np.nan)
+    for position, feature in enumerate(features):
+        geometry = feature.get("geometry") if isinstance(feature, Mapping) else None
+        coordinates = geometry.get("coordinates") if isinstance(geometry, Mapping) else None
+        if (
+            isinstance(coordinates, (list, tuple))
+            and len(coordinates) >= 2
+            and all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in coordinates[:2])
+        ):
+            first[position], second[position] = coordinates[0], coordinates[1]
+
+    swapped = (np.abs(first) <= 90) & (np.abs(second) > 90)
+    return np.where(swapped, second, first), np.where(swapped, first, second)
+
+
+def build_listing_filter_index(
+    payload: Mapping[str, Any],
+    *,
+    page_type: str,
+    version: str,
+) -> ListingFilterIndex:
+    """Extract the filterable columns from a listing FeatureCollection.
+
+    Args:
+        payload: GeoJSON FeatureCollection served to the map store.
+        page_type: Page key owning the payload.
+        version: Payload version the arrays are extracted from.
+
+    Returns:
+        The column index used by ``filter_listing_indices``.
+    """
+    features = [feature for feature in payload.get("features") or [] if isinstance(feature, dict)]
+    properties = [feature.get("properties") or {} for feature in features]
+
+    def column(name: str) -> list[Any]:
+        """Collect one property across every feature.
+
+        Args:
+            name: Property key to collect.
+
+        Returns:
+            Raw property values aligned with ``features``.
+        """
+        return [props.get(name) for props in properties]
+
+    listed_dates = column("listed_date")
+    longitude, latitude = _point_coordinates(features)
+    return ListingFilterIndex(
+        page_type=page_type,
+        version=version,
+        features=features,
+        mls_numbers=np.array(column("mls_number"), dtype=object),
+        numeric={name: _to_float_array(column(name)) for name in NUMERIC_FILTER_COLUMNS},
+        text={name: np.array(column(name), dtype=object) for name in TEXT_FILTER_COLUMNS},
+        listed_date_present=np.array([bool(value) for value in listed_dates], dtype=bool),
+        listed_date_ms=_epoch_ms(listed_dates),
+        longitude=longitude,
+        latitude=latitude,
+    )
+
+
+def _map_unique(values: np.ndarray, predicate: Callable[[Any], bool]) -> Mask:
+    """Evaluate a predicate once per distinct value and broadcast the result.
+
+    Args:
+        values: Object array of property values.
+        predicate: Test applied to each distinct value.
+
+    Returns:
+        A boolean mask aligned with ``values``.
+    """
+    if values.size == 0:
+        return np.zeros(0, dtype=bool)
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=False)
+    # factorize reports JSON nulls as NaN; hand them back to predicates as None.
+    lookup = np.fromiter(
+        (bool(predicate(None if pd.isna(value) else value)) for value in uniques),
+        dtype=bool,
+        count=len(uniques),
+    )
+    return lookup[codes]
+
+
+def _range_bounds(range_value: Any) -> tuple[Any, Any]:
+    """Destructure a ``[min, max]`` range like the clientside code does.
+
+    Args:
+        range_value: Range from the filter state.
+
+    Returns:
+        The raw minimum and maximum; missing positions are ``_UNSET``.
+    """
+    if isinstance(range_value, (list, tuple)):
+        values = list(range_value[:2]) + [_UNSET] * (2 - len(range_value[:2]))
+        return values[0], values[1]
+    return range_value, range_value
+
+
+def _bound(value: Any) -> float:
+    """Convert a destructured range bound to a comparable float.
+
+    Args:
+        value: Raw bound, possibly ``_UNSET`` for JavaScript ``undefined``.
+
+    Returns:
+        The numeric bound; NaN for ``undefined`` and non-numeric values.
+    """
+    return math.nan if value is _UNSET else _js_number(value)
+
+
+def _upper_is_open(selected_maximum: Any, configured_maximum: Any) -> bool:
+    """Mirror ``upperIsOpen``: the slider's top stop means "or more".
+
+    Args:
+        selected_maximum: Selected slider maximum.
+        configured_maximum: Slider endpoint representing "or more".
+
+    Returns:
+        Whether values above the selected maximum should pass.
+    """
+    configured = _bound(configured_maximum)
+    return math.isfinite(configured) and _bound(selected_maximum) >= configured
+
+
+def _range_mask(
+    values: np.ndarray,
+    range_value: Any,
+    *,
+    upper_open: bool | None = None,
+) -> Mask:
+    """Apply ``value >= min && (open || value <= max)`` to a float column.
+
+    Args:
+        values: Float column; NaN never satisfies a comparison.
+        range_value: ``[min, max]`` from the filter state.
+        upper_open: Whether the upper bound is open. ``None`` means open only
+            when the selected maximum is blank.
+
+    Returns:
+        A boolean mask.
+    """
+    minimum, maximum = _range_bounds(range_value)
+    if upper_open is None:
+        upper_open = maximum is not _UNSET and _is_blank(maximum)
+    with np.errstate(invalid="ignore"):
+        mask = values >= _bound(minimum)
+        if not upper_open:
+            mask &= values <= _bound(maximum)
+    return mask
+
+
+def _missing_aware_range_mask(
+    values: np.ndarray,
+    range_value: Any,
+    include_missing: Any,
+    *,
+    upper_open: bool | None = None,
+) -> Mask:
+    """Apply a numeric range where missing values pass only when requested.
+
+    Args:
+        values: Float column with NaN for missing values.
+        range_value: ``[min, max]`` from the filter state.
+        include_missing: Whether listings without a value should pass.
+        upper_open: Whether the upper bound is open; see ``_range_mask``.
+
+    Returns:
+        A boolean mask.
+    """
+    missing = np.isnan(values)
+    return np.where(missing, bool(include_missing), _range_mask(values, range_value, upper_open=upper_open))
+
+
+def _speed_mask(values: np.ndarray, range_value: Any, include_missing: Any) -> Mask:
+    """Mirror ``speedRangeFilter`` for one ISP speed column.
+
+    Args:
+        values: Float speed column with NaN for missing speeds.
+        range_value: ``[min, max]`` speed range, or a single value.
+        include_missing: Whether listings without speed data should pass.
+
+    Returns:
+        A boolean mask.
+    """
+    return _missing_aware_range_mask(values, range_value, include_missing, upper_open=False)
+
+
+def _selection(values: Any, *, drop: tuple[Any, ...] = ()) -> list[Any]:
+    """Return the truthy entries of a checklist selection.
+
+    Args:
+        values: Selected options from the filter state.
+        drop: Option values that mean "unknown" and are ignored.
+
+    Returns:
+        The effective selection.
+    """
+    if not isinstance(values, (list, tuple)):
+        return []
+    return [value for value in values if value and value not in drop]
+
+
+def _zip_code(value: Any) -> str:
+    """Mirror ``normalizeZipCode``: the first five-digit run, or ``""``.
+
+    Args:
+        value: Raw ZIP value.
+
+    Returns:
+        A five-digit ZIP code, or an empty string.
+    """
+    if value is None:
+        return ""
+    match = _ZIP_RE.search(str(value).strip())
+    return match.group(0) if match else ""
+
+
+def _zip_boundary_mask(index: ListingFilterIndex, zip_boundary: Any) -> Mask:
+    """Mirror the ZIP boundary filter: inside a selected polygon or matching ZIP.
+
+    Args:
+        index: Listing column index.
+        zip_boundary: ``zipBoundary`` state with ``zip_codes``/``features``
+            (or singular ``zip_code``/``feature``).
+
+    Returns:
+        A boolean mask; all ``True`` when no ZIP boundary is selected.
+    """
+    boundary = zip_boundary if isinstance(zip_boundary, Mapping) else {}
+    zip_codes = boundary.get("zip_codes")
+    if not isinstance(zip_codes, list):
+        zip_codes = [str(boundary["zip_code"]).strip()] if boundary.get("zip_code") else []
+    polygon_features = boundary.get("features")
+    if not isinstance(polygon_features, list):
+        polygon_features = [boundary["feature"]] if boundary.get("feature") else []
+    if not zip_codes and not polygon_features:
+        return np.ones(len(index), dtype=bool)
+
+    mask = np.zeros(len(index), dtype=bool)
+    valid_points = ~(np.isnan(index.longitude) | np.isnan(index.latitude))
+    for polygon_feature in polygon_features:
+        geometry = polygon_feature.get("geometry") if isinstance(polygon_feature, Mapping) else None
+        if not geometry:
+            continue
+        try:
+            polygon = shape(geometry)
+        except (AttributeError, TypeError, ValueError, shapely.errors.GEOSException):
+            continue
+        # ``turf.booleanPointInPolygon`` counts boundary points as inside.
+        mask |= valid_points & shapely.intersects_xy(polygon, index.longitude, index.latitude)
+
+    selected_zips = {_zip_code(value) for value in zip_codes} - {""}
+    if selected_zips:
+        mask |= _map_unique(index.text["zip_code"], lambda value: (zip_code := _zip_code(value)) != "" and zip_code in selected_zips)
+    return mask
+
+
+def _is_finite_number(value: Any) -> bool:
+    """Return whether a filter value is a finite JSON number.
+
+    Args:
+        value: Value from the filter state.
+
+    Returns:
+        ``True`` for finite ints and floats other than booleans.
+    """
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _validate_range(key: str, value: Any) -> None:
+    """Check a ``[min, max]`` range as produced by the sliders and exact fields.
+
+    Args:
+        key: Range key such as ``priceRange``.
+        value: Range from the filter state.
+
+    Returns:
+        None.
+
+    Raises:
+        ValueError: If the range is not a pair of numbers or blank bounds.
+    """
+    if key in _SCALAR_RANGE_FILTER_KEYS and _is_finite_number(value):
+        return
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        raise ValueError(f"{key} must be a [minimum, maximum] pair")
+    if not all(_is_blank(bound) or _is_finite_number(bound) for bound in value):
+        raise ValueError(f"{key} bounds must be finite numbers or null")
+
+
+def _validate_zip_boundary(value: Any) -> None:
+    """Check a ``zipBoundary`` state so an unreadable one cannot match everything.
+
+    Args:
+        value: ``zipBoundary`` from the filter state.
+
+    Returns:
+        None.
+
+    Raises:
+        ValueError: If the boundary has unknown keys, invalid ZIP codes or
+            unreadable polygons.
+    """
+    if value is None:
+        return
+    if not isinstance(value, Mapping):
+        raise ValueError("zipBoundary must be an object or null")
+    unknown = set(value) - _ZIP_BOUNDARY_KEYS
+    if unknown:
+        raise ValueError(f"zipBoundary has unknown keys: {', '.join(sorted(map(str, unknown)))}")
+
+    zip_codes = value.get("zip_codes")
+    if zip_codes is not None and not isinstance(zip_codes, list):
+        raise ValueError("zipBoundary.zip_codes must be a list")
+    for zip_code in (zip_codes or []) + ([value["zip_code"]] if value.get("zip_code") else []):
+        if not isinstance(zip_code, str) or not _zip_code(zip_code):
+            raise ValueError(f"zipBoundary has an invalid ZIP code: {zip_code!r}")
+
+    features = value.get("features")
+    if features is not None and not isinstance(features, list):
+        raise ValueError("zipBoundary.features must be a list")
+    for feature in (features or []) + ([value["feature"]] if value.get("feature") else []):
+        geometry = feature.get("geometry") if isinstance(feature, Mapping) else None
+        try:
+            shape(geometry)
+        except (AttributeError, TypeError, ValueError, shapely.errors.GEOSException):
+            raise ValueError("zipBoundary has a feature without a valid geometry") from None
+
+    if value.get("error") is not None and not isinstance(value["error"], str):
+        raise ValueError("zipBoundary.error must be a string or null")
+
+
+def validate_listing_filter_state(state: Mapping[str, Any]) -> None:
+    """Reject filter states the clientside filters could never have produced.
+
+    The masks follow JavaScript coercions, so a malformed value would
+    otherwise silently match nothing (``["a", null]``) or everything (an
+    unreadable ``zipBoundary``). Keys the server does not filter on, such as
+    ``locationText``, are checked for type only.
+
+    Args:
+        state: Filter state using the responsive filter UI's keys.
+
+    Returns:
+        None.
+
+    Raises:
+        ValueError: If a key is unknown or its value has the wrong shape.
+    """
+    for key, value in state.items():
+        if not isinstance(key, str):
+            raise ValueError("Filter keys must be strings")
+        if key.endswith("Range") and key != "listedRange":
+            _validate_range(key, value)
+        elif key.endswith("UpperBound") or key == "listedRange":
+            if not (value is None or _is_finite_number(value)):
+                raise ValueError(f"{key} must be a finite number or null")
+        elif key.endswith("Missing") or key == "nearbyZip":
+            if not (value is None or isinstance(value, bool)):
+                raise ValueError(f"{key} must be a boolean or null")
+        elif key in _CHECKLIST_FILTER_KEYS:
+            if not (value is None or (isinstance(value, list) and all(isinstance(item, str) for item in value))):
+                raise ValueError(f"{key} must be a list of strings")
+        elif key in ("dateStart", "dateEnd"):
+            if value and not (isinstance(value, str) and math.isfinite(_js_date_ms(value))):
+                raise ValueError(f"{key} must be an ISO date string or null")
+        elif key == "pets":
+            if value not in (None, True, False, "Both"):
+                raise ValueError("pets must be true, false, \"Both\" or null")
+        elif key == "rentControl":
+            if not (value is None or isinstance(value, str)):
+                raise ValueError("rentControl must be a string or null")
+        elif key == "locationText":
+            if not (
+                value is None
+                or isinstance(value, str)
+                or (isinstance(value, list) and all(isinstance(item, str) for item in value))
+            ):
+                raise ValueError("locationText must be a string or a list of strings")
+        elif key == "zipBoundary":
+            _validate_zip_boundary(value)
+        else:
+            raise ValueError(f"Unknown filter: {key}")
+
+
+def _lease_date_mask(index: ListingFilterIndex, state: Mapping[str, Any]) -> Mask:
+    """Mirror the lease ``listed_date`` window, including its null-bound quirk.
+
+    Args:
+        index: Listing column index.
+        state: Lease filter state.
+
+    Returns:
+        A boolean mask.
+    """
+    start = _js_date_ms(state.get("dateStart"))
+    end = _js_date_ms(state.get("dateEnd"))
+    # A ``null`` Date compares as 0 in JavaScript.
+    with np.errstate(invalid="ignore"):
+        in_window = (index.listed_date_ms >= (start or 0.0)) & (index.listed_date_ms <= (end or 0.0))
+    return np.where(index.listed_date_present, in_window, bool(state.get("dateMissing")))
+
+
+def _buy_date_mask(index: ListingFilterIndex, state: Mapping[str, Any]) -> Mask:
+    """Mirror the buy ``listed_date`` window, which is open unless both ends are set.
+
+    Args:
+        index: Listing column index.
+        state: Buy filter state.
+
+    Returns:
+        A boolean mask.
+    """
+    start = _js_date_ms(state.get("dateStart"))
+    end = _js_date_ms(state.get("dateEnd"))
+    if start is None or end is None:
+        in_window = np.ones(len(index), dtype=bool)
+    else:
+        with np.errstate(invalid="ignore"):
+            in_window = (index.listed_date_ms >= start) & (index.listed_date_ms <= end)
+    return np.where(index.listed_date_present, in_window, bool(state.get("dateMissing")))
+
+
+def _if_present(state: Mapping[str, Any], key: str, build: Callable[[Any], Mask], size: int) -> Mask:
+    """Apply a range filter only when its key is present in the state.
+
+    Args:
+        state: Filter state.
+        key: Range key such as ``priceRange``.
+        build: Callable building the mask from the range value.
+        size: Number of listings, for the unconstrained mask.
+
+    Returns:
+        The filter mask, or all ``True`` when the key is absent.
+    """
+    if key not in state:
+        return np.ones(size, dtype=bool)
+    return build(state[key])
+
+
+def _names_any(state: Mapping[str, Any], *keys: str) -> bool:
+    """Return whether the filter state sets any of ``keys``.
+
+    Args:
+        state: Filter state.
+        *keys: Keys that together configure one filter.
+
+    Returns:
+        ``True`` if at least one key is present.
+    """
+    return any(key in state for key in keys)
+
+
+def _lease_mask(index: ListingFilterIndex, state: Mapping[str, Any]) -> Mask:
+    """Mirror ``filterAndClusterLease`` over the column index.
+
+    Args:
+        index: Lease listing column index.
+        state: Lease filter state.
+
+    Returns:
+        A boolean mask of matching listings.
+    """
+    size = len(index)
+    numeric = index.numeric
+    text = index.text
+
+    def zero_filled(name: str) -> np.ndarray:
+        """Return a column where JSON ``null`` compares as 0, as in JavaScript.
+
+        Args:
+            name: Numeric column name.
+
+        Returns:
+            The column with NaN replaced by 0.
+        """
+        return np.nan_to_num(numeric[name], nan=0.0)
+
+    def open_upper(range_key: str, bound_key: str) -> bool:
+        """Evaluate ``upperIsOpen`` for a slider with an "or more" endpoint.
+
+        Args:
+            range_key: Range key in the state.
+            bound_key: Matching upper-bound key in the state.
+
+        Returns:
+            Whether the selected maximum is the slider's open endpoint.
+        """
+        return _upper_is_open(_range_bounds(state.get(range_key))[1], state.get(bound_key, _UNSET))
+
+    mask = _if_present(state, "priceRange", lambda value: _range_mask(zero_filled("list_price"), value), size)
+    mask &= _if_present(
+        state,
+        "bedroomsRange",
+        lambda value: _range_mask(zero_filled("bedrooms"), value, upper_open=open_upper("bedroomsRange", "bedroomsUpperBound")),
+        size,
+    )
+    mask &= _if_present(
+        state,
+        "bathroomsRange",
+        lambda value: _range_mask(
+            zero_filled("total_bathrooms"), value, upper_open=open_upper("bathroomsRange", "bathroomsUpperBound")
+        ),
+        size,
+    )
+
+    pets = state.get("pets")
+    if pets is True:
+        mask &= ~_map_unique(text["pet_policy"], lambda value: value in _NO_PETS_POLICIES)
+    elif pets is False:
+        mask &= _map_unique(text["pet_policy"], lambda value: value in _NO_PETS_POLICIES)
+
+    for column, range_key, missing_key in (
+        ("sqft", "sqftRange", "sqftMissing"),
+        ("ppsqft", "ppsqftRange", "ppsqftMissing"),
+        ("security_deposit", "securityRange", "securityMissing"),
+        ("pet_deposit", "petDepositRange", "petDepositMissing"),
+        ("key_deposit", "keyDepositRange", "keyDepositMissing"),
+        ("other_deposit", "otherDepositRange", "otherDepositMissing"),
+    ):
+        mask &= _if_present(
+            state,
+            range_key,
+            lambda value, column=column, missing_key=missing_key: _missing_aware_range_mask(
+                numeric[column], value, state.get(missing_key)
+            ),
+            size,
+        )
+    mask &= _if_present(
+        state,
+        "parkingRange",
+        lambda value: _missing_aware_range_mask(
+            numeric["parking_spaces"],
+            value,
+            state.get("parkingMissing"),
+            upper_open=open_upper("parkingRange", "parkingUpperBound"),
+        ),
+        size,
+    )
+    mask &= _if_present(
+        state,
+        "yearRange",
+        lambda value: _missing_aware_range_mask(numeric["year_built"], value, state.get("yearMissing"), upper_open=False),
+        size,
+    )
+
+    chosen_terms = [term for term in _selection(state.get("terms")) if str(term).strip()]
+    terms_pattern = (
+        re.compile("|".join(re.escape(str(term)) for term in chosen_terms), re.IGNORECASE) if chosen_terms else None
+    )
+    terms_missing_ok = bool(state.get("termsMissing"))
+
+    def terms_ok(value: Any) -> bool:
+        """Evaluate the lease-terms rule for one distinct ``terms`` value.
+
+        Args:
+            value: Raw ``terms`` property.
+
+        Returns:
+            Whether the listing passes the lease-terms filter.
+        """
+        normalized = None if value is None else str(value).strip()
+        missing = not normalized
+        if terms_pattern is None:
+            return not missing or terms_missing_ok
+        return (not missing and terms_pattern.search(normalized) is not None) or (missing and terms_missing_ok)
+
+    if _names_any(state, "terms", "termsMissing"):
+        mask &= _map_unique(text["terms"], terms_ok)
+
+    chosen_furnished = _selection(state.get("furnished"), drop=("Unknown",))
+    furnished_missing_ok = bool(state.get("furnishedMissing"))
+
+    def furnished_ok(value: Any) -> bool:
+        """Evaluate the furnished rule for one distinct ``furnished`` value.
+
+        Args:
+            value: Raw ``furnished`` property.
+
+        Returns:
+            Whether the listing passes the furnished filter.
+        """
+        if value == "Both":
+            value = "Furnished Or Unfurnished"
+        missing = value is None or value in ("", "Unknown")
+        if not chosen_furnished:
+            return not missing or furnished_missing_ok
+        return value in chosen_furnished or (missing and furnished_missing_ok)
+
+    if _names_any(state, "furnished", "furnishedMissing"):
+        mask &= _map_unique(text["furnished"], furnished_ok)
+
+    chosen_laundry = _selection(state.get("laundry"), drop=("Unknown",))
+    laundry_missing_ok = bool(state.get("laundryMissing"))
+
+    def laundry_ok(value: Any) -> bool:
+        """Evaluate the laundry rule for one distinct ``laundry_category`` value.
+
+        Args:
+            value: Raw ``laundry_category`` property.
+
+        Returns:
+            Whether the listing passes the laundry filter.
+        """
+        missing = value is None or value == "Unknown"
+        if not chosen_laundry:
+            return not missing or laundry_missing_ok
+        return value in chosen_laundry or (missing and laundry_missing_ok)
+
+    if _names_any(state, "laundry", "laundryMissing"):
+        mask &= _map_unique(text["laundry_category"], laundry_ok)
+
+    subtypes = state.get("subtypes")
+    if isinstance(subtypes, (list, tuple)) and subtypes:
+        mask &= _map_unique(text["subtype"], lambda value: value in subtypes)
+
+    if _names_any(state, "dateStart", "dateEnd", "dateMissing"):
+        mask &= _lease_date_mask(index, state)
+    mask &= _if_present(
+        state, "downloadRange", lambda value: _speed_mask(numeric["best_dn"], value, state.get("ispMissing")), size
+    )
+    mask &= _if_present(
+        state, "uploadRange", lambda value: _speed_mask(numeric["best_up"], value, state.get("ispMissing")), size
+    )
+
+    rent_control = state.get("rentControl")
+    if rent_control and rent_control != "any":
+        mask &= _map_unique(text["rent_control_status"], lambda value: (value or "unknown") == rent_control)
+
+    return mask & _zip_boundary_mask(index, state.get("zipBoundary"))
+
+
+def _buy_mask(index: ListingFilterIndex, state: Mapping[str, Any]) -> Mask:
+    """Mirror ``filterAndClusterBuy`` over the column index.
+
+    Args:
+        index: Buy listing column index.
+        state: Buy filter state.
+
+    Returns:
+        A boolean mask of matching listings.
+    """
+    size = len(index)
+    numeric = index.numeric
+    text = index.text
+
+    def open_upper(range_key: str, bound_key: str) -> bool:
+        """Evaluate ``upperIsOpen`` for a slider with an "or more" endpoint.
+
+        Args:
+            range_key: Range key in the state.
+            bound_key: Matching upper-bound key in the state.
+
+        Returns:
+            Whether the selected maximum is the slider's open endpoint.
+        """
+        return _upper_is_open(_range_bounds(state.get(range_key))[1], state.get(bound_key, _UNSET))
+
+    # ``parseFloat(value) || 0`` treats missing prices, beds and baths as 0.
+    mask = _if_present(
+        state, "priceRange", lambda value: _range_mask(np.nan_to_num(numeric["list_price"], nan=0.0), value), size
+    )
+    mask &= _if_present(
+        state,
+        "bedroomsRange",
+        lambda value: _range_mask(
+            np.nan_to_num(numeric["bedrooms"], nan=0.0), value, upper_open=open_upper("bedroomsRange", "bedroomsUpperBound")
+        ),
+        size,
+    )
+    mask &= _if_present(
+        state,
+        "bathroomsRange",
+        lambda value: _range_mask(
+            np.nan_to_num(numeric["total_bathrooms"], nan=0.0),
+            value,
+            upper_open=open_upper("bathroomsRange", "bathroomsUpperBound"),
+        ),
+        size,
+    )
+    for column, range_key, missing_key in (
+        ("sqft", "sqftRange", "sqftMissing"),
+        ("ppsqft", "ppsqftRange", "ppsqftMissing"),
+        ("lot_size", "lotSizeRange", "lotSizeMissing"),
+        ("hoa_fee", "hoaRange", "hoaMissing"),
+    ):
+        mask &= _if_present(
+            state,
+            range_key,
+            lambda value, column=column, missing_key=missing_key: _missing_aware_range_mask(
+                numeric[column], value, state.get(missing_key)
+            ),
+            size,
+        )
+    mask &= _if_present(
+        state,
+        "yearRange",
+        lambda value: _missing_aware_range_mask(numeric["year_built"], value, state.get("yearMissing"), upper_open=False),
+        size,
+    )
+
+    subtypes = state.get("subtypes") if isinstance(state.get("subtypes"), (list, tuple)) else []
+    if subtypes:
+        selected_upper = {str(value).upper() for value in subtypes}
+
+        def subtype_ok(value: Any) -> bool:
+            """Evaluate the case-insensitive buy subtype rule for one value.
+
+            Args:
+                value: Raw ``subtype`` property.
+
+            Returns:
+                Whether the listing passes the subtype filter.
+            """
+            subtype = str(value or "").upper()
+            if subtype == "" and "Unknown" in subtypes:
+                return True
+            return subtype in selected_upper
+
+        mask &= _map_unique(text["subtype"], subtype_ok)
+
+    if _names_any(state, "dateStart", "dateEnd", "dateMissing"):
+        mask &= _buy_date_mask(index, state)
+
+    frequencies = state.get("hoaFrequency") if isinstance(state.get("hoaFrequency"), (list, tuple)) else []
+    if frequencies:
+        mask &= _map_unique(
+            text["hoa_fee_frequency"],
+            lambda value: ("N/A" if not value or value == "<NA>" else value) in frequencies,
+        )
+
+    mask &= _if_present(
+        state, "downloadRange", lambda value: _speed_mask(numeric["best_dn"], value, state.get("ispMissing")), size
+    )
+    mask &= _if_present(
+        state, "uploadRange", lambda value: _speed_mask(numeric["best_up"], value, state.get("ispMissing")), size
+    )
+    return mask & _zip_boundary_mask(index, state.get("zipBoundary"))
+
+
+_PAGE_MASKS: dict[str, Callable[[ListingFilterIndex, Mapping[str, Any]], Mask]] = {
+    "lease": _lease_mask,
+    "buy": _buy_mask,
+}
+
+
+def filter_listing_indices(index: ListingFilterIndex, state: Mapping[str, Any]) -> np.ndarray:
+    """Return the positions of listings that pass every filter in ``state``.
+
+    Args:
+        index: Listing column index for one page.
+        state: Filter state using the responsive filter UI's keys.
+
+    Returns:
+        Sorted integer positions into ``index.features``.
+
+    Raises:
+        ValueError: If the index belongs to an unsupported page type.
+    """
+    build_mask = _PAGE_MASKS.get(index.page_type)
+    if build_mask is None:
+        raise ValueError(f"Unsupported listing page type: {index.page_type!r}")
+    return np.flatnonzero(build_mask(index, state))
+
+
+_filter_indexes: dict[str, ListingFilterIndex] = {}
+_filter_indexes_lock = threading.Lock()
+
+
+def get_listing_filter_index(
+    page_type: str,
+    version: str,
+    payload_bytes: Callable[[], Any],
+) -> ListingFilterIndex:
+    """Return the column index for a payload version, building it once per worker.
+
+    Args:
+        page_type: Page key such as ``lease`` or ``buy``.
+        version: Current payload version.
+        payload_bytes: Callable returning the encoded FeatureCollection
+            (bytes or a memory-mapped buffer).
+
+    Returns:
+        The cached column index for ``version``.
+    """
+    cached = _filter_indexes.get(page_type)
+    if cached is not None and cached.version == version:
+        return cached
+
+    with _filter_indexes_lock:
+        cached = _filter_indexes.get(page_type)
+        if cached is not None and cached.version == version:
+            return cached
+        index = build_listing_filter_index(
+            orjson.loads(memoryview(payload_bytes())),
+            page_type=page_type,
+            version=version,
+        )
+        _filter_indexes[page_type] = index
+        return index
+
+
+def clear_listing_filter_indexes() -> None:
+    """Drop every cached column index.
+
+    Returns:
+        None.
+    """
+    with _filter_indexes_lock:
+        _filter_indexes.clear()
@@ -0,0 +1,686 @@
+"""Pre-encoded, pre-compressed listing map payloads keyed by data version.
+
+The lease and buy maps boot from a multi-megabyte GeoJSON FeatureCollection.
+Serializing that dict through a Dash callback and letting Flask-Compress
+re-compress it on every page load is the most expensive thing a worker does
+per request, so this module encodes each data version exactly once per worker
+and keeps the identity, gzip and brotli bodies in memory for direct serving.
+
+``publish_listing_tables`` additionally writes each encoded version to
+content-hashed artifact files plus a per-page manifest. Workers whose data
+version matches the manifest memory-map those files instead of rebuilding the
+payload, so a data refresh is built once rather than once per worker. When no
+matching artifacts exist, one worker builds and publishes them under a file
+lock while the others wait and then map the same files.
+
+Each publish also appends a per-page change log of features added, modified
+or removed (keyed by ``mls_number``) relative to the previously published
+version, so returning browsers can fetch a small delta instead of the full
+FeatureCollection.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, Sequence, Union
+import gzip
+import hashlib
+import mmap
+import os
+import threading
+import time
+
+import brotli
+from loguru import logger
+import orjson
+
+from functions.shared_cache import atomic_write_bytes, exclusive_build_lock
+
+LISTING_PAYLOAD_ROUTE_TEMPLATE = "/api/{page_type}/listings-payload"
+LISTING_PAYLOAD_GZIP_LEVEL = 9
+LISTING_PAYLOAD_BROTLI_QUALITY = 9
+SUPPORTED_CONTENT_ENCODINGS: tuple[str, ...] = ("br", "gzip")
+LISTING_PAYLOAD_STREAM_CHUNK_BYTES = 256 * 1024
+LISTING_PAYLOAD_CHANGELOG_ENTRIES = 8
+LISTING_PAYLOAD_DELTA_MAX_CHANGED_FRACTION = 0.5
+LISTING_PAYLOAD_FEATURE_ID = "mls_number"
+_ARTIFACT_SUFFIXES: dict[str, str] = {
+    "identity": ".json",
+    "gzip": ".json.gz",
+    "brotli": ".json.br",
+}
+
+PayloadBody = Union[bytes, mmap.mmap]
+
+
+@dataclass(frozen=True)
+class EncodedListingPayload:
+    """Immutable encoded variants of one listing payload version.
+
+    Attributes:
+        page_type: Page key owning the payload, such as ``lease`` or ``buy``.
+        version: Data version token the payload was built from.
+        digest: Short content hash of the identity-encoded JSON body.
+        identity: orjson-encoded JSON bytes, or a read-only map of them.
+        gzip: Gzip-compressed JSON bytes, or a read-only map of them.
+        brotli: Brotli-compressed JSON bytes, or a read-only map of them.
+    """
+
+    page_type: str
+    version: str
+    digest: str
+    identity: PayloadBody
+    gzip: PayloadBody
+    brotli: PayloadBody
+
+    def body_for(self, content_encoding: str | None) -> PayloadBody:
+        """Return the stored body for a negotiated content encoding.
+
+        Args:
+            content_encoding: ``br``, ``gzip``, or ``None`` for identity.
+
+        Returns:
+            The encoded response body.
+        """
+        if content_encoding == "br":
+            return self.brotli
+        if content_encoding == "gzip":
+            return self.gzip
+        return self.identity
+
+    def etag_for(self, content_encoding: str | None) -> str:
+        """Return the strong entity tag for one encoded representation.
+
+        Args:
+            content_encoding: ``br``, ``gzip``, or ``None`` for identity.
+
+        Returns:
+            An unquoted ETag value unique to the content and encoding.
+        """
+        if content_encoding:
+            return f"{self.digest}-{content_encoding}"
+        return self.digest
+
+    def all_etags(self) -> tuple[str, ...]:
+        """Return every ETag this payload version may have been served under.
+
+        Returns:
+            Unquoted ETags for the identity, gzip, and brotli representations.
+        """
+        return tuple(
+            self.etag_for(encoding)
+            for encoding in (None, *SUPPORTED_CONTENT_ENCODINGS)
+        )
+
+
+def listing_payload_url(page_type: str, version: str) -> str:
+    """Build the versioned browser URL for a page's listing payload.
+
+    Args:
+        page_type: Page key such as ``lease`` or ``buy``.
+        version: Data version token embedded for browser cache busting.
+
+    Returns:
+        The relative URL the map store fetches on boot.
+    """
+    route = LISTING_PAYLOAD_ROUTE_TEMPLATE.format(page_type=page_type)
+    return f"{route}?v={version}"
+
+
+def encode_listing_payload(
+    payload: dict[str, Any],
+    *,
+    page_type: str,
+    version: str,
+) -> EncodedListingPayload:
+    """Encode a listing FeatureCollection once into every served representation.
+
+    Args:
+        payload: GeoJSON FeatureCollection built for the map store.
+        page_type: Page key owning the payload.
+        version: Data version token the payload was built from.
+
+    Returns:
+        The encoded identity, gzip, and brotli variants.
+    """
+    identity = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return encode_listing_payload_bytes(identity, page_type=page_type, version=version)
+
+
+def encode_listing_payload_bytes(
+    identity: bytes,
+    *,
+    page_type: str,
+    version: str,
+) -> EncodedListingPayload:
+    """Compress already-encoded listing JSON into every served representation.
+
+    Args:
+        identity: UTF-8 JSON bytes for the FeatureCollection.
+        page_type: Page key owning the payload.
+        version: Data version token the payload was built from.
+
+    Returns:
+        The encoded identity, gzip, and brotli variants.
+    """
+    return EncodedListingPayload(
+        page_type=page_type,
+        version=version,
+        digest=hashlib.sha256(identity).hexdigest()[:20],
+        identity=identity,
+        gzip=gzip.compress(identity, compresslevel=LISTING_PAYLOAD_GZIP_LEVEL, mtime=0),
+        brotli=brotli.compress(
+            identity,
+            mode=brotli.MODE_TEXT,
+            quality=LISTING_PAYLOAD_BROTLI_QUALITY,
+        ),
+    )
+
+
+def _encode_and_log(
+    page_type: str,
+    version: str,
+    build_payload_bytes: Callable[[], bytes],
+) -> EncodedListingPayload:
+    """Build and compress one payload version, logging its sizes and duration.
+
+    Args:
+        page_type: Page key such as ``lease`` or ``buy``.
+        version: Current data version token for the page.
+        build_payload_bytes: Callable returning the page's encoded GeoJSON
+            FeatureCollection bytes.
+
+    Returns:
+        The freshly encoded payload.
+    """
+    started_at = time.perf_counter()
+    encoded = encode_listing_payload_bytes(
+        build_payload_bytes(),
+        page_type=page_type,
+        version=version,
+    )
+    logger.info(
+        f"Encoded {page_type} listing payload v{version} "
+        f"({len(encoded.identity):,} B raw, {len(encoded.gzip):,} B gzip, "
+        f"{len(encoded.brotli):,} B br) in {time.perf_counter() - started_at:.2f}s."
+    )
+    return encoded
+
+
+def _load_or_publish_shared_payload(
+    page_type: str,
+    version: str,
+    build_payload_bytes: Callable[[], bytes],
+    artifact_dir: Path,
+) -> EncodedListingPayload | None:
+    """Map shared payload artifacts, building and publishing them if this worker owns the rebuild.
+
+    Args:
+        page_type: Page key such as ``lease`` or ``buy``.
+        version: Current data version token for the page.
+        build_payload_bytes: Callable returning the page's encoded GeoJSON
+            FeatureCollection bytes.
+        artifact_dir: Directory of published payload artifacts.
+
+    Returns:
+        The mapped payload, the in-memory payload when publishing failed after
+        a build, or ``None`` when nothing was built here.
+    """
+    mapped = load_listing_payload_artifacts(page_type, version, artifact_dir)
+    if mapped is not None:
+        logger.info(f"Mapped published {page_type} listing payload v{version} from {artifact_dir}.")
+        return mapped
+
+    encoded: EncodedListingPayload | None = None
+    try:
+        with exclusive_build_lock(artifact_dir / f".{page_type}.lock"):
+            mapped = load_listing_payload_artifacts(page_type, version, artifact_dir)
+            if mapped is None:
+                encoded = _encode_and_log(page_type, version, build_payload_bytes)
+                write_listing_payload_artifacts(encoded, artifact_dir)
+                mapped = load_listing_payload_artifacts(page_type, version, artifact_dir)
+    except OSError as exc:
+        logger.warning(f"Could not share {page_type} listing payload via {artifact_dir}: {exc}")
+    return mapped or encoded
+
+
+_encoded_payloads: dict[str, EncodedListingPayload] = {}
+_encoded_payloads_lock = threading.Lock()
+
+
+def get_encoded_listing_payload(
+    page_type: str,
+    version: str,
+    build_payload_bytes: Callable[[], bytes],
+    artifact_dir: str | Path | None = None,
+) -> EncodedListingPayload:
+    """Return the encoded payload for the current version, building it at most once.
+
+    Only the latest version per page is retained. Concurrent requests that
+    arrive while a new version is being encoded wait on the same lock instead
+    of encoding the payload in parallel. When ``artifact_dir`` is given, the
+    build is also coordinated across worker processes: artifacts already
+    published for ``version`` are memory-mapped, and otherwise the worker that
+    wins the file lock builds and publishes them for everyone else.
+
+    Args:
+        page_type: Page key such as ``lease`` or ``buy``.
+        version: Current data version token for the page.
+        build_payload_bytes: Callable returning the page's encoded GeoJSON
+            FeatureCollection bytes.
+        artifact_dir: Optional directory of published payload artifacts.
+
+    Returns:
+        The cached encoded payload for ``version``.
+    """
+    cached = _encoded_payloads.get(page_type)
+    if cached is not None and cached.version == version:
+        return cached
+
+    with _encoded_payloads_lock:
+        cached = _encoded_payloads.get(page_type)
+        if cached is not None and cached.version == version:
+            return cached
+
+        if artifact_dir is not None:
+            mapped = _load_or_publish_shared_payload(
+                page_type,
+                version,
+                build_payload_bytes,
+                Path(artifact_dir),
+            )
+            if mapped is not None:
+                _encoded_payloads[page_type] = mapped
+                return mapped
+
+        encoded = _encode_and_log(page_type, version, build_payload_bytes)
+        _encoded_payloads[page_type] = encoded
+        return encoded
+
+
+def iter_payload_body(
+    body: PayloadBody,
+    chunk_size: int = LISTING_PAYLOAD_STREAM_CHUNK_BYTES,
+) -> Iterator[bytes]:
+    """Yield a stored payload body in bounded chunks for streaming responses.
+
+    Args:
+        body: In-memory bytes or a memory-mapped artifact.
+        chunk_size: Maximum number of bytes copied per yielded chunk.
+
+    Yields:
+        Consecutive slices of ``body``.
+    """
+    for offset in range(0, len(body), chunk_size):
+        yield body[offset : offset + chunk_size]
+
+
+def _artifact_path(artifact_dir: Path, page_type: str, digest: str, variant: str) -> Path:
+    """Return the content-addressed file path for one payload variant.
+
+    Args:
+        artifact_dir: Directory holding published payload artifacts.
+        page_type: Page key owning the payload.
+        digest: Content hash of the identity body.
+        variant: ``identity``, ``gzip``, or ``brotli``.
+
+    Returns:
+        The artifact file path.
+    """
+    return artifact_dir / f"{page_type}-{digest}{_ARTIFACT_SUFFIXES[variant]}"
+
+
+def _manifest_path(artifact_dir: Path, page_type: str) -> Path:
+    """Return the manifest path that points at a page's current artifacts.
+
+    Args:
+        artifact_dir: Directory holding published payload artifacts.
+        page_type: Page key owning the payload.
+
+    Returns:
+        The manifest file path.
+    """
+    return artifact_dir / f"{page_type}.manifest.json"
+
+
+def _changelog_path(artifact_dir: Path, page_type: str) -> Path:
+    """Return the path of a page's published change log.
+
+    Args:
+        artifact_dir: Directory holding published payload artifacts.
+        page_type: Page key owning the payload.
+
+    Returns:
+        The change log file path.
+    """
+    return artifact_dir / f"{page_type}.changes.json"
+
+
+def _read_json_file(path: Path) -> Any:
+    """Read a small JSON file, treating missing or corrupt files as absent.
+
+    Args:
+        path: JSON file to read.
+
+    Returns:
+        The decoded value, or ``None`` when unreadable.
+    """
+    try:
+        return orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+
+def _features_by_id(payload: Any) -> dict[str, dict[str, Any]] | None:
+    """Index a FeatureCollection's features by listing id.
+
+    Args:
+        payload: Decoded GeoJSON FeatureCollection.
+
+    Returns:
+        Features keyed by ``mls_number``, or ``None`` when any feature lacks a
+        unique id and a delta therefore cannot be expressed.
+    """
+    features = payload.get("features") if isinstance(payload, dict) else None
+    if not isinstance(features, list):
+        return None
+
+    indexed: dict[str, dict[str, Any]] = {}
+    for feature in features:
+        properties = feature.get("properties") if isinstance(feature, dict) else None
+        feature_id = properties.get(LISTING_PAYLOAD_FEATURE_ID) if isinstance(properties, dict) else None
+        if feature_id is None or str(feature_id) in indexed:
+            return None
+        indexed[str(feature_id)] = feature
+    return indexed
+
+
+def compute_listing_payload_delta(previous: Any, current: Any) -> dict[str, Any] | None:
+    """Diff two listing FeatureCollections by ``mls_number``.
+
+    Args:
+        previous: FeatureCollection of the earlier version.
+        current: FeatureCollection of the newer version.
+
+    Returns:
+        ``upserted`` features (added or modified), ``removed`` ids, and the
+        newer ``feature_count``; or ``None`` when either side lacks unique ids.
+    """
+    previous_features = _features_by_id(previous)
+    current_features = _features_by_id(current)
+    if previous_features is None or current_features is None:
+        return None
+
+    return {
+        "upserted": [
+            feature
+            for feature_id, feature in current_features.items()
+            if previous_features.get(feature_id) != feature
+        ],
+        "removed": [
+            feature_id for feature_id in previous_features if feature_id not in current_features
+        ],
+        "feature_count": len(current_features),
+    }
+
+
+def _append_changelog_entry(
+    directory: Path,
+    previous_manifest: Any,
+    encoded: EncodedListingPayload,
+) -> None:
+    """Record the delta from the previously published version to ``encoded``.
+
+    A new version with unchanged content still gets an empty entry so that
+    clients holding the previous version can follow the chain.
+
+    Args:
+        directory: Directory holding published payload artifacts.
+        previous_manifest: Manifest that was current before this publish.
+        encoded: Newly published payload.
+
+    Returns:
+        None.
+    """
+    if not isinstance(previous_manifest, dict):
+        return
+    previous_version = str(previous_manifest.get("version"))
+    if previous_version == encoded.version:
+        return
+
+    current_payload = orjson.loads(bytes(encoded.identity))
+    if previous_manifest.get("digest") == encoded.digest:
+        delta: dict[str, Any] | None = {
+            "upserted": [],
+            "removed": [],
+            "feature_count": len(current_payload.get("features") or []),
+        }
+    else:
+        try:
+            previous_name = previous_manifest["files"]["identity"]["name"]
+        except (KeyError, TypeError):
+            return
+        previous_payload = _read_json_file(directory / previous_name)
+        delta = compute_listing_payload_delta(previous_payload, current_payload)
+    if delta is None:
+        logger.warning(f"Skipping {encoded.page_type} payload change log: features lack unique ids.")
+        return
+
+    changelog_path = _changelog_path(directory, encoded.page_type)
+    changelog = _read_json_file(changelog_path)
+    entries = changelog.get("entries") if isinstance(changelog, dict) else None
+    entries = [entry for entry in entries or [] if isinstance(entry, dict)]
+    entries.append({"from": previous_version, "to": encoded.version, **delta})
+    atomic_write_bytes(
+        changelog_path,
+        orjson.dumps(
+            {
+                "page_type": encoded.page_type,
+                "entries": entries[-LISTING_PAYLOAD_CHANGELOG_ENTRIES:],
+            }
+        ),
+    )
+    logger.info(
+        f"Recorded {encoded.page_type} payload delta {previous_version} -> {encoded.version}: "
+        f"{len(delta['upserted']):,} upserted, {len(delta['removed']):,} removed."
+    )
+
+
+def load_listing_payload_delta(
+    page_type: str,
+    since_version: str,
+    current_version: str,
+    artifact_dir: str | Path,
+) -> dict[str, Any] | None:
+    """Combine published change log entries from ``since_version`` to ``current_version``.
+
+    Args:
+        page_type: Page key such as ``lease`` or ``buy``.
+        since_version: Version the client already holds.
+        current_version: Version the server currently serves.
+        artifact_dir: Directory holding published payload artifacts.
+
+    Returns:
+        A delta with ``upserted`` features and ``removed`` ids, or ``None``
+        when the chain is incomplete or the change set is too large to be
+        cheaper than the full payload.
+    """
+    if since_version == current_version:
+        return {"from": since_version, "version": current_version, "upserted": [], "removed": []}
+
+    changelog = _read_json_file(_changelog_path(Path(artifact_dir), page_type))
+    entries = changelog.get("entries") if isinstance(changelog, dict) else None
+    by_origin = {
+        str(entry.get("from")): entry for entry in entries or [] if isinstance(entry, dict)
+    }
+
+    upserted: dict[str, dict[str, Any]] = {}
+    removed: set[str] = set()
+    version = since_version
+    feature_count = 0
+    while version != current_version:
+        entry = by_origin.pop(version, None)
+        if entry is None:
+            return None
+        for feature in entry.get("upserted") or []:
+            feature_id = str(feature["properties"][LISTING_PAYLOAD_FEATURE_ID])
+            upserted[feature_id] = feature
+            removed.discard(feature_id)
+        for feature_id in entry.get("removed") or []:
+            upserted.pop(str(feature_id), None)
+            removed.add(str(feature_id))
+        feature_count = int(entry.get("feature_count") or 0)
+        version = str(entry.get("to"))
+
+    if len(upserted) + len(removed) > feature_count * LISTING_PAYLOAD_DELTA_MAX_CHANGED_FRACTION:
+        return None
+    return {
+        "from": since_version,
+        "version": current_version,
+        "upserted": list(upserted.values()),
+        "removed": sorted(removed),
+    }
+
+
+def write_listing_payload_artifacts(
+    encoded: EncodedListingPayload,
+    artifact_dir: str | Path,
+) -> Path:
+    """Publish an encoded payload as content-hashed files plus a manifest.
+
+    Variant files are written before the manifest is swapped in, so readers
+    only ever see a manifest whose files are complete. The delta from the
+    previously published version is appended to the page's change log.
+    Artifacts for older digests of the same page are removed afterwards;
+    workers that already mapped them keep their mapping until they move to the
+    new version.
+
+    Args:
+        encoded: Encoded payload to publish.
+        artifact_dir: Directory receiving the artifacts, created if missing.
+
+    Returns:
+        The path of the page manifest that was written.
+    """
+    directory = Path(artifact_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    files: dict[str, dict[str, Any]] = {}
+    for variant in _ARTIFACT_SUFFIXES:
+        body = bytes(getattr(encoded, variant))
+        path = _artifact_path(directory, encoded.page_type, encoded.digest, variant)
+        if not path.is_file() or path.stat().st_size != len(body):
+            atomic_write_bytes(path, body)
+        files[variant] = {"name": path.name, "size": len(body)}
+
+    manifest_path = _manifest_path(directory, encoded.page_type)
+    _append_changelog_entry(directory, _read_json_file(manifest_path), encoded)
+    atomic_write_bytes(
+        manifest_path,
+        orjson.dumps(
+            {
+                "page_type": encoded.page_type,
+                "version": encoded.version,
+                "digest": encoded.digest,
+                "files": files,
+            },
+            option=orjson.OPT_INDENT_2,
+        ),
+    )
+
+    current_names = {entry["name"] for entry in files.values()}
+    for stale_path in directory.glob(f"{encoded.page_type}-*.json*"):
+        if stale_path.name not in current_names:
+            stale_path.unlink(missing_ok=True)
+    return manifest_path
+
+
+def _map_artifact_file(path: Path, expected_size: int) -> mmap.mmap:
+    """Memory-map one published artifact read-only after checking its size.
+
+    Args:
+        path: Artifact file to map.
+        expected_size: Byte size recorded in the manifest.
+
+    Returns:
+        A read-only memory map of the file.
+
+    Raises:
+        ValueError: If the file size does not match the manifest.
+    """
+    with path.open("rb") as artifact_file:
+        size = os.fstat(artifact_file.fileno()).st_size
+        if size != expected_size or size == 0:
+            raise ValueError(f"Artifact {path} is {size} B, manifest expects {expected_size} B")
+        return mmap.mmap(artifact_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def load_listing_payload_artifacts(
+    page_type: str,
+    version: str,
+    artifact_dir: str | Path,
+) -> EncodedListingPayload | None:
+    """Memory-map a page's published artifacts when they match ``version``.
+
+    Args:
+        page_type: Page key such as ``lease`` or ``buy``.
+        version: Data version the caller is about to serve.
+        artifact_dir: Directory holding published payload artifacts.
+
+    Returns:
+        The mapped payload, or ``None`` when no matching, intact artifacts exist.
+    """
+    directory = Path(artifact_dir)
+    try:
+        manifest = orjson.loads(_manifest_path(directory, page_type).read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+    if manifest.get("page_type") != page_type or str(manifest.get("version")) != version:
+        return None
+
+    try:
+        bodies = {
+            variant: _map_artifact_file(
+                directory / manifest["files"][variant]["name"],
+                int(manifest["files"][variant]["size"]),
+            )
+            for variant in _ARTIFACT_SUFFIXES
+        }
+    except (KeyError, TypeError, OSError, ValueError) as error:
+        logger.warning(f"Ignoring unusable {page_type} payload artifacts: {error}")
+        return None
+
+    return EncodedListingPayload(
+        page_type=page_type,
+        version=version,
+        digest=str(manifest["digest"]),
+        **bodies,
+    )
+
+
+def clear_encoded_listing_payloads() -> None:
+    """Drop every cached encoded payload, forcing the next request to rebuild.
+
+    Returns:
+        None.
+    """
+    with _encoded_payloads_lock:
+        _encoded_payloads.clear()
+
+
+def choose_content_encoding(accepted_encodings: Sequence[str]) -> str | None:
+    """Pick the best stored encoding from a client's acceptable encodings.
+
+    Args:
+        accepted_encodings: Encodings the client accepts, best first.
+
+    Returns:
+        ``br`` or ``gzip`` when acceptable, otherwise ``None`` for identity.
+    """
+    normalized = {str(value).strip().lower() for value in accepted_encodings}
+    for encoding in SUPPORTED_CONTENT_ENCODINGS:
+        if encoding in normalized or "*" in normalized:
+            return encoding
+    return None
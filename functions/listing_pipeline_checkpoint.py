@@ -19,12 +19,14 @@ import re
 import sqlite3
 from typing import Any, BinaryIO, Literal, Protocol
 
-import boto3
-from botocore.exceptions import ClientError
 import pandas as pd
 
+from functions.lazy_imports import lazy_import
 from functions.listing_report_utils import normalize_mls_number
 
+boto3 = lazy_import("boto3")
+botocore_exceptions = lazy_import("botocore.exceptions")
+
 
 ListingType = Literal["buy", "lease"]
 JsonScalar = str | int | float | bool | None
@@ -412,7 +414,7 @@ class ListingCheckpointStore:
                 Bucket=self.s3_bucket,
                 Key=self.s3_key,
             )
-        except ClientError as error:
+        except botocore_exceptions.ClientError as error:
             code = str(error.response.get("Error", {}).get("Code", ""))
             if code in {"404", "NoSuchKey", "NotFound"}:
                 return
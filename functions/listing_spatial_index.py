@@ -0,0 +1,311 @@
+"""Uniform-grid spatial index for viewport-paged listing delivery.
+
+The map store receives the whole listing payload, so payload size grows with
+the covered area rather than with what the user is looking at. This module
+buckets listing points into a fixed-size lon/lat grid, stored as a NumPy array
+of positions sorted by cell id, so a bounding-box query touches only the cells
+the box overlaps. Queries return features at a zoom-appropriate level of
+detail: zoomed-out views get slim marker features and are capped, while
+street-level views get the full properties.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Sequence
+import math
+import threading
+
+import numpy as np
+
+from functions.listing_filters import ListingFilterIndex, get_listing_filter_index
+
+LISTING_GRID_CELL_DEGREES = 0.02
+LISTING_VIEWPORT_FULL_DETAIL_ZOOM = 14
+LISTING_VIEWPORT_MAX_FEATURES = 5000
+LISTING_VIEWPORT_SUMMARY_PROPERTIES: tuple[str, ...] = (
+    "mls_number",
+    "list_price",
+    "bedrooms",
+    "total_bathrooms",
+    "subtype",
+)
+
+
+@dataclass(frozen=True)
+class BoundingBox:
+    """Longitude/latitude bounds of a map viewport.
+
+    Attributes:
+        west: Minimum longitude.
+        south: Minimum latitude.
+        east: Maximum longitude.
+        north: Maximum latitude.
+    """
+
+    west: float
+    south: float
+    east: float
+    north: float
+
+    @classmethod
+    def parse(cls, value: str) -> BoundingBox:
+        """Parse a ``west,south,east,north`` query-string value.
+
+        Args:
+            value: Comma-separated bounds in degrees.
+
+        Returns:
+            The parsed bounding box.
+
+        Raises:
+            ValueError: If the value is malformed or the bounds are inverted.
+        """
+        parts = [part.strip() for part in value.split(",")]
+        if len(parts) != 4:
+            raise ValueError("bbox must be west,south,east,north")
+        west, south, east, north = (float(part) for part in parts)
+        if not all(math.isfinite(bound) for bound in (west, south, east, north)):
+            raise ValueError("bbox bounds must be finite numbers")
+        if west > east or south > north:
+            raise ValueError("bbox must satisfy west <= east and south <= north")
+        return cls(west=west, south=south, east=east, north=north)
+
+
+@dataclass(frozen=True)
+class ListingGridIndex:
+    """Listing positions bucketed into a uniform lon/lat grid.
+
+    Attributes:
+        listings: Column index the grid was built over.
+        cell_degrees: Grid cell edge length in degrees.
+        origin_lon: Longitude of the grid's western edge.
+        origin_lat: Latitude of the grid's southern edge.
+        columns: Number of grid columns.
+        rows: Number of grid rows.
+        cell_ids: Sorted cell id for each indexed position.
+        positions: Feature positions ordered by ``cell_ids``.
+    """
+
+    listings: ListingFilterIndex = field(repr=False)
+    cell_degrees: float
+    origin_lon: float
+    origin_lat: float
+    columns: int
+    rows: int
+    cell_ids: np.ndarray = field(repr=False)
+    positions: np.ndarray = field(repr=False)
+
+    @property
+    def version(self) -> str:
+        """Return the payload version the grid was built from.
+
+        Returns:
+            The listing payload version.
+        """
+        return self.listings.version
+
+    def query(self, bbox: BoundingBox) -> np.ndarray:
+        """Return the positions of listings inside ``bbox`` (edges inclusive).
+
+        Args:
+            bbox: Viewport bounds.
+
+        Returns:
+            Sorted feature positions.
+        """
+        if self.positions.size == 0:
+            return np.empty(0, dtype=np.int64)
+
+        first_column = max(int((bbox.west - self.origin_lon) // self.cell_degrees), 0)
+        last_column = min(int((bbox.east - self.origin_lon) // self.cell_degrees), self.columns - 1)
+        first_row = max(int((bbox.south - self.origin_lat) // self.cell_degrees), 0)
+        last_row = min(int((bbox.north - self.origin_lat) // self.cell_degrees), self.rows - 1)
+        if first_column > last_column or first_row > last_row:
+            return np.empty(0, dtype=np.int64)
+
+        # Cells in one grid row are contiguous ids, so each row is one slice.
+        row_ids = np.arange(first_row, last_row + 1, dtype=np.int64) * self.columns
+        starts = np.searchsorted(self.cell_ids, row_ids + first_column, side="left")
+        stops = np.searchsorted(self.cell_ids, row_ids + last_column, side="right")
+        candidates = np.concatenate(
+            [self.positions[start:stop] for start, stop in zip(starts, stops) if stop > start]
+            or [np.empty(0, dtype=np.int64)]
+        )
+
+        longitude = self.listings.longitude[candidates]
+        latitude = self.listings.latitude[candidates]
+        inside = (
+            (longitude >= bbox.west)
+            & (longitude <= bbox.east)
+            & (latitude >= bbox.south)
+            & (latitude <= bbox.north)
+        )
+        return np.sort(candidates[inside])
+
+
+def build_listing_grid_index(
+    listings: ListingFilterIndex,
+    cell_degrees: float = LISTING_GRID_CELL_DEGREES,
+) -> ListingGridIndex:
+    """Bucket listing points into a uniform grid.
+
+    Listings without usable coordinates are left out of the grid.
+
+    Args:
+        listings: Column index holding the normalized point coordinates.
+        cell_degrees: Grid cell edge length in degrees.
+
+    Returns:
+        The grid index.
+    """
+    valid = np.flatnonzero(~(np.isnan(listings.longitude) | np.isnan(listings.latitude)))
+    if valid.size == 0:
+        return ListingGridIndex(
+            listings=listings,
+            cell_degrees=cell_degrees,
+            origin_lon=0.0,
+            origin_lat=0.0,
+            columns=0,
+            rows=0,
+            cell_ids=np.empty(0, dtype=np.int64),
+            positions=np.empty(0, dtype=np.int64),
+        )
+
+    longitude = listings.longitude[valid]
+    latitude = listings.latitude[valid]
+    origin_lon = float(longitude.min())
+    origin_lat = float(latitude.min())
+    column = ((longitude - origin_lon) // cell_degrees).astype(np.int64)
+    row = ((latitude - origin_lat) // cell_degrees).astype(np.int64)
+    columns = int(column.max()) + 1
+    cell_ids = row * columns + column
+    order = np.argsort(cell_ids, kind="stable")
+    return ListingGridIndex(
+        listings=listings,
+        cell_degrees=cell_degrees,
+        origin_lon=origin_lon,
+        origin_lat=origin_lat,
+        columns=columns,
+        rows=int(row.max()) + 1,
+        cell_ids=cell_ids[order],
+        positions=valid[order],
+    )
+
+
+def _thin_positions(positions: np.ndarray, limit: int) -> np.ndarray:
+    """Keep an evenly spaced subset of ``positions`` so at most ``limit`` remain.
+
+    Args:
+        positions: Sorted feature positions.
+        limit: Maximum number of positions to keep.
+
+    Returns:
+        ``positions`` unchanged, or an evenly spaced subset.
+    """
+    if positions.size <= limit:
+        return positions
+    return positions[np.linspace(0, positions.size - 1, num=limit).astype(np.int64)]
+
+
+def _summary_feature(feature: dict[str, Any], properties: Sequence[str]) -> dict[str, Any]:
+    """Return a slim copy of a feature carrying only marker properties.
+
+    Args:
+        feature: Full GeoJSON feature.
+        properties: Property keys to keep.
+
+    Returns:
+        A feature with the same geometry and a reduced property set.
+    """
+    source = feature.get("properties") or {}
+    return {
+        "type": "Feature",
+        "properties": {key: source.get(key) for key in properties},
+        "geometry": feature.get("geometry"),
+    }
+
+
+def build_viewport_feature_collection(
+    grid: ListingGridIndex,
+    bbox: BoundingBox,
+    zoom: float,
+    limit: int = LISTING_VIEWPORT_MAX_FEATURES,
+) -> dict[str, Any]:
+    """Return the listings inside a viewport at a zoom-appropriate detail level.
+
+    Below ``LISTING_VIEWPORT_FULL_DETAIL_ZOOM`` features carry only
+    ``LISTING_VIEWPORT_SUMMARY_PROPERTIES`` and are thinned evenly to
+    ``limit``; at street level every matching feature is returned in full.
+
+    Args:
+        grid: Spatial index for the current payload version.
+        bbox: Viewport bounds.
+        zoom: Leaflet zoom level of the viewport.
+        limit: Maximum number of summary features at low zoom.
+
+    Returns:
+        A FeatureCollection with ``version``, ``detail``, ``total`` and
+        ``truncated`` members describing the slice.
+    """
+    positions = grid.query(bbox)
+    features = grid.listings.features
+    full_detail = zoom >= LISTING_VIEWPORT_FULL_DETAIL_ZOOM
+    if full_detail:
+        selected = [features[position] for position in positions]
+        shown = positions.size
+    else:
+        thinned = _thin_positions(positions, limit)
+        selected = [_summary_feature(features[position], LISTING_VIEWPORT_SUMMARY_PROPERTIES) for position in thinned]
+        shown = thinned.size
+    return {
+        "type": "FeatureCollection",
+        "version": grid.version,
+        "detail": "full" if full_detail else "summary",
+        "total": int(positions.size),
+        "truncated": bool(shown < positions.size),
+        "features": selected,
+    }
+
+
+_grid_indexes: dict[str, ListingGridIndex] = {}
+_grid_indexes_lock = threading.Lock()
+
+
+def get_listing_grid_index(
+    page_type: str,
+    version: str,
+    payload_bytes: Callable[[], Any],
+) -> ListingGridIndex:
+    """Return the spatial index for a payload version, building it once per worker.
+
+    Args:
+        page_type: Page key such as ``lease`` or ``buy``.
+        version: Current payload version.
+        payload_bytes: Callable returning the encoded FeatureCollection.
+
+    Returns:
+        The cached grid index for ``version``.
+    """
+    cached = _grid_indexes.get(page_type)
+    if cached is not None and cached.version == version:
+        return cached
+
+    listings = get_listing_filter_index(page_type, version, payload_bytes)
+    with _grid_indexes_lock:
+        cached = _grid_indexes.get(page_type)
+        if cached is not None and cached.version == version:
+            return cached
+        grid = build_listing_grid_index(listings)
+        _grid_indexes[page_type] = grid
+        return grid
+
+
+def clear_listing_grid_indexes() -> None:
+    """Drop every cached grid index.
+
+    Returns:
+        None.
+    """
+    with _grid_indexes_lock:
+        _grid_indexes.clear()
@@ -0,0 +1,476 @@
+"""Precomputed marker clusters and convex hulls for every zoom level.
+
+Clustered map layers currently ship every point to the browser, which builds a
+supercluster index on load and computes a convex hull with turf whenever a
+cluster is hovered. This module runs the same greedy, radius-based clustering
+as supercluster once per data version in Python, producing for each zoom level
+the cluster centroids, point counts and hulls. Overlays flagged
+``server_clusters`` ship only an anchor feature (see
+``build_cluster_anchor_layer``); the browser fetches the ready-made clusters
+for its viewport and zoom instead of indexing tens of thousands of points on
+page load.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping
+import math
+import threading
+
+import numpy as np
+import shapely
+
+from functions.listing_spatial_index import BoundingBox
+
+# supercluster defaults, overridden by LayersClass.DEFAULT_SUPERCLUSTER_OPTIONS.
+CLUSTER_RADIUS = 160
+CLUSTER_EXTENT = 512
+CLUSTER_MIN_ZOOM = 3
+CLUSTER_MAX_ZOOM = 16
+CLUSTER_MIN_POINTS = 2
+CLUSTER_HULL_PRECISION = 5
+LISTING_SUPERCLUSTER_OPTIONS: dict[str, int] = {"radius": 160, "minZoom": 3}
+# The anchor is an invisible, non-interactive marker; its position is irrelevant.
+CLUSTER_ANCHOR_COORDINATES = (-118.2437, 34.0522)
+
+
+def _project(longitude: np.ndarray, latitude: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Project lon/lat to supercluster's unit Web Mercator square.
+
+    Args:
+        longitude: Point longitudes.
+        latitude: Point latitudes.
+
+    Returns:
+        ``x`` and ``y`` coordinates in ``[0, 1]``.
+    """
+    x = longitude / 360.0 + 0.5
+    sin = np.sin(np.radians(latitude))
+    with np.errstate(divide="ignore"):
+        y = 0.5 - 0.25 * np.log((1 + sin) / (1 - sin)) / math.pi
+    return x, np.clip(y, 0.0, 1.0)
+
+
+def _unproject(x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Invert ``_project``.
+
+    Args:
+        x: Unit-square x coordinates.
+        y: Unit-square y coordinates.
+
+    Returns:
+        Longitudes and latitudes in degrees.
+    """
+    y2 = (180 - y * 360) * math.pi / 180
+    return (x - 0.5) * 360, 360 * np.arctan(np.exp(y2)) / math.pi - 90
+
+
+def abbreviate_point_count(count: int) -> str | int:
+    """Format a cluster size the way supercluster's ``point_count_abbreviated`` does.
+
+    Args:
+        count: Number of points in the cluster.
+
+    Returns:
+        ``count`` itself below 1,000, otherwise a ``k``-suffixed string.
+    """
+    # JavaScript's Math.round rounds halves up, unlike Python's round().
+    if count >= 10000:
+        return f"{math.floor(count / 1000 + 0.5)}k"
+    if count >= 1000:
+        return f"{math.floor(count / 100 + 0.5) / 10:g}k"
+    return count
+
+
+def _cluster_once(
+    x: np.ndarray,
+    y: np.ndarray,
+    weights: np.ndarray,
+    radius: float,
+    min_points: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Merge points within ``radius`` of each other, as one supercluster zoom step.
+
+    Points are visited in order; each unvisited point absorbs its unvisited
+    neighbors into a weighted-centroid cluster when the merged count reaches
+    ``min_points``.
+
+    Args:
+        x: Projected x coordinates of the previous level's entries.
+        y: Projected y coordinates of the previous level's entries.
+        weights: Point counts of the previous level's entries.
+        radius: Merge radius in projected units.
+        min_points: Minimum merged count that forms a cluster.
+
+    Returns:
+        The new level's x, y and weights, plus each input entry's parent index.
+    """
+    size = x.size
+    cell_x = np.floor(x / radius).astype(np.int64)
+    cell_y = np.floor(y / radius).astype(np.int64)
+    buckets: dict[tuple[int, int], list[int]] = defaultdict(list)
+    for position, key in enumerate(zip(cell_x.tolist(), cell_y.tolist())):
+        buckets[key].append(position)
+
+    xs = x.tolist()
+    ys = y.tolist()
+    counts = weights.tolist()
+    parent = [-1] * size
+    radius_squared = radius * radius
+    out_x: list[float] = []
+    out_y: list[float] = []
+    out_weights: list[int] = []
+
+    for position in range(size):
+        if parent[position] != -1:
+            continue
+        px, py = xs[position], ys[position]
+        column, row = int(cell_x[position]), int(cell_y[position])
+        neighbors = [
+            other
+            for dx in (-1, 0, 1)
+            for dy in (-1, 0, 1)
+            for other in buckets.get((column + dx, row + dy), ())
+            if other != position
+            and parent[other] == -1
+            and (xs[other] - px) ** 2 + (ys[other] - py) ** 2 <= radius_squared
+        ]
+        origin_count = counts[position]
+        total = origin_count + sum(counts[other] for other in neighbors)
+        new_index = len(out_x)
+        parent[position] = new_index
+        if total > origin_count and total >= min_points:
+            weighted_x = px * origin_count
+            weighted_y = py * origin_count
+            for other in neighbors:
+                parent[other] = new_index
+                weighted_x += xs[other] * counts[other]
+                weighted_y += ys[other] * counts[other]
+            out_x.append(weighted_x / total)
+            out_y.append(weighted_y / total)
+            out_weights.append(total)
+        else:
+            out_x.append(px)
+            out_y.append(py)
+            out_weights.append(origin_count)
+
+    return (
+        np.asarray(out_x, dtype=float),
+        np.asarray(out_y, dtype=float),
+        np.asarray(out_weights, dtype=np.int64),
+        np.asarray(parent, dtype=np.int64),
+    )
+
+
+def _cluster_hulls(
+    longitude: np.ndarray,
+    latitude: np.ndarray,
+    leaf_labels: np.ndarray,
+    counts: np.ndarray,
+) -> list[list[list[float]] | None]:
+    """Compute each cluster's convex hull ring in one vectorized shapely call.
+
+    Args:
+        longitude: Leaf longitudes.
+        latitude: Leaf latitudes.
+        leaf_labels: Cluster index of each leaf at this zoom.
+        counts: Point count per cluster.
+
+    Returns:
+        One exterior ring per cluster (lon/lat pairs), or ``None`` for
+        entries with fewer than three points or collinear leaves.
+    """
+    hulls: list[list[list[float]] | None] = [None] * counts.size
+    hull_clusters = np.flatnonzero(counts >= 3)
+    if hull_clusters.size == 0:
+        return hulls
+
+    leaves = np.flatnonzero(np.isin(leaf_labels, hull_clusters))
+    leaves = leaves[np.argsort(leaf_labels[leaves], kind="stable")]
+    labels = leaf_labels[leaves]
+    multipoints = shapely.multipoints(
+        np.column_stack([longitude[leaves], latitude[leaves]]),
+        indices=np.searchsorted(hull_clusters, labels),
+    )
+    for cluster, hull in zip(hull_clusters.tolist(), shapely.convex_hull(multipoints)):
+        if shapely.get_type_id(hull) == 3:  # Polygon
+            ring = shapely.get_coordinates(shapely.get_exterior_ring(hull))
+            hulls[cluster] = np.round(ring, CLUSTER_HULL_PRECISION).tolist()
+    return hulls
+
+
+@dataclass(frozen=True)
+class ClusterLevel:
+    """Clusters and unclustered points for one zoom level.
+
+    Attributes:
+        zoom: Map zoom level.
+        longitude: Entry longitudes (cluster centroids or point positions).
+        latitude: Entry latitudes.
+        counts: Number of leaf points in each entry.
+        leaf: Source feature position for single-point entries, ``-1`` for clusters.
+        leaf_labels: Entry index of every leaf point at this zoom.
+        hulls: Convex hull ring per entry, or ``None``.
+    """
+
+    zoom: int
+    longitude: np.ndarray = field(repr=False)
+    latitude: np.ndarray = field(repr=False)
+    counts: np.ndarray = field(repr=False)
+    leaf: np.ndarray = field(repr=False)
+    leaf_labels: np.ndarray = field(repr=False)
+    hulls: list[list[list[float]] | None] = field(repr=False)
+
+
+@dataclass(frozen=True)
+class ClusterPyramid:
+    """Precomputed clusters for every zoom level of one dataset version.
+
+    Attributes:
+        version: Data version the clusters were built from.
+        features: Source point features, in leaf order.
+        longitude: Leaf longitudes.
+        latitude: Leaf latitudes.
+        levels: Cluster level per zoom from ``min_zoom`` to ``max_zoom``.
+        min_zoom: Lowest precomputed zoom; lower zooms reuse it.
+        max_zoom: Highest clustered zoom; higher zooms return raw points.
+    """
+
+    version: str
+    features: list[dict[str, Any]] = field(repr=False)
+    longitude: np.ndarray = field(repr=False)
+    latitude: np.ndarray = field(repr=False)
+    levels: dict[int, ClusterLevel] = field(repr=False)
+    min_zoom: int
+    max_zoom: int
+
+    def feature_collection(self, zoom: float, bbox: BoundingBox | None = None) -> dict[str, Any]:
+        """Return the ready-made clusters and points for a zoom and viewport.
+
+        Cluster features carry supercluster-compatible ``cluster``,
+        ``cluster_id``, ``point_count`` and ``point_count_abbreviated``
+        properties plus a precomputed ``hull`` ring; single points are
+        returned as their original features.
+
+        Args:
+            zoom: Map zoom level; fractional zooms round down like supercluster.
+            bbox: Optional viewport; entries outside it are omitted.
+
+        Returns:
+            A GeoJSON FeatureCollection with ``version`` and ``zoom`` members.
+        """
+        level_zoom = max(int(math.floor(zoom)), self.min_zoom)
+        level = self.levels.get(level_zoom)
+        if level is None:
+            longitude, latitude = self.longitude, self.latitude
+            counts = np.ones(longitude.size, dtype=np.int64)
+            leaf = np.arange(longitude.size)
+            hulls: list[list[list[float]] | None] = [None] * longitude.size
+        else:
+            longitude, latitude, counts, leaf, hulls = (
+                level.longitude,
+                level.latitude,
+                level.counts,
+                level.leaf,
+                level.hulls,
+            )
+
+        visible = np.ones(longitude.size, dtype=bool)
+        if bbox is not None:
+            visible = (
+                (longitude >= bbox.west)
+                & (longitude <= bbox.east)
+                & (latitude >= bbox.south)
+                & (latitude <= bbox.north)
+            )
+
+        features: list[dict[str, Any]] = []
+        for entry in np.flatnonzero(visible).tolist():
+            if leaf[entry] >= 0:
+                features.append(self.features[int(leaf[entry])])
+                continue
+            count = int(counts[entry])
+            features.append(
+                {
+                    "type": "Feature",
+                    "properties": {
+                        "cluster": True,
+                        "cluster_id": (entry << 5) + level_zoom + 1,
+                        "point_count": count,
+                        "point_count_abbreviated": abbreviate_point_count(count),
+                        "hull": hulls[entry],
+                    },
+                    "geometry": {
+                        "type": "Point",
+                        "coordinates": [float(longitude[entry]), float(latitude[entry])],
+                    },
+                }
+            )
+        return {"type": "FeatureCollection", "version": self.version, "zoom": level_zoom, "features": features}
+
+
+def build_cluster_pyramid(
+    geojson: Mapping[str, Any],
+    *,
+    version: str,
+    options: Mapping[str, Any] | None = None,
+) -> ClusterPyramid:
+    """Cluster a point FeatureCollection for every zoom level, top down.
+
+    Mirrors supercluster: leaves are projected to Web Mercator and clustered
+    from ``maxZoom`` down to ``minZoom``, each zoom merging the previous
+    zoom's output within ``radius / (extent * 2 ** zoom)``.
+
+    Args:
+        geojson: Point FeatureCollection; features without a usable point
+            geometry are skipped.
+        version: Data version the clusters are built from.
+        options: supercluster options (``radius``, ``extent``, ``minZoom``,
+            ``maxZoom``, ``minPoints``), typically a layer's
+            ``supercluster_options``.
+
+    Returns:
+        The cluster pyramid.
+    """
+    options = dict(options or {})
+    radius = float(options.get("radius", CLUSTER_RADIUS))
+    extent = float(options.get("extent", CLUSTER_EXTENT))
+    min_zoom = int(options.get("minZoom", CLUSTER_MIN_ZOOM))
+    max_zoom = int(options.get("maxZoom", CLUSTER_MAX_ZOOM))
+    min_points = int(options.get("minPoints", CLUSTER_MIN_POINTS))
+
+    features: list[dict[str, Any]] = []
+    coordinates: list[tuple[float, float]] = []
+    for feature in geojson.get("features") or []:
+        geometry = (feature or {}).get("geometry") or {}
+        point = geometry.get("coordinates") if geometry.get("type") == "Point" else None
+        if (
+            isinstance(point, (list, tuple))
+            and len(point) >= 2
+            and all(isinstance(value, (int, float)) and math.isfinite(value) for value in point[:2])
+        ):
+            features.append(feature)
+            coordinates.append((float(point[0]), float(point[1])))
+
+    points = np.asarray(coordinates, dtype=float).reshape(-1, 2)
+    longitude, latitude = points[:, 0], points[:, 1]
+    x, y = _project(longitude, latitude)
+    weights = np.ones(x.size, dtype=np.int64)
+    leaf_labels = np.arange(x.size)
+    # Entries that are still a single original point keep their leaf position.
+    entry_leaf = np.arange(x.size)
+
+    levels: dict[int, ClusterLevel] = {}
+    for zoom in range(max_zoom, min_zoom - 1, -1):
+        x, y, weights, parent = _cluster_once(x, y, weights, radius / (extent * 2**zoom), min_points)
+        leaf_labels = parent[leaf_labels]
+        # A weight-1 entry has exactly one child, itself a single original point.
+        single_children = np.flatnonzero(weights[parent] == 1)
+        previous_entry_leaf = entry_leaf
+        entry_leaf = np.full(x.size, -1, dtype=np.int64)
+        entry_leaf[parent[single_children]] = previous_entry_leaf[single_children]
+        is_single = entry_leaf >= 0
+        entry_lon, entry_lat = _unproject(x, y)
+        levels[zoom] = ClusterLevel(
+            zoom=zoom,
+            longitude=np.where(is_single, longitude[np.maximum(entry_leaf, 0)] if x.size else entry_lon, entry_lon),
+            latitude=np.where(is_single, latitude[np.maximum(entry_leaf, 0)] if x.size else entry_lat, entry_lat),
+            counts=weights,
+            leaf=entry_leaf,
+            leaf_labels=leaf_labels,
+            hulls=_cluster_hulls(longitude, latitude, leaf_labels, weights),
+        )
+
+    return ClusterPyramid(
+        version=version,
+        features=features,
+        longitude=longitude,
+        latitude=latitude,
+        levels=levels,
+        min_zoom=min_zoom,
+        max_zoom=max_zoom,
+    )
+
+
+def build_cluster_anchor_layer(
+    clusters_url: str,
+    *,
+    point_to_layer: str,
+    cluster_to_layer: str | None = None,
+) -> dict[str, Any]:
+    """Build the one-feature layer that stands in for a server-clustered overlay.
+
+    The browser renders the anchor with ``drawServerClusterLayer``, which
+    fetches the clusters and points of its viewport from ``clusters_url`` and
+    draws them with the layer's own point and cluster renderers.
+
+    Args:
+        clusters_url: URL of the layer's cluster route.
+        point_to_layer: Renderer name for single points.
+        cluster_to_layer: Optional renderer name for clusters; the default
+            count marker is used when omitted.
+
+    Returns:
+        A FeatureCollection holding the anchor feature.
+    """
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": list(CLUSTER_ANCHOR_COORDINATES)},
+                "properties": {
+                    "layer_role": "server_cluster_anchor",
+                    "clusters_url": clusters_url,
+                    "point_to_layer": point_to_layer,
+                    "cluster_to_layer": cluster_to_layer,
+                },
+            }
+        ],
+    }
+
+
+_cluster_pyramids: dict[str, ClusterPyramid] = {}
+_cluster_pyramids_lock = threading.Lock()
+
+
+def get_cluster_pyramid(
+    dataset: str,
+    version: str,
+    load_geojson: Callable[[], Mapping[str, Any]],
+    options: Mapping[str, Any] | None = None,
+) -> ClusterPyramid:
+    """Return a dataset's cluster pyramid, rebuilding it once per data version.
+
+    Args:
+        dataset: Cache key such as ``listings:lease`` or ``oil_well``.
+        version: Current data version.
+        load_geojson: Callable returning the point FeatureCollection.
+        options: supercluster options used for the build.
+
+    Returns:
+        The cached pyramid for ``version``.
+    """
+    cached = _cluster_pyramids.get(dataset)
+    if cached is not None and cached.version == version:
+        return cached
+
+    with _cluster_pyramids_lock:
+        cached = _cluster_pyramids.get(dataset)
+        if cached is not None and cached.version == version:
+            return cached
+        pyramid = build_cluster_pyramid(load_geojson(), version=version, options=options)
+        _cluster_pyramids[dataset] = pyramid
+        return pyramid
+
+
+def clear_cluster_pyramids() -> None:
+    """Drop every cached cluster pyramid.
+
+    Returns:
+        None.
+    """
+    with _cluster_pyramids_lock:
+        _cluster_pyramids.clear()
@@ -5,13 +5,14 @@ The module keeps database access read-only and response sizes bounded.
 
 from __future__ import annotations
 
-from contextlib import closing
+from contextlib import contextmanager
 from datetime import date
 from math import ceil
 from pathlib import Path
 from functions.data_paths import LARENTALS_DB_PATH
+from functions.sqlite_read_pool import read_only_connection
 import sqlite3
-from typing import Any, Literal, TypeAlias, TypedDict
+from typing import Any, Iterator, Literal, TypeAlias, TypedDict
 
 from dash.mcp import configure_mcp_server, mcp_enabled
 
@@ -253,22 +254,20 @@ def _validate_non_negative(value: int | None, *, field_name: str) -> None:
         raise ValueError(f"{field_name} must be a non-negative integer")
 
 
-def _connect_read_only(db_path: str | Path) -> sqlite3.Connection:
-    """Open a SQLite database connection that cannot perform writes.
+@contextmanager
+def _connect_read_only(db_path: str | Path) -> Iterator[sqlite3.Connection]:
+    """Check out a pooled SQLite database connection that cannot perform writes.
 
     Rows are exposed by column name to simplify response normalization.
 
     Args:
         db_path: Filesystem path to the SQLite database.
 
-    Returns:
-        A read-only SQLite connection.
+    Yields:
+        A read-only SQLite connection owned by the calling thread.
     """
-    resolved_path = Path(db_path).resolve()
-    connection = sqlite3.connect(f"file:{resolved_path}?mode=ro", uri=True)
-    connection.row_factory = sqlite3.Row
-    connection.execute("PRAGMA query_only = ON")
-    return connection
+    with read_only_connection(db_path) as connection:
+        yield connection
 
 
 def _like_pattern(value: str) -> str:
@@ -538,7 +537,7 @@ def search_listings_in_database(
     offset = (page - 1) * page_size
     table_name = listing_type
 
-    with closing(_connect_read_only(db_path)) as connection:
+    with _connect_read_only(db_path) as connection:
         total_results = int(
             connection.execute(
                 f"SELECT COUNT(*) FROM {table_name} WHERE {where_sql}",  # noqa: S608
@@ -1,13 +1,20 @@
+from __future__ import annotations
+
 from dotenv import load_dotenv, find_dotenv
-from imagekitio import ImageKit
-from imagekitio.models.UploadFileRequestOptions import UploadFileRequestOptions
+from functions.lazy_imports import lazy_import
 from loguru import logger
-from typing import Optional, List, Generator, Set
+from typing import TYPE_CHECKING, Optional, List, Generator, Set
 import geopandas as gpd
 import os
 import pandas as pd
 import sys
 
+if TYPE_CHECKING:
+    from imagekitio import ImageKit
+
+imagekitio = lazy_import("imagekitio")
+imagekit_upload_options = lazy_import("imagekitio.models.UploadFileRequestOptions")
+
 load_dotenv(find_dotenv())
 
 # https://github.com/imagekit-developer/imagekit-python#file-upload
@@ -37,7 +44,7 @@ def imagekit_transform(
     transformed_image: Optional[str] = None
 
     # Set up upload options
-    options = UploadFileRequestOptions(
+    options = imagekit_upload_options.UploadFileRequestOptions(
         is_private_file=False,
         use_unique_file_name=False,
         overwrite_file=True,
@@ -156,7 +163,7 @@ def delete_single_mls_image(mls_number: str) -> None:
     Returns:
     None
     """
-    imagekit_instance = ImageKit(
+    imagekit_instance = imagekitio.ImageKit(
         public_key=os.getenv('IMAGEKIT_PUBLIC_KEY'),
         private_key=os.getenv('IMAGEKIT_PRIVATE_KEY'),
         url_endpoint=os.getenv('IMAGEKIT_URL_ENDPOINT')
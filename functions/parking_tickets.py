@@ -11,6 +11,7 @@ import re
 import requests
 import time
 from functions.data_paths import PARKING_TICKETS_HEATMAP_PATH
+from functions.heatmap_grids import build_heat_grid
 
 load_dotenv(find_dotenv(), override=False)
 
@@ -27,7 +28,12 @@ PARKING_TICKETS_MARKER_ZOOM_MIN = 15
 PARKING_TICKETS_HEAT_ZOOM_MAX = 16
 PARKING_TICKETS_MARKER_MERGE_DISTANCE_METERS = 40.0
 PARKING_TICKETS_REQUEST_TIMEOUT_SECONDS = 45
-PARKING_TICKETS_ARTIFACT_VERSION = 4
+PARKING_TICKETS_ARTIFACT_VERSION = 5
+# First artifact version whose marker thresholds match the renderer's legend tiers.
+PARKING_TICKETS_HYBRID_BREAKS_ARTIFACT_VERSION = 5
+# Yearly citation counts for monthly, weekly and several-per-week marker tiers, plus the
+# floor of the extreme tier (roughly 10 per week).
+PARKING_TICKETS_MARKER_BASELINE_BREAKS = (12, 52, 156, 520)
 MAX_REASONABLE_FINE_AMOUNT = 2500.0
 PARKING_TICKETS_LOCAL_ARTIFACT_PATH = PARKING_TICKETS_HEATMAP_PATH
 LA_CITY_COORDINATE_BOUNDS = {
@@ -171,11 +177,38 @@ def load_local_parking_tickets_heat_geojson() -> GeoJsonDict | None:
     if isinstance(metadata, dict):
         metadata["data_source"] = "local_artifact"
         metadata.setdefault("artifact_version", PARKING_TICKETS_ARTIFACT_VERSION)
+        if int(metadata["artifact_version"]) < PARKING_TICKETS_HYBRID_BREAKS_ARTIFACT_VERSION:
+            _upgrade_marker_frequency_breaks(payload)
 
     logger.info(f"Loaded parking tickets heatmap artifact from {artifact_path}.")
     return payload
 
 
+def _upgrade_marker_frequency_breaks(payload: GeoJsonDict) -> None:
+    """Recompute marker tiers on artifacts written before the hybrid thresholds.
+
+    Older artifacts stored quantile thresholds that the renderer ignored in
+    favor of deriving its own from every marker; the renderer now only sees the
+    markers in view and reads the thresholds from the anchor.
+
+    Args:
+        payload: Parking heatmap payload loaded from disk, updated in place.
+
+    Returns:
+        None.
+    """
+    for feature in payload["features"]:
+        properties = feature.get("properties") if isinstance(feature, dict) else None
+        if not isinstance(properties, dict):
+            continue
+        citation_counts = [
+            int(point[2])
+            for point in properties.get("marker_points") or []
+            if isinstance(point, list) and len(point) > 2 and isinstance(point[2], (int, float))
+        ]
+        properties["marker_frequency_breaks"] = list(_marker_frequency_thresholds(citation_counts))
+
+
 def write_local_parking_tickets_heat_geojson(
     payload: GeoJsonDict,
     output_path: Path | None = None,
@@ -895,30 +928,46 @@ def _attach_heat_intensity(points: list[ParkingHeatPoint]) -> list[ParkingHeatPo
     return weighted_points
 
 
-def _marker_frequency_thresholds(marker_points: list[ParkingMarkerPoint]) -> tuple[int, int, int, int]:
-    """Derive discrete ticket-frequency thresholds for zoomed-in marker styling.
+def _round_up_to_friendly_count(value: int) -> int:
+    """Round a citation count up to a label-friendly threshold.
 
     Args:
-        marker_points: Normalized hotspot rows used for close-up markers.
+        value: Candidate citation-count threshold.
 
     Returns:
-        Tuple of lower-bound thresholds for moderate, high, very-high, and
-        extreme-frequency marker tiers.
+        Rounded-up threshold suitable for a legend label.
     """
-    counts = sorted(
-        int(point["citation_count"])
-        for point in marker_points
-        if int(point["citation_count"]) > 0
-    )
+    value = max(1, value)
+    for limit, step in ((25, 5), (100, 10), (500, 25), (1000, 50)):
+        if value <= limit:
+            return math.ceil(value / step) * step
+    return math.ceil(value / 100) * 100
+
+
+def _marker_frequency_thresholds(citation_counts: list[int]) -> tuple[int, int, int, int]:
+    """Derive hybrid ticket-frequency thresholds for zoomed-in marker styling.
+
+    The first tiers use fixed yearly frequencies (monthly-ish, weekly-ish and
+    several per week) so the legend stays readable. The extreme tier is
+    reserved for outliers: the larger of roughly ten citations per week and
+    the dataset's 99th percentile, rounded to a friendly count. Browsers only
+    receive the markers in view, so the thresholds are computed here over
+    every marker.
+
+    Args:
+        citation_counts: Citation counts of every close-up marker.
+
+    Returns:
+        Tuple of lower-bound thresholds for monthly, weekly, several-per-week,
+        and extreme-frequency marker tiers.
+    """
+    counts = sorted(count for count in citation_counts if count > 0)
+    monthly, weekly, several_per_week, extreme_floor = PARKING_TICKETS_MARKER_BASELINE_BREAKS
     if not counts:
-        return (0, 0, 0, 0)
+        return PARKING_TICKETS_MARKER_BASELINE_BREAKS
 
-    return (
-        _pick_quantile_threshold(counts, 0.50),
-        _pick_quantile_threshold(counts, 0.75),
-        _pick_quantile_threshold(counts, 0.90),
-        _pick_quantile_threshold(counts, 0.975),
-    )
+    percentile_99 = max(1, _pick_quantile_threshold(counts, 0.99))
+    return (monthly, weekly, several_per_week, max(extreme_floor, _round_up_to_friendly_count(percentile_99)))
 
 
 def _build_heat_anchor_feature(
@@ -942,7 +991,7 @@ def _build_heat_anchor_feature(
         window_start: Inclusive start date for the current citation window.
         window_end: Inclusive end date for the current citation window.
         max_citation_count: Largest citation count in the current hotspot set.
-        marker_frequency_breaks: Quantile-derived citation-count thresholds for
+        marker_frequency_breaks: Hybrid citation-count thresholds for
             zoomed-in marker color tiers.
 
     Returns:
@@ -985,6 +1034,7 @@ def _build_heat_anchor_feature(
         "properties": {
             "layer_role": "parking_tickets_heat_anchor",
             "heat_points": heat_points,
+            "heat_grid": build_heat_grid(heat_points),
             "marker_points": marker_point_tuples,
             "heat_max_intensity": 1.0,
             "max_citation_count": max_citation_count,
@@ -1022,7 +1072,9 @@ def _build_live_parking_tickets_heat_geojson() -> GeoJsonDict:
         )
 
         max_citation_count = max((int(point["citation_count"]) for point in heat_points), default=0)
-        marker_frequency_breaks = _marker_frequency_thresholds(marker_points)
+        marker_frequency_breaks = _marker_frequency_thresholds(
+            [int(point["citation_count"]) for point in marker_points]
+        )
         metadata: ParkingLayerMetadata = {
             "window_start": window_start.isoformat(),
             "window_end": window_end.isoformat(),
@@ -0,0 +1,299 @@
+"""Columnar validation, deduplication and bounds filtering for point layers.
+
+Overlay layers are loaded as GeoJSON FeatureCollections and used to be
+cleaned with a per-feature Python loop every time the layer cache was
+(re)built, which for TTL-cached layers happens on a request thread. This
+module extracts the point coordinates once into longitude/latitude arrays and
+keeps the original feature dicts as the property table, so each cleaning step
+is a vectorized mask:
+
+- validation drops Point features without finite coordinates inside the
+  WGS84 range (Leaflet throws on them when building markers);
+- bounds filtering drops Points outside a layer's ``valid_bounds``;
+- deduplication drops exact copies of an earlier feature, comparing
+  properties only among features that share a coordinate.
+
+Non-Point features always pass through untouched. The FeatureCollection is
+only rebuilt when a feature is actually dropped; otherwise the loaded object
+is returned as is.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from itertools import chain
+from operator import itemgetter
+from typing import Any, Optional, TypeAlias
+
+from loguru import logger
+import numpy as np
+import orjson
+
+GeoJsonDict: TypeAlias = dict[str, Any]
+Bounds: TypeAlias = tuple[float, float, float, float]
+Mask = np.ndarray
+
+
+def _coordinate_pair(feature: Any) -> tuple[float, float, bool]:
+    """Read one feature's Point coordinates, tolerating malformed features.
+
+    Args:
+        feature: A GeoJSON feature, possibly malformed.
+
+    Returns:
+        ``(longitude, latitude, is_point)``; coordinates are NaN when the
+        Point has no usable numeric lon/lat pair, and ``is_point`` is
+        ``False`` for features whose geometry is not a Point.
+    """
+    geometry = feature.get("geometry") if isinstance(feature, dict) else None
+    if not isinstance(geometry, dict) or geometry.get("type") != "Point":
+        return np.nan, np.nan, False
+    coordinates = geometry.get("coordinates")
+    if not isinstance(coordinates, (list, tuple)) or len(coordinates) < 2:
+        return np.nan, np.nan, True
+    longitude, latitude = coordinates[0], coordinates[1]
+    if not all(
+        isinstance(value, (int, float)) and not isinstance(value, bool) for value in (longitude, latitude)
+    ):
+        return np.nan, np.nan, True
+    return float(longitude), float(latitude), True
+
+
+def _point_columns(features: list[Any]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Extract longitude, latitude and Point-geometry columns from features.
+
+    Well-formed all-Point layers are read with C-level ``map`` passes and one
+    flat array conversion; anything else falls back to a per-feature reader.
+
+    Args:
+        features: GeoJSON features of one layer.
+
+    Returns:
+        Float longitude and latitude arrays (NaN where unusable) and a boolean
+        array marking Point geometries.
+    """
+    if not features:
+        empty = np.empty(0, dtype=float)
+        return empty, empty.copy(), np.empty(0, dtype=bool)
+    try:
+        geometries = list(map(itemgetter("geometry"), features))
+        if set(map(itemgetter("type"), geometries)) == {"Point"}:
+            coordinates = list(map(itemgetter("coordinates"), geometries))
+            if set(map(len, coordinates)) == {2}:
+                flat = np.array(list(chain.from_iterable(coordinates)))
+                if flat.dtype.kind in "fi":
+                    pairs = flat.astype(float, copy=False).reshape(-1, 2)
+                    return (
+                        np.ascontiguousarray(pairs[:, 0]),
+                        np.ascontiguousarray(pairs[:, 1]),
+                        np.ones(len(features), dtype=bool),
+                    )
+    except (KeyError, TypeError, ValueError):
+        pass
+    longitude, latitude, is_point = zip(*map(_coordinate_pair, features))
+    return (
+        np.fromiter(longitude, dtype=float, count=len(features)),
+        np.fromiter(latitude, dtype=float, count=len(features)),
+        np.fromiter(is_point, dtype=bool, count=len(features)),
+    )
+
+
+def _feature_key(feature: Any) -> bytes | None:
+    """Serialize a feature canonically for exact-duplicate comparison.
+
+    Args:
+        feature: GeoJSON feature to serialize.
+
+    Returns:
+        Key-sorted JSON bytes, or ``None`` when the feature cannot be
+        serialized (it is then never treated as a duplicate).
+    """
+    try:
+        return orjson.dumps(feature, option=orjson.OPT_SORT_KEYS)
+    except (orjson.JSONEncodeError, TypeError):
+        return None
+
+
+@dataclass(frozen=True)
+class PointLayerTable:
+    """Columnar view of one point layer.
+
+    Attributes:
+        members: Top-level FeatureCollection members other than ``features``.
+        features: Original feature dicts, in order; the layer's property table.
+        longitude: Point longitudes (NaN for unusable or non-Point features).
+        latitude: Point latitudes (NaN for unusable or non-Point features).
+        is_point: Whether each feature has a Point geometry.
+        source: The FeatureCollection the table was built from.
+    """
+
+    members: dict[str, Any] = field(repr=False)
+    features: list[Any] = field(repr=False)
+    longitude: np.ndarray = field(repr=False)
+    latitude: np.ndarray = field(repr=False)
+    is_point: np.ndarray = field(repr=False)
+    source: GeoJsonDict = field(repr=False)
+
+    @classmethod
+    def from_geojson(cls, geojson_data: GeoJsonDict) -> PointLayerTable:
+        """Extract the coordinate columns of a FeatureCollection.
+
+        Args:
+            geojson_data: Loaded GeoJSON FeatureCollection.
+
+        Returns:
+            The columnar table; the features themselves are not copied.
+        """
+        features = geojson_data.get("features") or []
+        longitude, latitude, is_point = _point_columns(features)
+        return cls(
+            members={key: value for key, value in geojson_data.items() if key != "features"},
+            features=features,
+            longitude=longitude,
+            latitude=latitude,
+            is_point=is_point,
+            source=geojson_data,
+        )
+
+    def __len__(self) -> int:
+        """Return the number of features.
+
+        Returns:
+            The feature count.
+        """
+        return len(self.features)
+
+    def valid_mask(self) -> Mask:
+        """Mark features that are not Points or have usable WGS84 coordinates.
+
+        Returns:
+            Boolean mask, ``False`` for Points with missing, non-numeric,
+            non-finite or out-of-range coordinates.
+        """
+        with np.errstate(invalid="ignore"):
+            usable = (np.abs(self.longitude) <= 180.0) & (np.abs(self.latitude) <= 90.0)
+        return ~self.is_point | usable
+
+    def bounds_mask(self, bounds: Bounds) -> Mask:
+        """Mark features that are not Points or fall inside a lon/lat box.
+
+        Args:
+            bounds: Inclusive ``(min_lon, max_lon, min_lat, max_lat)`` box.
+
+        Returns:
+            Boolean mask, ``False`` for Points outside the box (including
+            Points without usable coordinates).
+        """
+        min_lon, max_lon, min_lat, max_lat = bounds
+        with np.errstate(invalid="ignore"):
+            inside = (
+                (self.longitude >= min_lon)
+                & (self.longitude <= max_lon)
+                & (self.latitude >= min_lat)
+                & (self.latitude <= max_lat)
+            )
+        return ~self.is_point | inside
+
+    def duplicate_mask(self, candidates: Optional[Mask] = None) -> Mask:
+        """Mark Points that exactly repeat an earlier Point feature.
+
+        Coordinates are grouped with a NumPy sort; whole features are only
+        compared within groups of two or more Points at the same coordinate.
+
+        Args:
+            candidates: Optional mask restricting which features take part;
+                features outside it are never marked nor matched against.
+
+        Returns:
+            Boolean mask, ``True`` for every exact repeat after its first
+            occurrence.
+        """
+        duplicates = np.zeros(len(self), dtype=bool)
+        eligible = self.is_point & np.isfinite(self.longitude) & np.isfinite(self.latitude)
+        if candidates is not None:
+            eligible &= candidates
+        positions = np.flatnonzero(eligible)
+        if len(positions) < 2:
+            return duplicates
+
+        # Distinct lon/lat pairs map to distinct complex keys; a stable sort
+        # keeps each coordinate group in feature order.
+        keys = self.longitude[positions] + 1j * self.latitude[positions]
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        same_as_previous = np.concatenate(([False], sorted_keys[1:] == sorted_keys[:-1]))
+        colliding = same_as_previous | np.concatenate((same_as_previous[1:], [False]))
+        group_ids = np.cumsum(~same_as_previous)
+        seen: set[tuple[int, bytes]] = set()
+        for position, group_id in zip(positions[order[colliding]].tolist(), group_ids[colliding].tolist()):
+            key = _feature_key(self.features[position])
+            if key is None:
+                continue
+            if (group_id, key) in seen:
+                duplicates[position] = True
+            else:
+                seen.add((group_id, key))
+        return duplicates
+
+    def to_geojson(self, keep: Mask) -> GeoJsonDict:
+        """Rebuild the FeatureCollection for the kept features.
+
+        Args:
+            keep: Boolean mask of features to keep.
+
+        Returns:
+            The source object itself when every feature is kept; otherwise a
+            shallow copy with the kept features in their original order.
+        """
+        if bool(keep.all()):
+            return self.source
+        features = self.features
+        return {**self.members, "features": [features[position] for position in np.flatnonzero(keep).tolist()]}
+
+
+def prepare_point_layer(
+    geojson_data: GeoJsonDict,
+    *,
+    bounds: Optional[Bounds] = None,
+    validate: bool = True,
+    deduplicate: bool = True,
+) -> GeoJsonDict:
+    """Validate, deduplicate and bounds-filter a loaded layer in one pass.
+
+    Args:
+        geojson_data: Loaded GeoJSON FeatureCollection.
+        bounds: Optional ``(min_lon, max_lon, min_lat, max_lat)`` box Points
+            must fall inside.
+        validate: Whether to drop Points without usable WGS84 coordinates.
+        deduplicate: Whether to drop exact repeats of an earlier feature.
+
+    Returns:
+        The cleaned FeatureCollection; the input object itself when nothing
+        was dropped.
+    """
+    if not isinstance(geojson_data, dict) or not isinstance(geojson_data.get("features"), list):
+        return geojson_data
+    table = PointLayerTable.from_geojson(geojson_data)
+    keep = np.ones(len(table), dtype=bool)
+    dropped: list[str] = []
+
+    if validate:
+        valid = table.valid_mask()
+        if not valid.all():
+            dropped.append(f"{int((~valid).sum())} invalid")
+        keep &= valid
+    if bounds is not None:
+        inside = table.bounds_mask(bounds)
+        outside = keep & ~inside
+        if outside.any():
+            dropped.append(f"{int(outside.sum())} out-of-bounds")
+        keep &= inside
+    if deduplicate:
+        duplicates = table.duplicate_mask(keep)
+        if duplicates.any():
+            dropped.append(f"{int(duplicates.sum())} duplicate")
+        keep &= ~duplicates
+
+    if dropped:
+        logger.warning(f"Filtered {', '.join(dropped)} point features from GeoJSON payload.")
+    return table.to_geojson(keep)
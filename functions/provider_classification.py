@@ -0,0 +1,31 @@
+"""SQL expressions classifying broadband provider rows for listing popups.
+
+Kept apart from the broadband merge pipeline so the ISP route can share them
+without importing the merge's GeoPandas machinery.
+"""
+
+# Popup classification of a provider row. Stored on the provider-options table
+# at merge time; the ISP route evaluates the same expressions for databases
+# merged before these columns existed.
+PROVIDER_SERVICE_TYPE_SQL = """
+    CASE
+      WHEN TechCode IN (10, 11, 12, 20) THEN 'DSL'
+      WHEN TechCode = 40 THEN 'Cable'
+      WHEN TechCode = 50 THEN 'Fiber'
+      WHEN TechCode = 60 THEN 'Satellite'
+      WHEN TechCode IN (70, 71, 72) THEN 'Terrestrial Fixed Wireless'
+      ELSE COALESCE(Service_Type, 'Unknown')
+    END
+"""
+
+PROVIDER_BUCKET_SQL = """
+    CASE
+      WHEN TechCode = 50 THEN 'best'
+      WHEN TechCode IN (40, 43) AND COALESCE(MaxAdDn, 0) >= 1000 THEN 'best'
+      WHEN COALESCE(MaxAdDn, 0) >= 1000 THEN 'best'
+      WHEN TechCode IN (40, 43) THEN 'good'
+      WHEN TechCode IN (70, 71, 72) AND COALESCE(MaxAdDn, 0) >= 100 THEN 'good'
+      WHEN COALESCE(MaxAdDn, 0) >= 100 THEN 'good'
+      ELSE 'fallback'
+    END
+"""
@@ -14,13 +14,26 @@ import json
 import logging
 import re
 import time
+from dataclasses import dataclass, field
 from functools import lru_cache
 from pathlib import Path
 from typing import Any, TypedDict
 
+import numpy as np
 import orjson
+import pandas as pd
 import requests
 
+from functions.column_files import (
+    ColumnFile,
+    KeyIndex,
+    StringColumn,
+    artifact_digest,
+    column_file_path,
+    current_artifact_digest,
+    open_column_file,
+    write_column_file,
+)
 from functions.data_paths import RSO_PROPERTY_LOOKUP_PATH
 
 logger = logging.getLogger(__name__)
@@ -34,6 +47,21 @@ RSO_POWERBI_RESOURCE_KEY = "3db255db-5477-4b7c-8624-7f37f177efac"
 RSO_POWERBI_MODEL_ID = 264470
 RSO_SOURCE_DESCRIPTION = "LAHD public RSO dashboard inventory"
 RSO_REQUEST_TIMEOUT_SECONDS = 60
+# Bump when the RSO column-file layout or address normalization changes.
+RSO_LOOKUP_COLUMN_FILE_KIND = "rso-listing-lookup/1"
+_RSO_TEXT_FIELDS: tuple[str, ...] = ("unit_range", "apn", "address")
+# Enrichment column -> ``RsoListingLookupResult`` field for stored listing summaries.
+RSO_SUMMARY_ENRICHMENT_FIELDS: dict[str, str] = {
+    "rso_matched": "matched",
+    "rso_coverage": "coverage",
+    "rso_units": "rso_units",
+    "rso_unit_range": "unit_range",
+    "rso_apn": "apn",
+    "rso_address": "address",
+    "rso_year": "rso_year",
+}
+# Digest of the lookup artifact a stored summary was computed from.
+RSO_SUMMARY_SOURCE_COLUMN = "rso_summary_source"
 
 _UNIT_RE = re.compile(r"(?:\s*(?:#|APT\.?|APARTMENT|UNIT|STE|SUITE)\s*[A-Z0-9-]+)\s*$", re.IGNORECASE)
 _STREET_SUFFIX_NORMALIZATION = {
@@ -160,18 +188,55 @@ def _result_from_record(record: dict[str, Any]) -> RsoListingLookupResult:
     }
 
 
-@lru_cache(maxsize=4)
-def _load_lookup(artifact_path: str, artifact_mtime_ns: int) -> dict[str, Any]:
-    """Load and index the local RSO inventory by normalized address.
+def rso_listing_summary_enrichment_values(summary: RsoListingLookupResult, source_digest: str) -> dict[str, object]:
+    """Flatten a listing summary into its enrichment-table columns.
+
+    Args:
+        summary: Result of ``lookup_rso_property_for_listing``.
+        source_digest: Digest of the lookup artifact the summary came from.
+
+    Returns:
+        Enrichment column name to value.
+    """
+    values: dict[str, object] = {column: summary[field] for column, field in RSO_SUMMARY_ENRICHMENT_FIELDS.items()}
+    values["rso_matched"] = int(summary["matched"])
+    values[RSO_SUMMARY_SOURCE_COLUMN] = source_digest
+    return values
+
+
+def stored_rso_listing_summary(
+    row: dict[str, Any],
+    artifact_path: Path = RSO_PROPERTY_LOOKUP_PATH,
+) -> RsoListingLookupResult | None:
+    """Rebuild a listing summary from stored enrichment columns.
+
+    Args:
+        row: Listing row carrying the ``rso_*`` enrichment columns.
+        artifact_path: Filesystem path to the local data artifact.
+
+    Returns:
+        The stored summary, or ``None`` when none was stored or it was
+        computed from another version of the lookup artifact.
+    """
+    source = row.get(RSO_SUMMARY_SOURCE_COLUMN)
+    if source is None or source != current_artifact_digest(artifact_path):
+        return None
+    summary = _empty_result(data_available=True)
+    for column, field in RSO_SUMMARY_ENRICHMENT_FIELDS.items():
+        summary[field] = row.get(column)  # type: ignore[literal-required]
+    summary["matched"] = bool(row.get("rso_matched"))
+    return summary
+
+
+def _prepare_lookup(artifact_path: str) -> dict[str, Any]:
+    """Parse the local RSO inventory and index it by normalized address.
 
     Args:
         artifact_path: Filesystem path to the local data artifact.
-        artifact_mtime_ns: Artifact modification time used to invalidate the cache.
 
     Returns:
         A mapping containing the loaded lookup.
     """
-    del artifact_mtime_ns
     try:
         with gzip.open(artifact_path, "rb") as artifact_file:
             payload = orjson.loads(artifact_file.read())
@@ -199,6 +264,187 @@ def _load_lookup(artifact_path: str, artifact_mtime_ns: int) -> dict[str, Any]:
     return {"records": address_index, "metadata": metadata if isinstance(metadata, dict) else {}}
 
 
+@dataclass(frozen=True)
+class RsoLookupIndex:
+    """Address-indexed RSO inventory held as arrays.
+
+    Attributes:
+        address_rows: Normalized address to the row of its newest record.
+        rso_units: RSO unit count per row, ``-1`` when unknown.
+        rso_year: RSO registration year per row, ``-1`` when unknown.
+        texts: ``unit_range``, ``apn`` and ``address`` string columns.
+        metadata: Artifact metadata.
+    """
+
+    address_rows: KeyIndex = field(repr=False)
+    rso_units: np.ndarray = field(repr=False)
+    rso_year: np.ndarray = field(repr=False)
+    texts: dict[str, StringColumn] = field(repr=False)
+    metadata: dict[str, Any] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_prepared(cls, prepared: dict[str, Any]) -> RsoLookupIndex:
+        """Build the index from ``_prepare_lookup`` output.
+
+        Args:
+            prepared: Records keyed by normalized address, plus metadata.
+
+        Returns:
+            The RSO lookup index.
+        """
+        records_by_key: dict[str, Any] = prepared.get("records") or {}
+        records = list(records_by_key.values())
+
+        def year_or_unit(name: str) -> np.ndarray:
+            """Parse one integer column, using ``-1`` for unknown values.
+
+            Args:
+                name: Record field to parse.
+
+            Returns:
+                The parsed column.
+            """
+            parsed = (_parse_int(record.get(name)) for record in records)
+            return np.fromiter((-1 if value is None else value for value in parsed), dtype=np.int64, count=len(records))
+
+        return cls(
+            address_rows=KeyIndex.from_mapping({key: row for row, key in enumerate(records_by_key)}),
+            rso_units=year_or_unit("rso_units"),
+            rso_year=year_or_unit("rso_year"),
+            texts={
+                name: StringColumn.from_values(
+                    [str(record.get(name)) if record.get(name) not in (None, "") else None for record in records]
+                )
+                for name in _RSO_TEXT_FIELDS
+            },
+            metadata=prepared.get("metadata") or {},
+        )
+
+    @classmethod
+    def from_column_file(cls, column_file: ColumnFile) -> RsoLookupIndex:
+        """Wrap the arrays of a mapped column file without copying them.
+
+        Args:
+            column_file: Column file written from ``column_arrays``.
+
+        Returns:
+            The RSO lookup index backed by the mapped arrays.
+        """
+        arrays = column_file.arrays
+        return cls(
+            address_rows=KeyIndex.from_arrays(arrays, "address_rows"),
+            rso_units=arrays["rso_units"],
+            rso_year=arrays["rso_year"],
+            texts={name: StringColumn.from_arrays(arrays, name) for name in _RSO_TEXT_FIELDS},
+            metadata=dict(column_file.attributes.get("metadata") or {}),
+        )
+
+    def column_arrays(self) -> dict[str, np.ndarray]:
+        """Return every array of the index, named for a column file.
+
+        Returns:
+            Array name to array.
+        """
+        arrays = {"rso_units": self.rso_units, "rso_year": self.rso_year}
+        arrays.update(self.address_rows.arrays("address_rows"))
+        for name, column in self.texts.items():
+            arrays.update(column.arrays(name))
+        return arrays
+
+    def __len__(self) -> int:
+        """Return the number of indexed properties.
+
+        Returns:
+            The property count.
+        """
+        return len(self.address_rows)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return the record for a normalized address.
+
+        Args:
+            key: Address normalized with ``_normalize_address``.
+
+        Returns:
+            The record's popup fields, or ``None`` when the address is not
+            in the inventory.
+        """
+        row = self.address_rows.get(key)
+        if row is None:
+            return None
+        rso_units = int(self.rso_units[row])
+        rso_year = int(self.rso_year[row])
+        return {
+            "rso_units": rso_units if rso_units >= 0 else None,
+            "rso_year": rso_year if rso_year >= 0 else None,
+            **{name: self.texts[name][row] for name in _RSO_TEXT_FIELDS},
+        }
+
+
+def _open_lookup_columns(path: Path) -> RsoLookupIndex | None:
+    """Map the RSO column file when it was built from the current artifact.
+
+    Args:
+        path: RSO lookup artifact.
+
+    Returns:
+        The mapped index, or ``None`` when no current column file exists.
+    """
+    column_file = open_column_file(column_file_path(path), kind=RSO_LOOKUP_COLUMN_FILE_KIND)
+    if column_file is None:
+        return None
+    if column_file.attributes.get("source_digest") != current_artifact_digest(path):
+        logger.info("Ignoring RSO column file built from another version of %s.", path)
+        return None
+    return RsoLookupIndex.from_column_file(column_file)
+
+
+@lru_cache(maxsize=4)
+def _load_lookup(artifact_path: str, artifact_mtime_ns: int) -> RsoLookupIndex:
+    """Load the address-indexed RSO inventory.
+
+    A current column file (``build-rso-property-lookup --columns``, run by
+    the Docker build) is memory-mapped with no parse step and shared by every
+    worker through the page cache. Without one, the inventory is parsed and
+    indexed in-process.
+
+    Args:
+        artifact_path: Filesystem path to the local data artifact.
+        artifact_mtime_ns: Artifact modification time used to invalidate the cache.
+
+    Returns:
+        The RSO lookup index.
+    """
+    path = Path(artifact_path)
+    if path.is_file():
+        mapped = _open_lookup_columns(path)
+        if mapped is not None:
+            return mapped
+    return RsoLookupIndex.from_prepared(_prepare_lookup(artifact_path))
+
+
+def write_rso_lookup_column_file(artifact_path: Path = RSO_PROPERTY_LOOKUP_PATH) -> Path:
+    """Write the memory-mappable column file for an RSO lookup artifact.
+
+    Args:
+        artifact_path: RSO lookup artifact to index.
+
+    Returns:
+        The written column-file path.
+    """
+    source_digest = artifact_digest(artifact_path)
+    index = RsoLookupIndex.from_prepared(_prepare_lookup(str(artifact_path)))
+    output_path = write_column_file(
+        column_file_path(artifact_path),
+        kind=RSO_LOOKUP_COLUMN_FILE_KIND,
+        arrays=index.column_arrays(),
+        attributes={"metadata": index.metadata, "source_digest": source_digest},
+    )
+    _load_lookup.cache_clear()
+    logger.info("Wrote %s RSO lookup rows to %s.", len(index), output_path)
+    return output_path
+
+
 def lookup_rso_property_for_listing(
     address: object,
     artifact_path: Path = RSO_PROPERTY_LOOKUP_PATH,
@@ -220,9 +466,20 @@ def lookup_rso_property_for_listing(
     key = _normalize_address(address)
     if not key:
         return _empty_result(data_available=True)
-    lookup = _load_lookup(str(artifact_path), mtime_ns)
-    record = (lookup.get("records") or {}).get(key)
-    return _result_from_record(record) if isinstance(record, dict) else _empty_result(data_available=True)
+    record = _load_lookup(str(artifact_path), mtime_ns).get(key)
+    return _result_from_record(record) if record is not None else _empty_result(data_available=True)
+
+
+def rso_property_lookup_version(artifact_path: Path = RSO_PROPERTY_LOOKUP_PATH) -> str:
+    """Return a version token for the local RSO lookup artifact.
+
+    Args:
+        artifact_path: Filesystem path to the local data artifact.
+
+    Returns:
+        The artifact's content digest, or ``"missing"`` if unavailable.
+    """
+    return current_artifact_digest(artifact_path) or "missing"
 
 
 def prewarm_rso_property_lookup_cache(
@@ -245,40 +502,52 @@ def prewarm_rso_property_lookup_cache(
     _load_lookup(str(artifact_path), mtime_ns)
 
 
-def add_rso_status_to_listing_geojson(payload: dict[str, Any]) -> dict[str, Any]:
-    """Attach a client-filter-friendly RSO status to each listing feature.
+def add_rso_status_column(
+    listings: pd.DataFrame,
+    artifact_path: Path = RSO_PROPERTY_LOOKUP_PATH,
+) -> pd.DataFrame:
+    """Return a copy of the listings with a client-filter-friendly RSO status.
 
     Listings outside LA City and listings not found in the public inventory are
     intentionally both ``unknown``. An inventory omission is not a finding that
     a property is not rent controlled.
 
     Args:
-        payload: Structured request, listing, or artifact payload to validate or summarize.
+        listings: Listing rows with a ``full_street_address`` column.
+        artifact_path: Filesystem path to the local data artifact.
 
     Returns:
-        A mapping containing the updated RSO status to listing GeoJSON.
+        A new frame with a ``rent_control_status`` column; ``listings`` is
+        left unchanged.
     """
-    features = payload.get("features")
-    if not isinstance(features, list):
-        return payload
-
     try:
-        mtime_ns = RSO_PROPERTY_LOOKUP_PATH.stat().st_mtime_ns
-        address_index = _load_lookup(str(RSO_PROPERTY_LOOKUP_PATH), mtime_ns).get("records") or {}
+        mtime_ns = artifact_path.stat().st_mtime_ns
+        lookup: RsoLookupIndex | None = _load_lookup(str(artifact_path), mtime_ns)
     except OSError:
-        address_index = {}
+        lookup = None
 
-    for feature in features:
-        properties = feature.get("properties") if isinstance(feature, dict) else None
-        if not isinstance(properties, dict):
-            continue
-        record = address_index.get(_normalize_address(properties.get("full_street_address")))
-        properties["rent_control_status"] = (
-            _coverage_from_counts(_parse_int(record.get("rso_units")) or 0, str(record.get("unit_range") or ""))
-            if isinstance(record, dict)
-            else "unknown"
-        )
-    return payload
+    statuses: dict[object, str] = {}
+
+    def status_for(address: object) -> str:
+        """Resolve and memoize the RSO status for one raw address.
+
+        Args:
+            address: Raw listing street address.
+
+        Returns:
+            The listing's RSO coverage status.
+        """
+        if address not in statuses:
+            record = lookup.get(_normalize_address(address)) if lookup is not None else None
+            statuses[address] = (
+                _coverage_from_counts(_parse_int(record.get("rso_units")) or 0, str(record.get("unit_range") or ""))
+                if record is not None
+                else "unknown"
+            )
+        return statuses[address]
+
+    addresses = listings["full_street_address"] if "full_street_address" in listings.columns else [None] * len(listings)
+    return listings.assign(rent_control_status=[status_for(address) for address in addresses])
 
 
 def _powerbi_headers(request_id: str) -> dict[str, str]:
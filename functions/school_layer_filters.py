@@ -0,0 +1,583 @@
+"""Indexed, memoized filtering for the map-only school layer controls.
+
+``filter_school_layer_geojson`` walks every school feature and re-normalizes
+its properties on each call. The school controls fire a callback on every
+change (including each enrollment-slider step), so this module extracts the
+filterable attributes once per school-layer version into NumPy arrays:
+
+- categorical attributes (level, campus configuration, funding type) as
+  integer codes into a casefolded vocabulary;
+- grade bands as a per-school bitset;
+- flags and early-grade offerings as boolean arrays;
+- enrollment as a float array plus a "known" mask;
+- the search text as one casefolded haystack with per-school offsets, so a
+  name search is a handful of ``str.find`` calls instead of a Python loop.
+
+A filter pass is then a few vectorized mask operations, and finished
+FeatureCollections are memoized in a small LRU keyed by the layer version and
+the normalized filter state. ``filter_school_layer_geojson`` stays the
+reference implementation; the two must agree.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Sequence
+import threading
+
+import numpy as np
+import pandas as pd
+
+from functions.layers import (
+    DEFAULT_SCHOOL_LAYER_ENROLLMENT_MAX,
+    SCHOOL_LAYER_GRADE_BAND_OPTIONS,
+    GeoJsonDict,
+    LayersClass,
+    _normalize_school_flag,
+    _normalize_school_text,
+)
+
+SCHOOL_FILTER_RESULT_CACHE_MAX_ENTRIES = 256
+# Separates schools in the search haystack; a search containing it matches nothing.
+_SEARCH_SEPARATOR = "\x00"
+_MAX_GRADE_BANDS = 64
+
+Mask = np.ndarray
+
+
+def _normalized_selection(values: Sequence[Any] | None) -> frozenset[str]:
+    """Casefold a multi-select value the way the reference filter does.
+
+    Args:
+        values: Selected option values from a school control.
+
+    Returns:
+        The non-blank selections, stripped and casefolded.
+    """
+    return frozenset(
+        value.strip().casefold() for value in (values or []) if isinstance(value, str) and value.strip()
+    )
+
+
+@dataclass(frozen=True)
+class SchoolLayerFilters:
+    """Normalized, hashable state of the school layer controls.
+
+    Attributes:
+        search: Casefolded search text, or ``""`` when not searching.
+        levels: Selected school levels.
+        grade_bands: Selected grade bands; empty when every band is selected.
+        campus_configurations: Selected campus configurations.
+        early_grades: Selected early-grade options (``tk``, ``kindergarten``).
+        funding_types: Selected funding types.
+        enrollment_range: Inclusive ``(min, max)`` enrollment, or ``None``.
+        charter_only: Whether to keep charter schools only.
+        magnet_only: Whether to keep magnet schools only.
+        title_i_only: Whether to keep Title I schools only.
+        recently_opened_only: Whether to keep recently opened schools only.
+    """
+
+    search: str = ""
+    levels: frozenset[str] = frozenset()
+    grade_bands: frozenset[str] = frozenset()
+    campus_configurations: frozenset[str] = frozenset()
+    early_grades: frozenset[str] = frozenset()
+    funding_types: frozenset[str] = frozenset()
+    enrollment_range: tuple[float, float] | None = None
+    charter_only: bool = False
+    magnet_only: bool = False
+    title_i_only: bool = False
+    recently_opened_only: bool = False
+
+    @classmethod
+    def from_controls(
+        cls,
+        *,
+        search_text: str | None = None,
+        school_levels: Sequence[str] | None = None,
+        grade_bands: Sequence[str] | None = None,
+        campus_configurations: Sequence[str] | None = None,
+        early_grades: Sequence[str] | None = None,
+        funding_types: Sequence[str] | None = None,
+        enrollment_range: Sequence[float] | None = None,
+        charter_only: bool = False,
+        magnet_only: bool = False,
+        title_i_only: bool = False,
+        recently_opened_only: bool = False,
+    ) -> SchoolLayerFilters:
+        """Normalize raw control values into a filter state.
+
+        Args:
+            search_text: Case-insensitive school-name search text.
+            school_levels: Selected school-level labels.
+            grade_bands: Selected elementary, middle, or high-school grade bands.
+            campus_configurations: Selected campus configurations.
+            early_grades: Selected early-grade options.
+            funding_types: Selected school funding types.
+            enrollment_range: Inclusive student-enrollment range.
+            charter_only: Whether to restrict results to charter schools.
+            magnet_only: Whether to restrict results to magnet schools.
+            title_i_only: Whether to restrict results to Title I schools.
+            recently_opened_only: Whether to restrict results to recently opened schools.
+
+        Returns:
+            The normalized filter state.
+        """
+        selected_bands = _normalized_selection(grade_bands)
+        if selected_bands == _normalized_selection(SCHOOL_LAYER_GRADE_BAND_OPTIONS):
+            selected_bands = frozenset()
+        range_values = list(enrollment_range or [])
+        return cls(
+            search=(_normalize_school_text(search_text) or "").casefold(),
+            levels=_normalized_selection(school_levels),
+            grade_bands=selected_bands,
+            campus_configurations=_normalized_selection(campus_configurations),
+            early_grades=_normalized_selection(early_grades),
+            funding_types=_normalized_selection(funding_types),
+            enrollment_range=(float(range_values[0]), float(range_values[1])) if len(range_values) >= 2 else None,
+            charter_only=bool(charter_only),
+            magnet_only=bool(magnet_only),
+            title_i_only=bool(title_i_only),
+            recently_opened_only=bool(recently_opened_only),
+        )
+
+
+@dataclass(frozen=True)
+class CategoricalColumn:
+    """Integer codes into a vocabulary of casefolded values.
+
+    Attributes:
+        codes: Code per school.
+        vocabulary: Casefolded value to code.
+    """
+
+    codes: np.ndarray = field(repr=False)
+    vocabulary: dict[str, int] = field(repr=False)
+
+    def isin(self, selected: frozenset[str]) -> Mask:
+        """Return which schools hold one of the selected values.
+
+        Args:
+            selected: Casefolded values to keep.
+
+        Returns:
+            A boolean mask aligned with the schools.
+        """
+        selected_codes = [self.vocabulary[value] for value in selected if value in self.vocabulary]
+        return np.isin(self.codes, selected_codes)
+
+
+@dataclass(frozen=True)
+class SchoolLayerIndex:
+    """Filterable school attributes extracted from one school-layer version.
+
+    Attributes:
+        version: School-layer version the arrays were extracted from.
+        members: Top-level FeatureCollection members other than ``features``.
+        features: Features returned for matches (already projected for output).
+        search_haystack: Casefolded search texts joined by a separator.
+        search_offsets: Start offset of each school's text in the haystack.
+        levels: School level codes.
+        campus_configurations: Campus configuration (grade span) codes.
+        funding_types: Funding type codes.
+        grade_band_bits: Bitset of each school's grade bands.
+        grade_band_vocabulary: Casefolded grade band to bit position.
+        offers_tk: Whether each school offers transitional kindergarten.
+        offers_kindergarten: Whether each school offers kindergarten.
+        enrollment: Parsed enrollment (NaN where unparseable as a number).
+        enrollment_known: Whether each school reports an enrollment value.
+        charter: Whether each school is a charter school.
+        magnet: Whether each school is a magnet school.
+        title_i: Whether each school is a Title I school.
+        recently_opened: Whether each school opened recently.
+    """
+
+    version: str
+    members: dict[str, Any] = field(repr=False)
+    features: list[GeoJsonDict] = field(repr=False)
+    search_haystack: str = field(repr=False)
+    search_offsets: list[int] = field(repr=False)
+    levels: CategoricalColumn = field(repr=False)
+    campus_configurations: CategoricalColumn = field(repr=False)
+    funding_types: CategoricalColumn = field(repr=False)
+    grade_band_bits: np.ndarray = field(repr=False)
+    grade_band_vocabulary: dict[str, int] = field(repr=False)
+    offers_tk: np.ndarray = field(repr=False)
+    offers_kindergarten: np.ndarray = field(repr=False)
+    enrollment: np.ndarray = field(repr=False)
+    enrollment_known: np.ndarray = field(repr=False)
+    charter: np.ndarray = field(repr=False)
+    magnet: np.ndarray = field(repr=False)
+    title_i: np.ndarray = field(repr=False)
+    recently_opened: np.ndarray = field(repr=False)
+
+    def __len__(self) -> int:
+        """Return the number of indexed schools.
+
+        Returns:
+            The feature count.
+        """
+        return len(self.features)
+
+    def feature_collection(self, positions: np.ndarray) -> GeoJsonDict:
+        """Build the FeatureCollection for matching schools.
+
+        Args:
+            positions: Sorted positions of matching schools.
+
+        Returns:
+            The layer's top-level members with the matching features.
+        """
+        features = self.features
+        return {**self.members, "features": [features[position] for position in positions.tolist()]}
+
+
+def _categorical(values: list[Any]) -> CategoricalColumn:
+    """Factorize values normalized as ``str(value or "").strip().casefold()``.
+
+    Args:
+        values: Raw property values.
+
+    Returns:
+        The codes and their vocabulary.
+    """
+    normalized = [str(value or "").strip().casefold() for value in values]
+    codes, uniques = pd.factorize(pd.Series(normalized, dtype=object))
+    return CategoricalColumn(
+        codes=codes.astype(np.int32, copy=False),
+        vocabulary={value: code for code, value in enumerate(uniques)},
+    )
+
+
+def _enrollment(values: list[Any]) -> tuple[np.ndarray, np.ndarray]:
+    """Parse enrollment values the way the reference filter does.
+
+    Args:
+        values: Raw ``enrollment_total`` properties.
+
+    Returns:
+        ``(enrollment, known)``: parsed numbers (NaN where unknown) and
+        whether each value counts as reported.
+    """
+    enrollment = np.full(len(values), np.nan)
+    known = np.zeros(len(values), dtype=bool)
+    for position, value in enumerate(values):
+        if value in (None, "", "Unknown"):
+            continue
+        try:
+            enrollment[position] = float(value)
+        except (TypeError, ValueError):
+            continue
+        known[position] = True
+    return enrollment, known
+
+
+def _grade_band_bits(values: list[Any]) -> tuple[np.ndarray, dict[str, int]]:
+    """Encode each school's grade bands as a bitset.
+
+    Args:
+        values: Raw ``grade_bands`` properties (lists of band labels).
+
+    Returns:
+        The bitset per school and the band-to-bit vocabulary.
+
+    Raises:
+        ValueError: If the layer uses more distinct bands than fit in a bitset.
+    """
+    vocabulary: dict[str, int] = {}
+    bits = np.zeros(len(values), dtype=np.uint64)
+    for position, bands in enumerate(values):
+        row = 0
+        for band in bands or []:
+            if not band:
+                continue
+            key = str(band).strip().casefold()
+            bit = vocabulary.setdefault(key, len(vocabulary))
+            if bit >= _MAX_GRADE_BANDS:
+                raise ValueError(f"School layer has more than {_MAX_GRADE_BANDS} distinct grade bands.")
+            row |= 1 << bit
+        bits[position] = row
+    return bits, vocabulary
+
+
+def build_school_layer_index(
+    geojson_data: GeoJsonDict | None,
+    *,
+    version: str,
+    output_features: Callable[[GeoJsonDict], GeoJsonDict] | None = None,
+) -> SchoolLayerIndex:
+    """Extract the filterable school attributes from a school-layer FeatureCollection.
+
+    Args:
+        geojson_data: School-layer GeoJSON feature collection.
+        version: School-layer version the arrays are extracted from.
+        output_features: Optional transform applied once to the collection to
+            produce the features returned for matches, such as a property
+            projection. Filtering always reads the untransformed properties.
+
+    Returns:
+        The index used by :func:`filter_school_layer_positions`.
+    """
+    geojson_data = geojson_data or {"type": "FeatureCollection", "features": []}
+    features = list(geojson_data.get("features") or [])
+    properties = [feature.get("properties") or {} for feature in features]
+
+    def column(name: str) -> list[Any]:
+        """Collect one property across every school.
+
+        Args:
+            name: Property key to collect.
+
+        Returns:
+            Raw property values aligned with ``features``.
+        """
+        return [props.get(name) for props in properties]
+
+    def flags(name: str, normalize: Callable[[Any], bool]) -> np.ndarray:
+        """Evaluate a boolean property for every school.
+
+        Args:
+            name: Property key to read.
+            normalize: Converts a raw value into the flag.
+
+        Returns:
+            A boolean array aligned with ``features``.
+        """
+        return np.fromiter((normalize(value) for value in column(name)), dtype=bool, count=len(features))
+
+    search_texts = [str(value or "").casefold() for value in column("search_text")]
+    search_offsets: list[int] = []
+    offset = 0
+    for text in search_texts:
+        search_offsets.append(offset)
+        offset += len(text) + len(_SEARCH_SEPARATOR)
+
+    output = output_features(geojson_data) if output_features is not None else geojson_data
+    grade_band_bits, grade_band_vocabulary = _grade_band_bits(column("grade_bands"))
+    enrollment, enrollment_known = _enrollment(column("enrollment_total"))
+    return SchoolLayerIndex(
+        version=version,
+        members={key: value for key, value in geojson_data.items() if key != "features"},
+        features=list(output.get("features") or []),
+        search_haystack=_SEARCH_SEPARATOR.join(search_texts),
+        search_offsets=search_offsets,
+        levels=_categorical(column("school_level")),
+        campus_configurations=_categorical(column("grade_span_display")),
+        funding_types=_categorical(column("funding_type")),
+        grade_band_bits=grade_band_bits,
+        grade_band_vocabulary=grade_band_vocabulary,
+        offers_tk=flags("offers_tk_flag", bool),
+        offers_kindergarten=flags("offers_kindergarten_flag", bool),
+        enrollment=enrollment,
+        enrollment_known=enrollment_known,
+        charter=flags("charter_flag", lambda value: _normalize_school_flag(value) == 1),
+        magnet=flags("magnet_flag", lambda value: _normalize_school_flag(value) == 1),
+        title_i=flags("title_i_flag", lambda value: _normalize_school_flag(value) == 1),
+        recently_opened=flags("recently_opened_flag", bool),
+    )
+
+
+def _search_mask(index: SchoolLayerIndex, needle: str) -> Mask:
+    """Mark schools whose search text contains ``needle``.
+
+    Args:
+        index: School layer index.
+        needle: Casefolded, non-empty search text.
+
+    Returns:
+        A boolean mask aligned with the schools.
+    """
+    mask = np.zeros(len(index), dtype=bool)
+    if _SEARCH_SEPARATOR in needle:
+        return mask
+    haystack, offsets = index.search_haystack, index.search_offsets
+    position = haystack.find(needle)
+    while position != -1:
+        school = bisect_right(offsets, position) - 1
+        mask[school] = True
+        if school + 1 >= len(offsets):
+            break
+        position = haystack.find(needle, offsets[school + 1])
+    return mask
+
+
+def filter_school_layer_positions(index: SchoolLayerIndex, filters: SchoolLayerFilters) -> np.ndarray:
+    """Return the positions of schools that pass every active filter.
+
+    Args:
+        index: School layer index.
+        filters: Normalized control state.
+
+    Returns:
+        Sorted integer positions into ``index.features``.
+    """
+    mask = np.ones(len(index), dtype=bool)
+    if filters.search:
+        mask &= _search_mask(index, filters.search)
+    if filters.levels:
+        mask &= index.levels.isin(filters.levels)
+    if filters.grade_bands:
+        selected_bits = 0
+        for band in filters.grade_bands:
+            if band in index.grade_band_vocabulary:
+                selected_bits |= 1 << index.grade_band_vocabulary[band]
+        mask &= (index.grade_band_bits & np.uint64(selected_bits)) != 0
+    if filters.campus_configurations:
+        mask &= index.campus_configurations.isin(filters.campus_configurations)
+    if filters.early_grades:
+        early = np.zeros(len(index), dtype=bool)
+        if "tk" in filters.early_grades:
+            early |= index.offers_tk
+        if "kindergarten" in filters.early_grades:
+            early |= index.offers_kindergarten
+        mask &= early
+    if filters.funding_types:
+        mask &= index.funding_types.isin(filters.funding_types)
+    if filters.enrollment_range is not None:
+        minimum, maximum = filters.enrollment_range
+        in_range = (index.enrollment >= minimum) & (index.enrollment <= maximum)
+        full_range = minimum <= 0 and maximum >= DEFAULT_SCHOOL_LAYER_ENROLLMENT_MAX
+        mask &= np.where(index.enrollment_known, in_range, full_range)
+    if filters.charter_only:
+        mask &= index.charter
+    if filters.magnet_only:
+        mask &= index.magnet
+    if filters.title_i_only:
+        mask &= index.title_i
+    if filters.recently_opened_only:
+        mask &= index.recently_opened
+    return np.flatnonzero(mask)
+
+
+class SchoolFilterResultCache:
+    """Thread-safe LRU of filtered FeatureCollections keyed by ``(version, filters)``."""
+
+    def __init__(self, max_entries: int = SCHOOL_FILTER_RESULT_CACHE_MAX_ENTRIES) -> None:
+        """Create an empty cache.
+
+        Args:
+            max_entries: Number of results kept before the least recently used is evicted.
+
+        Returns:
+            None.
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, SchoolLayerFilters], GeoJsonDict] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(
+        self,
+        key: tuple[str, SchoolLayerFilters],
+        build: Callable[[], GeoJsonDict],
+    ) -> GeoJsonDict:
+        """Return a cached result, building and storing it on a miss.
+
+        Args:
+            key: ``(school-layer version, normalized filters)``.
+            build: Callable producing the filtered FeatureCollection.
+
+        Returns:
+            The filtered FeatureCollection.
+        """
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+
+        result = build()
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        """Drop every cached result and reset the counters.
+
+        Returns:
+            None.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached results.
+
+        Returns:
+            The entry count.
+        """
+        with self._lock:
+            return len(self._entries)
+
+
+school_filter_result_cache = SchoolFilterResultCache()
+_school_layer_index: SchoolLayerIndex | None = None
+_school_layer_index_lock = threading.Lock()
+
+
+def get_school_layer_index() -> SchoolLayerIndex:
+    """Return the index for the current school-layer data, building it once per version.
+
+    The version is the time the shared layer cache loaded the school layer,
+    so a TTL reload of the artifact yields a new index.
+
+    Returns:
+        The school layer index, returning popup-only properties for matches.
+    """
+    geojson_data = LayersClass.load_layer_data("schools")
+    cached_at, _ = LayersClass.geojson_cache[LayersClass.get_layer_config("schools").dataset]
+    version = repr(cached_at)
+
+    global _school_layer_index
+    index = _school_layer_index
+    if index is not None and index.version == version:
+        return index
+    with _school_layer_index_lock:
+        index = _school_layer_index
+        if index is None or index.version != version:
+            index = build_school_layer_index(
+                geojson_data,
+                version=version,
+                # Filtering needs the full properties; the popup only reads a subset of them.
+                output_features=lambda payload: LayersClass.project_layer_data("schools", payload),
+            )
+            _school_layer_index = index
+        return index
+
+
+def filter_school_layer(filters: SchoolLayerFilters) -> GeoJsonDict:
+    """Return the school layer for the given controls, memoized per layer version.
+
+    Args:
+        filters: Normalized control state.
+
+    Returns:
+        The filtered school-layer FeatureCollection with popup-only properties.
+    """
+    index = get_school_layer_index()
+    return school_filter_result_cache.get_or_build(
+        (index.version, filters),
+        lambda: index.feature_collection(filter_school_layer_positions(index, filters)),
+    )
+
+
+def clear_school_layer_index() -> None:
+    """Drop the cached school index and every memoized filter result.
+
+    Returns:
+        None.
+    """
+    global _school_layer_index
+    with _school_layer_index_lock:
+        _school_layer_index = None
+    school_filter_result_cache.clear()
@@ -0,0 +1,79 @@
+"""Cross-worker build coordination for shared, immutable on-disk files.
+
+Gunicorn forks ten workers from a preloaded master. Anything a worker caches
+with ``lru_cache`` after fork is private, so when a database or lookup
+artifact changes every worker rebuilds the same structure at the same time.
+The helpers here let one worker own each rebuild: it takes an exclusive file
+lock, builds, and atomically publishes an immutable file named by the source
+version. The other workers block on the lock and then read or memory-map that
+file, which the OS page cache shares between processes.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+import errno
+import fcntl
+import os
+import time
+
+# How often a bounded lock wait retries a non-blocking flock.
+BUILD_LOCK_POLL_SECONDS = 0.05
+
+
+@contextmanager
+def exclusive_build_lock(lock_path: Path, timeout_seconds: float | None = None) -> Iterator[None]:
+    """Hold an exclusive cross-process lock for the duration of a rebuild.
+
+    Args:
+        lock_path: Lock file path; created if missing and never removed.
+        timeout_seconds: Longest time to wait for the lock, polling without
+            blocking; ``None`` waits indefinitely.
+
+    Yields:
+        None while the lock is held.
+
+    Raises:
+        TimeoutError: If the lock is still held elsewhere after ``timeout_seconds``.
+    """
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with lock_path.open("a+b") as lock_file:
+        if timeout_seconds is None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            deadline = time.monotonic() + timeout_seconds
+            while True:
+                try:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        raise TimeoutError(errno.ETIMEDOUT, "Timed out waiting for build lock", str(lock_path))
+                    time.sleep(BUILD_LOCK_POLL_SECONDS)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Write bytes to ``path`` via a fsynced temporary file and atomic rename.
+
+    Args:
+        path: Final destination path.
+        data: Bytes to write.
+
+    Returns:
+        None.
+    """
+    temporary_path = path.with_name(f".{path.name}.tmp")
+    try:
+        with temporary_path.open("wb") as output_file:
+            output_file.write(data)
+            output_file.flush()
+            os.fsync(output_file.fileno())
+        os.replace(temporary_path, path)
+    finally:
+        temporary_path.unlink(missing_ok=True)
@@ -0,0 +1,536 @@
+"""A SQLite-backed TTL cache shared by every worker on a host.
+
+``lru_cache`` results are private to one Gunicorn worker and lost on restart,
+so slow upstream calls (live Socrata record fetches) are repeated per worker
+and after every deploy. ``SharedTtlCache`` keeps JSON results in one SQLite
+file instead:
+
+- fresh entries are served directly;
+- expired entries are served for a further ``stale_seconds`` while one
+  background thread per host refreshes them (stale-while-revalidate);
+- concurrent misses for a key are coalesced: callers serialize on a file
+  lock of their own key and all but the first read the value the first one
+  stored. Waiting is bounded by ``SHARED_TTL_CACHE_LOCK_WAIT_SECONDS``, after
+  which the caller serves any stored value or fetches directly;
+- hit, stale-hit, miss, coalesced, refresh and error counts are kept in the
+  same file, so ``stats()`` reports host-wide numbers. Hits are counted in
+  memory and written at most every ``SHARED_TTL_CACHE_STATS_FLUSH_SECONDS``
+  (or with the next miss), so serving a cached value does not write to SQLite.
+
+The cache file may be given as a callable resolved on every call, so tests
+and scripts can point a decorated function at another file. If the file or
+its lock cannot be opened the wrapped call simply runs uncached.
+"""
+
+from __future__ import annotations
+
+from contextlib import ExitStack, closing
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any, Callable, Generic, ParamSpec
+import functools
+import sqlite3
+import threading
+import time
+
+from loguru import logger
+import orjson
+
+from functions.shared_cache import exclusive_build_lock
+
+P = ParamSpec("P")
+JsonDict = dict[str, Any]
+
+SHARED_TTL_CACHE_BUSY_TIMEOUT_SECONDS = 5.0
+# Longest a miss waits for another worker fetching the same key.
+SHARED_TTL_CACHE_LOCK_WAIT_SECONDS = 10.0
+SHARED_TTL_CACHE_STAT_NAMES = (
+    "hits",
+    "stale_hits",
+    "misses",
+    "coalesced",
+    "refreshes",
+    "errors",
+    "lock_timeouts",
+)
+# Longest a worker keeps hit counts in memory before adding them to the file.
+SHARED_TTL_CACHE_STATS_FLUSH_SECONDS = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    stale_until REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE TABLE IF NOT EXISTS stats (
+    namespace TEXT NOT NULL,
+    name TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (namespace, name)
+);
+"""
+
+
+class SharedTtlCache:
+    """JSON values in a shared SQLite file with TTL, stale-while-revalidate and coalescing."""
+
+    def __init__(
+        self,
+        path: Path | Callable[[], Path],
+        *,
+        namespace: str,
+        ttl_seconds: float,
+        stale_seconds: float,
+        ttl_for: Callable[[JsonDict], float] | None = None,
+    ) -> None:
+        """Configure a cache namespace; the file is created on first use.
+
+        Args:
+            path: SQLite file shared by every worker, or a callable returning it
+                that is resolved on every call.
+            namespace: Name separating this cache's keys and stats from others in the file.
+            ttl_seconds: Default lifetime of a stored value.
+            stale_seconds: How long an expired value is still served while it is refreshed.
+            ttl_for: Optional callable returning a value-specific lifetime, for
+                example a shorter one for degraded fallback results.
+
+        Returns:
+            None.
+        """
+        self._path = path
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.ttl_for = ttl_for
+        self._refreshing: set[str] = set()
+        self._refreshing_lock = threading.Lock()
+        self._schema_ready_for: Path | None = None
+        self._pending_counts: dict[str, int] = {}
+        self._pending_counts_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    @property
+    def path(self) -> Path:
+        """Return the cache file for this call.
+
+        Returns:
+            The configured path, or the one the configured callable returns now.
+        """
+        return Path(self._path() if callable(self._path) else self._path)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the cache file, creating its schema on the first call.
+
+        Returns:
+            An autocommit SQLite connection in WAL mode.
+        """
+        if self._schema_ready_for != self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(
+            str(self.path),
+            timeout=SHARED_TTL_CACHE_BUSY_TIMEOUT_SECONDS,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        if self._schema_ready_for != self.path:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._schema_ready_for = self.path
+        return conn
+
+    def _lock_path(self, key: str) -> Path:
+        """Return the lock file that serializes fetches of ``key`` alone.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            The lock file path named by a hash of the namespace and key.
+        """
+        digest = blake2b(f"{self.namespace}\0{key}".encode(), digest_size=16).hexdigest()
+        return self.path.with_name(f".{self.path.name}.locks") / f"{digest}.lock"
+
+    def _read(self, conn: sqlite3.Connection, key: str) -> tuple[JsonDict, float, float] | None:
+        """Read a stored value with its expiry times.
+
+        Args:
+            conn: Open cache connection.
+            key: Cache key.
+
+        Returns:
+            ``(value, expires_at, stale_until)``, or ``None`` when absent.
+        """
+        row = conn.execute(
+            "SELECT value, expires_at, stale_until FROM entries WHERE namespace = ? AND key = ?",
+            (self.namespace, key),
+        ).fetchone()
+        if row is None:
+            return None
+        return orjson.loads(row[0]), row[1], row[2]
+
+    def _store(self, conn: sqlite3.Connection, key: str, value: JsonDict) -> None:
+        """Store a value and drop entries of this namespace past their stale window.
+
+        Args:
+            conn: Open cache connection.
+            key: Cache key.
+            value: JSON-serializable value.
+
+        Returns:
+            None.
+        """
+        now = time.time()
+        expires_at = now + (self.ttl_for(value) if self.ttl_for is not None else self.ttl_seconds)
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, key, orjson.dumps(value), now, expires_at, expires_at + self.stale_seconds),
+            )
+            conn.execute("DELETE FROM entries WHERE namespace = ? AND stale_until < ?", (self.namespace, now))
+
+    def _count(self, conn: sqlite3.Connection, name: str) -> None:
+        """Increment a shared stats counter, flushing pending hit counts with it.
+
+        Counting is best effort.
+
+        Args:
+            conn: Open cache connection.
+            name: Counter name from ``SHARED_TTL_CACHE_STAT_NAMES``.
+
+        Returns:
+            None.
+        """
+        with self._pending_counts_lock:
+            self._pending_counts[name] = self._pending_counts.get(name, 0) + 1
+        self._flush_counts(conn)
+
+    def _count_hit(self, conn: sqlite3.Connection, name: str) -> None:
+        """Count a hit in memory, flushing once the flush interval has passed.
+
+        Args:
+            conn: Open cache connection.
+            name: ``hits`` or ``stale_hits``.
+
+        Returns:
+            None.
+        """
+        with self._pending_counts_lock:
+            self._pending_counts[name] = self._pending_counts.get(name, 0) + 1
+            due = time.monotonic() - self._last_flush >= SHARED_TTL_CACHE_STATS_FLUSH_SECONDS
+        if due:
+            self._flush_counts(conn)
+
+    def _flush_counts(self, conn: sqlite3.Connection) -> None:
+        """Add this worker's pending counts to the shared stats table.
+
+        Counts that cannot be written are kept for the next flush.
+
+        Args:
+            conn: Open cache connection.
+
+        Returns:
+            None.
+        """
+        with self._pending_counts_lock:
+            pending, self._pending_counts = self._pending_counts, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.executemany(
+                    "INSERT INTO stats VALUES (?, ?, ?) "
+                    "ON CONFLICT (namespace, name) DO UPDATE SET count = count + excluded.count",
+                    [(self.namespace, name, count) for name, count in pending.items()],
+                )
+        except sqlite3.Error as exc:
+            logger.warning(f"Could not count {self.namespace} stats in {self.path}: {exc}")
+            with self._pending_counts_lock:
+                for name, count in pending.items():
+                    self._pending_counts[name] = self._pending_counts.get(name, 0) + count
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], JsonDict]) -> JsonDict:
+        """Return the cached value for ``key``, fetching it on a miss.
+
+        Exceptions from ``fetch`` on a miss propagate and nothing is stored.
+
+        Args:
+            key: Cache key.
+            fetch: Callable producing the value from the upstream source.
+
+        Returns:
+            The fresh, stale or newly fetched value.
+        """
+        try:
+            conn = self._connect()
+        except (OSError, sqlite3.Error) as exc:
+            logger.warning(f"Shared cache {self.path} unavailable; fetching {self.namespace}:{key} directly: {exc}")
+            return fetch()
+
+        with closing(conn):
+            try:
+                cached = self._read(conn, key)
+            except sqlite3.Error as exc:
+                logger.warning(f"Could not read {self.namespace}:{key} from {self.path}; fetching directly: {exc}")
+                return fetch()
+            now = time.time()
+            if cached is not None and now < cached[2]:
+                value, expires_at, _ = cached
+                if now < expires_at:
+                    self._count_hit(conn, "hits")
+                else:
+                    self._count_hit(conn, "stale_hits")
+                    self._refresh_in_background(key, fetch, expires_at)
+                return value
+
+            with ExitStack() as stack:
+                try:
+                    stack.enter_context(
+                        exclusive_build_lock(self._lock_path(key), timeout_seconds=SHARED_TTL_CACHE_LOCK_WAIT_SECONDS)
+                    )
+                except TimeoutError:
+                    self._count(conn, "lock_timeouts")
+                    return self._serve_after_lock_timeout(conn, key, fetch)
+                except OSError as exc:
+                    logger.warning(f"Could not lock {self.namespace}:{key} in {self.path}; fetching directly: {exc}")
+                    return fetch()
+                try:
+                    cached = self._read(conn, key)
+                except sqlite3.Error as exc:
+                    logger.warning(f"Could not read {self.namespace}:{key} from {self.path}; fetching directly: {exc}")
+                    return fetch()
+                if cached is not None and time.time() < cached[1]:
+                    self._count(conn, "coalesced")
+                    return cached[0]
+                self._count(conn, "misses")
+                try:
+                    value = fetch()
+                except Exception:
+                    self._count(conn, "errors")
+                    raise
+                try:
+                    self._store(conn, key, value)
+                except sqlite3.Error as exc:
+                    logger.warning(f"Could not store {self.namespace}:{key} in {self.path}: {exc}")
+                return value
+
+    def _serve_after_lock_timeout(self, conn: sqlite3.Connection, key: str, fetch: Callable[[], JsonDict]) -> JsonDict:
+        """Answer a miss whose key is still being fetched by someone else.
+
+        Args:
+            conn: Open cache connection.
+            key: Cache key.
+            fetch: Callable producing the value from the upstream source.
+
+        Returns:
+            Any value still stored for ``key``, however old, otherwise a direct
+            uncached fetch.
+        """
+        try:
+            cached = self._read(conn, key)
+        except sqlite3.Error:
+            cached = None
+        if cached is not None:
+            logger.warning(f"Timed out waiting to fetch {self.namespace}:{key}; serving the stored value.")
+            return cached[0]
+        logger.warning(f"Timed out waiting to fetch {self.namespace}:{key}; fetching directly.")
+        return fetch()
+
+    def _refresh_in_background(self, key: str, fetch: Callable[[], JsonDict], seen_expires_at: float) -> None:
+        """Start one refresh thread per key in this process.
+
+        Args:
+            key: Cache key whose stored value has expired.
+            fetch: Callable producing the value from the upstream source.
+            seen_expires_at: Expiry of the stale value the caller saw.
+
+        Returns:
+            None.
+        """
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        threading.Thread(
+            target=self._refresh,
+            args=(key, fetch, seen_expires_at),
+            name=f"shared-ttl-refresh-{self.namespace}",
+            daemon=True,
+        ).start()
+
+    def _refresh(self, key: str, fetch: Callable[[], JsonDict], seen_expires_at: float) -> None:
+        """Refresh a stale value unless another worker already has or is doing so.
+
+        Failures are logged and the stale value keeps being served.
+
+        Args:
+            key: Cache key whose stored value has expired.
+            fetch: Callable producing the value from the upstream source.
+            seen_expires_at: Expiry of the stale value the caller saw.
+
+        Returns:
+            None.
+        """
+        try:
+            with (
+                closing(self._connect()) as conn,
+                exclusive_build_lock(self._lock_path(key), timeout_seconds=SHARED_TTL_CACHE_LOCK_WAIT_SECONDS),
+            ):
+                cached = self._read(conn, key)
+                if cached is not None and cached[1] > seen_expires_at:
+                    return
+                try:
+                    value = fetch()
+                except Exception as exc:
+                    self._count(conn, "errors")
+                    logger.warning(f"Background refresh of {self.namespace}:{key} failed; serving stale value: {exc}")
+                    return
+                self._store(conn, key, value)
+                self._count(conn, "refreshes")
+        except TimeoutError:
+            logger.info(f"Skipped background refresh of {self.namespace}:{key}; another fetch holds its lock.")
+        except (OSError, sqlite3.Error) as exc:
+            logger.warning(f"Background refresh of {self.namespace}:{key} could not use {self.path}: {exc}")
+        finally:
+            with self._refreshing_lock:
+                self._refreshing.discard(key)
+
+    def stats(self) -> dict[str, int]:
+        """Return host-wide counters for this namespace.
+
+        This worker's pending hit counts are flushed first; other workers' hits
+        may lag by up to ``SHARED_TTL_CACHE_STATS_FLUSH_SECONDS``.
+
+        Returns:
+            Counter name to count, including ``entries`` (stored keys).
+        """
+        counts = dict.fromkeys(SHARED_TTL_CACHE_STAT_NAMES, 0)
+        try:
+            with closing(self._connect()) as conn:
+                self._flush_counts(conn)
+                counts.update(
+                    conn.execute("SELECT name, count FROM stats WHERE namespace = ?", (self.namespace,)).fetchall()
+                )
+                counts["entries"] = conn.execute(
+                    "SELECT COUNT(*) FROM entries WHERE namespace = ?", (self.namespace,)
+                ).fetchone()[0]
+        except (OSError, sqlite3.Error) as exc:
+            logger.warning(f"Could not read shared cache stats from {self.path}: {exc}")
+        return counts
+
+    def clear(self) -> None:
+        """Drop every stored value and counter of this namespace.
+
+        Returns:
+            None.
+        """
+        with self._pending_counts_lock:
+            self._pending_counts.clear()
+        try:
+            with closing(self._connect()) as conn:
+                conn.execute("DELETE FROM entries WHERE namespace = ?", (self.namespace,))
+                conn.execute("DELETE FROM stats WHERE namespace = ?", (self.namespace,))
+        except (OSError, sqlite3.Error) as exc:
+            logger.warning(f"Could not clear shared cache {self.path}: {exc}")
+
+
+class SharedTtlCachedFunction(Generic[P]):
+    """A function whose results are kept in a ``SharedTtlCache``.
+
+    Mirrors the ``lru_cache`` wrapper API with ``cache_clear`` and ``cache_info``.
+    """
+
+    def __init__(self, function: Callable[P, JsonDict], cache: SharedTtlCache, key: Callable[P, str]) -> None:
+        """Wrap ``function``.
+
+        Args:
+            function: Function producing JSON-serializable results.
+            cache: Cache storing the results.
+            key: Callable mapping the call arguments to a cache key.
+
+        Returns:
+            None.
+        """
+        functools.update_wrapper(self, function)
+        self.function = function
+        self.cache = cache
+        self.key = key
+
+    def __call__(self, *args: P.args, **kwargs: P.kwargs) -> JsonDict:
+        """Return the cached result for these arguments.
+
+        Args:
+            *args: Positional arguments for the wrapped function.
+            **kwargs: Keyword arguments for the wrapped function.
+
+        Returns:
+            The wrapped function's result, possibly from the cache.
+        """
+        return self.cache.get_or_fetch(self.key(*args, **kwargs), lambda: self.function(*args, **kwargs))
+
+    def cache_clear(self) -> None:
+        """Drop every cached result.
+
+        Returns:
+            None.
+        """
+        self.cache.clear()
+
+    def cache_info(self) -> dict[str, int]:
+        """Return the cache's host-wide counters.
+
+        Returns:
+            Counter name to count.
+        """
+        return self.cache.stats()
+
+
+def shared_ttl_cache(
+    path: Path | Callable[[], Path],
+    *,
+    namespace: str,
+    ttl_seconds: float,
+    stale_seconds: float,
+    key: Callable[P, str],
+    ttl_for: Callable[[JsonDict], float] | None = None,
+) -> Callable[[Callable[P, JsonDict]], SharedTtlCachedFunction[P]]:
+    """Decorate a JSON-returning function with a ``SharedTtlCache``.
+
+    Args:
+        path: SQLite file shared by every worker, or a callable returning it
+            that is resolved on every call.
+        namespace: Name separating this cache's keys and stats from others in the file.
+        ttl_seconds: Default lifetime of a stored value.
+        stale_seconds: How long an expired value is still served while it is refreshed.
+        key: Callable mapping the call arguments to a cache key.
+        ttl_for: Optional callable returning a value-specific lifetime.
+
+    Returns:
+        A decorator producing a ``SharedTtlCachedFunction``.
+    """
+
+    def decorate(function: Callable[P, JsonDict]) -> SharedTtlCachedFunction[P]:
+        """Wrap ``function`` in the configured cache.
+
+        Args:
+            function: Function producing JSON-serializable results.
+
+        Returns:
+            The cached function.
+        """
+        cache = SharedTtlCache(
+            path,
+            namespace=namespace,
+            ttl_seconds=ttl_seconds,
+            stale_seconds=stale_seconds,
+            ttl_for=ttl_for,
+        )
+        return SharedTtlCachedFunction(function, cache, key)
+
+    return decorate
@@ -1,9 +1,9 @@
 from __future__ import annotations
-from contextlib import closing
 from datetime import date, datetime
 from pathlib import Path
 from typing import Optional
-import sqlite3
+
+from functions.sqlite_read_pool import read_only_connection
 
 def get_earliest_listed_date(
     db_path: str | Path,
@@ -34,7 +34,7 @@ def get_earliest_listed_date(
       AND TRIM(CAST({date_column} AS TEXT)) != ''
     """
 
-    with closing(sqlite3.connect(str(db_path))) as conn:
+    with read_only_connection(db_path) as conn:
         row = conn.execute(sql).fetchone()
 
     if not row or row[0] is None:
@@ -81,7 +81,7 @@ def get_latest_date_processed(
       AND TRIM(CAST({date_column} AS TEXT)) != ''
     """
 
-    with closing(sqlite3.connect(str(db_path))) as conn:
+    with read_only_connection(db_path) as conn:
         row = conn.execute(sql).fetchone()
 
     if not row or row[0] is None:
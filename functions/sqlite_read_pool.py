@@ -0,0 +1,270 @@
+"""Per-thread, read-only SQLite connections shared by the API and MCP read paths.
+
+Every popup, ISP lookup and MCP search used to open a fresh connection,
+paying for the open, the schema parse and a cold page cache each time, and
+dropping the prepared-statement cache afterwards. Gunicorn runs each worker
+with a fixed set of threads, so each thread keeps one read-only connection
+per database file and reuses it across requests.
+
+A pooled connection is tied to the file it was opened against (device,
+inode, mtime and size). Committed writes such as ``publish_listing_tables``
+change the mtime, and replacing the file changes the inode; either way the
+next checkout on each thread closes the old connection and opens a new one.
+Connections are created lazily after fork, and a pool inherited across a
+fork discards the parent's connections.
+
+Each worker logs its pool counters at most every fifteen minutes, on a
+checkout, so connection churn shows up in the server logs.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+import os
+import sqlite3
+import threading
+import time
+
+from loguru import logger
+
+READ_POOL_MMAP_SIZE = 256 * 1024 * 1024
+READ_POOL_CACHE_SIZE_KIB = 16 * 1024
+READ_POOL_CACHED_STATEMENTS = 256
+# Minimum time between two logged snapshots of a worker's pool counters.
+READ_POOL_STATS_LOG_SECONDS = 15 * 60.0
+
+
+@dataclass
+class _PooledConnection:
+    """A thread's open connection and the file version it was opened against."""
+
+    connection: sqlite3.Connection
+    file_version: tuple[int, int, int, int]
+    generation: int
+
+
+def _file_version(path: Path) -> tuple[int, int, int, int]:
+    """Return the identity and modification state of a database file.
+
+    Args:
+        path: Resolved database path.
+
+    Returns:
+        ``(st_dev, st_ino, st_mtime_ns, st_size)``.
+
+    Raises:
+        sqlite3.OperationalError: If the database file does not exist.
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError as exc:
+        raise sqlite3.OperationalError(f"unable to open database file: {path}") from exc
+    return (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+class ReadOnlyConnectionPool:
+    """Hand out one reusable read-only connection per thread and database file."""
+
+    def __init__(
+        self,
+        *,
+        mmap_size: int = READ_POOL_MMAP_SIZE,
+        cache_size_kib: int = READ_POOL_CACHE_SIZE_KIB,
+        cached_statements: int = READ_POOL_CACHED_STATEMENTS,
+        stats_log_seconds: float = READ_POOL_STATS_LOG_SECONDS,
+    ) -> None:
+        """Configure the pragmas applied to each new connection.
+
+        Args:
+            mmap_size: Bytes of the database file SQLite may memory-map.
+            cache_size_kib: Per-connection page cache size in KiB.
+            cached_statements: Prepared statements kept per connection.
+            stats_log_seconds: Minimum time between logged counter snapshots.
+
+        Returns:
+            None.
+        """
+        self.mmap_size = mmap_size
+        self.cache_size_kib = cache_size_kib
+        self.cached_statements = cached_statements
+        self.stats_log_seconds = stats_log_seconds
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._pid = os.getpid()
+        self._stats: Counter[str] = Counter()
+        self._stats_logged_at = time.monotonic()
+
+    def _open(self, path: Path) -> sqlite3.Connection:
+        """Open and tune a read-only connection.
+
+        Args:
+            path: Resolved database path.
+
+        Returns:
+            A read-only connection returning ``sqlite3.Row`` rows.
+        """
+        connection = sqlite3.connect(
+            f"file:{path}?mode=ro",
+            uri=True,
+            check_same_thread=True,
+            cached_statements=self.cached_statements,
+        )
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA query_only = ON")
+        connection.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        connection.execute(f"PRAGMA cache_size = {-int(self.cache_size_kib)}")
+        return connection
+
+    def _close(self, pooled: _PooledConnection) -> None:
+        """Close a pooled connection and record it.
+
+        Args:
+            pooled: Connection entry being discarded.
+
+        Returns:
+            None.
+        """
+        pooled.connection.close()
+        with self._lock:
+            self._stats["closed"] += 1
+
+    def _thread_connections(self) -> dict[str, _PooledConnection]:
+        """Return this thread's connections, discarding any inherited across a fork.
+
+        Returns:
+            Mapping of resolved database path to pooled connection.
+        """
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._pid = os.getpid()
+                    self._generation += 1
+                    self._stats.clear()
+                    self._stats_logged_at = time.monotonic()
+                    self._local = threading.local()
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = {}
+            self._local.connections = connections
+        return connections
+
+    @contextmanager
+    def connection(self, db_path: str | Path) -> Iterator[sqlite3.Connection]:
+        """Check out this thread's read-only connection to ``db_path``.
+
+        The connection stays open after the block exits. It is closed instead
+        if the block raises a ``sqlite3.DatabaseError`` other than an
+        ``OperationalError`` (for example a corrupt page), so a connection in
+        an unknown state is never reused.
+
+        Args:
+            db_path: Filesystem path to the SQLite database.
+
+        Yields:
+            A read-only connection returning ``sqlite3.Row`` rows.
+
+        Raises:
+            sqlite3.OperationalError: If the database cannot be opened.
+        """
+        path = Path(db_path).resolve()
+        key = str(path)
+        connections = self._thread_connections()
+        file_version = _file_version(path)
+
+        pooled = connections.get(key)
+        event = "opened"
+        if pooled is not None:
+            if pooled.file_version == file_version and pooled.generation == self._generation:
+                event = "reused"
+            else:
+                del connections[key]
+                self._close(pooled)
+                pooled = None
+                event = "reopened"
+
+        if pooled is None:
+            pooled = _PooledConnection(self._open(path), file_version, self._generation)
+            connections[key] = pooled
+
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats[event] += 1
+            now = time.monotonic()
+            log_stats = now - self._stats_logged_at >= self.stats_log_seconds
+            if log_stats:
+                self._stats_logged_at = now
+        if log_stats:
+            logger.info(f"SQLite read pool stats for worker {os.getpid()}: {self.stats()}")
+
+        try:
+            yield pooled.connection
+        except sqlite3.OperationalError:
+            raise
+        except sqlite3.DatabaseError:
+            if connections.get(key) is pooled:
+                del connections[key]
+                self._close(pooled)
+            raise
+
+    def reset(self) -> None:
+        """Retire every pooled connection; each thread reopens on its next checkout.
+
+        Returns:
+            None.
+        """
+        with self._lock:
+            self._generation += 1
+
+    def stats(self) -> dict[str, int]:
+        """Return connection counters for this process.
+
+        Returns:
+            Counts of ``checkouts``, ``opened``, ``reused``, ``reopened`` and
+            ``closed`` connections, plus the number currently ``open``.
+        """
+        with self._lock:
+            counts = {
+                name: self._stats[name] for name in ("checkouts", "opened", "reused", "reopened", "closed")
+            }
+        counts["open"] = counts["opened"] + counts["reopened"] - counts["closed"]
+        return counts
+
+
+_read_pool = ReadOnlyConnectionPool()
+
+
+@contextmanager
+def read_only_connection(db_path: str | Path) -> Iterator[sqlite3.Connection]:
+    """Check out the calling thread's pooled read-only connection.
+
+    Args:
+        db_path: Filesystem path to the SQLite database.
+
+    Yields:
+        A read-only connection returning ``sqlite3.Row`` rows.
+    """
+    with _read_pool.connection(db_path) as connection:
+        yield connection
+
+
+def read_pool_stats() -> dict[str, int]:
+    """Return the process-wide read-pool counters.
+
+    Returns:
+        Pool statistics as described by ``ReadOnlyConnectionPool.stats``.
+    """
+    return _read_pool.stats()
+
+
+def reset_read_pool() -> None:
+    """Retire all pooled read-only connections in this process.
+
+    Returns:
+        None.
+    """
+    _read_pool.reset()
@@ -0,0 +1,290 @@
+"""Warm-start snapshots and per-stage timing for worker boot.
+
+``prewarm_startup_caches`` prepares the listing frames and lookup indexes
+before the first request. Those structures only change when their source
+files (or the code that prepares them) change, so the prepared objects are
+pickled into a snapshot stamped with the source versions after a successful
+build. On the next boot a snapshot whose versions still match is loaded
+instead of rebuilding. Every header also records the installed numpy, pandas
+and geopandas versions, whose pickles are not portable across upgrades.
+
+Snapshots are only read and written inside an active
+:func:`warm_start_session`; elsewhere :func:`warm_start_snapshot` simply
+calls the builder, so tests and scripts never touch the snapshot directory.
+"""
+
+from __future__ import annotations
+
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable, Iterator, Mapping, TypeVar
+import io
+import os
+import pickle
+import time
+
+from loguru import logger
+
+from functions.data_paths import WARM_START_SNAPSHOT_DIR
+from functions.shared_cache import atomic_write_bytes, exclusive_build_lock
+
+# Bump when the snapshot layout or anything pickled into it changes shape.
+WARM_START_FORMAT_VERSION = 2
+WARM_START_SNAPSHOT_SUFFIX = ".pickle"
+# Libraries whose objects are pickled into snapshots.
+WARM_START_PICKLED_LIBRARIES = ("numpy", "pandas", "geopandas")
+
+T = TypeVar("T")
+
+
+def source_version(path: str | Path) -> str:
+    """Return a version token for a snapshot source file.
+
+    Args:
+        path: Source file the snapshot is derived from.
+
+    Returns:
+        ``"<mtime_ns>-<size>"``, or ``"missing"`` when the file cannot be read.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return "missing"
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+@lru_cache(maxsize=1)
+def pickled_library_versions() -> dict[str, str]:
+    """Return the installed versions of the libraries pickled into snapshots.
+
+    Returns:
+        Distribution name to version, with ``"missing"`` for any not installed.
+    """
+    versions = {}
+    for name in WARM_START_PICKLED_LIBRARIES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = "missing"
+    return versions
+
+
+@dataclass
+class BootStage:
+    """Timing and snapshot usage for one named startup stage."""
+
+    name: str
+    seconds: float = 0.0
+    snapshot_hits: int = 0
+    snapshot_misses: int = 0
+
+    @property
+    def source(self) -> str:
+        """Describe where the stage's snapshot-backed objects came from.
+
+        Returns:
+            ``"snapshot"`` when every lookup hit, ``"built"`` when any missed,
+            or ``"-"`` when the stage used no snapshots.
+        """
+        if self.snapshot_misses:
+            return "built"
+        if self.snapshot_hits:
+            return "snapshot"
+        return "-"
+
+
+@dataclass
+class WarmStartSession:
+    """Snapshot directory and stage timings for one startup run."""
+
+    snapshot_dir: Path
+    stages: list[BootStage] = field(default_factory=list)
+    _current: BootStage | None = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[BootStage]:
+        """Time a startup stage and attribute snapshot lookups to it.
+
+        Args:
+            name: Stage label used in the breakdown.
+
+        Yields:
+            The stage record, completed when the block exits.
+        """
+        stage = BootStage(name)
+        previous, self._current = self._current, stage
+        started_at = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            stage.seconds = time.perf_counter() - started_at
+            self._current = previous
+            self.stages.append(stage)
+
+    def snapshot_path(self, name: str) -> Path:
+        """Return the snapshot file for ``name``.
+
+        Args:
+            name: Snapshot name.
+
+        Returns:
+            The snapshot path inside the session directory.
+        """
+        return self.snapshot_dir / f"{name}{WARM_START_SNAPSHOT_SUFFIX}"
+
+    def _read(self, path: Path, header: dict[str, Any]) -> tuple[bool, Any]:
+        """Load a snapshot value when its header matches.
+
+        The header is pickled separately ahead of the value, so a stale
+        snapshot is rejected without unpickling the value.
+
+        Args:
+            path: Snapshot path.
+            header: Expected format, library and source versions.
+
+        Returns:
+            ``(True, value)`` on a match, otherwise ``(False, None)``.
+        """
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return False, None
+        try:
+            stream = io.BytesIO(data)
+            if pickle.load(stream) != header:
+                return False, None
+            return True, pickle.load(stream)
+        except Exception as exc:
+            logger.warning(f"Ignoring unreadable warm-start snapshot {path}: {exc}")
+            return False, None
+
+    def _record(self, hit: bool) -> None:
+        """Count a snapshot hit or miss against the current stage.
+
+        Args:
+            hit: Whether the snapshot was reused.
+
+        Returns:
+            None.
+        """
+        if self._current is None:
+            return
+        if hit:
+            self._current.snapshot_hits += 1
+        else:
+            self._current.snapshot_misses += 1
+
+    def load_or_build(self, name: str, versions: Mapping[str, Any], build: Callable[[], T]) -> T:
+        """Return the snapshot for ``name`` if its versions match, else build and store it.
+
+        ``None`` results are returned but never stored, so a failed build is
+        retried on the next boot.
+
+        Args:
+            name: Snapshot name, unique per prepared object.
+            versions: Source version tokens the object was derived from.
+            build: Callable preparing the object from its sources.
+
+        Returns:
+            The prepared object.
+        """
+        header = {
+            "format": WARM_START_FORMAT_VERSION,
+            "libraries": pickled_library_versions(),
+            "versions": dict(versions),
+        }
+        path = self.snapshot_path(name)
+        hit, value = self._read(path, header)
+        if hit:
+            self._record(True)
+            return value
+
+        self._record(False)
+        with ExitStack() as stack:
+            try:
+                stack.enter_context(exclusive_build_lock(self.snapshot_dir / f".{name}.lock"))
+            except OSError as exc:
+                logger.warning(f"Could not lock warm-start snapshot {path}: {exc}")
+            else:
+                hit, value = self._read(path, header)
+                if hit:
+                    return value
+
+            value = build()
+            if value is not None:
+                self._write(path, header, value)
+            return value
+
+    def _write(self, path: Path, header: dict[str, Any], value: Any) -> None:
+        """Publish a snapshot atomically, logging instead of failing the boot.
+
+        Args:
+            path: Snapshot path.
+            header: Format, library and source versions stored ahead of the value.
+            value: Prepared object to pickle.
+
+        Returns:
+            None.
+        """
+        try:
+            data = pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL) + pickle.dumps(
+                value, protocol=pickle.HIGHEST_PROTOCOL
+            )
+            atomic_write_bytes(path, data)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError) as exc:
+            logger.warning(f"Could not write warm-start snapshot {path}: {exc}")
+
+    def breakdown(self) -> str:
+        """Format the recorded stages as a boot timing table.
+
+        Returns:
+            One line per stage with its duration and snapshot source, plus a total.
+        """
+        width = max([len(stage.name) for stage in self.stages] + [len("total")])
+        lines = [f"  {stage.name:<{width}}  {stage.seconds:7.2f}s  {stage.source}" for stage in self.stages]
+        lines.append(f"  {'total':<{width}}  {sum(stage.seconds for stage in self.stages):7.2f}s")
+        return "\n".join(lines)
+
+
+_active_session: WarmStartSession | None = None
+
+
+@contextmanager
+def warm_start_session(snapshot_dir: Path = WARM_START_SNAPSHOT_DIR) -> Iterator[WarmStartSession]:
+    """Enable warm-start snapshots for the duration of a startup run.
+
+    Args:
+        snapshot_dir: Directory holding snapshot files.
+
+    Yields:
+        The active session, used to time stages and report the breakdown.
+    """
+    global _active_session
+    previous = _active_session
+    _active_session = WarmStartSession(snapshot_dir)
+    try:
+        yield _active_session
+    finally:
+        _active_session = previous
+
+
+def warm_start_snapshot(name: str, versions: Mapping[str, Any], build: Callable[[], T]) -> T:
+    """Load or build a prepared object through the active warm-start session.
+
+    Outside a session this is just ``build()``.
+
+    Args:
+        name: Snapshot name, unique per prepared object.
+        versions: Source version tokens the object was derived from.
+        build: Callable preparing the object from its sources.
+
+    Returns:
+        The prepared object.
+    """
+    session = _active_session
+    if session is None:
+        return build()
+    return session.load_or_build(name, versions, build)
@@ -1,6 +1,6 @@
-from bs4 import BeautifulSoup
 from datetime import datetime, timezone
 from email.utils import parsedate_to_datetime
+from functions.lazy_imports import lazy_import
 from loguru import logger
 from typing import Tuple, Optional
 import pandas as pd
@@ -12,6 +12,8 @@ import random
 import threading
 from urllib.parse import urlparse
 
+bs4 = lazy_import("bs4")
+
 # Initialize logging
 logger.add(sys.stderr, format="{time} {level} {message}", filter="my_module", level="DEBUG")
 
@@ -254,7 +256,7 @@ def check_expired_listing_bhhs(url: str, mls_number: str) -> bool | None:
         response = get_with_backoff(url, headers=headers)
         response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = bs4.BeautifulSoup(response.text, 'html.parser')
 
         # Look for the message indicating the listing is no longer active
         description_div = soup.find('div', class_='page-description')
@@ -381,7 +383,7 @@ def webscrape_bhhs(url: str, row_index: int, mls_number: str, total_rows: int) -
     try:
         response = get_with_backoff(url, headers=headers)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = bs4.BeautifulSoup(response.text, 'html.parser')
 
         # Initialize variables
         listed_date = None
@@ -593,7 +595,7 @@ def update_hoa_fee(df: pd.DataFrame, mls_number: str) -> None:
         # Fetch the main listing page
         main_response = get_with_backoff(main_url, headers=headers)
         main_response.raise_for_status()
-        main_soup = BeautifulSoup(main_response.text, 'html.parser')
+        main_soup = bs4.BeautifulSoup(main_response.text, 'html.parser')
         # Find the link to the details page
         link_tag = main_soup.find('a', attrs={'class': 'btn cab waves-effect waves-light btn-details show-listing-details'})
         if link_tag:
@@ -602,7 +604,7 @@ def update_hoa_fee(df: pd.DataFrame, mls_number: str) -> None:
             # Fetch the details page
             details_response = get_with_backoff(details_url, headers=headers)
             details_response.raise_for_status()
-            details_soup = BeautifulSoup(details_response.text, 'html.parser')
+            details_soup = bs4.BeautifulSoup(details_response.text, 'html.parser')
             # Look for the HOA fee within the details page
             hoa_fee_text = details_soup.find(string=re.compile(r'HOA Fee is \$[\d,]+\.?\d*'))
             if hoa_fee_text:
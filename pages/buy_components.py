@@ -1,9 +1,14 @@
 from dash import dcc, html
 import dash_mantine_components as dmc
 import numpy as np
+import orjson
 import pandas as pd
 
-from .component_base import BaseClass, _build_cached_geojson_payload, _db_cache_token
+from .component_base import (
+    BaseClass,
+    _build_cached_geojson_bytes,
+    _db_cache_token,
+)
 from .component_factories import (
     build_isp_speed_components,
     build_listed_date_filter,
@@ -109,12 +114,21 @@ class BuyComponents(BaseClass):
 
     @classmethod
     def get_cached_geojson_payload(cls) -> dict:
-        """Return the cached buy GeoJSON payload for the current database version.
+        """Return a fresh copy of the buy GeoJSON payload for the current data version.
 
         Returns:
             A GeoJSON feature collection for the buy map store.
         """
-        return _build_cached_geojson_payload(
+        return orjson.loads(cls.get_cached_geojson_bytes())
+
+    @classmethod
+    def get_cached_geojson_bytes(cls) -> bytes:
+        """Return the encoded buy GeoJSON payload without a dict round trip.
+
+        Returns:
+            UTF-8 GeoJSON FeatureCollection bytes for the buy map store.
+        """
+        return _build_cached_geojson_bytes(
             table_name=cls.CONFIG.table_name,
             page_type=cls.CONFIG.page_type,
             select_columns=cls.CONFIG.map_columns,
@@ -3,10 +3,12 @@ from functools import lru_cache
 from .components import BuyComponents
 from .component_factories import build_location_filter_status
 from dash import dcc, callback, clientside_callback, ClientsideFunction
+from functions.layer_artifacts import lazy_layer_sources
 from functions.layers import (
   STREET_BASE_LAYER_NAME,
   LayersClass,
 )
+from functions.school_layer_filters import SchoolLayerFilters, filter_school_layer
 from functions.zip_geocoding_utils import (
   load_zip_place_crosswalk,
   load_zip_polygons,
@@ -78,6 +80,12 @@ def layout(**_: object) -> dbc.Container:
   """
   components = get_buy_components()
   geojson_store = dcc.Store(id="buy-geojson-store", storage_type="memory", data=None)
+  geojson_url_store = dcc.Store(id="buy-geojson-url-store", storage_type="memory", data=BuyComponents.get_payload_url())
+  layer_sources_store = dcc.Store(
+    id="buy-layer-sources-store",
+    storage_type="memory",
+    data=lazy_layer_sources(BuyComponents.OPTIONAL_LAYER_KEYS),
+  )
   zip_boundary_store = dcc.Store(id="buy-zip-boundary-store", storage_type="memory", data={"zip_codes": [], "features": [], "error": None})
   school_layer_prompt_state_store = dcc.Store(
     id="buy-school-layer-prompt-state",
@@ -116,6 +124,8 @@ def layout(**_: object) -> dbc.Container:
     [
       *build_filter_ui_stores("buy"),
       geojson_store,
+      geojson_url_store,
+      layer_sources_store,
       zip_boundary_store,
       school_layer_prompt_state_store,
       school_layer_focus_store,
@@ -208,75 +218,40 @@ clientside_callback(
   prevent_initial_call=True,
 )
 
-# Server-side callbacks
-@callback(
+# Fetch the pre-encoded listing payload straight from the versioned API route
+# instead of serializing it through a server-side Dash callback.
+clientside_callback(
+  ClientsideFunction(namespace='clientside', function_name='loadListingPayload'),
   Output("buy-geojson-store", "data"),
   Input("buy-boot", "n_intervals"),
-  running=[
-    (
-      Output("buy-map-spinner", "style", allow_duplicate=True),
-      {
-        "position": "absolute",
-        "inset": "0",
-        "display": "flex",
-        "alignItems": "center",
-        "justifyContent": "center",
-        "backgroundColor": "rgba(0, 0, 0, 0.25)",
-        "zIndex": "10000",
-      },
-      {
-        "position": "absolute",
-        "inset": "0",
-        "display": "none",
-        "alignItems": "center",
-        "justifyContent": "center",
-        "backgroundColor": "rgba(0, 0, 0, 0.25)",
-        "zIndex": "10000",
-      },
-    ),
-  ],
+  State("buy-geojson-url-store", "data"),
   prevent_initial_call=True,
 )
-def load_buy_geojson(_: int) -> dict:
-  """Load the full buy GeoJSON into the browser store once, after the page renders.
 
-  Returns:
-    A GeoJSON dict suitable for dl.GeoJSON(data=...).
-
-  Args:
-      _: Unused callback arguments accepted by the framework.
-  """
-  return BuyComponents.get_cached_geojson_payload()
+# Until the full payload arrives, fill the map from the viewport route on each
+# pan or zoom so slow connections see the listings in view first.
+clientside_callback(
+  ClientsideFunction(namespace='clientside', function_name='loadListingViewport'),
+  Output("buy_geojson", "data", allow_duplicate=True),
+  Input("map", "bounds"),
+  Input("map", "zoom"),
+  State("buy-geojson-url-store", "data"),
+  prevent_initial_call=True,
+)
 
-@callback(
+# Optional overlays are fetched by URL from their static, pre-compressed
+# artifacts; the Schools overlay is filtered server-side and loads separately.
+clientside_callback(
+  ClientsideFunction(namespace='clientside', function_name='loadLazyLayerData'),
   Output({"type": "lazy-layer-geojson", "page": "buy", "layer": ALL}, "data"),
   Input(LayersClass.layers_control_id("buy"), "overlays"),
   State({"type": "lazy-layer-geojson", "page": "buy", "layer": ALL}, "id"),
   State({"type": "lazy-layer-geojson", "page": "buy", "layer": ALL}, "data"),
+  State("buy-layer-sources-store", "data"),
 )
-def load_buy_optional_layers(
-  selected_overlays: list[str] | None,
-  layer_ids: list[dict[str, str]] | None,
-  current_data: list[dict] | None,
-) -> list[dict]:
-  """Lazy-load optional map layers only after the user enables them.
-
-  Args:
-      selected_overlays: Names of map overlays currently selected by the user.
-      layer_ids: Pattern-matching Dash identifiers for the lazy GeoJSON layers.
-      current_data: Existing GeoJSON payloads aligned with the lazy layer identifiers.
-
-  Returns:
-      A list containing the loaded buy optional layers.
-  """
-  return LayersClass.resolve_lazy_layer_data(
-    selected_overlays=selected_overlays,
-    layer_ids=layer_ids,
-    current_data=current_data,
-    excluded_layer_keys=("schools",),
-  )
 
 
+# Server-side callbacks
 @callback(
   Output("buy-school-layer-controls-collapse", "is_open"),
   Input(LayersClass.layers_control_id("buy"), "overlays"),
@@ -422,7 +397,7 @@ def update_buy_school_layer(
   title_i_only: bool | None,
   recently_opened_only: bool | None,
 ) -> dict | object:
-  """Filter the school overlay from the cached raw GeoJSON payload.
+  """Filter the school overlay through the cached school index.
 
   Args:
       selected_overlays: Names of map overlays currently selected by the user.
@@ -444,20 +419,20 @@ def update_buy_school_layer(
   if not LayersClass.overlay_is_selected(selected_overlays, "schools"):
     return dash.no_update
 
-  raw_geojson = LayersClass.load_layer_data("schools")
-  return LayersClass.filter_school_layer_geojson(
-    raw_geojson,
-    search_text=search_text,
-    school_levels=school_levels,
-    grade_bands=grade_bands,
-    campus_configurations=campus_configurations,
-    early_grades=early_grades,
-    funding_types=funding_types,
-    enrollment_range=enrollment_range,
-    charter_only=bool(charter_only),
-    magnet_only=bool(magnet_only),
-    title_i_only=bool(title_i_only),
-    recently_opened_only=bool(recently_opened_only),
+  return filter_school_layer(
+    SchoolLayerFilters.from_controls(
+      search_text=search_text,
+      school_levels=school_levels,
+      grade_bands=grade_bands,
+      campus_configurations=campus_configurations,
+      early_grades=early_grades,
+      funding_types=funding_types,
+      enrollment_range=enrollment_range,
+      charter_only=bool(charter_only),
+      magnet_only=bool(magnet_only),
+      title_i_only=bool(title_i_only),
+      recently_opened_only=bool(recently_opened_only),
+    )
   )
 
 @callback(
@@ -1,24 +1,45 @@
 from contextlib import closing
-from datetime import date
+from datetime import date, datetime
 from functools import lru_cache
 from html import unescape
-from typing import Any, Optional, Sequence
+from typing import Any, ClassVar, Optional, Sequence
 import dash_leaflet as dl
 import geopandas as gpd
-import json
 import logging
 import numpy as np
+import orjson
 import os
 import pandas as pd
 import re
 import sqlite3
 
+from functions.geojson_encoder import encode_geojson_feature_collection
 from functions.layers import LayersClass
+from functions.listing_data_version import read_listing_data_version
+from functions.listing_payload_cache import (
+    EncodedListingPayload,
+    get_encoded_listing_payload,
+    listing_payload_url,
+)
 from functions.sql_helpers import get_latest_date_processed
-from functions.data_paths import LARENTALS_DB_PATH
+from functions.data_paths import LARENTALS_DB_PATH, LISTING_PAYLOAD_ARTIFACT_DIR
+from functions.warm_start import source_version, warm_start_snapshot
+from .component_models import PageConfig, PayloadStage
 
 DB_PATH = str(LARENTALS_DB_PATH)
 DEFAULT_SPEED_MAX = 1.0
+GEOJSON_ROUND_COLUMNS: dict[str, int] = {
+    "latitude": 6,
+    "longitude": 6,
+    "list_price": 2,
+    "ppsqft": 2,
+    "security_deposit": 2,
+    "pet_deposit": 2,
+    "key_deposit": 2,
+    "other_deposit": 2,
+    "hoa_fee": 2,
+    "space_rent": 2,
+}
 logger = logging.getLogger(__name__)
 _IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
 
@@ -159,14 +180,16 @@ def _sqlite_table_columns(
 
 
 @lru_cache(maxsize=8)
-def _build_cached_geojson_payload(
+def _build_cached_geojson_bytes(
     table_name: str,
     page_type: str,
     select_columns: tuple[str, ...],
     db_mtime_ns: int,
     categorize_lease_laundry: bool = False,
-) -> dict:
-    """Build and cache a GeoJSON payload without constructing any Dash UI components.
+    payload_stages: tuple[PayloadStage, ...] = (),
+    stage_versions: tuple[str, ...] = (),
+) -> bytes:
+    """Build and cache encoded GeoJSON bytes without constructing any Dash UI components.
 
     Args:
         table_name: Source table name.
@@ -174,11 +197,14 @@ def _build_cached_geojson_payload(
         select_columns: Columns to load for the payload.
         db_mtime_ns: Database modification time used for cache invalidation.
         categorize_lease_laundry: Whether to normalize lease laundry labels.
+        payload_stages: Derived-field stages applied, in order, before encoding.
+        stage_versions: Current version token of each stage, used for cache
+            invalidation.
 
     Returns:
-        A GeoJSON feature collection ready for the client store.
+        UTF-8 GeoJSON FeatureCollection bytes ready for the client store.
     """
-    del db_mtime_ns  # Used only as part of the cache key.
+    del db_mtime_ns, stage_versions  # Used only as part of the cache key.
 
     loader = BaseClass(
         table_name=table_name,
@@ -190,13 +216,75 @@ def _build_cached_geojson_payload(
     if categorize_lease_laundry and "laundry" in loader.df.columns:
         loader.df["laundry"] = loader.df["laundry"].apply(categorize_laundry_features)
 
-    return loader.return_geojson()
+    for stage in payload_stages:
+        loader.df = stage.apply(loader.df)
+
+    return loader.return_geojson_bytes()
 
 
 class BaseClass:
-    """Shared listing-data loader and transformer for page component builders."""
+    """Shared listing-data loader and transformer for page component builders.
+
+    The payload helpers below serve page subclasses, which set ``CONFIG`` and
+    define ``get_cached_geojson_bytes`` and ``get_cached_geojson_payload``.
+    The base class is also instantiated directly as a plain frame loader, so
+    it provides neither.
+    """
 
     OPTIONAL_LAYER_KEYS: tuple[str, ...] = ()
+    PAYLOAD_STAGES: ClassVar[tuple[PayloadStage, ...]] = ()
+    CONFIG: ClassVar[PageConfig]
+
+    @classmethod
+    def payload_stage_versions(cls) -> tuple[str, ...]:
+        """Return the current version token of each registered payload stage.
+
+        Returns:
+            One token per entry in ``PAYLOAD_STAGES``.
+        """
+        return tuple(str(stage.version()) for stage in cls.PAYLOAD_STAGES)
+
+    @classmethod
+    def get_payload_version(cls) -> str:
+        """Return the version token that identifies the current map payload.
+
+        The database part is the listing data version its writers store in
+        the file, so the token is the same on every host that has a copy of
+        the database. Databases published before data versions existed fall
+        back to the file's modification time.
+
+        Returns:
+            A string that changes whenever the listing data or a payload
+            stage's inputs change.
+        """
+        data_version = read_listing_data_version(DB_PATH) or str(_db_cache_token())
+        return "-".join((data_version, *cls.payload_stage_versions()))
+
+    @classmethod
+    def get_cached_encoded_payload(cls) -> EncodedListingPayload:
+        """Return the pre-encoded, pre-compressed map payload for this page.
+
+        Published artifacts for the current version are memory-mapped when
+        present; otherwise the payload is built and encoded in-process.
+
+        Returns:
+            The encoded payload for the current payload version.
+        """
+        return get_encoded_listing_payload(
+            cls.CONFIG.page_type,
+            cls.get_payload_version(),
+            cls.get_cached_geojson_bytes,
+            artifact_dir=LISTING_PAYLOAD_ARTIFACT_DIR,
+        )
+
+    @classmethod
+    def get_payload_url(cls) -> str:
+        """Return the versioned URL the browser map store fetches on boot.
+
+        Returns:
+            A relative URL for the page's listing-payload route.
+        """
+        return listing_payload_url(cls.CONFIG.page_type, cls.get_payload_version())
 
     def __init__(
         self,
@@ -208,6 +296,9 @@ class BaseClass:
     ) -> None:
         """Load a table/view from SQLite and prepare the DataFrame.
 
+        During startup prewarming the prepared frame is reused from a
+        warm-start snapshot while the database file is unchanged.
+
         Args:
             table_name: SQLite table/view name (e.g. "lease" or "buy").
             page_type: Page context ("lease" or "buy").
@@ -222,7 +313,51 @@ class BaseClass:
             ValueError: If the operation cannot be completed.
         """
         safe_table = _require_safe_identifier(table_name, field_name="table_name")
+        if select_columns is not None and not select_columns:
+            raise ValueError("select_columns cannot be empty when provided")
+
+        self.page_type = page_type
+        self.df, earliest_date, self.last_updated = warm_start_snapshot(
+            f"{page_type}-{safe_table}-frame",
+            {
+                "db": source_version(DB_PATH),
+                "code": source_version(__file__),
+                "select_columns": None if select_columns is None else list(select_columns),
+                "include_last_updated": include_last_updated,
+            },
+            lambda: self._prepare_frame(
+                safe_table,
+                select_columns=select_columns,
+                include_last_updated=include_last_updated,
+            ),
+        )
+        # Resolved per boot so a snapshot never carries a stale "today".
+        self.earliest_date = earliest_date if earliest_date is not None else date.today()
+
+    def _prepare_frame(
+        self,
+        safe_table: str,
+        *,
+        select_columns: Optional[Sequence[str]],
+        include_last_updated: bool,
+    ) -> tuple[pd.DataFrame, Optional[datetime], Optional[str]]:
+        """Query, enrich and normalize the listing table into a GeoDataFrame.
+
+        This is the expensive part of construction; during startup its result
+        is kept in a warm-start snapshot keyed by the database version.
+
+        Args:
+            safe_table: Validated SQLite table/view name.
+            select_columns: Optional list/tuple of columns to select instead of SELECT *.
+            include_last_updated: Whether to query the table's processed timestamp.
 
+        Returns:
+            The prepared frame, the earliest listed date (``None`` when the
+            table has no listed dates) and the last processed timestamp.
+
+        Raises:
+            ValueError: If no requested column exists in the table.
+        """
         with closing(sqlite3.connect(DB_PATH)) as conn:
             base_table_columns = _sqlite_table_columns(conn, safe_table)
 
@@ -230,9 +365,6 @@ class BaseClass:
                 sql = f"SELECT * FROM {safe_table}"
                 requested_cols: list[str] | None = None
             else:
-                if not select_columns:
-                    raise ValueError("select_columns cannot be empty when provided")
-
                 requested_cols = [
                     _require_safe_identifier(col, field_name="select_columns")
                     for col in select_columns
@@ -261,8 +393,6 @@ class BaseClass:
                         keep_cols.append(col)
                 self.df = self.df[keep_cols]
 
-        self.page_type = page_type
-
         numeric_cols = [
             "latitude",
             "longitude",
@@ -305,12 +435,11 @@ class BaseClass:
             geom = gpd.points_from_xy(self.df["longitude"], self.df["latitude"])
             self.df = gpd.GeoDataFrame(self.df, geometry=geom)
 
+        earliest_date = None
         if "listed_date" in self.df.columns and not self.df["listed_date"].isna().all():
-            self.earliest_date = self.df["listed_date"].min().to_pydatetime()
-        else:
-            self.earliest_date = date.today()
+            earliest_date = self.df["listed_date"].min().to_pydatetime()
 
-        self.last_updated = (
+        last_updated = (
             get_latest_date_processed(DB_PATH, table_name=safe_table)
             if include_last_updated
             else None
@@ -330,6 +459,8 @@ class BaseClass:
                 self.df["laundry_category"]
             )
 
+        return self.df, earliest_date, last_updated
+
     def dynamic_output_id(self, index: str) -> dict[str, str]:
         """Build the pattern-matching output id used by dynamic filter sections.
 
@@ -363,47 +494,28 @@ class BaseClass:
             layer_keys=self.OPTIONAL_LAYER_KEYS,
         )
 
+    def return_geojson_bytes(self) -> bytes:
+        """Encode the current GeoDataFrame as GeoJSON FeatureCollection bytes.
+
+        Coordinates are rounded to 6 decimals, money columns to 2 decimals,
+        datetime-like columns become ISO strings (blank when missing), and
+        NaN values become ``null``.
+
+        Returns:
+            UTF-8 JSON bytes for the selected listings.
+        """
+        return encode_geojson_feature_collection(
+            self.df,
+            round_columns=GEOJSON_ROUND_COLUMNS,
+        )
+
     def return_geojson(self) -> dict:
         """Return a GeoJSON FeatureCollection for the current GeoDataFrame.
-        Convert datetime-like columns to ISO strings.
 
         Returns:
             A GeoJSON feature collection built from the selected listings.
         """
-        gdf = self.df.copy()
-
-        if "listed_date" in gdf.columns and pd.api.types.is_datetime64_any_dtype(
-            gdf["listed_date"]
-        ):
-            gdf["listed_date"] = (
-                gdf["listed_date"].dt.strftime("%Y-%m-%dT%H:%M:%S").fillna("")
-            )
-
-        if "latitude" in gdf.columns:
-            gdf["latitude"] = gdf["latitude"].round(6)
-        if "longitude" in gdf.columns:
-            gdf["longitude"] = gdf["longitude"].round(6)
-
-        for col in [
-            "list_price",
-            "ppsqft",
-            "security_deposit",
-            "pet_deposit",
-            "key_deposit",
-            "other_deposit",
-            "hoa_fee",
-            "space_rent",
-        ]:
-            if col in gdf.columns:
-                gdf[col] = gdf[col].round(2)
-
-        if {"best_dn", "best_up"}.issubset(gdf.columns):
-            gdf[["best_dn", "best_up"]] = gdf[["best_dn", "best_up"]].replace(
-                {np.nan: None}
-            )
-
-        geojson_str = gdf.to_json(drop_id=True)
-        return json.loads(geojson_str)
+        return orjson.loads(self.return_geojson_bytes())
 
     def _attach_isp_speeds(self, conn: sqlite3.Connection, table_name: str) -> None:
         """Join best available ISP speeds onto the listing dataframe.
@@ -430,18 +542,31 @@ class BaseClass:
             provider_table,
             field_name="provider_table",
         )
+        summary_table = f"{safe_table}_provider_summary"
         try:
-            speed_df = pd.read_sql_query(
-                f"""
+            has_summary = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                (summary_table,),
+            ).fetchone() is not None
+            if has_summary:
+                # Materialized by the broadband merge; one row per listing.
+                speed_sql = f"""
+                SELECT
+                    listing_id AS mls_number,
+                    best_dn,
+                    best_up
+                FROM {summary_table}
+                """
+            else:
+                speed_sql = f"""
                 SELECT
                     listing_id AS mls_number,
                     MAX(MaxAdDn) AS best_dn,
                     MAX(MaxAdUp) AS best_up
                 FROM {provider_table}
                 GROUP BY listing_id
-                """,
-                conn,
-            )
+                """
+            speed_df = pd.read_sql_query(speed_sql, conn)
         except sqlite3.Error as exc:
             logger.warning("Failed to load ISP speeds from %s: %s", provider_table, exc)
             self.df["best_dn"] = np.nan
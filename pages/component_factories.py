@@ -21,6 +21,7 @@ from functions.layers import (
     SCHOOL_LAYER_GRADE_BAND_OPTIONS,
     SCHOOL_LAYER_LEVEL_OPTIONS,
 )
+from functions.marker_clusters import LISTING_SUPERCLUSTER_OPTIONS
 
 
 @dataclass(frozen=True)
@@ -757,10 +758,7 @@ def build_map(
             clusterToLayer=generate_convex_hulls,
             onEachFeature=ns("on_each_feature"),
             zoomToBoundsOnClick=True,
-            superClusterOptions={
-                "radius": 160,
-                "minZoom": 3,
-            },
+            superClusterOptions=dict(LISTING_SUPERCLUSTER_OPTIONS),
         ),
         dl.FullScreenControl(),
     ]
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Any, Mapping, TypeAlias
+from typing import Any, Callable, Mapping, TypeAlias
 
 
 FilterSection: TypeAlias = tuple[str, Any, str]
@@ -31,3 +31,18 @@ class PageParts:
     title_card: Any
     user_options_card: Any
     map_card: Any
+
+
+@dataclass(frozen=True)
+class PayloadStage:
+    """Derived-field step applied once per listing payload build.
+
+    ``apply`` receives the loaded listing frame and returns a new frame with
+    the derived columns; it must not mutate its input. ``version`` returns a
+    token for the stage's external inputs, such as a lookup artifact's
+    content digest, and becomes part of the payload version.
+    """
+
+    name: str
+    version: Callable[[], object]
+    apply: Callable[[Any], Any]
@@ -1,11 +1,12 @@
 from dash import dcc, html
 import dash_mantine_components as dmc
 import numpy as np
+import orjson
 import pandas as pd
 
 from .component_base import (
     BaseClass,
-    _build_cached_geojson_payload,
+    _build_cached_geojson_bytes,
     _db_cache_token,
     categorize_laundry_features,
 )
@@ -23,9 +24,9 @@ from .component_factories import (
     build_year_built_filter,
     iqr_capped_range_bounds,
 )
-from .component_models import FilterSection, PageConfig, PageParts
+from .component_models import FilterSection, PageConfig, PageParts, PayloadStage
 from .responsive_filter_ui import build_map_filter_toolbar
-from functions.rso import add_rso_status_to_listing_geojson
+from functions.rso import add_rso_status_column, rso_property_lookup_version
 
 
 class LeaseComponents(BaseClass):
@@ -41,6 +42,9 @@ class LeaseComponents(BaseClass):
         "schools",
         "oil_well",
     )
+    PAYLOAD_STAGES: tuple[PayloadStage, ...] = (
+        PayloadStage(name="rso_status", version=rso_property_lookup_version, apply=add_rso_status_column),
+    )
 
     LEASE_COLUMNS: tuple[str, ...] = (
         "mls_number",
@@ -130,19 +134,29 @@ class LeaseComponents(BaseClass):
 
     @classmethod
     def get_cached_geojson_payload(cls) -> dict:
-        """Return the cached lease GeoJSON payload for the current database version.
+        """Return a fresh copy of the lease GeoJSON payload for the current data version.
 
         Returns:
             A GeoJSON feature collection for the lease map store.
         """
-        payload = _build_cached_geojson_payload(
+        return orjson.loads(cls.get_cached_geojson_bytes())
+
+    @classmethod
+    def get_cached_geojson_bytes(cls) -> bytes:
+        """Return the encoded lease payload, with derived fields such as RSO status.
+
+        Returns:
+            UTF-8 GeoJSON FeatureCollection bytes for the lease map store.
+        """
+        return _build_cached_geojson_bytes(
             table_name=cls.CONFIG.table_name,
             page_type=cls.CONFIG.page_type,
             select_columns=cls.CONFIG.map_columns,
             db_mtime_ns=_db_cache_token(),
             categorize_lease_laundry=True,
+            payload_stages=cls.PAYLOAD_STAGES,
+            stage_versions=cls.payload_stage_versions(),
         )
-        return add_rso_status_to_listing_geojson(payload)
 
     def __init__(self) -> None:
         """Load lease data and assemble the top-level page cards.
@@ -4,10 +4,12 @@ from .components import LeaseComponents
 from .component_factories import build_location_filter_status
 from dash import dcc, clientside_callback, ClientsideFunction, callback
 from dash.dependencies import ALL, Input, Output, State
+from functions.layer_artifacts import lazy_layer_sources
 from functions.layers import (
   STREET_BASE_LAYER_NAME,
   LayersClass,
 )
+from functions.school_layer_filters import SchoolLayerFilters, filter_school_layer
 from functions.zip_geocoding_utils import (
   load_zip_place_crosswalk,
   load_zip_polygons,
@@ -77,6 +79,12 @@ def layout(**_: object) -> dbc.Container:
   lease_components = get_lease_components()
 
   geojson_store = dcc.Store(id="lease-geojson-store", storage_type="memory", data=None)
+  geojson_url_store = dcc.Store(id="lease-geojson-url-store", storage_type="memory", data=LeaseComponents.get_payload_url())
+  layer_sources_store = dcc.Store(
+    id="lease-layer-sources-store",
+    storage_type="memory",
+    data=lazy_layer_sources(LeaseComponents.OPTIONAL_LAYER_KEYS),
+  )
   zip_boundary_store = dcc.Store(id="lease-zip-boundary-store", storage_type="memory", data={"zip_codes": [], "features": [], "error": None})
   school_layer_prompt_state_store = dcc.Store(
     id="lease-school-layer-prompt-state",
@@ -116,6 +124,8 @@ def layout(**_: object) -> dbc.Container:
     [
       *build_filter_ui_stores("lease"),
       geojson_store,
+      geojson_url_store,
+      layer_sources_store,
       zip_boundary_store,
       school_layer_prompt_state_store,
       school_layer_focus_store,
@@ -140,75 +150,40 @@ def layout(**_: object) -> dbc.Container:
 
 register_responsive_filter_callbacks("lease")
 
-# Server-side callbacks
-@callback(
+# Fetch the pre-encoded listing payload straight from the versioned API route
+# instead of serializing it through a server-side Dash callback.
+clientside_callback(
+  ClientsideFunction(namespace='clientside', function_name='loadListingPayload'),
   Output("lease-geojson-store", "data"),
   Input("lease-boot", "n_intervals"),
-  running=[
-    (
-      Output("lease-map-spinner", "style", allow_duplicate=True),
-      {
-        "position": "absolute",
-        "inset": "0",
-        "display": "flex",
-        "alignItems": "center",
-        "justifyContent": "center",
-        "backgroundColor": "rgba(0, 0, 0, 0.25)",
-        "zIndex": "10000",
-      },
-      {
-        "position": "absolute",
-        "inset": "0",
-        "display": "none",
-        "alignItems": "center",
-        "justifyContent": "center",
-        "backgroundColor": "rgba(0, 0, 0, 0.25)",
-        "zIndex": "10000",
-      },
-    ),
-  ],
+  State("lease-geojson-url-store", "data"),
   prevent_initial_call=True,
 )
-def load_lease_geojson(_: int) -> dict:
-  """Load the full lease GeoJSON into the browser store once, after the page renders.
 
-  Returns:
-    A GeoJSON dict suitable for dl.GeoJSON(data=...).
-
-  Args:
-      _: Unused callback arguments accepted by the framework.
-  """
-  return LeaseComponents.get_cached_geojson_payload()
+# Until the full payload arrives, fill the map from the viewport route on each
+# pan or zoom so slow connections see the listings in view first.
+clientside_callback(
+  ClientsideFunction(namespace='clientside', function_name='loadListingViewport'),
+  Output("lease_geojson", "data", allow_duplicate=True),
+  Input("map", "bounds"),
+  Input("map", "zoom"),
+  State("lease-geojson-url-store", "data"),
+  prevent_initial_call=True,
+)
 
-@callback(
+# Optional overlays are fetched by URL from their static, pre-compressed
+# artifacts; the Schools overlay is filtered server-side and loads separately.
+clientside_callback(
+  ClientsideFunction(namespace='clientside', function_name='loadLazyLayerData'),
   Output({"type": "lazy-layer-geojson", "page": "lease", "layer": ALL}, "data"),
   Input(LayersClass.layers_control_id("lease"), "overlays"),
   State({"type": "lazy-layer-geojson", "page": "lease", "layer": ALL}, "id"),
   State({"type": "lazy-layer-geojson", "page": "lease", "layer": ALL}, "data"),
+  State("lease-layer-sources-store", "data"),
 )
-def load_lease_optional_layers(
-  selected_overlays: list[str] | None,
-  layer_ids: list[dict[str, str]] | None,
-  current_data: list[dict] | None,
-) -> list[dict]:
-  """Lazy-load optional map layers only after the user enables them.
-
-  Args:
-      selected_overlays: Names of map overlays currently selected by the user.
-      layer_ids: Pattern-matching Dash identifiers for the lazy GeoJSON layers.
-      current_data: Existing GeoJSON payloads aligned with the lazy layer identifiers.
-
-  Returns:
-      A list containing the loaded lease optional layers.
-  """
-  return LayersClass.resolve_lazy_layer_data(
-    selected_overlays=selected_overlays,
-    layer_ids=layer_ids,
-    current_data=current_data,
-    excluded_layer_keys=("schools",),
-  )
 
 
+# Server-side callbacks
 @callback(
   Output("lease-school-layer-controls-collapse", "is_open"),
   Input(LayersClass.layers_control_id("lease"), "overlays"),
@@ -354,7 +329,7 @@ def update_lease_school_layer(
   title_i_only: bool | None,
   recently_opened_only: bool | None,
 ) -> dict | object:
-  """Filter the school overlay from the cached raw GeoJSON payload.
+  """Filter the school overlay through the cached school index.
 
   Args:
       selected_overlays: Names of map overlays currently selected by the user.
@@ -376,20 +351,20 @@ def update_lease_school_layer(
   if not LayersClass.overlay_is_selected(selected_overlays, "schools"):
     return dash.no_update
 
-  raw_geojson = LayersClass.load_layer_data("schools")
-  return LayersClass.filter_school_layer_geojson(
-    raw_geojson,
-    search_text=search_text,
-    school_levels=school_levels,
-    grade_bands=grade_bands,
-    campus_configurations=campus_configurations,
-    early_grades=early_grades,
-    funding_types=funding_types,
-    enrollment_range=enrollment_range,
-    charter_only=bool(charter_only),
-    magnet_only=bool(magnet_only),
-    title_i_only=bool(title_i_only),
-    recently_opened_only=bool(recently_opened_only),
+  return filter_school_layer(
+    SchoolLayerFilters.from_controls(
+      search_text=search_text,
+      school_levels=school_levels,
+      grade_bands=grade_bands,
+      campus_configurations=campus_configurations,
+      early_grades=early_grades,
+      funding_types=funding_types,
+      enrollment_range=enrollment_range,
+      charter_only=bool(charter_only),
+      magnet_only=bool(magnet_only),
+      title_i_only=bool(title_i_only),
+      recently_opened_only=bool(recently_opened_only),
+    )
   )
 
 
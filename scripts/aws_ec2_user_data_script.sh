@@ -83,6 +83,8 @@ BROADBAND_GEOPACKAGE_PATH=$(uv run python -c \
   "from functions.data_paths import CA_BROADBAND_GEOPACKAGE_PATH; print(CA_BROADBAND_GEOPACKAGE_PATH)")
 ALPR_CAMERAS_PATH=$(uv run python -c \
   "from functions.data_paths import ALPR_CAMERAS_PATH; print(ALPR_CAMERAS_PATH)")
+LISTING_PAYLOAD_DIR=$(uv run python -c \
+  "from functions.data_paths import LISTING_PAYLOAD_ARTIFACT_DIR; print(LISTING_PAYLOAD_ARTIFACT_DIR)")
 STAGING_DIR="$(dirname "$DB_PATH")/listing-staging"
 LEASE_STAGE_DB="$STAGING_DIR/lease.db"
 BUY_STAGE_DB="$STAGING_DIR/buy.db"
@@ -158,6 +160,14 @@ echo "----- ENRICH SCHOOL DISTRICTS AND NEAREST SCHOOLS -----"
 uv run enrich-schools \
   --db-path "$DB_PATH"
 
+echo "----- ENRICH CITY OF LOS ANGELES JURISDICTION -----"
+uv run enrich-jurisdiction \
+  --db-path "$DB_PATH"
+
+echo "----- ENRICH LAHD AND RSO LISTING SUMMARIES -----"
+uv run enrich-housing-summaries \
+  --db-path "$DB_PATH"
+
 echo "----- FETCH CPUC BROADBAND GEOPACKAGE -----"
 uv run fetch-cpuc-broadband-geopackage \
   --output "$BROADBAND_GEOPACKAGE_PATH" \
@@ -169,6 +179,11 @@ uv run run-broadband-merge \
   --geopackage-path "$BROADBAND_GEOPACKAGE_PATH" \
   --geopackage-layer "$BROADBAND_GEOPACKAGE_LAYER"
 
+# The enrichment steps above replaced the database's listing data version, so
+# republish the map payloads for the final contents.
+echo "----- PUBLISH LISTING PAYLOADS -----"
+uv run publish-listing-payloads
+
 echo "----- FETCH ALPR CAMERAS -----"
 uv run fetch-alpr-cameras \
   --output "$ALPR_CAMERAS_PATH"
@@ -229,3 +244,24 @@ if local_size != remote_size:
 
 print(f"Verified s3://{bucket}/{key} ({remote_size} bytes).")
 PY
+
+echo "----- UPLOAD LISTING PAYLOADS -----"
+uv run python - "$LISTING_PAYLOAD_DIR" "$S3_BUCKET" <<'PY'
+import sys
+from pathlib import Path
+
+import boto3
+
+artifact_dir = Path(sys.argv[1])
+bucket = sys.argv[2]
+
+s3 = boto3.client("s3")
+# Manifests go last so a reader never sees one that points at missing files.
+paths = sorted(
+    (path for path in artifact_dir.iterdir() if path.is_file() and not path.name.startswith(".")),
+    key=lambda path: path.name.endswith(".manifest.json"),
+)
+for path in paths:
+    s3.upload_file(str(path), bucket, f"listing_payloads/{path.name}")
+print(f"Uploaded {len(paths)} listing payload files to s3://{bucket}/listing_payloads/")
+PY
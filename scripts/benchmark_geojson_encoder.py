@@ -0,0 +1,169 @@
+"""Benchmark the columnar GeoJSON encoder against the legacy ``to_json`` path."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Callable
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+
+from functions.geojson_encoder import encode_geojson_feature_collection
+from pages.component_base import GEOJSON_ROUND_COLUMNS
+
+DEFAULT_ROW_COUNTS = (10_000, 100_000)
+
+
+def build_synthetic_listings(row_count: int, seed: int = 0) -> gpd.GeoDataFrame:
+    """Build a listing-shaped GeoDataFrame with realistic column types.
+
+    Args:
+        row_count: Number of synthetic listings to generate.
+        seed: Random seed so repeated runs encode identical data.
+
+    Returns:
+        A point GeoDataFrame resembling the lease map payload columns.
+    """
+    rng = np.random.default_rng(seed)
+    latitude = rng.uniform(33.7, 34.35, row_count)
+    longitude = rng.uniform(-118.7, -118.1, row_count)
+    list_price = rng.uniform(1_200, 12_000, row_count)
+    list_price[rng.random(row_count) < 0.01] = np.nan
+    listed_date = pd.Series(
+        pd.Timestamp("2026-01-01")
+        + pd.to_timedelta(rng.integers(0, 270, row_count), unit="D")
+    )
+    listed_date[rng.random(row_count) < 0.02] = pd.NaT
+    best_dn = rng.choice([25.0, 100.0, 300.0, 1000.0, np.nan], row_count)
+
+    frame = pd.DataFrame(
+        {
+            "mls_number": [f"SR{index:08d}" for index in range(row_count)],
+            "full_street_address": [
+                f"{100 + index % 9_000} Main St, Los Angeles, CA 900{index % 90:02d}"
+                for index in range(row_count)
+            ],
+            "latitude": latitude,
+            "longitude": longitude,
+            "list_price": list_price,
+            "ppsqft": list_price / rng.uniform(400, 3_000, row_count),
+            "bedrooms": rng.integers(0, 6, row_count),
+            "total_bathrooms": rng.choice([1.0, 1.5, 2.0, 2.5, 3.0], row_count),
+            "subtype": rng.choice(["Apartment", "Condominium", "Single Family", "Townhouse"], row_count),
+            "pet_policy": rng.choice(["Yes", "No", "Cats", "Dogs", None], row_count),
+            "furnished": rng.choice(["Furnished", "Unfurnished", None], row_count),
+            "security_deposit": rng.uniform(0, 10_000, row_count),
+            "listed_date": listed_date,
+            "best_dn": best_dn,
+            "best_up": best_dn / 10,
+        }
+    )
+    return gpd.GeoDataFrame(
+        frame,
+        geometry=gpd.points_from_xy(longitude, latitude),
+        crs="EPSG:4326",
+    )
+
+
+def legacy_return_geojson(gdf: gpd.GeoDataFrame) -> dict:
+    """Reproduce the pre-encoder ``BaseClass.return_geojson`` implementation.
+
+    Args:
+        gdf: Listing GeoDataFrame to serialize.
+
+    Returns:
+        A GeoJSON FeatureCollection dict.
+    """
+    gdf = gdf.copy()
+    if "listed_date" in gdf.columns and pd.api.types.is_datetime64_any_dtype(gdf["listed_date"]):
+        gdf["listed_date"] = gdf["listed_date"].dt.strftime("%Y-%m-%dT%H:%M:%S").fillna("")
+    for column, decimals in GEOJSON_ROUND_COLUMNS.items():
+        if column in gdf.columns:
+            gdf[column] = gdf[column].round(decimals)
+    if {"best_dn", "best_up"}.issubset(gdf.columns):
+        gdf[["best_dn", "best_up"]] = gdf[["best_dn", "best_up"]].replace({np.nan: None})
+    return json.loads(gdf.to_json(drop_id=True))
+
+
+def _best_time(func: Callable[[], object], repeats: int) -> float:
+    """Return the fastest wall-clock time of several runs.
+
+    Args:
+        func: Zero-argument callable to time.
+        repeats: Number of timed runs.
+
+    Returns:
+        The minimum elapsed time in seconds.
+    """
+    timings = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started_at)
+    return min(timings)
+
+
+def run_benchmark(row_counts: tuple[int, ...], repeats: int) -> list[dict[str, float]]:
+    """Time the legacy and columnar encoders for each synthetic dataset size.
+
+    Args:
+        row_counts: Synthetic listing counts to benchmark.
+        repeats: Timed runs per encoder and size; the best run is reported.
+
+    Returns:
+        One result row per size with timings in seconds and the speedup.
+    """
+    results = []
+    for row_count in row_counts:
+        gdf = build_synthetic_listings(row_count)
+        legacy_seconds = _best_time(lambda: legacy_return_geojson(gdf), repeats)
+        encoder_bytes_seconds = _best_time(
+            lambda: encode_geojson_feature_collection(gdf, round_columns=GEOJSON_ROUND_COLUMNS),
+            repeats,
+        )
+        payload_size = len(encode_geojson_feature_collection(gdf, round_columns=GEOJSON_ROUND_COLUMNS))
+        results.append(
+            {
+                "rows": float(row_count),
+                "legacy_seconds": legacy_seconds,
+                "encoder_seconds": encoder_bytes_seconds,
+                "speedup": legacy_seconds / encoder_bytes_seconds if encoder_bytes_seconds else float("inf"),
+                "payload_bytes": float(payload_size),
+            }
+        )
+    return results
+
+
+def main() -> None:
+    """Print a timing table comparing the legacy and columnar GeoJSON encoders.
+
+    Returns:
+        None.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark GeoJSON encoding of synthetic listing payloads."
+    )
+    parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_ROW_COUNTS),
+        help="Synthetic listing counts to benchmark.",
+    )
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8}  {'legacy (s)':>10}  {'encoder (s)':>11}  {'speedup':>7}  {'payload (MB)':>12}")
+    for result in run_benchmark(tuple(args.rows), args.repeats):
+        print(
+            f"{int(result['rows']):>8}  {result['legacy_seconds']:>10.3f}  "
+            f"{result['encoder_seconds']:>11.3f}  {result['speedup']:>6.1f}x  "
+            f"{result['payload_bytes'] / 1_000_000:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Benchmark the columnar LAHD listing lookup against the legacy dict index."""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+import orjson
+
+from functions import lahd
+from functions.lahd_lookup_index import LahdLookupIndex
+
+DEFAULT_QUERY_COUNT = 20_000
+# Listing coordinates are jittered by up to this many degrees around a record.
+QUERY_JITTER_DEGREES = 0.0008
+
+
+def legacy_index(prepared: dict[str, Any]) -> dict[str, Any]:
+    """Reproduce the pre-columnar dict-of-records lookup index.
+
+    Args:
+        prepared: Output of ``lahd._prepare_lahd_listing_lookup``.
+
+    Returns:
+        The legacy ``records``/``address_index``/``apn_index``/``spatial_index`` mapping.
+    """
+    columns = prepared["columns"]
+    names = list(columns)
+    records = [dict(zip(names, values)) for values in zip(*columns.values())]
+    address_index: dict[str, dict[str, Any]] = {}
+    apn_index: dict[str, dict[str, Any]] = {}
+    spatial_index: dict[tuple[int, int], list[dict[str, Any]]] = {}
+    for record, address_key, apn in zip(records, prepared["address_keys"], prepared["apn_keys"]):
+        if not address_key:
+            continue
+        existing = address_index.get(address_key)
+        if existing is None or record["problem_score"] > existing["problem_score"]:
+            address_index[address_key] = record
+        if apn:
+            existing_by_apn = apn_index.get(apn)
+            if existing_by_apn is None or record["problem_score"] > existing_by_apn["problem_score"]:
+                apn_index[apn] = record
+        bucket = (
+            math.floor(record["lat"] / lahd.LAHD_LOOKUP_SPATIAL_CELL_DEGREES),
+            math.floor(record["lon"] / lahd.LAHD_LOOKUP_SPATIAL_CELL_DEGREES),
+        )
+        spatial_index.setdefault(bucket, []).append(record)
+    return {
+        "records": records,
+        "address_index": address_index,
+        "apn_index": apn_index,
+        "spatial_index": spatial_index,
+    }
+
+
+def _legacy_distance_meters(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Estimate the distance between two nearby coordinates in meters.
+
+    Args:
+        lat1: Latitude of the first point.
+        lon1: Longitude of the first point.
+        lat2: Latitude of the second point.
+        lon2: Longitude of the second point.
+
+    Returns:
+        The approximate distance in meters.
+    """
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    mean_lat = (lat1_rad + lat2_rad) / 2
+    x = math.radians(lon2 - lon1) * math.cos(mean_lat)
+    y = math.radians(lat2 - lat1)
+    return 6371000 * math.sqrt((x * x) + (y * y))
+
+
+def legacy_lookup(index: dict[str, Any], address: str, lat: float, lon: float) -> tuple[str | None, str | None]:
+    """Match a listing with the legacy address-then-bucket-scan lookup.
+
+    Args:
+        index: Output of ``legacy_index``.
+        address: Listing street address.
+        lat: Listing latitude.
+        lon: Listing longitude.
+
+    Returns:
+        ``(match_type, apn)`` of the match, or ``(None, None)``.
+    """
+    record = index["address_index"].get(lahd._normalize_property_address_for_lookup(address))
+    if record is not None:
+        return "address", record["apn"]
+    cell = lahd.LAHD_LOOKUP_SPATIAL_CELL_DEGREES
+    bucket_lat, bucket_lon = math.floor(lat / cell), math.floor(lon / cell)
+    span = lahd._lahd_spatial_neighbor_span()
+    nearest_record, nearest_distance = None, math.inf
+    for lat_offset in range(-span, span + 1):
+        for lon_offset in range(-span, span + 1):
+            for record in index["spatial_index"].get((bucket_lat + lat_offset, bucket_lon + lon_offset), []):
+                distance = _legacy_distance_meters(lat, lon, record["lat"], record["lon"])
+                if distance < nearest_distance:
+                    nearest_record, nearest_distance = record, distance
+    if nearest_record is not None and nearest_distance <= lahd.LAHD_LISTING_LOOKUP_MAX_DISTANCE_METERS:
+        return "nearby_parcel", nearest_record["apn"]
+    return None, None
+
+
+def columnar_lookup(index: LahdLookupIndex, address: str, lat: float, lon: float) -> tuple[str | None, str | None]:
+    """Match a listing with the columnar index, materializing only the winner.
+
+    Args:
+        index: Columnar lookup index.
+        address: Listing street address.
+        lat: Listing latitude.
+        lon: Listing longitude.
+
+    Returns:
+        ``(match_type, apn)`` of the match, or ``(None, None)``.
+    """
+    row = index.row_for_address(lahd._normalize_property_address_for_lookup(address))
+    if row is not None:
+        return "address", index.record(row)["apn"]
+    nearest = index.nearest(lat, lon, span=lahd._lahd_spatial_neighbor_span())
+    if nearest is not None and nearest[1] <= lahd.LAHD_LISTING_LOOKUP_MAX_DISTANCE_METERS:
+        return "nearby_parcel", index.record(nearest[0])["apn"]
+    return None, None
+
+
+def build_queries(prepared: dict[str, Any], count: int, seed: int = 0) -> list[tuple[str, float, float]]:
+    """Build listing-like queries: a quarter exact addresses, the rest jittered near records.
+
+    Args:
+        prepared: Output of ``lahd._prepare_lahd_listing_lookup``.
+        count: Number of queries.
+        seed: Random seed so repeated runs issue identical queries.
+
+    Returns:
+        ``(address, latitude, longitude)`` queries.
+    """
+    rng = random.Random(seed)
+    columns = prepared["columns"]
+    size = len(columns["lat"])
+    queries = []
+    for _ in range(count):
+        row = rng.randrange(size)
+        lat = columns["lat"][row] + rng.uniform(-QUERY_JITTER_DEGREES, QUERY_JITTER_DEGREES)
+        lon = columns["lon"][row] + rng.uniform(-QUERY_JITTER_DEGREES, QUERY_JITTER_DEGREES)
+        address = columns["address"][row] if rng.random() < 0.25 else f"{rng.randrange(1, 99999)} NOWHERE AVE #2"
+        queries.append((address, lat, lon))
+    return queries
+
+
+def _measure_build(build: Callable[[], Any]) -> tuple[Any, float, int]:
+    """Build an index while timing it and tracing its retained allocations.
+
+    Args:
+        build: Zero-argument index builder.
+
+    Returns:
+        ``(index, seconds, retained_bytes)``.
+    """
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    index = build()
+    seconds = time.perf_counter() - started_at
+    retained_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return index, seconds, retained_bytes
+
+
+def main() -> None:
+    """Print build time, retained memory and lookup latency for both indexes.
+
+    Returns:
+        None.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark LAHD listing lookups.")
+    parser.add_argument("--artifact", type=Path, default=lahd.LAHD_LOCAL_LOOKUP_ARTIFACT_PATH)
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERY_COUNT)
+    args = parser.parse_args()
+
+    prepared = lahd._prepare_lahd_listing_lookup(args.artifact)
+    if not prepared["columns"]:
+        raise SystemExit(f"No LAHD lookup records found in {args.artifact}.")
+    queries = build_queries(prepared, args.queries)
+
+    # Build each index from freshly decoded records so that everything it
+    # keeps alive (strings included) is counted.
+    blob = orjson.dumps(prepared)
+    legacy, legacy_build, legacy_bytes = _measure_build(lambda: legacy_index(orjson.loads(blob)))
+    columnar, columnar_build, columnar_bytes = _measure_build(
+        lambda: lahd._index_prepared_lahd_listing_lookup(orjson.loads(blob))
+    )
+
+    started_at = time.perf_counter()
+    legacy_results = [legacy_lookup(legacy, *query) for query in queries]
+    legacy_lookup_seconds = time.perf_counter() - started_at
+    started_at = time.perf_counter()
+    columnar_results = [columnar_lookup(columnar, *query) for query in queries]
+    columnar_lookup_seconds = time.perf_counter() - started_at
+
+    mismatches = sum(left != right for left, right in zip(legacy_results, columnar_results))
+    matched = sum(result[0] is not None for result in columnar_results)
+    print(f"records: {len(columnar):,}  queries: {len(queries):,}  matched: {matched:,}  mismatches: {mismatches}")
+    print(f"{'index':>9}  {'build (s)':>9}  {'retained (MB)':>13}  {'lookup (us)':>11}")
+    for name, build_seconds, retained, lookup_seconds in (
+        ("legacy", legacy_build, legacy_bytes, legacy_lookup_seconds),
+        ("columnar", columnar_build, columnar_bytes, columnar_lookup_seconds),
+    ):
+        print(
+            f"{name:>9}  {build_seconds:>9.3f}  {retained / 1_000_000:>13.1f}  "
+            f"{lookup_seconds / len(queries) * 1_000_000:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
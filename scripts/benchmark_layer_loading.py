@@ -0,0 +1,247 @@
+"""Benchmark point-layer loading against the legacy ``build_layer_data``.
+
+The legacy load parsed sources with ``json`` and clipped layers with
+``valid_bounds`` in a per-feature loop. The current load parses with
+``orjson`` and runs the columnar pass of :mod:`functions.point_layers`, which
+also validates and deduplicates layers that set ``clean_points``.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import replace
+import argparse
+import gc
+import json
+from pathlib import Path
+import tempfile
+import time
+from typing import Callable, Iterator
+
+import numpy as np
+import orjson
+
+from functions.layers import GeoJsonDict, LayerConfig, LayersClass
+
+DEFAULT_LAYER_KEYS = ("alpr_cameras", "oil_well", "supermarkets_grocery")
+
+
+def build_synthetic_points(row_count: int, seed: int = 0) -> GeoJsonDict:
+    """Build an oil-well-shaped point layer with a few bad and repeated points.
+
+    Args:
+        row_count: Number of synthetic features to generate.
+        seed: Random seed so repeated runs clean identical data.
+
+    Returns:
+        A point GeoJSON FeatureCollection.
+    """
+    rng = np.random.default_rng(seed)
+    longitude = rng.uniform(-119.5, -117.0, row_count)
+    latitude = rng.uniform(33.2, 35.0, row_count)
+    outside = rng.random(row_count) < 0.01
+    longitude[outside] = 0.0
+    latitude[outside] = 0.0
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [float(lon), float(lat)]},
+            "properties": {
+                "API": f"0403{index:06d}",
+                "WellStatus": "Idle" if index % 3 else "Active",
+                "OperatorNa": f"Operator {index % 250}",
+                "FieldName": f"Field {index % 40}",
+            },
+        }
+        for index, (lon, lat) in enumerate(zip(longitude, latitude))
+    ]
+    features.extend(features[: row_count // 200])
+    return {"type": "FeatureCollection", "features": features}
+
+
+def legacy_filter_to_bounds(
+    geojson_data: GeoJsonDict,
+    bounds: tuple[float, float, float, float],
+) -> GeoJsonDict:
+    """Reproduce the pre-columnar ``LayersClass.filter_geojson_to_bounds`` loop.
+
+    Args:
+        geojson_data: GeoJSON FeatureCollection payload to filter.
+        bounds: Tuple of ``(min_lon, max_lon, min_lat, max_lat)``.
+
+    Returns:
+        A copy of the payload restricted to in-bounds point features.
+    """
+    min_lon, max_lon, min_lat, max_lat = bounds
+    filtered_features = []
+    for feature in geojson_data.get("features", []):
+        geometry = feature.get("geometry") or {}
+        coords = geometry.get("coordinates") or []
+        if geometry.get("type") != "Point" or len(coords) < 2:
+            filtered_features.append(feature)
+            continue
+        lon, lat = coords[0], coords[1]
+        if min_lon <= lon <= max_lon and min_lat <= lat <= max_lat:
+            filtered_features.append(feature)
+    return {**geojson_data, "features": filtered_features}
+
+
+def _best_time(func: Callable[[], object], repeats: int) -> float:
+    """Return the fastest wall-clock time of several runs.
+
+    Like ``timeit``, garbage collection is paused while timing so that
+    collections triggered by earlier runs' allocations do not skew the result.
+
+    Args:
+        func: Zero-argument callable to time.
+        repeats: Number of timed runs.
+
+    Returns:
+        The minimum elapsed time in seconds.
+    """
+    timings = []
+    for _ in range(repeats):
+        gc.collect()
+        gc.disable()
+        try:
+            started_at = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started_at)
+        finally:
+            gc.enable()
+    return min(timings)
+
+
+def legacy_build_layer_data(spec: LayerConfig) -> GeoJsonDict:
+    """Reproduce the pre-columnar ``LayersClass.build_layer_data``.
+
+    Args:
+        spec: Layer configuration to load.
+
+    Returns:
+        The layer parsed with ``json`` and, when configured, restricted to
+        ``valid_bounds`` with the per-feature loop.
+    """
+    if spec.loader is not None:
+        loaded_data = spec.loader()
+    else:
+        with open(spec.filepath, "r") as source_file:
+            loaded_data = json.load(source_file)
+    if spec.valid_bounds is not None:
+        loaded_data = legacy_filter_to_bounds(loaded_data, spec.valid_bounds)
+    return loaded_data
+
+
+def run_benchmark(
+    layer_keys: list[str],
+    repeats: int,
+) -> list[dict[str, float | str]]:
+    """Time the legacy and current layer load for each registered layer.
+
+    Both sides read and parse the source and apply the layer's configured
+    cleaning, so the speedup is what a cache (re)load actually gains.
+
+    Args:
+        layer_keys: Registered layer keys; layers whose source is missing are skipped.
+        repeats: Timed runs per implementation; the best run is reported.
+
+    Returns:
+        One result row per layer with timings in seconds and the speedup of
+        the current load over the legacy one.
+    """
+    results: list[dict[str, float | str]] = []
+    for layer_key in layer_keys:
+        spec = LayersClass.get_layer_config(layer_key)
+        try:
+            source = legacy_build_layer_data(replace(spec, valid_bounds=None))
+        except (OSError, RuntimeError, ValueError) as exc:
+            print(f"skipping {layer_key}: {exc}")
+            continue
+        kept = LayersClass.build_layer_data(layer_key)
+        legacy_seconds = _best_time(lambda: legacy_build_layer_data(spec), repeats)
+        current_seconds = _best_time(lambda: LayersClass.build_layer_data(layer_key), repeats)
+        cleaning = "+".join(
+            step for step, enabled in (("bounds", spec.valid_bounds), ("clean", spec.clean_points)) if enabled
+        ) or "none"
+        results.append(
+            {
+                "layer": layer_key,
+                "cleaning": cleaning,
+                "features": float(len(source["features"])),
+                "kept": float(len(kept["features"])),
+                "legacy_seconds": legacy_seconds,
+                "current_seconds": current_seconds,
+                "speedup": legacy_seconds / current_seconds if current_seconds else float("inf"),
+            }
+        )
+    return results
+
+
+@contextmanager
+def synthetic_layers(row_counts: list[int]) -> Iterator[list[str]]:
+    """Register oil-well-shaped synthetic layers backed by temporary files.
+
+    Args:
+        row_counts: Feature count of each synthetic layer.
+
+    Yields:
+        The registered synthetic layer keys; they are removed on exit.
+    """
+    template = LayersClass.get_layer_config("oil_well")
+    layer_keys: list[str] = []
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            for row_count in row_counts:
+                layer_key = f"synthetic_{row_count}"
+                path = Path(directory) / f"{layer_key}.geojson"
+                path.write_bytes(orjson.dumps(build_synthetic_points(row_count)))
+                LayersClass.LAYER_CONFIGS[layer_key] = replace(template, dataset=layer_key, filepath=str(path))
+                layer_keys.append(layer_key)
+            yield layer_keys
+        finally:
+            for layer_key in layer_keys:
+                LayersClass.LAYER_CONFIGS.pop(layer_key, None)
+
+
+def main() -> None:
+    """Print a timing table comparing the legacy and current layer loads.
+
+    Returns:
+        None.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark point-layer loading (parse, bounds filtering, validation and dedup)."
+    )
+    parser.add_argument(
+        "--layers",
+        nargs="*",
+        default=list(DEFAULT_LAYER_KEYS),
+        help="Registered layer keys to benchmark; layers whose source is missing are skipped.",
+    )
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        nargs="*",
+        default=[],
+        help="Also benchmark synthetic oil-well-shaped layers of these sizes.",
+    )
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    with synthetic_layers(args.synthetic) as synthetic_keys:
+        results = run_benchmark([*args.layers, *synthetic_keys], args.repeats)
+
+    print(
+        f"{'layer':>20}  {'cleaning':>12}  {'features':>8}  {'kept':>8}  "
+        f"{'legacy (ms)':>11}  {'current (ms)':>12}  {'speedup':>7}"
+    )
+    for result in results:
+        print(
+            f"{result['layer']:>20}  {result['cleaning']:>12}  {int(result['features']):>8}  "
+            f"{int(result['kept']):>8}  {result['legacy_seconds'] * 1000:>11.2f}  "
+            f"{result['current_seconds'] * 1000:>12.2f}  {result['speedup']:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ from functions.lahd import (
     LAHD_GEOCODE_CACHE_PATH,
     LAHD_LOCAL_LOOKUP_ARTIFACT_PATH,
     refresh_local_lahd_property_lookup,
+    write_lahd_lookup_column_file,
 )
 
 
@@ -45,6 +46,16 @@ def parse_args() -> argparse.Namespace:
         default=LAHD_GEOCODE_CACHE_PATH,
         help="Path to the LAHD APN coordinate cache JSON.",
     )
+    parser.add_argument(
+        "--columns",
+        action="store_true",
+        help="Also write the memory-mappable column file next to the artifact.",
+    )
+    parser.add_argument(
+        "--columns-only",
+        action="store_true",
+        help="Only rebuild the column file from the existing artifact, without fetching.",
+    )
     parser.add_argument(
         "--print-output-path",
         action="store_true",
@@ -65,12 +76,18 @@ def main() -> int:
         print(LAHD_LOCAL_LOOKUP_ARTIFACT_PATH)
         return 0
 
+    if args.columns_only:
+        print(write_lahd_lookup_column_file(args.output))
+        return 0
+
     artifact_path = refresh_local_lahd_property_lookup(
         output_path=args.output,
         aggregate_limit=args.aggregate_limit,
         geocode_cache_path=args.geocode_cache,
     )
     print(artifact_path)
+    if args.columns:
+        print(write_lahd_lookup_column_file(artifact_path))
     return 0
 
 
@@ -5,7 +5,7 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 
-from functions.rso import refresh_local_rso_property_lookup
+from functions.rso import RSO_PROPERTY_LOOKUP_PATH, refresh_local_rso_property_lookup, write_rso_lookup_column_file
 
 
 def main() -> None:
@@ -16,9 +16,22 @@ def main() -> None:
     """
     parser = argparse.ArgumentParser(description="Build the current LAHD RSO property lookup for listing popups.")
     parser.add_argument("--output", type=Path, default=None, help="Optional path for the generated gzip JSON lookup.")
+    parser.add_argument(
+        "--columns", action="store_true", help="Also write the memory-mappable column file next to the lookup."
+    )
+    parser.add_argument(
+        "--columns-only",
+        action="store_true",
+        help="Only rebuild the column file from the existing lookup, without fetching.",
+    )
     args = parser.parse_args()
+    if args.columns_only:
+        print(write_rso_lookup_column_file(args.output or RSO_PROPERTY_LOOKUP_PATH))
+        return
     artifact_path = refresh_local_rso_property_lookup(args.output) if args.output else refresh_local_rso_property_lookup()
     print(artifact_path)
+    if args.columns:
+        print(write_rso_lookup_column_file(artifact_path))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import time
+from pathlib import Path
+from typing import Sequence
+
+import pandas as pd
+
+from functions.column_files import current_artifact_digest
+from functions.data_paths import LAHD_PROPERTY_LOOKUP_PATH, RSO_PROPERTY_LOOKUP_PATH
+from functions.lahd import lahd_listing_summary_enrichment_values, lookup_lahd_property_for_listing
+from functions.listing_enrichment_utils import (
+    DEFAULT_DB_PATH,
+    LISTING_TABLES,
+    ListingTable,
+    now_utc_iso,
+    require_safe_identifier,
+    upsert_listing_enrichment_rows,
+)
+from functions.rso import lookup_rso_property_for_listing, rso_listing_summary_enrichment_values
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """Parse command-line options for the LAHD/RSO listing-summary stage.
+
+    Args:
+        argv: Optional command-line argument sequence; defaults to ``sys.argv``.
+
+    Returns:
+        The parsed command-line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description=(
+            "Populate buy_enrichment / lease_enrichment with the LAHD property "
+            "summary (and, for leases, the RSO summary) shown in listing popups."
+        )
+    )
+    parser.add_argument(
+        "--db-path",
+        default=str(DEFAULT_DB_PATH),
+        help=f"Path to the SQLite database (default: {DEFAULT_DB_PATH})",
+    )
+    parser.add_argument(
+        "--listing-table",
+        choices=("buy", "lease", "all"),
+        default="all",
+        help="Listing table to enrich (default: all).",
+    )
+    parser.add_argument(
+        "--lahd-lookup-path",
+        type=Path,
+        default=LAHD_PROPERTY_LOOKUP_PATH,
+        help=f"LAHD property lookup artifact (default: {LAHD_PROPERTY_LOOKUP_PATH})",
+    )
+    parser.add_argument(
+        "--rso-lookup-path",
+        type=Path,
+        default=RSO_PROPERTY_LOOKUP_PATH,
+        help=f"RSO property lookup artifact (default: {RSO_PROPERTY_LOOKUP_PATH})",
+    )
+    return parser.parse_args(argv)
+
+
+def load_listing_addresses(db_path: str | Path, listing_table: ListingTable) -> pd.DataFrame:
+    """Load every listing's MLS number, street address and raw coordinates.
+
+    Args:
+        db_path: Filesystem path to the SQLite database.
+        listing_table: Listing table, either ``buy`` or ``lease``.
+
+    Returns:
+        A dataframe with ``mls_number``, ``full_street_address``, ``latitude``
+        and ``longitude``.
+    """
+    safe_table = require_safe_identifier(listing_table, field_name="listing_table")
+    with sqlite3.connect(str(db_path)) as conn:
+        return pd.read_sql_query(
+            f"""
+            SELECT mls_number, full_street_address, latitude, longitude
+            FROM {safe_table}
+            WHERE TRIM(CAST(mls_number AS TEXT)) != ''
+            """,
+            conn,
+        )
+
+
+def build_summary_rows(listings: pd.DataFrame, listing_table: ListingTable, args: argparse.Namespace) -> pd.DataFrame:
+    """Compute the stored LAHD/RSO summary columns for a batch of listings.
+
+    Summaries are only stored for lookups whose artifact is present and
+    readable, so a missing artifact leaves previously stored values untouched.
+
+    Args:
+        listings: Output of ``load_listing_addresses``.
+        listing_table: Listing table, either ``buy`` or ``lease``.
+        args: Parsed command-line options.
+
+    Returns:
+        One row per listing with ``mls_number`` and the summary columns.
+    """
+    lahd_digest = current_artifact_digest(args.lahd_lookup_path)
+    rso_digest = current_artifact_digest(args.rso_lookup_path) if listing_table == "lease" else None
+    rows: list[dict[str, object]] = []
+    for mls_number, address, latitude, longitude in listings[
+        ["mls_number", "full_street_address", "latitude", "longitude"]
+    ].itertuples(index=False, name=None):
+        row: dict[str, object] = {"mls_number": mls_number}
+        if lahd_digest is not None:
+            lahd_summary = lookup_lahd_property_for_listing(
+                address=address,
+                latitude=latitude,
+                longitude=longitude,
+                artifact_path=args.lahd_lookup_path,
+            )
+            if lahd_summary["data_available"]:
+                row.update(lahd_listing_summary_enrichment_values(lahd_summary, lahd_digest))
+        if rso_digest is not None:
+            rso_summary = lookup_rso_property_for_listing(address, args.rso_lookup_path)
+            if rso_summary["data_available"]:
+                row.update(rso_listing_summary_enrichment_values(rso_summary, rso_digest))
+        rows.append(row)
+    return pd.DataFrame.from_records(rows)
+
+
+def enrich_table(listing_table: ListingTable, args: argparse.Namespace) -> int:
+    """Compute and store the LAHD/RSO popup summaries for one listing table.
+
+    Args:
+        listing_table: Listing table, either ``buy`` or ``lease``.
+        args: Parsed command-line options.
+
+    Returns:
+        The number of listing rows written to the enrichment table.
+    """
+    listings = load_listing_addresses(args.db_path, listing_table)
+    if listings.empty:
+        print(f"[{listing_table}] No listings found; skipping.")
+        return 0
+
+    started_at = time.perf_counter()
+    result = build_summary_rows(listings, listing_table, args)
+    if len(result.columns) == 1:
+        print(f"[{listing_table}] No LAHD or RSO lookup artifact found; skipping.")
+        return 0
+    result["enriched_at"] = now_utc_iso()
+
+    written = upsert_listing_enrichment_rows(args.db_path, listing_table, result)
+    matched = int(result["lahd_matched"].sum()) if "lahd_matched" in result else 0
+    print(
+        f"[{listing_table}] Upserted {written:,} LAHD/RSO summary rows "
+        f"({matched:,} LAHD matches) in {time.perf_counter() - started_at:.1f}s."
+    )
+    return written
+
+
+def main() -> None:
+    """Store the LAHD and RSO popup summaries of every listing.
+
+    Returns:
+        None.
+    """
+    args = parse_args()
+    listing_tables: list[ListingTable] = list(LISTING_TABLES) if args.listing_table == "all" else [args.listing_table]
+    for listing_table in listing_tables:
+        enrich_table(listing_table, args)
+
+
+if __name__ == "__main__":
+    main()
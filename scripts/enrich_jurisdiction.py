@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import argparse
+import sqlite3
+from pathlib import Path
+from typing import Sequence
+
+import pandas as pd
+
+from functions.data_paths import LA_CITY_BOUNDARY_PATH
+from functions.lahd import listings_in_los_angeles_city
+from functions.listing_enrichment_utils import (
+    DEFAULT_DB_PATH,
+    LISTING_TABLES,
+    ListingTable,
+    build_source_version,
+    now_utc_iso,
+    require_safe_identifier,
+    upsert_listing_enrichment_rows,
+)
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """Parse command-line options for the City of Los Angeles jurisdiction stage.
+
+    Args:
+        argv: Optional command-line argument sequence; defaults to ``sys.argv``.
+
+    Returns:
+        The parsed command-line arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description=(
+            "Populate buy_enrichment / lease_enrichment with in_la_city, the "
+            "City of Los Angeles jurisdiction used to scope LAHD and RSO popups."
+        )
+    )
+    parser.add_argument(
+        "--db-path",
+        default=str(DEFAULT_DB_PATH),
+        help=f"Path to the SQLite database (default: {DEFAULT_DB_PATH})",
+    )
+    parser.add_argument(
+        "--listing-table",
+        choices=("buy", "lease", "all"),
+        default="all",
+        help="Listing table to enrich (default: all).",
+    )
+    parser.add_argument(
+        "--boundary-path",
+        type=Path,
+        default=LA_CITY_BOUNDARY_PATH,
+        help=f"City of Los Angeles boundary GeoJSON (default: {LA_CITY_BOUNDARY_PATH})",
+    )
+    return parser.parse_args(argv)
+
+
+def load_listing_locations(db_path: str | Path, listing_table: ListingTable) -> pd.DataFrame:
+    """Load every listing's MLS number, city label and raw coordinates.
+
+    Listings without coordinates are kept: their jurisdiction can still follow
+    from the city label.
+
+    Args:
+        db_path: Filesystem path to the SQLite database.
+        listing_table: Listing table, either ``buy`` or ``lease``.
+
+    Returns:
+        A dataframe with ``mls_number``, ``city``, ``latitude`` and ``longitude``.
+    """
+    safe_table = require_safe_identifier(listing_table, field_name="listing_table")
+    with sqlite3.connect(str(db_path)) as conn:
+        return pd.read_sql_query(
+            f"""
+            SELECT mls_number, city, latitude, longitude
+            FROM {safe_table}
+            WHERE TRIM(CAST(mls_number AS TEXT)) != ''
+            """,
+            conn,
+        )
+
+
+def enrich_table(listing_table: ListingTable, args: argparse.Namespace) -> int:
+    """Compute and store ``in_la_city`` for every listing in one table.
+
+    Args:
+        listing_table: Listing table, either ``buy`` or ``lease``.
+        args: Parsed command-line options.
+
+    Returns:
+        The number of listing rows written to the enrichment table.
+    """
+    listings = load_listing_locations(args.db_path, listing_table)
+    if listings.empty:
+        print(f"[{listing_table}] No listings found; skipping.")
+        return 0
+
+    in_la_city = listings_in_los_angeles_city(
+        listings["city"].tolist(),
+        listings["latitude"].tolist(),
+        listings["longitude"].tolist(),
+        boundary_path=args.boundary_path,
+    )
+    result = listings[["mls_number"]].copy()
+    result["in_la_city"] = pd.array([None if value is None else int(value) for value in in_la_city], dtype="Int64")
+    result["source_version"] = build_source_version([args.boundary_path])
+    result["enriched_at"] = now_utc_iso()
+
+    written = upsert_listing_enrichment_rows(args.db_path, listing_table, result)
+    inside = sum(value is True for value in in_la_city)
+    print(f"[{listing_table}] Upserted {written:,} jurisdiction rows ({inside:,} inside the City of Los Angeles).")
+    return written
+
+
+def main() -> None:
+    """Store the City of Los Angeles jurisdiction of every listing.
+
+    Returns:
+        None.
+    """
+    args = parse_args()
+    listing_tables: list[ListingTable] = list(LISTING_TABLES) if args.listing_table == "all" else [args.listing_table]
+    for listing_table in listing_tables:
+        enrich_table(listing_table, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 from pathlib import Path
 from functions.data_paths import LARENTALS_DB_PATH
+from functions.listing_data_version import bump_listing_data_version
 from typing import Optional
 import json
 import re
@@ -236,6 +237,7 @@ def backfill_lease_terms(db_path: str) -> None:
             "UPDATE lease SET terms = ?, terms_norm = ? WHERE rowid = ?",
             updates,
         )
+        bump_listing_data_version(conn)
         conn.commit()
     finally:
         conn.close()
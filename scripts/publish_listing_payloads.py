@@ -0,0 +1,62 @@
+"""Build the lease and buy map payloads once and publish them for serving workers.
+
+Workers compare the manifest version with their own payload version, which is
+built from the data version stored in the database and the RSO lookup digest,
+so the artifacts can be built wherever the database was written and copied
+alongside it. Run this after the last write that changes the listing data.
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from functions.data_paths import LISTING_PAYLOAD_ARTIFACT_DIR
+from functions.listing_payload_cache import write_listing_payload_artifacts
+
+
+def publish_listing_payload_artifacts(
+    artifact_dir: str | Path = LISTING_PAYLOAD_ARTIFACT_DIR,
+) -> list[Path]:
+    """Build the lease and buy map payloads once and publish them as artifacts.
+
+    The payloads are built from the canonical database through the same code
+    path serving workers use, so the manifest versions match what workers
+    compute for the same files.
+
+    Args:
+        artifact_dir: Directory receiving the payload artifacts and manifests.
+
+    Returns:
+        The manifest paths written, one per page.
+    """
+    from pages.buy_components import BuyComponents
+    from pages.lease_components import LeaseComponents
+
+    return [
+        write_listing_payload_artifacts(
+            component_class.get_cached_encoded_payload(),
+            artifact_dir,
+        )
+        for component_class in (LeaseComponents, BuyComponents)
+    ]
+
+
+def main() -> None:
+    """Publish pre-encoded listing payload artifacts for the canonical database.
+
+    Returns:
+        None.
+    """
+    parser = argparse.ArgumentParser(
+        description="Build and publish memory-mappable listing map payloads."
+    )
+    parser.add_argument("--artifact-dir", default=str(LISTING_PAYLOAD_ARTIFACT_DIR))
+    args = parser.parse_args()
+
+    for manifest_path in publish_listing_payload_artifacts(args.artifact_dir):
+        print(f"Published listing payload manifest {manifest_path}")
+
+
+if __name__ == "__main__":
+    main()
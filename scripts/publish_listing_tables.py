@@ -1,4 +1,9 @@
-"""Atomically publish independently-built buy and lease SQLite tables."""
+"""Atomically publish independently-built buy and lease SQLite tables.
+
+After the swap, the lease and buy map payloads are built once and written as
+content-hashed artifacts (see ``scripts.publish_listing_payloads``) that
+serving workers memory-map on their next request.
+"""
 
 from __future__ import annotations
 
@@ -6,7 +11,9 @@ import argparse
 from pathlib import Path
 import sqlite3
 
-from functions.data_paths import LARENTALS_DB_PATH
+from functions.data_paths import LARENTALS_DB_PATH, LISTING_PAYLOAD_ARTIFACT_DIR
+from functions.listing_data_version import bump_listing_data_version
+from scripts.publish_listing_payloads import publish_listing_payload_artifacts
 
 
 def _read_table_schema(stage_path: Path, table_name: str) -> str:
@@ -58,6 +65,9 @@ def publish_listing_tables(
 ) -> None:
     """Replace buy and lease together, leaving other canonical tables intact.
 
+    The swap also replaces the database's listing data version, which keys the
+    published payload artifacts.
+
     Args:
         db_path: Filesystem path to the SQLite database.
         buy_stage_path: Filesystem path for the buy stage.
@@ -87,6 +97,7 @@ def publish_listing_tables(
                 connection.execute(
                     f'INSERT INTO "{table_name}" SELECT * FROM "{stage_name}"."{table_name}"'
                 )
+            bump_listing_data_version(connection)
             connection.commit()
         except Exception:
             connection.rollback()
@@ -108,6 +119,7 @@ def main() -> None:
     parser.add_argument("--db-path", default=str(LARENTALS_DB_PATH))
     parser.add_argument("--buy-stage-path", required=True)
     parser.add_argument("--lease-stage-path", required=True)
+    parser.add_argument("--artifact-dir", default=str(LISTING_PAYLOAD_ARTIFACT_DIR))
     args = parser.parse_args()
 
     publish_listing_tables(
@@ -117,6 +129,12 @@ def main() -> None:
     )
     print(f"Published buy and lease tables to {args.db_path}")
 
+    if Path(args.db_path).resolve() != LARENTALS_DB_PATH.resolve():
+        print("Skipping payload artifacts: they are only built from the canonical database.")
+        return
+    for manifest_path in publish_listing_payload_artifacts(args.artifact_dir):
+        print(f"Published listing payload manifest {manifest_path}")
+
 
 if __name__ == "__main__":
     main()
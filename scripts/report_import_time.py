@@ -0,0 +1,252 @@
+"""Report and budget the import cost of the web entry point.
+
+Runs ``python -X importtime`` in a fresh interpreter over the modules the web
+entry point imports, then prints the slowest imports by cumulative time
+together with the total time and the number of modules loaded. ``--check``
+exits non-zero when the budgets below are exceeded or when a pipeline-only
+dependency is reached from the serving path.
+
+``app`` itself reads runtime data while Dash registers its pages, so the
+entry point is measured through its imports: the top-level imports of
+``app.py`` and of every ``pages/*_page.py`` module.
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+from dataclasses import dataclass
+from pathlib import Path
+import subprocess
+import sys
+from typing import Iterable, Sequence
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Budgets sit well above a typical boot so only real regressions trip them.
+IMPORT_TIME_BUDGET_SECONDS = 6.0
+IMPORTED_MODULE_BUDGET = 2600
+
+# Dependencies and helpers used only by the listing pipelines and build
+# scripts. None of them may be imported while a web worker boots.
+PIPELINE_ONLY_MODULES = frozenset(
+    {
+        "boto3",
+        "botocore",
+        "bs4",
+        "geopy",
+        "imagekitio",
+        "openpyxl",
+        "functions.aws_functions",
+        "functions.broadband_spatial_merge_utils",
+        "functions.dataframe_utils",
+        "functions.geocoding_utils",
+        "functions.listing_pipeline_checkpoint",
+        "functions.mls_image_processing_utils",
+        "functions.webscraping_utils",
+    }
+)
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    """One ``-X importtime`` row."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass(frozen=True)
+class ImportReport:
+    """Import timings and the resulting module set for one interpreter run."""
+
+    timings: tuple[ImportTiming, ...]
+    modules: frozenset[str]
+
+    @property
+    def total_seconds(self) -> float:
+        """Return the wall time spent importing the requested modules.
+
+        Returns:
+            The summed cumulative time of the top-level imports, in seconds.
+        """
+        return sum(timing.cumulative_us for timing in self.timings if timing.depth == 0) / 1_000_000
+
+    def pipeline_only_modules(self) -> list[str]:
+        """Return pipeline-only modules (or their submodules) that were imported.
+
+        Returns:
+            Sorted module names from :data:`PIPELINE_ONLY_MODULES` that were loaded.
+        """
+        return sorted(
+            name
+            for name in PIPELINE_ONLY_MODULES
+            if any(module == name or module.startswith(f"{name}.") for module in self.modules)
+        )
+
+    def budget_violations(self) -> list[str]:
+        """Describe every budget the run exceeded.
+
+        Returns:
+            Human-readable violations; empty when within budget.
+        """
+        violations = [f"pipeline-only module imported: {name}" for name in self.pipeline_only_modules()]
+        if self.total_seconds > IMPORT_TIME_BUDGET_SECONDS:
+            violations.append(
+                f"import time {self.total_seconds:.2f}s exceeds {IMPORT_TIME_BUDGET_SECONDS:.2f}s"
+            )
+        if len(self.modules) > IMPORTED_MODULE_BUDGET:
+            violations.append(f"{len(self.modules):,} modules imported, budget is {IMPORTED_MODULE_BUDGET:,}")
+        return violations
+
+
+def _module_imports(path: Path, package: str | None) -> list[str]:
+    """Return the absolute module names imported at the top level of a file.
+
+    Args:
+        path: Python source file.
+        package: Package containing the file, used to resolve relative imports.
+
+    Returns:
+        Imported module names in source order.
+    """
+    modules: list[str] = []
+    for node in ast.parse(path.read_text(), filename=str(path)).body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level and package:
+                base = package.rsplit(".", node.level - 1)[0]
+                modules.append(f"{base}.{node.module}" if node.module else base)
+            elif node.module and node.module != "__future__":
+                modules.append(node.module)
+    return modules
+
+
+def web_entry_modules(project_root: Path = PROJECT_ROOT) -> list[str]:
+    """Collect the modules imported by the web entry point and its Dash pages.
+
+    Args:
+        project_root: Repository root containing ``app.py`` and ``pages/``.
+
+    Returns:
+        Sorted, de-duplicated module names.
+    """
+    modules = set(_module_imports(project_root / "app.py", None))
+    for page_path in sorted((project_root / "pages").glob("*_page.py")):
+        modules.update(_module_imports(page_path, "pages"))
+    return sorted(modules)
+
+
+def parse_importtime(stderr: str) -> tuple[ImportTiming, ...]:
+    """Parse ``-X importtime`` output.
+
+    Args:
+        stderr: Standard error of an interpreter run with ``-X importtime``.
+
+    Returns:
+        One timing per imported module, in the order they finished importing.
+    """
+    timings: list[ImportTiming] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|", 2)
+        if not self_us.strip().isdigit():
+            continue
+        stripped = name.lstrip(" ")
+        timings.append(
+            ImportTiming(
+                module=stripped.strip(),
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(name) - len(stripped) - 1) // 2,
+            )
+        )
+    return tuple(timings)
+
+
+def measure_imports(modules: Iterable[str], project_root: Path = PROJECT_ROOT) -> ImportReport:
+    """Import ``modules`` in a fresh interpreter and collect its import timings.
+
+    Args:
+        modules: Module names to import, in order.
+        project_root: Working directory, so first-party packages resolve.
+
+    Returns:
+        The timings and the final ``sys.modules`` key set.
+
+    Raises:
+        RuntimeError: If the interpreter fails to import the modules.
+    """
+    code = "\n".join(
+        [*(f"import {module}" for module in modules), "import sys", "print('\\n'.join(sorted(sys.modules)))"]
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing the web entry modules failed:\n{result.stderr[-4000:]}")
+    return ImportReport(timings=parse_importtime(result.stderr), modules=frozenset(result.stdout.split()))
+
+
+def format_report(report: ImportReport, top: int) -> str:
+    """Format the slowest imports and the budget summary.
+
+    Args:
+        report: Measured import report.
+        top: Number of modules to list by cumulative time.
+
+    Returns:
+        A printable report.
+    """
+    slowest = sorted(report.timings, key=lambda timing: timing.cumulative_us, reverse=True)[:top]
+    lines = [f"{'cumulative (ms)':>15}  {'self (ms)':>9}  module"]
+    lines.extend(
+        f"{timing.cumulative_us / 1000:>15.1f}  {timing.self_us / 1000:>9.1f}  {'  ' * timing.depth}{timing.module}"
+        for timing in slowest
+    )
+    lines.append("")
+    lines.append(f"total import time: {report.total_seconds:.2f}s (budget {IMPORT_TIME_BUDGET_SECONDS:.2f}s)")
+    lines.append(f"modules imported: {len(report.modules):,} (budget {IMPORTED_MODULE_BUDGET:,})")
+    pipeline_modules = report.pipeline_only_modules()
+    lines.append(f"pipeline-only modules: {', '.join(pipeline_modules) if pipeline_modules else 'none'}")
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Print the import-time report, optionally failing when over budget.
+
+    Args:
+        argv: Command-line arguments; defaults to ``sys.argv[1:]``.
+
+    Returns:
+        None.
+    """
+    parser = argparse.ArgumentParser(description="Report import time of the web entry point.")
+    parser.add_argument(
+        "--module",
+        action="append",
+        dest="modules",
+        help="Module to measure instead of the web entry imports (repeatable).",
+    )
+    parser.add_argument("--top", type=int, default=25, help="Number of slowest imports to list.")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero when a budget is exceeded.")
+    args = parser.parse_args(argv)
+
+    report = measure_imports(args.modules or web_entry_modules())
+    print(format_report(report, args.top))
+    violations = report.budget_violations()
+    if args.check and violations:
+        print("\n".join(f"over budget: {violation}" for violation in violations), file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Report the download size of each point overlay as GeoJSON and in compact form.
+
+For every layer with a ``compact`` spec, the layer is loaded the same way the
+server loads it, then serialized both as GeoJSON and in the compact layer
+encoding. Sizes are printed identity-encoded, gzip-compressed and
+brotli-compressed, which is what a browser downloads when it enables the
+overlay.
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+import gzip
+from typing import Any, Sequence
+
+import brotli
+import orjson
+
+from functions.compact_layers import encode_compact_layer
+from functions.layer_artifacts import LAYER_ARTIFACT_BROTLI_QUALITY, LAYER_ARTIFACT_GZIP_LEVEL
+from functions.layers import LayersClass
+
+
+@dataclass(frozen=True)
+class EncodedSizes:
+    """Byte sizes of one serialized payload."""
+
+    identity: int
+    gzip: int
+    br: int
+
+
+@dataclass(frozen=True)
+class LayerSizeReport:
+    """GeoJSON and compact sizes for one layer."""
+
+    layer_key: str
+    feature_count: int
+    geojson: EncodedSizes
+    compact: EncodedSizes
+
+    @property
+    def br_savings(self) -> float:
+        """Return the share of brotli-compressed bytes the compact form saves.
+
+        Returns:
+            A fraction between 0 and 1 (negative if the compact form is larger).
+        """
+        return 1 - self.compact.br / self.geojson.br if self.geojson.br else 0.0
+
+
+def encoded_sizes(payload: Any) -> EncodedSizes:
+    """Serialize a payload and measure it with each content encoding.
+
+    Args:
+        payload: JSON-serializable payload.
+
+    Returns:
+        Identity, gzip and brotli sizes in bytes.
+    """
+    body = orjson.dumps(payload)
+    return EncodedSizes(
+        identity=len(body),
+        gzip=len(gzip.compress(body, compresslevel=LAYER_ARTIFACT_GZIP_LEVEL, mtime=0)),
+        br=len(brotli.compress(body, mode=brotli.MODE_TEXT, quality=LAYER_ARTIFACT_BROTLI_QUALITY)),
+    )
+
+
+def compact_layer_keys() -> list[str]:
+    """Return every registered layer that declares a compact spec.
+
+    Returns:
+        Layer keys in registry order.
+    """
+    return [layer_key for layer_key, spec in LayersClass.LAYER_CONFIGS.items() if spec.compact is not None]
+
+
+def measure_layer_sizes(layer_key: str, geojson_data: dict[str, Any] | None = None) -> LayerSizeReport:
+    """Measure one layer as GeoJSON and in the compact layer encoding.
+
+    Args:
+        layer_key: Registered layer key with a compact spec.
+        geojson_data: Layer payload; loaded from the layer's source when omitted.
+
+    Returns:
+        The layer's size report.
+
+    Raises:
+        ValueError: If the layer declares no compact spec.
+    """
+    spec = LayersClass.get_layer_config(layer_key).compact
+    if spec is None:
+        raise ValueError(f"Layer '{layer_key}' has no compact spec.")
+    payload = LayersClass.build_layer_data(layer_key) if geojson_data is None else geojson_data
+    return LayerSizeReport(
+        layer_key=layer_key,
+        feature_count=len(payload.get("features") or []),
+        geojson=encoded_sizes(payload),
+        compact=encoded_sizes(encode_compact_layer(payload, spec)),
+    )
+
+
+def format_report(reports: Sequence[LayerSizeReport]) -> str:
+    """Format layer size reports as a table.
+
+    Args:
+        reports: Measured layers.
+
+    Returns:
+        A printable table with one row per layer and a total row.
+    """
+    header = (
+        f"{'layer':<22} {'features':>8}  {'geojson':>10} {'gzip':>9} {'br':>9}  "
+        f"{'compact':>10} {'gzip':>9} {'br':>9}  {'br saved':>8}"
+    )
+    lines = [header]
+    for report in reports:
+        lines.append(
+            f"{report.layer_key:<22} {report.feature_count:>8,}  "
+            f"{report.geojson.identity:>10,} {report.geojson.gzip:>9,} {report.geojson.br:>9,}  "
+            f"{report.compact.identity:>10,} {report.compact.gzip:>9,} {report.compact.br:>9,}  "
+            f"{report.br_savings:>8.1%}"
+        )
+    geojson_br = sum(report.geojson.br for report in reports)
+    compact_br = sum(report.compact.br for report in reports)
+    saved = 1 - compact_br / geojson_br if geojson_br else 0.0
+    lines.append(f"total brotli: {geojson_br:,} B as GeoJSON, {compact_br:,} B compact ({saved:.1%} saved)")
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Print the size report for the selected (or all compact) layers.
+
+    Args:
+        argv: Command-line arguments; defaults to ``sys.argv[1:]``.
+
+    Returns:
+        None.
+    """
+    parser = argparse.ArgumentParser(description="Report GeoJSON vs compact download sizes of point layers.")
+    parser.add_argument(
+        "--layer",
+        action="append",
+        dest="layers",
+        choices=compact_layer_keys(),
+        help="Layer to measure (repeatable); defaults to every compact layer.",
+    )
+    args = parser.parse_args(argv)
+
+    reports: list[LayerSizeReport] = []
+    for layer_key in args.layers or compact_layer_keys():
+        try:
+            report = measure_layer_sizes(layer_key)
+        except (OSError, ValueError) as exc:
+            print(f"skipping {layer_key}: {exc}")
+            continue
+        if report.feature_count == 0:
+            print(f"skipping {layer_key}: no features")
+            continue
+        reports.append(report)
+    print(format_report(reports))
+
+
+if __name__ == "__main__":
+    main()
@@ -71,6 +71,7 @@ def main() -> None:
             geopackage_path=args.geopackage_path,
             geopackage_layer=args.geopackage_layer,
             output_table="lease_provider_options",
+            summary_table="lease_provider_summary",
             buffer_meters=args.buffer_meters,
             predicate=predicate,
             join_how="inner",
@@ -81,6 +82,7 @@ def main() -> None:
             geopackage_path=args.geopackage_path,
             geopackage_layer=args.geopackage_layer,
             output_table="buy_provider_options",
+            summary_table="buy_provider_summary",
             buffer_meters=args.buffer_meters,
             predicate=predicate,
             join_how="inner",
@@ -0,0 +1,152 @@
+from pathlib import Path
+import sqlite3
+from unittest.mock import patch
+
+import geopandas as gpd
+import pytest
+import shapely
+
+from api.isp import build_provider_options_sql, provider_options_precomputed
+from functions.broadband_spatial_merge_utils import ProviderJoinConfig, write_provider_options_from_geopackage
+from pages.component_base import BaseClass
+
+
+@pytest.fixture
+def merged_db(tmp_path: Path) -> Path:
+    """Run the broadband merge for three lease listings against a tiny GeoPackage.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        The merged database path.
+    """
+    db_path = tmp_path / "larentals.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(
+            """
+            CREATE TABLE lease (mls_number TEXT, latitude REAL, longitude REAL, list_price INTEGER);
+            INSERT INTO lease VALUES
+              ('L-1', 34.05, -118.25, 3000),
+              ('L-2', 34.15, -118.35, 2800),
+              ('L-3', 35.50, -119.50, 2600);
+            """
+        )
+
+    west = shapely.box(-118.40, 34.00, -118.20, 34.20)
+    east = shapely.box(-118.30, 34.00, -118.20, 34.10)
+    providers = gpd.GeoDataFrame(
+        {
+            "DBA": ["Fiber Co", "Cable Co", "Fixed Air", "Old DSL", "Dead Link"],
+            "TechCode": [50, 40, 70, 10, 12],
+            "MaxAdDn": [2000.0, 1200.0, 150.0, 25.0, 0.0],
+            "MaxAdUp": [2000.0, 35.0, 20.0, 3.0, 0.0],
+            "MaxDnTier": [9, 8, 6, 3, 0],
+            "MaxUpTier": [9, 5, 4, 2, 0],
+            "MinDnTier": [1, 1, 1, 1, 0],
+            "MinUpTier": [1, 1, 1, 1, 0],
+            "Contact": [None] * 5,
+            "Busconsm": ["C"] * 5,
+            "Service_Type": ["Wireline", "Wireline", None, "Wireline", "Wireline"],
+        },
+        geometry=[east, west, west, west, east],
+        crs="EPSG:4326",
+    )
+    gpkg_path = tmp_path / "providers.gpkg"
+    providers.to_file(gpkg_path, layer="providers", driver="GPKG")
+
+    write_provider_options_from_geopackage(
+        ProviderJoinConfig(
+            larentals_db_path=str(db_path),
+            listing_table="lease",
+            geopackage_path=str(gpkg_path),
+            geopackage_layer="providers",
+            output_table="lease_provider_options",
+            buffer_meters=0.0,
+            predicate="within",
+        )
+    )
+    return db_path
+
+
+def test_merge_stores_classification_matching_the_popup_query(merged_db: Path) -> None:
+    """Verify that stored service types and buckets equal the on-the-fly classification.
+
+    Args:
+        merged_db: Merged database fixture.
+
+    Returns:
+        None.
+    """
+    with sqlite3.connect(merged_db) as conn:
+        conn.row_factory = sqlite3.Row
+        assert provider_options_precomputed(conn, "lease")
+        for listing_id in ("L-1", "L-2", "L-3"):
+            stored = [dict(row) for row in conn.execute(build_provider_options_sql("lease", True), (listing_id,))]
+            computed = [dict(row) for row in conn.execute(build_provider_options_sql("lease", False), (listing_id,))]
+            assert stored == computed
+        buckets = {
+            row["DBA"]: (row["Service_Type"], row["bucket"])
+            for row in conn.execute(build_provider_options_sql("lease", True), ("L-1",))
+        }
+        plan = " ".join(
+            row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {build_provider_options_sql('lease', True)}", ("L-1",))
+        )
+
+    assert buckets == {
+        "Fiber Co": ("Fiber", "best"),
+        "Cable Co": ("Cable", "best"),
+        "Fixed Air": ("Terrestrial Fixed Wireless", "good"),
+        "Old DSL": ("DSL", "fallback"),
+    }
+    assert "idx_lease_provider_options_listing_id" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_merge_writes_best_speed_summary(merged_db: Path) -> None:
+    """Verify that the summary table holds each listing's best speeds, keyed by listing id.
+
+    Args:
+        merged_db: Merged database fixture.
+
+    Returns:
+        None.
+    """
+    with sqlite3.connect(merged_db) as conn:
+        summary = conn.execute("SELECT * FROM lease_provider_summary ORDER BY listing_id").fetchall()
+        grouped = conn.execute(
+            """
+            SELECT listing_id, MAX(MaxAdDn), MAX(MaxAdUp)
+            FROM lease_provider_options
+            GROUP BY listing_id
+            ORDER BY listing_id
+            """
+        ).fetchall()
+
+    assert summary == grouped == [("L-1", 2000.0, 2000.0), ("L-2", 1200.0, 35.0)]
+
+
+def test_payload_loader_reads_the_summary_table(merged_db: Path) -> None:
+    """Verify that the listing loader takes best speeds from the summary table.
+
+    Args:
+        merged_db: Merged database fixture.
+
+    Returns:
+        None.
+    """
+    with sqlite3.connect(merged_db) as conn:
+        conn.execute("UPDATE lease_provider_summary SET best_dn = 5000 WHERE listing_id = 'L-2'")
+
+    with patch("pages.component_base.DB_PATH", str(merged_db)):
+        loader = BaseClass(
+            table_name="lease",
+            page_type="lease",
+            select_columns=("mls_number", "latitude", "longitude"),
+            include_last_updated=False,
+        )
+
+    speeds = loader.df.set_index("mls_number")["best_dn"].to_dict()
+    assert speeds["L-1"] == 2000.0
+    assert speeds["L-2"] == 5000.0
+    assert speeds["L-3"] != speeds["L-3"]
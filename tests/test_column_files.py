@@ -0,0 +1,134 @@
+import gzip
+from pathlib import Path
+import random
+
+import numpy as np
+import orjson
+
+from functions import lahd, rso
+from functions.column_files import KeyIndex, StringColumn, column_file_path, open_column_file, write_column_file
+
+
+def _write_gzip_json(path: Path, payload: dict[str, object]) -> None:
+    """Write a gzipped JSON lookup artifact.
+
+    Args:
+        path: Destination path.
+        payload: Artifact payload.
+
+    Returns:
+        None.
+    """
+    with gzip.open(path, "wb") as artifact_file:
+        artifact_file.write(orjson.dumps(payload))
+
+
+def test_column_file_round_trips_arrays_and_rejects_bad_files(tmp_path: Path) -> None:
+    """Verify that column files map arrays back unchanged and ignore other kinds and truncated files.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    texts = StringColumn.from_values(["Échelle", None, "", "5TH ST"])
+    keys = KeyIndex.from_mapping({"B": 1, "AA": 0, "C": 3})
+    path = write_column_file(
+        tmp_path / "sample.columns",
+        kind="sample/1",
+        arrays={"values": np.arange(5, dtype=np.float64), **texts.arrays("texts"), **keys.arrays("keys")},
+        attributes={"metadata": {"generated_at": "2026-01-01"}},
+    )
+
+    mapped = open_column_file(path, kind="sample/1")
+    assert mapped is not None and mapped.attributes == {"metadata": {"generated_at": "2026-01-01"}}
+    assert mapped.arrays["values"].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert not mapped.arrays["values"].flags.writeable
+    mapped_texts = StringColumn.from_arrays(mapped.arrays, "texts")
+    assert [mapped_texts[row] for row in range(len(mapped_texts))] == ["Échelle", None, None, "5TH ST"]
+    mapped_keys = KeyIndex.from_arrays(mapped.arrays, "keys")
+    assert list(mapped_keys.items()) == [("AA", 0), ("B", 1), ("C", 3)]
+    assert mapped_keys.get("B") == 1 and mapped_keys.get("A") is None and mapped_keys.get("LONGER KEY") is None
+
+    assert open_column_file(path, kind="other/1") is None
+    path.write_bytes(path.read_bytes()[:-8])
+    assert open_column_file(path, kind="sample/1") is None
+    assert open_column_file(tmp_path / "missing.columns", kind="sample/1") is None
+
+
+def test_lahd_lookup_is_served_from_a_current_column_file(tmp_path: Path) -> None:
+    """Verify that LAHD lookups match when mapped from the column file and fall back once the artifact changes.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    rng = random.Random(3)
+    points = [
+        [
+            34.05 + rng.uniform(-0.01, 0.01),
+            -118.25 + rng.uniform(-0.01, 0.01),
+            *(rng.randrange(0, 9) for _ in range(10)),
+            f"{index} Main Street",
+            f"51{index:08d}" if index % 3 else None,
+            "2020-01-01",
+            None,
+        ]
+        for index in range(400)
+    ]
+    artifact = tmp_path / "lahd_property_lookup.json.gz"
+    _write_gzip_json(artifact, {"records": points, "metadata": {"generated_at": "2026-05-27T17:09:54Z"}})
+    built = lahd._index_prepared_lahd_listing_lookup(lahd._prepare_lahd_listing_lookup(artifact))
+
+    assert lahd.write_lahd_lookup_column_file(artifact) == column_file_path(artifact)
+    mapped = lahd._load_lahd_lookup_artifact(artifact)
+    assert not mapped.latitude.flags.writeable
+    assert len(mapped) == len(built) and mapped.metadata == built.metadata
+    assert [mapped.record(row) for row in range(len(mapped))] == [built.record(row) for row in range(len(built))]
+    assert mapped.row_for_apn("5100000007") == built.row_for_apn("5100000007")
+    for lat, lon in ((34.05, -118.25), (34.051, -118.249), (34.3, -118.0)):
+        assert mapped.nearest(lat, lon, span=2) == built.nearest(lat, lon, span=2)
+
+    _write_gzip_json(artifact, {"records": points[:10]})
+    lahd._load_lahd_listing_lookup.cache_clear()
+    assert len(lahd._load_lahd_lookup_artifact(artifact)) == 10
+
+
+def test_rso_lookup_is_served_from_a_current_column_file(tmp_path: Path) -> None:
+    """Verify that RSO lookups match when mapped from the column file and fall back once the artifact changes.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    artifact = tmp_path / "rso_property_lookup.json.gz"
+    records = [
+        {"apn": "1", "address": "123 MAIN STREET", "rso_units": 2, "unit_range": "2 units", "rso_year": 2026},
+        {"apn": "2", "address": "456 MAIN STREET", "rso_units": None, "unit_range": "2-4 units", "rso_year": 2025},
+    ]
+    _write_gzip_json(artifact, {"records": records})
+    rso._load_lookup.cache_clear()
+    expected = [rso.lookup_rso_property_for_listing(address, artifact) for address in ("123 Main St #4", "456 Main St")]
+
+    rso.write_rso_lookup_column_file(artifact)
+    mapped = rso._load_lookup(str(artifact), artifact.stat().st_mtime_ns)
+    assert not mapped.rso_units.flags.writeable
+    assert mapped.get("456 MAIN ST") == {
+        "rso_units": None,
+        "rso_year": 2025,
+        "unit_range": "2-4 units",
+        "apn": "2",
+        "address": "456 MAIN STREET",
+    }
+    assert [rso.lookup_rso_property_for_listing(address, artifact) for address in ("123 Main St #4", "456 Main St")] == (
+        expected
+    )
+
+    _write_gzip_json(artifact, {"records": records[:1]})
+    rso._load_lookup.cache_clear()
+    assert rso.lookup_rso_property_for_listing("456 Main St", artifact) == rso._empty_result(data_available=True)
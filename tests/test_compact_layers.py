@@ -0,0 +1,174 @@
+from pathlib import Path
+import random
+import shutil
+import subprocess
+from typing import Any
+
+import orjson
+import pytest
+
+from functions.compact_layers import (
+    CompactLayerSpec,
+    decode_compact_layer,
+    encode_compact_layer,
+)
+from functions.layers import LayersClass
+from scripts.report_layer_sizes import measure_layer_sizes
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+COMPACT_LAYERS_JS = REPO_ROOT / "assets" / "js" / "clientside_callbacks" / "compact_layers.js"
+NODE = shutil.which("node")
+
+NODE_HARNESS = """
+const fs = require("fs");
+const vm = require("vm");
+const input = JSON.parse(fs.readFileSync(0, "utf8"));
+const context = {window: {}};
+vm.createContext(context);
+vm.runInContext(fs.readFileSync(input.file, "utf8"), context, {filename: input.file});
+const decode = context.window.larentals.compactLayers.decodeCompactLayer;
+process.stdout.write(JSON.stringify([decode(input.compact), decode(input.geojson)]));
+"""
+
+SPEC = CompactLayerSpec(properties=("name", "status", "rating", "tags"))
+
+
+def _stores(count: int = 300, seed: int = 7) -> dict[str, Any]:
+    """Build a point FeatureCollection with repeated categories and unused columns.
+
+    Args:
+        count: Number of features.
+        seed: Random seed for reproducible coordinates.
+
+    Returns:
+        A GeoJSON FeatureCollection.
+    """
+    rng = random.Random(seed)
+    return {
+        "type": "FeatureCollection",
+        "metadata": {"title": "Stores"},
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [rng.uniform(-118.7, -117.9), rng.uniform(33.7, 34.4)],
+                },
+                "properties": {
+                    "name": f"Store {index}",
+                    "status": rng.choice(["open", "closed", None]),
+                    "rating": None if index % 5 == 0 else round(rng.uniform(1, 5), 1),
+                    "tags": ["grocery"] if index % 2 else [],
+                    "unused": "x" * 40,
+                },
+            }
+            for index in range(count)
+        ],
+    }
+
+
+def _expected(payload: dict[str, Any], precision: int) -> dict[str, Any]:
+    """Apply the lossy parts of the compact encoding to a FeatureCollection.
+
+    Args:
+        payload: Source FeatureCollection.
+        precision: Coordinate decimal places kept.
+
+    Returns:
+        The FeatureCollection a compact round trip should produce.
+    """
+    return {
+        **payload,
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [round(value, precision) for value in feature["geometry"]["coordinates"]],
+                },
+                "properties": {key: feature["properties"].get(key) for key in SPEC.properties},
+            }
+            for feature in payload["features"]
+        ],
+    }
+
+
+def test_compact_round_trip_keeps_template_properties_and_quantizes_coordinates() -> None:
+    """Verify that encoding then decoding keeps the spec's properties at the spec's precision.
+
+    Returns:
+        None.
+    """
+    payload = _stores()
+    compact = encode_compact_layer(payload, SPEC)
+
+    assert compact["type"] == "CompactFeatureCollection"
+    assert compact["metadata"] == {"title": "Stores"}
+    assert set(compact["properties"]) == set(SPEC.properties)
+    assert sorted(compact["properties"]["status"]["dictionary"]) == ["closed", "open"]
+    assert "values" in compact["properties"]["name"]
+    assert all(isinstance(delta, int) for delta in compact["coordinates"])
+    assert decode_compact_layer(compact) == _expected(payload, SPEC.precision)
+    assert len(orjson.dumps(compact)) < len(orjson.dumps(payload)) / 2
+
+
+def test_compact_encoding_rejects_non_point_features_and_drops_empty_columns() -> None:
+    """Verify that non-point features are rejected and all-null properties are omitted.
+
+    Returns:
+        None.
+    """
+    line = {
+        "type": "FeatureCollection",
+        "features": [{"type": "Feature", "geometry": {"type": "LineString", "coordinates": []}, "properties": {}}],
+    }
+    with pytest.raises(ValueError):
+        encode_compact_layer(line, SPEC)
+
+    sparse = _stores(count=3)
+    for feature in sparse["features"]:
+        feature["properties"]["rating"] = None
+    assert "rating" not in encode_compact_layer(sparse, SPEC)["properties"]
+    with pytest.raises(ValueError):
+        decode_compact_layer(sparse)
+
+
+@pytest.mark.skipif(NODE is None, reason="node is required to run the clientside decoder")
+def test_browser_decoder_matches_python_decoder() -> None:
+    """Verify that the clientside decoder expands compact layers exactly like the Python one.
+
+    Returns:
+        None.
+    """
+    payload = _stores()
+    compact = encode_compact_layer(payload, SPEC)
+    completed = subprocess.run(
+        [NODE, "-e", NODE_HARNESS],
+        input=orjson.dumps({"file": str(COMPACT_LAYERS_JS), "compact": compact, "geojson": payload}),
+        capture_output=True,
+        check=True,
+    )
+    from_compact, passthrough = orjson.loads(completed.stdout)
+
+    assert from_compact == decode_compact_layer(compact)
+    assert passthrough == payload
+
+
+def test_layer_size_report_and_school_projection_use_popup_properties() -> None:
+    """Verify that the size report and the school callback projection honor each layer's compact spec.
+
+    Returns:
+        None.
+    """
+    payload = _stores()
+    for feature in payload["features"]:
+        feature["properties"].update({"school_name": feature["properties"]["name"], "search_text": "store"})
+
+    report = measure_layer_sizes("schools", payload)
+    projected = LayersClass.project_layer_data("schools", payload)
+
+    assert report.feature_count == 300
+    assert report.compact.identity < report.geojson.identity
+    assert report.compact.br < report.geojson.br
+    assert all(set(feature["properties"]) == {"school_name"} for feature in projected["features"])
+    assert LayersClass.project_layer_data("crime", payload) is payload
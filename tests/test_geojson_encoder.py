@@ -0,0 +1,84 @@
+import geopandas as gpd
+import numpy as np
+import orjson
+import pandas as pd
+from shapely.geometry import Point, Polygon
+
+from functions.geojson_encoder import encode_geojson_feature_collection
+from pages.component_base import GEOJSON_ROUND_COLUMNS
+from scripts.benchmark_geojson_encoder import (
+    build_synthetic_listings,
+    legacy_return_geojson,
+)
+
+
+def test_encoder_matches_legacy_listing_payload() -> None:
+    """Verify that the columnar encoder reproduces the legacy listing payload exactly.
+
+    Returns:
+        None.
+    """
+    gdf = build_synthetic_listings(500, seed=3)
+
+    encoded = orjson.loads(
+        encode_geojson_feature_collection(gdf, round_columns=GEOJSON_ROUND_COLUMNS)
+    )
+
+    assert encoded == legacy_return_geojson(gdf)
+
+
+def test_encoder_handles_missing_values_and_special_keys() -> None:
+    """Verify that NaN, None, NaT, and odd property names encode safely.
+
+    Returns:
+        None.
+    """
+    gdf = gpd.GeoDataFrame(
+        {
+            "rate%": [1.23456, np.nan],
+            'quote"key': ["a", None],
+            "count": [1, 2],
+            "flag": [True, False],
+            "listed_date": pd.to_datetime(["2026-05-01 10:30:00", None]),
+        },
+        geometry=[Point(-118.25, 34.05), None],
+    )
+
+    payload = orjson.loads(
+        encode_geojson_feature_collection(gdf, round_columns={"rate%": 2})
+    )
+
+    first, second = payload["features"]
+    assert first["properties"] == {
+        "rate%": 1.23,
+        'quote"key': "a",
+        "count": 1,
+        "flag": True,
+        "listed_date": "2026-05-01T10:30:00",
+    }
+    assert first["geometry"] == {"type": "Point", "coordinates": [-118.25, 34.05]}
+    assert second["properties"]["rate%"] is None
+    assert second["properties"]['quote"key'] is None
+    assert second["properties"]["listed_date"] == ""
+    assert second["geometry"] is None
+
+
+def test_encoder_supports_non_point_geometries_and_column_subsets() -> None:
+    """Verify that polygon layers encode via shapely and honor property subsets.
+
+    Returns:
+        None.
+    """
+    gdf = gpd.GeoDataFrame(
+        {"name": ["Block"], "ignored": ["x"]},
+        geometry=[Polygon([(0, 0), (1, 0), (1, 1), (0, 0)])],
+    )
+
+    payload = orjson.loads(
+        encode_geojson_feature_collection(gdf, property_columns=["name"])
+    )
+
+    assert payload == orjson.loads(gdf[["name", "geometry"]].to_json(drop_id=True))
+    assert encode_geojson_feature_collection(gdf.iloc[0:0]) == (
+        b'{"type":"FeatureCollection","features":[]}'
+    )
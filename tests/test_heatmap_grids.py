@@ -0,0 +1,215 @@
+from collections.abc import Iterator
+from dataclasses import replace
+from pathlib import Path
+import random
+from typing import Any
+
+from flask import Flask
+import orjson
+import pytest
+
+from api.layers import register_layer_routes
+from functions import layer_artifacts, parking_tickets
+from functions.heatmap_grids import (
+    HEATMAP_GRID_BANDS,
+    build_heat_grid,
+    clear_heatmap_grids,
+    heatmap_grid_from_geojson,
+)
+from functions.layer_artifacts import clear_layer_artifacts, get_layer_artifact
+from functions.layers import LayersClass
+from functions.listing_spatial_index import BoundingBox
+
+
+def _heat_layer(count: int = 2000, seed: int = 3) -> dict[str, Any]:
+    """Build a parking-style heat anchor with weighted points and markers.
+
+    Args:
+        count: Number of heat points.
+        seed: Random seed for reproducible positions.
+
+    Returns:
+        A heat layer FeatureCollection with one anchor feature.
+    """
+    rng = random.Random(seed)
+    heat_points = [
+        [round(rng.uniform(33.8, 34.3), 6), round(rng.uniform(-118.6, -118.1), 6), round(rng.uniform(0.14, 1.0), 4)]
+        for _ in range(count)
+    ]
+    marker_points = [
+        [point[0], point[1], index + 1, 63.0, 63.0, f"{index} MAIN ST", 1]
+        for index, point in enumerate(heat_points[:300])
+    ]
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [-118.3, 34.05]},
+                "properties": {
+                    "layer_role": "parking_tickets_heat_anchor",
+                    "heat_points": heat_points,
+                    "heat_grid": build_heat_grid(heat_points),
+                    "marker_points": marker_points,
+                    "marker_frequency_breaks": [12, 52, 156, 520],
+                    "marker_zoom_min": 15,
+                    "heat_zoom_max": 16,
+                },
+            }
+        ],
+        "metadata": {"artifact_version": 5},
+    }
+
+
+def test_heat_grid_conserves_weight_and_coarsens_with_zoom() -> None:
+    """Verify that every band keeps the total weight and lower zooms use fewer, coarser cells.
+
+    Returns:
+        None.
+    """
+    heat_points = _heat_layer()["features"][0]["properties"]["heat_points"]
+    total = sum(point[2] for point in heat_points)
+    grid = build_heat_grid(heat_points + [[34.0, -118.2, 0], ["x", None, 1]])
+
+    cell_counts = []
+    for band, serialized in zip(HEATMAP_GRID_BANDS, grid["bands"]):
+        cells = serialized["cells"]
+        assert serialized["cell_zoom"] == band.cell_zoom
+        assert [cell[0] for cell in cells] == sorted(cell[0] for cell in cells)
+        assert all(len(cell[0]) == band.cell_zoom for cell in cells)
+        assert sum(cell[3] for cell in cells) == pytest.approx(total, abs=1e-3 * len(cells))
+        cell_counts.append(len(cells))
+    assert cell_counts == sorted(cell_counts) and cell_counts[0] < cell_counts[-1] <= len(heat_points)
+
+    merged = build_heat_grid([[34.05, -118.25, 1.0], [34.0500001, -118.2500001, 3.0]])
+    assert merged["bands"][0]["cells"] == [
+        [merged["bands"][0]["cells"][0][0], 34.05, -118.25, 4.0]
+    ]
+    assert build_heat_grid([])["bands"][0]["cells"] == []
+
+
+def test_viewport_returns_band_cells_and_markers_inside_bbox() -> None:
+    """Verify that viewports return only the zoom band's cells in view and markers once zoomed in.
+
+    Returns:
+        None.
+    """
+    layer = _heat_layer()
+    grid = heatmap_grid_from_geojson(layer, version="v1")
+    bbox = BoundingBox(west=-118.4, south=33.9, east=-118.3, north=34.0)
+
+    county = grid.viewport(9.6)
+    assert county["zoom"] == 9 and county["cell_zoom"] == 15 and county["marker_points"] == []
+    assert len(county["heat_points"]) == len(layer["features"][0]["properties"]["heat_grid"]["bands"][0]["cells"])
+
+    street = grid.viewport(15.2, bbox)
+    assert street["cell_zoom"] == 20
+    assert street["heat_points"] and all(
+        bbox.south - 0.01 <= lat <= bbox.north + 0.01 and bbox.west - 0.01 <= lon <= bbox.east + 0.01
+        for lat, lon, _ in street["heat_points"]
+    )
+    expected_markers = [
+        point
+        for point in layer["features"][0]["properties"]["marker_points"]
+        if bbox.south <= point[0] <= bbox.north and bbox.west <= point[1] <= bbox.east
+    ]
+    assert street["marker_points"] == expected_markers
+
+    close = grid.viewport(17, bbox)
+    assert close["heat_points"] == [] and close["cell_zoom"] is None
+    assert close["marker_points"] == expected_markers
+
+    # Artifacts written before the builders emitted grids are aggregated on load.
+    del layer["features"][0]["properties"]["heat_grid"]
+    assert heatmap_grid_from_geojson(layer, version="v0").viewport(12, bbox) == {
+        **grid.viewport(12, bbox),
+        "version": "v0",
+    }
+    assert heatmap_grid_from_geojson({"type": "FeatureCollection", "features": []}, version="e").viewport(5) == {
+        "version": "e",
+        "zoom": 5,
+        "cell_zoom": 15,
+        "heat_points": [],
+        "marker_points": [],
+    }
+
+
+@pytest.fixture
+def parking_layer(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[dict[str, Any]]:
+    """Serve a synthetic parking heat layer through the layer registry and cache.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+        monkeypatch: Pytest fixture used to patch the layer registry.
+
+    Yields:
+        The synthetic heat layer.
+    """
+    layer = _heat_layer()
+    source = tmp_path / "parking.json.gz"
+    source.write_bytes(b"source")
+    spec = LayersClass.LAYER_CONFIGS["parking_tickets_density"]
+    monkeypatch.setitem(
+        LayersClass.LAYER_CONFIGS,
+        "parking_tickets_density",
+        replace(spec, loader=lambda: layer, source_path=str(source), cache_ttl_seconds=None),
+    )
+    monkeypatch.setitem(LayersClass.geojson_cache, spec.dataset, (1000.0, layer))
+    monkeypatch.setattr(layer_artifacts, "LAYER_ARTIFACT_DIR", tmp_path / "artifacts")
+    clear_heatmap_grids()
+    clear_layer_artifacts()
+    yield layer
+    clear_heatmap_grids()
+    clear_layer_artifacts()
+
+
+def test_heat_route_serves_viewport_cells_and_artifact_drops_points(parking_layer: dict[str, Any]) -> None:
+    """Verify that the heat route serves viewport cells and the static artifact omits per-point arrays.
+
+    Args:
+        parking_layer: Synthetic parking heat layer.
+
+    Returns:
+        None.
+    """
+    server = Flask(__name__)
+    register_layer_routes(server)
+    client = server.test_client()
+
+    response = client.get("/api/layers/parking_tickets_density/heat?zoom=11.4&bbox=-118.4,33.9,-118.3,34.0")
+    payload = orjson.loads(response.data)
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "public, max-age=300"
+    assert payload["version"] == repr(1000.0) and payload["zoom"] == 11 and payload["cell_zoom"] == 17
+    assert 0 < len(payload["heat_points"]) < len(parking_layer["features"][0]["properties"]["heat_points"])
+
+    assert client.get("/api/layers/parking_tickets_density/heat?zoom=abc").status_code == 400
+    assert client.get("/api/layers/parking_tickets_density/heat?zoom=nan").status_code == 400
+    assert client.get("/api/layers/parking_tickets_density/heat?zoom=3&bbox=1,2,3").status_code == 400
+    assert client.get("/api/layers/oil_well/heat?zoom=3").status_code == 404
+    assert client.get("/api/layers/unknown/heat?zoom=3").status_code == 404
+
+    artifact = get_layer_artifact("parking_tickets_density")
+    assert artifact is not None
+    anchor = orjson.loads(artifact.path_for(None).read_bytes())["features"][0]["properties"]
+    assert anchor["heat_cells_url"] == "/api/layers/parking_tickets_density/heat"
+    assert not {"heat_points", "marker_points", "heat_grid"} & set(anchor)
+    assert anchor["marker_frequency_breaks"] == [12, 52, 156, 520]
+
+
+def test_parking_marker_tiers_are_computed_over_every_marker() -> None:
+    """Verify that parking marker tiers use the legend's hybrid rule, including on upgraded artifacts.
+
+    Returns:
+        None.
+    """
+    assert parking_tickets._marker_frequency_thresholds([]) == (12, 52, 156, 520)
+    assert parking_tickets._marker_frequency_thresholds(list(range(1, 301))) == (12, 52, 156, 520)
+    assert parking_tickets._marker_frequency_thresholds(list(range(1, 1001))) == (12, 52, 156, 1000)
+
+    layer = _heat_layer()
+    properties = layer["features"][0]["properties"]
+    properties["marker_points"] = [[34.0, -118.3, count, 63.0, 63.0, "MAIN ST", 1] for count in range(1, 1001)]
+    properties["marker_frequency_breaks"] = [500, 750, 900, 975]
+    parking_tickets._upgrade_marker_frequency_breaks(layer)
+    assert properties["marker_frequency_breaks"] == [12, 52, 156, 1000]
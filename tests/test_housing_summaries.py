@@ -0,0 +1,171 @@
+import gzip
+from pathlib import Path
+import sqlite3
+from typing import Any
+
+from flask import Flask
+import orjson
+import pytest
+
+from api import listings as listings_api
+from api.listings import register_listing_routes
+from functions import lahd, listing_detail_cache, rso
+from scripts.enrich_housing_summaries import enrich_table, parse_args
+
+
+def _write_gzip_json(path: Path, payload: dict[str, object]) -> None:
+    """Write a gzipped JSON lookup artifact.
+
+    Args:
+        path: Destination path.
+        payload: Artifact payload.
+
+    Returns:
+        None.
+    """
+    with gzip.open(path, "wb") as artifact_file:
+        artifact_file.write(orjson.dumps(payload))
+
+
+def _create_lease_db(db_path: Path) -> None:
+    """Create a lease table with one LAHD/RSO match and one unmatched listing.
+
+    Args:
+        db_path: Destination SQLite path.
+
+    Returns:
+        None.
+    """
+    columns = [
+        "mls_number", "subtype", "list_price", "bedrooms", "total_bathrooms", "sqft", "ppsqft",
+        "year_built", "parking_spaces", "pet_policy", "terms", "furnished", "phone_number",
+        "security_deposit", "pet_deposit", "key_deposit", "other_deposit", "full_street_address",
+        "city", "latitude", "longitude", "listed_date", "listing_url", "mls_photo", "laundry_category",
+    ]
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(f"CREATE TABLE lease ({', '.join(columns)})")
+        conn.execute(
+            "CREATE TABLE lease_provider_options (listing_id TEXT, DBA TEXT, Service_Type TEXT, TechCode INTEGER, "
+            "MaxAdDn REAL, MaxAdUp REAL, MaxDnTier REAL, MaxUpTier REAL, MinDnTier REAL, MinUpTier REAL)"
+        )
+        for mls_number, address, latitude, longitude in (
+            ("HIT", "123 Main St #4", 34.0500, -118.2500),
+            ("MISS", "999 Nowhere Ave", 34.2000, -118.5000),
+        ):
+            row = {column: None for column in columns}
+            row.update(
+                mls_number=mls_number,
+                full_street_address=address,
+                city="Los Angeles",
+                latitude=latitude,
+                longitude=longitude,
+            )
+            conn.execute(f"INSERT INTO lease VALUES ({', '.join('?' for _ in columns)})", list(row.values()))
+
+
+def test_popups_serve_stored_summaries_until_the_artifacts_change(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Verify that enrich-housing-summaries stores popup summaries that the API returns without live lookups.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+        monkeypatch: Pytest fixture used to point lookups at test artifacts.
+
+    Returns:
+        None.
+    """
+    lahd_artifact = tmp_path / "lahd_property_lookup.json.gz"
+    rso_artifact = tmp_path / "rso_property_lookup.json.gz"
+    _write_gzip_json(
+        lahd_artifact,
+        {
+            "records": [
+                [34.05, -118.25, 7, 3, 1, 2, 1, 4, 2, 0, 0, 0, "123 MAIN STREET", "5100000001", "2026-04-01", None],
+            ]
+        },
+    )
+    _write_gzip_json(
+        rso_artifact,
+        {"records": [{"apn": "5100000001", "address": "123 MAIN STREET", "rso_units": 8, "rso_year": 2026}]},
+    )
+    lahd._load_lahd_listing_lookup.cache_clear()
+    rso._load_lookup.cache_clear()
+    db_path = tmp_path / "listings.db"
+    _create_lease_db(db_path)
+
+    args = parse_args(
+        ["--db-path", str(db_path), "--lahd-lookup-path", str(lahd_artifact), "--rso-lookup-path", str(rso_artifact)]
+    )
+    assert enrich_table("lease", args) == 2
+    live = {
+        mls_number: (
+            lahd.lookup_lahd_property_for_listing(
+                address=address, latitude=latitude, longitude=longitude, artifact_path=lahd_artifact
+            ),
+            rso.lookup_rso_property_for_listing(address, rso_artifact),
+        )
+        for mls_number, address, latitude, longitude in (
+            ("HIT", "123 Main St #4", 34.0500, -118.2500),
+            ("MISS", "999 Nowhere Ave", 34.2000, -118.5000),
+        )
+    }
+    assert live["HIT"][0]["matched"] and live["HIT"][1]["matched"] and not live["MISS"][0]["matched"]
+
+    recomputed: list[str] = []
+
+    def record_lahd_lookup(**kwargs: Any) -> dict[str, Any]:
+        """Record a live LAHD lookup made by a popup.
+
+        Args:
+            **kwargs: Listing address and coordinates.
+
+        Returns:
+            The empty LAHD result.
+        """
+        recomputed.append("lahd")
+        return lahd.unavailable_lahd_listing_lookup_result()
+
+    def record_rso_lookup(address: object) -> dict[str, Any]:
+        """Record a live RSO lookup made by a popup.
+
+        Args:
+            address: Listing street address.
+
+        Returns:
+            The empty RSO result.
+        """
+        recomputed.append("rso")
+        return rso._empty_result(data_available=False)
+
+    monkeypatch.setattr(listings_api, "lookup_lahd_property_for_listing", record_lahd_lookup)
+    monkeypatch.setattr(listings_api, "lookup_rso_property_for_listing", record_rso_lookup)
+    monkeypatch.setattr(listings_api, "live_lahd_datasets_available", lambda: True)
+    monkeypatch.setattr(listing_detail_cache, "live_lahd_datasets_available", lambda: True)
+    monkeypatch.setattr(
+        listings_api, "stored_lahd_listing_summary", lambda row: lahd.stored_lahd_listing_summary(row, lahd_artifact)
+    )
+    monkeypatch.setattr(
+        listings_api, "stored_rso_listing_summary", lambda row: rso.stored_rso_listing_summary(row, rso_artifact)
+    )
+    listing_detail_cache.listing_detail_response_cache.clear()
+    server = Flask(__name__)
+    register_listing_routes(server, db_path=str(db_path))
+    client = server.test_client()
+
+    batch = client.post("/api/lease/listing-details/batch", json={"ids": ["HIT", "MISS"]}).get_json()["listings"]
+    single = client.get("/api/lease/listing-details/HIT").get_json()
+    listing_detail_cache.listing_detail_response_cache.clear()
+
+    for mls_number, (lahd_summary, rso_summary) in live.items():
+        assert batch[mls_number]["lahd_property_summary"] == lahd_summary
+        assert batch[mls_number]["rso_property_summary"] == {**rso_summary, "jurisdiction_in_scope": True}
+        assert "lahd_problem_score" not in batch[mls_number] and "rso_summary_source" not in batch[mls_number]
+    assert single["lahd_property_summary"] == batch["HIT"]["lahd_property_summary"]
+    assert recomputed == []
+
+    # A rebuilt artifact invalidates the stored LAHD summaries until the stage reruns.
+    _write_gzip_json(lahd_artifact, {"records": []})
+    client.post("/api/lease/listing-details/batch", json={"ids": ["HIT"]})
+    assert recomputed == ["lahd"]
@@ -0,0 +1,93 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+from functions.lazy_imports import lazy_import
+from scripts.report_import_time import (
+    IMPORTED_MODULE_BUDGET,
+    IMPORT_TIME_BUDGET_SECONDS,
+    measure_imports,
+    parse_importtime,
+    web_entry_modules,
+)
+
+
+def test_web_entry_imports_stay_within_budget() -> None:
+    """Verify that booting the web entry point stays off pipeline dependencies and within budget.
+
+    Returns:
+        None.
+    """
+    modules = web_entry_modules()
+    report = measure_imports(modules)
+
+    assert "api" in modules and "pages.components" in modules
+    assert report.pipeline_only_modules() == []
+    assert len(report.modules) <= IMPORTED_MODULE_BUDGET
+    assert report.total_seconds <= IMPORT_TIME_BUDGET_SECONDS
+    assert report.budget_violations() == []
+
+
+def test_pipeline_helpers_defer_their_heavy_dependencies() -> None:
+    """Verify that importing pipeline helpers does not import their third-party clients.
+
+    Returns:
+        None.
+    """
+    report = measure_imports(
+        [
+            "functions.aws_functions",
+            "functions.dataframe_utils",
+            "functions.geocoding_utils",
+            "functions.mls_image_processing_utils",
+        ]
+    )
+
+    assert not {"boto3", "botocore", "bs4", "geopy", "imagekitio"} & report.modules
+
+
+def test_lazy_import_loads_on_first_attribute_access(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verify that a lazy module is imported only when an attribute is read.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+        monkeypatch: Pytest fixture used to extend ``sys.path``.
+
+    Returns:
+        None.
+    """
+    (tmp_path / "lazy_probe_module.py").write_text("VALUE = 42\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    try:
+        proxy = lazy_import("lazy_probe_module")
+        assert "lazy_probe_module" not in sys.modules
+        assert not proxy.is_loaded
+
+        assert proxy.VALUE == 42
+        assert proxy.is_loaded
+        assert "lazy_probe_module" in sys.modules
+    finally:
+        sys.modules.pop("lazy_probe_module", None)
+
+
+def test_parse_importtime_tracks_nesting() -> None:
+    """Verify that importtime rows keep their timings and nesting depth.
+
+    Returns:
+        None.
+    """
+    timings = parse_importtime(
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     encodings.aliases\n"
+        "import time:       300 |        420 |   encodings\n"
+        "import time:        50 |        470 | site\n"
+        "some unrelated log line\n"
+    )
+
+    assert [(timing.module, timing.depth) for timing in timings] == [
+        ("encodings.aliases", 2),
+        ("encodings", 1),
+        ("site", 0),
+    ]
+    assert timings[-1].cumulative_us == 470
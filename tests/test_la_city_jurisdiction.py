@@ -0,0 +1,128 @@
+from pathlib import Path
+import random
+import sqlite3
+from typing import Any
+
+from flask import Flask
+import pytest
+
+from api import listings as listings_api
+from api.listings import register_listing_routes
+from functions import lahd, listing_detail_cache
+from scripts.enrich_jurisdiction import enrich_table, parse_args
+
+
+def test_batch_jurisdiction_matches_single_listing_checks() -> None:
+    """Verify that the vectorized jurisdiction test agrees with the per-listing check on mixed inputs.
+
+    Returns:
+        None.
+    """
+    rng = random.Random(5)
+    cities = ["Los Angeles", "North Hollywood", "Santa Monica", "Pasadena", "", None]
+    listings = [
+        (
+            rng.choice(cities),
+            rng.choice([rng.uniform(33.6, 34.4), rng.uniform(33.6, 34.4), None, "bad", "34.0522", float("nan")]),
+            rng.choice([rng.uniform(-118.8, -118.0), rng.uniform(-118.8, -118.0), None, "-118.2437"]),
+        )
+        for _ in range(2000)
+    ]
+    cities_column, latitudes, longitudes = (list(column) for column in zip(*listings))
+
+    batch = lahd.listings_in_los_angeles_city(cities_column, latitudes, longitudes)
+
+    assert batch == [
+        lahd.is_listing_in_los_angeles_city(city=city, latitude=latitude, longitude=longitude)
+        for city, latitude, longitude in listings
+    ]
+    assert {True, False, None} <= set(batch)
+    assert lahd.listings_in_los_angeles_city(
+        ["Los Angeles", "Pasadena"], [34.05, 34.05], [-118.25, -118.25], boundary_path=Path("/missing.geojson")
+    ) == [True, None]
+
+
+def _create_lease_db(db_path: Path) -> None:
+    """Create a lease table with listings inside, outside and without coordinates.
+
+    Args:
+        db_path: Destination SQLite path.
+
+    Returns:
+        None.
+    """
+    columns = [
+        "mls_number", "subtype", "list_price", "bedrooms", "total_bathrooms", "sqft", "ppsqft",
+        "year_built", "parking_spaces", "pet_policy", "terms", "furnished", "phone_number",
+        "security_deposit", "pet_deposit", "key_deposit", "other_deposit", "full_street_address",
+        "city", "latitude", "longitude", "listed_date", "listing_url", "mls_photo", "laundry_category",
+    ]
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(f"CREATE TABLE lease ({', '.join(columns)})")
+        conn.execute(
+            "CREATE TABLE lease_provider_options (listing_id TEXT, DBA TEXT, Service_Type TEXT, TechCode INTEGER, "
+            "MaxAdDn REAL, MaxAdUp REAL, MaxDnTier REAL, MaxUpTier REAL, MinDnTier REAL, MinUpTier REAL)"
+        )
+        for mls_number, city, latitude, longitude in (
+            ("IN", "North Hollywood", 34.1706, -118.3772),
+            ("OUT", "Santa Monica", 34.0195, -118.4912),
+            ("NEW", "Los Angeles", None, None),
+        ):
+            row = {column: None for column in columns}
+            row.update(mls_number=mls_number, city=city, latitude=latitude, longitude=longitude)
+            conn.execute(f"INSERT INTO lease VALUES ({', '.join('?' for _ in columns)})", list(row.values()))
+
+
+def test_detail_routes_read_the_stored_jurisdiction(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verify that enrich-jurisdiction stores in_la_city and popups read it instead of testing the boundary.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+        monkeypatch: Pytest fixture used to stub lookups and count boundary checks.
+
+    Returns:
+        None.
+    """
+    db_path = tmp_path / "listings.db"
+    _create_lease_db(db_path)
+    assert enrich_table("lease", parse_args(["--db-path", str(db_path), "--listing-table", "lease"])) == 3
+    with sqlite3.connect(db_path) as conn:
+        stored = dict(conn.execute("SELECT mls_number, in_la_city FROM lease_enrichment").fetchall())
+    assert stored == {"IN": 1, "OUT": 0, "NEW": 1}
+
+    # A listing the enrichment has not covered yet still gets a live check.
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("INSERT INTO lease (mls_number, city, latitude, longitude) VALUES ('LATE', 'Pasadena', 34.14, -118.14)")
+
+    checked: list[Any] = []
+
+    def count_checks(**kwargs: Any) -> bool | None:
+        """Record a live jurisdiction check.
+
+        Args:
+            **kwargs: Listing city and coordinates.
+
+        Returns:
+            The real jurisdiction result.
+        """
+        checked.append(kwargs["city"])
+        return lahd.is_listing_in_los_angeles_city(**kwargs)
+
+    monkeypatch.setattr(listings_api, "is_listing_in_los_angeles_city", count_checks)
+    monkeypatch.setattr(listings_api, "live_lahd_datasets_available", lambda: False)
+    monkeypatch.setattr(listings_api, "lookup_rso_property_for_listing", lambda address: {"matched": False})
+    monkeypatch.setattr(listing_detail_cache, "live_lahd_datasets_available", lambda: False)
+    listing_detail_cache.listing_detail_response_cache.clear()
+    server = Flask(__name__)
+    register_listing_routes(server, db_path=str(db_path))
+    client = server.test_client()
+
+    inside = client.get("/api/lease/listing-details/IN").get_json()
+    outside = client.get("/api/lease/listing-details/OUT").get_json()
+    batch = client.post("/api/lease/listing-details/batch", json={"ids": ["IN", "LATE"]}).get_json()["listings"]
+    listing_detail_cache.listing_detail_response_cache.clear()
+
+    assert inside["in_la_city"] is True and inside["rso_property_summary"]["jurisdiction_in_scope"] is True
+    assert outside["in_la_city"] is False and outside["lahd_property_summary"]["jurisdiction_in_scope"] is False
+    assert batch["IN"]["in_la_city"] is True and batch["LATE"]["in_la_city"] is False
+    assert checked == ["Pasadena"]
@@ -0,0 +1,64 @@
+import random
+from typing import Any
+
+from functions import lahd
+from functions.lahd_lookup_index import LAHD_LOOKUP_COUNT_FIELDS, LAHD_LOOKUP_TEXT_FIELDS, empty_lahd_lookup_index
+from scripts.benchmark_lahd_lookup import build_queries, columnar_lookup, legacy_index, legacy_lookup
+
+
+def _prepared(count: int = 3000, seed: int = 2) -> dict[str, Any]:
+    """Build prepared LAHD lookup columns with clustered parcels and shared addresses.
+
+    Args:
+        count: Number of records.
+        seed: Random seed for reproducible records.
+
+    Returns:
+        A mapping shaped like ``lahd._prepare_lahd_listing_lookup`` output.
+    """
+    rng = random.Random(seed)
+    records = []
+    for index in range(count):
+        lat = round(34.05 + rng.uniform(-0.02, 0.02), 6)
+        lon = round(-118.25 + rng.uniform(-0.02, 0.02), 6)
+        records.append(
+            {
+                "lat": lat,
+                "lon": lon,
+                **{name: rng.randrange(0, 40) for name in LAHD_LOOKUP_COUNT_FIELDS},
+                "address": f"{index % 700} MAIN STREET, Los Angeles, CA 90012",
+                "apn": None if index % 5 == 0 else f"51{index % 900:08d}",
+                "first_case_date": "2015-01-01",
+                "latest_case_date": rng.choice([None, "2025-09-10", "2024-01-02"]),
+            }
+        )
+    # A parcel with the same coordinates as another breaks distance ties by record order.
+    records.append({**records[10], "address": "1 TIE ST", "apn": "5100000001"})
+    names = ("lat", "lon", *LAHD_LOOKUP_COUNT_FIELDS, *LAHD_LOOKUP_TEXT_FIELDS)
+    return {
+        "columns": {name: [record[name] for record in records] for name in names},
+        "address_keys": [lahd._normalize_property_address_for_lookup(record["address"]) for record in records],
+        "apn_keys": [lahd._normalize_apn(record["apn"]) for record in records],
+        "metadata": {"generated_at": "2026-05-27T17:09:54Z"},
+    }
+
+
+def test_columnar_index_matches_the_dict_index() -> None:
+    """Verify that address, APN and nearest-parcel matches agree with the dict-of-records index.
+
+    Returns:
+        None.
+    """
+    prepared = _prepared()
+    legacy = legacy_index(prepared)
+    index = lahd._index_prepared_lahd_listing_lookup(prepared)
+
+    assert len(index) == len(legacy["records"]) and index.metadata["generated_at"] == "2026-05-27T17:09:54Z"
+    queries = build_queries(prepared, 3000, seed=9) + [("", 34.3, -118.0), ("", 0.0, 0.0)]
+    assert [columnar_lookup(index, *query) for query in queries] == [legacy_lookup(legacy, *query) for query in queries]
+
+    assert {apn: index.record(row) for apn, row in index.apn_rows.items()} == legacy["apn_index"]
+    assert {key: index.record(row) for key, row in index.address_rows.items()} == legacy["address_index"]
+
+    empty = empty_lahd_lookup_index(lahd.LAHD_LOOKUP_SPATIAL_CELL_DEGREES)
+    assert len(empty) == 0 and empty.nearest(34.05, -118.25, span=2) is None and empty.row_for_apn("1") is None
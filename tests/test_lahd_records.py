@@ -10,13 +10,31 @@ from functions import lahd
 from functions import lahd_records_ui
 
 
+@pytest.fixture
+def record_detail_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point the shared record-detail cache at a temporary file.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+        monkeypatch: Pytest fixture used to replace the cache path.
+
+    Returns:
+        The temporary cache file.
+    """
+    cache_path = tmp_path / "lahd_record_details.sqlite3"
+    monkeypatch.setattr(lahd, "LAHD_RECORD_DETAIL_CACHE_PATH", cache_path)
+    return cache_path
+
+
 def test_fetch_lahd_property_record_details_normalizes_rows(
     monkeypatch: pytest.MonkeyPatch,
+    record_detail_cache: Path,
 ) -> None:
     """Verify that fetch lahd property record details normalizes rows.
 
     Args:
         monkeypatch: Pytest fixture used to replace dependencies during the test.
+        record_detail_cache: Temporary record-detail cache file.
 
     Returns:
         None.
@@ -71,13 +89,9 @@ def test_fetch_lahd_property_record_details_normalizes_rows(
         raise AssertionError(f"Unexpected URL: {url}")
 
     monkeypatch.setattr(lahd, "_request_socrata_rows", fake_request)
-    lahd.fetch_lahd_property_record_details.cache_clear()
-
-    try:
-        payload = lahd.fetch_lahd_property_record_details("5046-034-015", row_limit=1)
-    finally:
-        lahd.fetch_lahd_property_record_details.cache_clear()
+    payload = lahd.fetch_lahd_property_record_details("5046-034-015", row_limit=1)
 
+    assert record_detail_cache.is_file()
     assert payload["apn"] == "5046034015"
     assert payload["cases"] == [
         {
@@ -97,11 +111,13 @@ def test_fetch_lahd_property_record_details_normalizes_rows(
 
 def test_fetch_lahd_property_record_details_falls_back_to_snapshot(
     monkeypatch: pytest.MonkeyPatch,
+    record_detail_cache: Path,
 ) -> None:
     """Verify that fetch lahd property record details falls back to snapshot.
 
     Args:
         monkeypatch: Pytest fixture used to replace dependencies during the test.
+        record_detail_cache: Temporary record-detail cache file.
 
     Returns:
         None.
@@ -165,13 +181,9 @@ def test_fetch_lahd_property_record_details_falls_back_to_snapshot(
         },
     )
     monkeypatch.setattr(lahd, "get_lahd_property_lookup_metadata", lambda: {"generated_at": "2026-05-27T17:09:54Z"})
-    lahd.fetch_lahd_property_record_details.cache_clear()
-
-    try:
-        payload = lahd.fetch_lahd_property_record_details("5030-011-006")
-    finally:
-        lahd.fetch_lahd_property_record_details.cache_clear()
+    payload = lahd.fetch_lahd_property_record_details("5030-011-006")
 
+    assert record_detail_cache.is_file()
     assert payload["apn"] == "5030011006"
     assert payload["cases"] == []
     assert payload["violations"] == []
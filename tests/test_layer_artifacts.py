@@ -0,0 +1,193 @@
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Iterator
+import gzip
+import os
+
+import brotli
+from flask import Flask
+import orjson
+import pytest
+
+from api.layers import register_layer_routes
+from functions import layer_artifacts
+from functions.compact_layers import decode_compact_layer
+from functions.layer_artifacts import clear_layer_artifacts, get_layer_artifact, lazy_layer_sources
+from functions.layers import LayersClass
+
+
+def _feature_collection(count: int) -> dict[str, Any]:
+    """Build a small point FeatureCollection.
+
+    Args:
+        count: Number of point features.
+
+    Returns:
+        A GeoJSON FeatureCollection.
+    """
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [round(-118.2 - index / 1000, 3), round(34.0 + index / 1000, 3)]},
+                "properties": {"WellNumber": f"Well {index}", "WellStatus": "P", "Source": "CalGEM"},
+            }
+            for index in range(count)
+        ],
+    }
+
+
+@pytest.fixture
+def oil_well_source(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """Point the oil-well layer at a temporary GeoJSON file and artifact directory.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+        monkeypatch: Pytest fixture used to patch the layer registry.
+
+    Yields:
+        The temporary GeoJSON source file.
+    """
+    source = tmp_path / "oil_wells.geojson"
+    source.write_bytes(orjson.dumps(_feature_collection(40)))
+    spec = LayersClass.LAYER_CONFIGS["oil_well"]
+    monkeypatch.setitem(LayersClass.LAYER_CONFIGS, "oil_well", replace(spec, filepath=str(source)))
+    monkeypatch.setattr(layer_artifacts, "LAYER_ARTIFACT_DIR", tmp_path / "artifacts")
+    clear_layer_artifacts()
+    yield source
+    clear_layer_artifacts()
+
+
+def test_layer_route_negotiates_precompressed_variants(oil_well_source: Path) -> None:
+    """Verify that the layer data route serves brotli, gzip and identity files with cache validators.
+
+    Args:
+        oil_well_source: Temporary oil-well GeoJSON source.
+
+    Returns:
+        None.
+    """
+    server = Flask(__name__)
+    register_layer_routes(server)
+    client = server.test_client()
+    url = lazy_layer_sources(["oil_well", "schools"])["oil_well"]["url"]
+    expected = _feature_collection(40)
+    for feature in expected["features"]:
+        del feature["properties"]["Source"]
+
+    br_response = client.get(url, headers={"Accept-Encoding": "gzip, br"})
+    gzip_response = client.get(url, headers={"Accept-Encoding": "gzip"})
+    identity_response = client.get("/api/layers/oil_well/data", headers={"Accept-Encoding": "identity"})
+
+    assert br_response.status_code == 200
+    assert br_response.headers["Content-Encoding"] == "br"
+    assert br_response.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert br_response.headers["Vary"] == "Accept-Encoding"
+    assert decode_compact_layer(orjson.loads(brotli.decompress(br_response.data))) == expected
+    assert gzip_response.headers["Content-Encoding"] == "gzip"
+    assert decode_compact_layer(orjson.loads(gzip.decompress(gzip_response.data))) == expected
+    assert "Content-Encoding" not in identity_response.headers
+    assert identity_response.headers["Cache-Control"] == "public, no-cache"
+    assert decode_compact_layer(orjson.loads(identity_response.data)) == expected
+    assert len({br_response.headers["ETag"], gzip_response.headers["ETag"], identity_response.headers["ETag"]}) == 3
+
+    revalidated = client.get(
+        url,
+        headers={"Accept-Encoding": "gzip, br", "If-None-Match": br_response.headers["ETag"]},
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.data == b""
+    assert revalidated.headers["ETag"] == br_response.headers["ETag"]
+
+    assert client.get("/api/layers/schools/data").status_code == 404
+    assert client.get("/api/layers/unknown/data").status_code == 404
+
+
+def test_layer_artifact_is_published_once_per_source_version(
+    oil_well_source: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Verify that artifacts are reused across workers and republished when the source changes.
+
+    Args:
+        oil_well_source: Temporary oil-well GeoJSON source.
+        monkeypatch: Pytest fixture used to count publishes.
+
+    Returns:
+        None.
+    """
+    publishes: list[str] = []
+    encode = layer_artifacts.encode_layer_artifact
+
+    def counting_encode(layer_key: str, version: str) -> layer_artifacts.LayerArtifact:
+        """Record an encode before delegating to the real implementation.
+
+        Args:
+            layer_key: Registered layer key.
+            version: Source version being encoded.
+
+        Returns:
+            The encoded artifact.
+        """
+        publishes.append(version)
+        return encode(layer_key, version)
+
+    monkeypatch.setattr(layer_artifacts, "encode_layer_artifact", counting_encode)
+
+    first = get_layer_artifact("oil_well")
+    clear_layer_artifacts()
+    from_manifest = get_layer_artifact("oil_well")
+    assert first is not None and from_manifest == first
+    assert len(publishes) == 1
+
+    oil_well_source.write_bytes(orjson.dumps(_feature_collection(41)))
+    os.utime(oil_well_source, ns=(2_000_000_000_000_000_000, 2_000_000_000_000_000_000))
+    updated = get_layer_artifact("oil_well")
+
+    assert updated is not None and updated.version != first.version
+    assert updated.digest != first.digest
+    assert len(publishes) == 2
+    assert not first.path_for("br").exists()
+    assert orjson.loads(updated.path_for(None).read_bytes())["count"] == 41
+
+
+def test_layer_route_serves_an_in_memory_encode_when_artifacts_cannot_be_shared(
+    oil_well_source: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Verify that a lock or write failure falls back to this worker's own encode.
+
+    Args:
+        oil_well_source: Temporary oil-well GeoJSON source.
+        monkeypatch: Pytest fixture used to break the artifact directory.
+
+    Returns:
+        None.
+    """
+
+    def failing_lock(lock_path: Path) -> None:
+        """Fail like a read-only artifact directory.
+
+        Args:
+            lock_path: Lock file the caller asked for.
+
+        Returns:
+            None; it always raises.
+
+        Raises:
+            OSError: Always.
+        """
+        raise OSError(f"read-only file system: {lock_path}")
+
+    monkeypatch.setattr(layer_artifacts, "exclusive_build_lock", failing_lock)
+    server = Flask(__name__)
+    register_layer_routes(server)
+    client = server.test_client()
+
+    br_response = client.get("/api/layers/oil_well/data", headers={"Accept-Encoding": "br"})
+    identity_response = client.get("/api/layers/oil_well/data", headers={"Accept-Encoding": "identity"})
+
+    assert br_response.status_code == 200
+    assert br_response.headers["Content-Encoding"] == "br"
+    assert orjson.loads(brotli.decompress(br_response.data)) == orjson.loads(identity_response.data)
+    assert decode_compact_layer(orjson.loads(identity_response.data))["features"]
+    assert not (oil_well_source.parent / "artifacts").exists()
@@ -0,0 +1,179 @@
+from collections.abc import Iterator
+import os
+from pathlib import Path
+import sqlite3
+from typing import Any
+
+from flask import Flask
+import pytest
+
+from api import listings as listings_api
+from api.isp import register_isp_routes
+from api.listings import register_listing_routes
+from functions import listing_detail_cache
+from functions.listing_detail_cache import ListingDetailResponseCache
+from functions.sqlite_read_pool import read_pool_stats
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache() -> Iterator[None]:
+    """Reset the shared listing-detail response cache around each test.
+
+    Yields:
+        None while the test runs.
+    """
+    listing_detail_cache.listing_detail_response_cache.clear()
+    yield
+    listing_detail_cache.listing_detail_response_cache.clear()
+
+
+@pytest.fixture
+def app_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> dict[str, Any]:
+    """Serve one lease listing from a temp database with stubbed lookup artifacts.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+        monkeypatch: Pytest fixture used to redirect lookups and count builds.
+
+    Returns:
+        The test client, file paths and a list recording summary builds.
+    """
+    db_path = tmp_path / "listings.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(
+            """
+            CREATE TABLE lease (
+              mls_number TEXT, subtype TEXT, list_price INTEGER, bedrooms INTEGER,
+              total_bathrooms REAL, sqft INTEGER, ppsqft REAL, year_built INTEGER,
+              parking_spaces INTEGER, pet_policy TEXT, terms TEXT, furnished TEXT,
+              phone_number TEXT, security_deposit REAL, pet_deposit REAL, key_deposit REAL,
+              other_deposit REAL, full_street_address TEXT, city TEXT, latitude REAL,
+              longitude REAL, listed_date TEXT, listing_url TEXT, mls_photo TEXT,
+              laundry_category TEXT
+            );
+            INSERT INTO lease (mls_number, list_price, city) VALUES ('L-1', 3000, 'Pasadena');
+            CREATE TABLE lease_provider_options (
+              listing_id TEXT, DBA TEXT, Service_Type TEXT, TechCode INTEGER, MaxAdDn REAL,
+              MaxAdUp REAL, MaxDnTier REAL, MaxUpTier REAL, MinDnTier REAL, MinUpTier REAL
+            );
+            INSERT INTO lease_provider_options VALUES ('L-1', 'Fiber Co', NULL, 50, 1000, 1000, NULL, NULL, NULL, NULL);
+            """
+        )
+    lahd_path = tmp_path / "lahd.json.gz"
+    rso_path = tmp_path / "rso.json.gz"
+    for path in (lahd_path, rso_path):
+        path.write_bytes(b"{}")
+        os.utime(path, ns=(1_700_000_000_000_000_000, 1_700_000_000_000_000_000))
+    os.utime(db_path, ns=(1_700_000_100_000_000_000, 1_700_000_100_000_000_000))
+
+    builds: list[str] = []
+
+    def summarize(payload: dict[str, Any]) -> dict[str, Any]:
+        """Record a summary build.
+
+        Args:
+            payload: Listing detail payload.
+
+        Returns:
+            A fake summary.
+        """
+        builds.append(payload["mls_number"])
+        return {"matched": False}
+
+    monkeypatch.setattr(listings_api, "build_lahd_listing_summary", summarize)
+    monkeypatch.setattr(listings_api, "build_rso_listing_summary", summarize)
+    monkeypatch.setattr(listing_detail_cache, "live_lahd_datasets_available", lambda: True)
+    monkeypatch.setattr(listing_detail_cache, "LAHD_PROPERTY_LOOKUP_PATH", lahd_path)
+    monkeypatch.setattr(listing_detail_cache, "RSO_PROPERTY_LOOKUP_PATH", rso_path)
+
+    server = Flask(__name__)
+    register_listing_routes(server, db_path=str(db_path))
+    register_isp_routes(server, db_path=str(db_path))
+    return {"client": server.test_client(), "db_path": db_path, "rso_path": rso_path, "builds": builds}
+
+
+def test_detail_responses_carry_validators_and_honor_them(app_files: dict[str, Any]) -> None:
+    """Verify that ETag/Last-Modified are set and matching requests get a bodiless 304.
+
+    Args:
+        app_files: Test client and file fixture.
+
+    Returns:
+        None.
+    """
+    client = app_files["client"]
+
+    first = client.get("/api/lease/listing-details/L-1")
+    etag = first.headers["ETag"]
+    before = read_pool_stats()
+    by_etag = client.get("/api/lease/listing-details/L-1", headers={"If-None-Match": etag})
+    by_date = client.get(
+        "/api/lease/listing-details/L-1", headers={"If-Modified-Since": first.headers["Last-Modified"]}
+    )
+
+    assert first.status_code == 200
+    assert first.get_json()["mls_number"] == "L-1"
+    assert first.headers["Cache-Control"] == listing_detail_cache.LISTING_DETAIL_CACHE_CONTROL
+    assert first.headers["Last-Modified"] == "Tue, 14 Nov 2023 22:15:00 GMT"
+    assert by_etag.status_code == by_date.status_code == 304
+    assert by_etag.data == b""
+    assert by_etag.headers["ETag"] == etag
+    assert read_pool_stats()["checkouts"] == before["checkouts"]
+
+
+def test_repeat_requests_are_served_from_the_response_cache(app_files: dict[str, Any]) -> None:
+    """Verify that unconditional repeats reuse the cached body until the data version changes.
+
+    Args:
+        app_files: Test client and file fixture.
+
+    Returns:
+        None.
+    """
+    client = app_files["client"]
+
+    first = client.get("/api/lease/listing-details/L-1")
+    second = client.get("/api/lease/listing-details/L-1")
+    isp_etag = client.get("/api/lease/isp-options/L-1").headers["ETag"]
+    assert second.data == first.data
+    assert app_files["builds"] == ["L-1", "L-1"]
+
+    os.utime(app_files["rso_path"], ns=(1_800_000_000_000_000_000, 1_800_000_000_000_000_000))
+    refreshed = client.get("/api/lease/listing-details/L-1", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert refreshed.status_code == 200
+    assert refreshed.headers["ETag"] != first.headers["ETag"]
+    assert len(app_files["builds"]) == 4
+    assert client.get("/api/lease/isp-options/L-1").headers["ETag"] == isp_etag
+
+
+def test_missing_listings_are_not_cached(app_files: dict[str, Any]) -> None:
+    """Verify that unknown listings return 404 and leave the cache empty.
+
+    Args:
+        app_files: Test client and file fixture.
+
+    Returns:
+        None.
+    """
+    assert app_files["client"].get("/api/lease/listing-details/NOPE").status_code == 404
+    assert len(listing_detail_cache.listing_detail_response_cache) == 0
+
+
+def test_response_cache_is_bounded() -> None:
+    """Verify that the response cache evicts least recently used bodies.
+
+    Returns:
+        None.
+    """
+    cache = ListingDetailResponseCache(max_entries=2)
+
+    cache.get_or_build(("route", "a", "v1"), lambda: b"a")
+    cache.get_or_build(("route", "b", "v1"), lambda: b"b")
+    cache.get_or_build(("route", "a", "v1"), lambda: b"unused")
+    cache.get_or_build(("route", "c", "v1"), lambda: b"c")
+
+    assert len(cache) == 2
+    assert cache.get_or_build(("route", "a", "v1"), lambda: b"rebuilt") == b"a"
+    assert cache.get_or_build(("route", "b", "v1"), lambda: b"rebuilt") == b"rebuilt"
+    assert (cache.hits, cache.misses) == (2, 4)
@@ -0,0 +1,173 @@
+from pathlib import Path
+import sqlite3
+from typing import Any
+
+from flask import Flask
+import pytest
+
+from api import listings as listings_api
+from api.isp import register_isp_routes
+from api.listings import register_listing_routes
+from functions import listing_detail_cache
+from functions.sqlite_read_pool import read_pool_stats
+
+
+def _create_listing_db(db_path: Path) -> None:
+    """Create a small lease/buy database with provider options.
+
+    Args:
+        db_path: Destination SQLite path.
+
+    Returns:
+        None.
+    """
+    lease_columns = [
+        "mls_number", "subtype", "list_price", "bedrooms", "total_bathrooms", "sqft", "ppsqft",
+        "year_built", "parking_spaces", "pet_policy", "terms", "furnished", "phone_number",
+        "security_deposit", "pet_deposit", "key_deposit", "other_deposit", "full_street_address",
+        "city", "latitude", "longitude", "listed_date", "listing_url", "mls_photo", "laundry_category",
+    ]
+    buy_columns = [
+        "mls_number", "subtype", "list_price", "bedrooms", "total_bathrooms", "sqft", "ppsqft",
+        "year_built", "lot_size", "garage_spaces", "hoa_fee", "hoa_fee_frequency",
+        "full_street_address", "city", "latitude", "longitude", "listed_date", "listing_url", "mls_photo",
+    ]
+    provider_columns = (
+        "listing_id TEXT, DBA TEXT, Service_Type TEXT, TechCode INTEGER, MaxAdDn REAL, MaxAdUp REAL, "
+        "MaxDnTier REAL, MaxUpTier REAL, MinDnTier REAL, MinUpTier REAL"
+    )
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(f"CREATE TABLE lease ({', '.join(lease_columns)})")
+        conn.execute(f"CREATE TABLE buy ({', '.join(buy_columns)})")
+        conn.execute(f"CREATE TABLE lease_provider_options ({provider_columns})")
+        conn.execute(f"CREATE TABLE buy_provider_options ({provider_columns})")
+        for mls_number, city in (("L-1", "Los Angeles"), ("L-2", "Pasadena"), ("L-3", "Los Angeles")):
+            row = {column: None for column in lease_columns}
+            row.update(mls_number=mls_number, city=city, list_price=3000, full_street_address=f"{mls_number} Main St")
+            conn.execute(f"INSERT INTO lease VALUES ({', '.join('?' for _ in lease_columns)})", list(row.values()))
+        buy_row = {column: None for column in buy_columns}
+        buy_row.update(mls_number="B-1", city="Los Angeles", list_price=900000)
+        conn.execute(f"INSERT INTO buy VALUES ({', '.join('?' for _ in buy_columns)})", list(buy_row.values()))
+
+        provider_rows = [
+            ("L-1", f"ISP {rank}", None, 50 if rank % 2 else 40, 100.0 * rank, 10.0, None, None, None, None)
+            for rank in range(1, 11)
+        ]
+        provider_rows += [
+            ("L-1", None, None, 50, 5000.0, 5000.0, None, None, None, None),
+            ("L-2", "Zero Co", None, 10, 0.0, 0.0, None, None, None, None),
+            ("L-2", "DSL Co", None, 10, 25.0, 3.0, None, None, None, None),
+            ("B-1", "Fiber Co", None, 50, 2000.0, 2000.0, None, None, None, None),
+        ]
+        for table, prefix in (("lease_provider_options", "L-"), ("buy_provider_options", "B-")):
+            conn.executemany(
+                f"INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [row for row in provider_rows if row[0].startswith(prefix)],
+            )
+
+
+@pytest.fixture
+def client(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Any:
+    """Build a Flask client serving the listing and ISP routes from a temp database.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+        monkeypatch: Pytest fixture used to stub the LAHD/RSO lookups.
+
+    Returns:
+        A Flask test client.
+    """
+    db_path = tmp_path / "listings.db"
+    _create_listing_db(db_path)
+    monkeypatch.setattr(listings_api, "build_lahd_listing_summary", lambda payload: {"lahd": payload["mls_number"]})
+    monkeypatch.setattr(listings_api, "build_rso_listing_summary", lambda payload: {"rso": payload["mls_number"]})
+    monkeypatch.setattr(listing_detail_cache, "live_lahd_datasets_available", lambda: False)
+
+    server = Flask(__name__)
+    register_listing_routes(server, db_path=str(db_path))
+    register_isp_routes(server, db_path=str(db_path))
+    return server.test_client()
+
+
+def test_batch_details_match_single_listing_routes(client: Any) -> None:
+    """Verify that each batched entry equals the single detail and ISP responses.
+
+    Args:
+        client: Flask test client fixture.
+
+    Returns:
+        None.
+    """
+    response = client.post("/api/lease/listing-details/batch", json={"ids": ["L-1", "L-2", "L-1", "NOPE", " L-3 "]})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["missing"] == ["NOPE"]
+    assert set(body["listings"]) == {"L-1", "L-2", "L-3"}
+    for listing_id, detail in body["listings"].items():
+        single = client.get(f"/api/lease/listing-details/{listing_id}").get_json()
+        isp_options = client.get(f"/api/lease/isp-options/{listing_id}").get_json()
+        assert {key: value for key, value in detail.items() if key != "isp_options"} == single
+        assert detail["isp_options"] == isp_options
+    assert len(body["listings"]["L-1"]["isp_options"]) == 8
+    assert [option["dba"] for option in body["listings"]["L-2"]["isp_options"]] == ["DSL Co"]
+    assert body["listings"]["L-3"]["isp_options"] == []
+
+
+def test_buy_batch_omits_rso_summary(client: Any) -> None:
+    """Verify that buy listings get LAHD summaries and ISP options but no RSO summary.
+
+    Args:
+        client: Flask test client fixture.
+
+    Returns:
+        None.
+    """
+    detail = client.post("/api/buy/listing-details/batch", json={"ids": ["B-1"]}).get_json()["listings"]["B-1"]
+
+    assert detail["lahd_property_summary"] == {"lahd": "B-1"}
+    assert "rso_property_summary" not in detail
+    assert [option["dba"] for option in detail["isp_options"]] == ["Fiber Co"]
+
+
+def test_batch_uses_one_pooled_connection(client: Any) -> None:
+    """Verify that batch requests share one pooled read-only connection per thread.
+
+    Args:
+        client: Flask test client fixture.
+
+    Returns:
+        None.
+    """
+    before = read_pool_stats()
+
+    first = client.post("/api/lease/listing-details/batch", json={"ids": ["L-1", "L-2", "L-3"]})
+    second = client.post("/api/lease/listing-details/batch", json={"ids": ["L-1"]})
+
+    after = read_pool_stats()
+    assert first.status_code == second.status_code == 200
+    assert after["checkouts"] - before["checkouts"] == 2
+    assert after["opened"] - before["opened"] == 1
+    assert after["reused"] - before["reused"] == 1
+
+
+def test_batch_rejects_invalid_requests(client: Any) -> None:
+    """Verify that unknown pages and malformed id lists are rejected.
+
+    Args:
+        client: Flask test client fixture.
+
+    Returns:
+        None.
+    """
+    too_many = [f"L-{index}" for index in range(listings_api.LISTING_DETAIL_BATCH_MAX_IDS + 1)]
+
+    assert client.post("/api/rent/listing-details/batch", json={"ids": ["L-1"]}).status_code == 404
+    assert client.post("/api/lease/listing-details/batch", data="nope").status_code == 400
+    assert client.post("/api/lease/listing-details/batch", json={"ids": "L-1"}).status_code == 400
+    assert client.post("/api/lease/listing-details/batch", json={"ids": [{"id": 1}]}).status_code == 400
+    assert client.post("/api/lease/listing-details/batch", json={"ids": too_many}).status_code == 400
+    assert client.post("/api/lease/listing-details/batch", json={"ids": []}).get_json() == {
+        "listings": {},
+        "missing": [],
+    }
@@ -0,0 +1,467 @@
+from collections.abc import Iterator
+import os
+from pathlib import Path
+import random
+import shutil
+import subprocess
+from typing import Any
+
+from flask import Flask
+import orjson
+import pytest
+
+from api.listing_payload import register_listing_payload_routes
+from functions import listing_filters
+from functions.listing_filters import (
+    build_listing_filter_index,
+    filter_listing_indices,
+    validate_listing_filter_state,
+)
+from functions.listing_payload_cache import encode_listing_payload
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+GEOJSON_JS_DIR = REPO_ROOT / "assets" / "js" / "clientside_callbacks" / "geojson"
+NODE = shutil.which("node")
+
+NODE_HARNESS = """
+const fs = require("fs");
+const vm = require("vm");
+const input = JSON.parse(fs.readFileSync(0, "utf8"));
+const context = {console, window: {dash_clientside: {no_update: "__no_update__"}}};
+vm.createContext(context);
+for (const file of input.files) {
+    vm.runInContext(fs.readFileSync(file, "utf8"), context, {filename: file});
+}
+const filterState = context.window.larentals.filters[input.adapter];
+const results = input.states.map((state) => (
+    filterState(state, input.geojson).features.map((feature) => feature.properties.mls_number)
+));
+process.stdout.write(JSON.stringify(results));
+"""
+
+LEASE_BASE_STATE: dict[str, Any] = {
+    "priceRange": [0, None],
+    "bedroomsRange": [0, 6],
+    "bathroomsRange": [0, 6],
+    "pets": None,
+    "sqftRange": [0, None],
+    "sqftMissing": True,
+    "ppsqftRange": [0, None],
+    "ppsqftMissing": True,
+    "parkingRange": [0, 5],
+    "parkingMissing": True,
+    "yearRange": [1900, 2030],
+    "yearMissing": True,
+    "terms": [],
+    "termsMissing": True,
+    "furnished": [],
+    "furnishedMissing": True,
+    "securityRange": [0, None],
+    "securityMissing": True,
+    "petDepositRange": [0, None],
+    "petDepositMissing": True,
+    "keyDepositRange": [0, None],
+    "keyDepositMissing": True,
+    "otherDepositRange": [0, None],
+    "otherDepositMissing": True,
+    "laundry": [],
+    "laundryMissing": True,
+    "subtypes": [],
+    "dateStart": "2026-01-01",
+    "dateEnd": "2026-12-31",
+    "dateMissing": True,
+    "downloadRange": [0, 10000],
+    "uploadRange": [0, 10000],
+    "ispMissing": True,
+    "rentControl": "any",
+    "bedroomsUpperBound": 6,
+    "bathroomsUpperBound": 6,
+    "parkingUpperBound": 5,
+    "zipBoundary": None,
+}
+
+BUY_BASE_STATE: dict[str, Any] = {
+    "priceRange": [0, None],
+    "bedroomsRange": [0, 6],
+    "bathroomsRange": [0, 6],
+    "sqftRange": [0, None],
+    "sqftMissing": True,
+    "ppsqftRange": [0, None],
+    "ppsqftMissing": True,
+    "lotSizeRange": [0, None],
+    "lotSizeMissing": True,
+    "yearRange": [1900, 2030],
+    "yearMissing": True,
+    "subtypes": [],
+    "dateStart": "2026-01-01",
+    "dateEnd": "2026-12-31",
+    "dateMissing": True,
+    "hoaRange": [0, None],
+    "hoaMissing": True,
+    "hoaFrequency": [],
+    "downloadRange": [0, 10000],
+    "uploadRange": [0, 10000],
+    "ispMissing": True,
+    "bedroomsUpperBound": 6,
+    "bathroomsUpperBound": 6,
+    "zipBoundary": None,
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_filter_indexes() -> Iterator[None]:
+    """Reset the module-level filter index cache around each test.
+
+    Yields:
+        None while the test runs.
+    """
+    listing_filters.clear_listing_filter_indexes()
+    yield
+    listing_filters.clear_listing_filter_indexes()
+
+
+def _maybe(rng: random.Random, value: Any, missing_rate: float = 0.15) -> Any:
+    """Return ``value`` or ``None`` to simulate missing listing data.
+
+    Args:
+        rng: Seeded random generator.
+        value: Value to keep most of the time.
+        missing_rate: Probability of returning ``None``.
+
+    Returns:
+        ``value`` or ``None``.
+    """
+    return None if rng.random() < missing_rate else value
+
+
+def _synthetic_payload(page_type: str, count: int = 400, seed: int = 11) -> dict[str, Any]:
+    """Build a listing FeatureCollection with a mix of present and missing values.
+
+    Args:
+        page_type: ``lease`` or ``buy``; controls the price scale and columns.
+        count: Number of listings.
+        seed: Random seed.
+
+    Returns:
+        A GeoJSON FeatureCollection shaped like the served listing payloads.
+    """
+    rng = random.Random(seed)
+    features = []
+    for position in range(count):
+        listed_date = rng.choice(
+            [
+                "",
+                "2025-12-31T23:30:00",
+                "2026-01-01T00:15:00",
+                f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00",
+                "2026-12-31T23:59:00",
+                "2027-01-01",
+            ]
+        )
+        properties: dict[str, Any] = {
+            "mls_number": f"{page_type.upper()}-{position}",
+            "list_price": _maybe(rng, rng.randint(1, 12) * (500 if page_type == "lease" else 150_000)),
+            "bedrooms": _maybe(rng, rng.randint(0, 8)),
+            "total_bathrooms": _maybe(rng, rng.choice([1, 1.5, 2, 3, 7])),
+            "sqft": _maybe(rng, rng.randint(300, 4000)),
+            "ppsqft": _maybe(rng, round(rng.uniform(1, 900), 2)),
+            "year_built": _maybe(rng, rng.randint(1890, 2026)),
+            "subtype": rng.choice(["Apartment", "Condominium", "SingleFamilyResidence", None, ""]),
+            "listed_date": listed_date,
+            "best_dn": rng.choice([None, 0, 25, 100, 1000, 5000]),
+            "best_up": rng.choice([None, 0, 5, 35, 1000]),
+            "zip_code": rng.choice(["90012", "90026-1234", "", None]),
+        }
+        if page_type == "lease":
+            properties.update(
+                pet_policy=rng.choice(["Yes", "No", "No, Size Limit", "Cats Only", None]),
+                parking_spaces=_maybe(rng, rng.randint(0, 7)),
+                terms=rng.choice(["12M", " 6M, 12M ", "MO", "", None, "NG"]),
+                furnished=rng.choice(["Furnished", "Unfurnished", "Both", "Unknown", "", None]),
+                laundry_category=rng.choice(["In Unit", "Shared", "Unknown", None]),
+                security_deposit=_maybe(rng, rng.randint(0, 5000)),
+                pet_deposit=_maybe(rng, rng.randint(0, 1000), 0.6),
+                key_deposit=_maybe(rng, rng.randint(0, 200), 0.8),
+                other_deposit=_maybe(rng, rng.randint(0, 800), 0.8),
+                rent_control_status=rng.choice(["likely", "unlikely", "unknown", None]),
+            )
+        else:
+            properties.update(
+                lot_size=_maybe(rng, rng.randint(1000, 20000)),
+                hoa_fee=_maybe(rng, rng.randint(0, 900), 0.5),
+                hoa_fee_frequency=rng.choice(["Monthly", "Annually", "<NA>", "", None]),
+            )
+        lon = round(-118.3 + rng.uniform(-0.05, 0.05), 5)
+        lat = round(34.05 + rng.uniform(-0.05, 0.05), 5)
+        # Some sources deliver [lat, lon]; both filter engines repair the swap.
+        coordinates = [lat, lon] if position % 17 == 0 else [lon, lat]
+        features.append(
+            {
+                "type": "Feature",
+                "properties": properties,
+                "geometry": {"type": "Point", "coordinates": coordinates},
+            }
+        )
+    return {"type": "FeatureCollection", "features": features}
+
+
+LEASE_STATE_VARIANTS: list[dict[str, Any]] = [
+    {},
+    {"priceRange": [1500, 4000]},
+    {"priceRange": [None, 3000], "bedroomsRange": [2, 6]},
+    {"bedroomsRange": [1, 3], "bathroomsRange": [1.5, 2]},
+    {"pets": True},
+    {"pets": False, "parkingRange": [1, 5], "parkingMissing": False},
+    {"sqftRange": [800, 2000], "sqftMissing": False},
+    {"ppsqftRange": [2, 500], "ppsqftMissing": False, "yearRange": [1950, 2000], "yearMissing": False},
+    {"terms": ["12m"], "termsMissing": False},
+    {"terms": ["6M", "mo"], "termsMissing": True},
+    {"terms": [" "], "termsMissing": False},
+    {"furnished": ["Furnished Or Unfurnished"], "furnishedMissing": False},
+    {"furnished": ["Unfurnished", "Unknown"], "furnishedMissing": True},
+    {"furnished": [], "furnishedMissing": False, "laundry": [], "laundryMissing": False},
+    {"laundry": ["In Unit"], "laundryMissing": True},
+    {"subtypes": ["Apartment", "Condominium"]},
+    {"securityRange": [500, 3000], "securityMissing": False, "petDepositRange": [0, 500], "petDepositMissing": True},
+    {"keyDepositRange": [0, 100], "keyDepositMissing": False, "otherDepositRange": [100, None]},
+    {"dateStart": "2026-03-01", "dateEnd": "2026-06-30", "dateMissing": False},
+    {"dateStart": None, "dateEnd": "2026-06-30"},
+    {"dateStart": "2026-03-01", "dateEnd": None, "dateMissing": True},
+    {"downloadRange": [100, 1000], "ispMissing": False},
+    {"uploadRange": 35, "ispMissing": True},
+    {"rentControl": "likely"},
+    {"rentControl": "unknown"},
+    {"zipBoundary": {"zip_codes": ["90012"], "features": []}},
+    {"zipBoundary": {"zip_code": "90026"}},
+]
+
+BUY_STATE_VARIANTS: list[dict[str, Any]] = [
+    {},
+    {"priceRange": [300_000, 900_000]},
+    {"bedroomsRange": [3, 6], "bathroomsRange": [0, 2]},
+    {"sqftRange": [1000, None], "sqftMissing": False, "lotSizeRange": [5000, 15000], "lotSizeMissing": False},
+    {"ppsqftRange": [0, 400], "ppsqftMissing": True, "yearRange": [1990, 2030], "yearMissing": False},
+    {"subtypes": ["SINGLEFAMILYRESIDENCE"]},
+    {"subtypes": ["Condominium", "Unknown"]},
+    {"dateStart": "2026-02-01", "dateEnd": "2026-08-01", "dateMissing": False},
+    {"dateStart": None, "dateEnd": "2026-08-01", "dateMissing": False},
+    {"hoaRange": [0, 300], "hoaMissing": False},
+    {"hoaFrequency": ["Monthly", "N/A"]},
+    {"downloadRange": [25, 1000], "uploadRange": [5, 1000], "ispMissing": False},
+    {"zipBoundary": {"zip_codes": ["90012"]}},
+]
+
+
+def _run_javascript_filters(adapter: str, files: list[str], payload: dict[str, Any], states: list[dict[str, Any]]) -> list[list[str]]:
+    """Run the real clientside filter adapters under Node for each state.
+
+    Args:
+        adapter: ``filterLeaseState`` or ``filterBuyState``.
+        files: Script files to load, in page order.
+        payload: Listing FeatureCollection.
+        states: Filter states to evaluate.
+
+    Returns:
+        Matching MLS numbers per state, in feature order.
+    """
+    completed = subprocess.run(
+        [NODE, "-e", NODE_HARNESS],
+        input=orjson.dumps(
+            {
+                "adapter": adapter,
+                "files": [str(GEOJSON_JS_DIR / name) for name in files],
+                "geojson": payload,
+                "states": states,
+            }
+        ),
+        capture_output=True,
+        check=True,
+        # Browsers in the map's market parse listing timestamps as LA local time.
+        env={**os.environ, "TZ": listing_filters.LISTING_FILTER_TIMEZONE},
+    )
+    return orjson.loads(completed.stdout)
+
+
+def _run_python_filters(page_type: str, payload: dict[str, Any], states: list[dict[str, Any]]) -> list[list[str]]:
+    """Run the server-side filter engine for each state.
+
+    Args:
+        page_type: ``lease`` or ``buy``.
+        payload: Listing FeatureCollection.
+        states: Filter states to evaluate.
+
+    Returns:
+        Matching MLS numbers per state, in feature order.
+    """
+    index = build_listing_filter_index(payload, page_type=page_type, version="v1")
+    return [index.mls_numbers[filter_listing_indices(index, state)].tolist() for state in states]
+
+
+@pytest.mark.skipif(NODE is None, reason="node is required to run the clientside filters")
+@pytest.mark.parametrize(
+    ("page_type", "adapter", "files", "base_state", "variants"),
+    [
+        ("lease", "filterLeaseState", ["helpers.js", "filters_lease.js"], LEASE_BASE_STATE, LEASE_STATE_VARIANTS),
+        ("buy", "filterBuyState", ["helpers.js", "filters_buy.js"], BUY_BASE_STATE, BUY_STATE_VARIANTS),
+    ],
+)
+def test_server_filters_match_clientside_filters(
+    page_type: str,
+    adapter: str,
+    files: list[str],
+    base_state: dict[str, Any],
+    variants: list[dict[str, Any]],
+) -> None:
+    """Verify that the vectorized filters select exactly what the browser selects.
+
+    Args:
+        page_type: ``lease`` or ``buy``.
+        adapter: Clientside filter-state adapter name.
+        files: Clientside scripts defining the adapter.
+        base_state: Permissive filter state the variants override.
+        variants: Per-case filter overrides.
+
+    Returns:
+        None.
+    """
+    payload = _synthetic_payload(page_type)
+    states = [{**base_state, **variant} for variant in variants]
+
+    expected = _run_javascript_filters(adapter, files, payload, states)
+    actual = _run_python_filters(page_type, payload, states)
+
+    for variant, expected_ids, actual_ids in zip(variants, expected, actual):
+        assert actual_ids == expected_ids, variant
+    # Guard against a degenerate dataset where every case trivially matches.
+    assert len({len(ids) for ids in expected}) > len(variants) // 2
+
+
+def test_zip_boundary_polygons_include_points_inside_and_on_the_edge() -> None:
+    """Verify that selected ZIP polygons match contained and boundary points only.
+
+    Returns:
+        None.
+    """
+    payload = {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "properties": {"mls_number": mls}, "geometry": {"type": "Point", "coordinates": coords}}
+            for mls, coords in [
+                ("inside", [-118.25, 34.05]),
+                ("edge", [-118.2, 34.05]),
+                ("swapped", [34.05, -118.25]),
+                ("outside", [-118.1, 34.05]),
+            ]
+        ],
+    }
+    square = {
+        "type": "Feature",
+        "geometry": {
+            "type": "Polygon",
+            "coordinates": [[[-118.3, 34.0], [-118.2, 34.0], [-118.2, 34.1], [-118.3, 34.1], [-118.3, 34.0]]],
+        },
+    }
+    index = build_listing_filter_index(payload, page_type="lease", version="v1")
+
+    matched = index.mls_numbers[filter_listing_indices(index, {"zipBoundary": {"features": [square]}})]
+
+    assert matched.tolist() == ["inside", "edge", "swapped"]
+
+
+def test_absent_ranges_do_not_constrain_results() -> None:
+    """Verify that a sparse filter state only applies the filters it names.
+
+    Returns:
+        None.
+    """
+    payload = _synthetic_payload("buy", count=50)
+    index = build_listing_filter_index(payload, page_type="buy", version="v1")
+
+    assert filter_listing_indices(index, {}).tolist() == list(range(50))
+    assert 0 < filter_listing_indices(index, {"priceRange": [0, 600_000]}).size < 50
+
+
+def test_filter_endpoint_returns_ids_and_features_and_reuses_the_index() -> None:
+    """Verify that the filter route serves ids or features from one cached index.
+
+    Returns:
+        None.
+    """
+    payload = _synthetic_payload("lease", count=60)
+    encoded = encode_listing_payload(payload, page_type="lease", version="v1")
+    server = Flask(__name__)
+    register_listing_payload_routes(server, payload_sources={"lease": lambda: encoded})
+    client = server.test_client()
+    filters = {"priceRange": [1000, 3000]}
+
+    ids_response = client.post("/api/lease/listings-filter", json={"filters": filters})
+    features_response = client.post(
+        "/api/lease/listings-filter", json={"filters": filters, "format": "features"}
+    )
+
+    assert ids_response.status_code == 200
+    ids_body = ids_response.get_json()
+    features_body = features_response.get_json()
+    assert ids_body["version"] == "v1"
+    assert ids_body["mls_numbers"] == _run_python_filters("lease", payload, [filters])[0]
+    assert ids_body["count"] == len(ids_body["mls_numbers"]) == features_body["count"]
+    assert [feature["properties"]["mls_number"] for feature in features_body["features"]] == ids_body["mls_numbers"]
+    assert listing_filters._filter_indexes["lease"].version == "v1"
+
+    assert client.post("/api/lease/listings-filter", json={"format": "csv"}).status_code == 400
+    assert client.post("/api/lease/listings-filter", data="nope").status_code == 400
+    assert client.post("/api/rent/listings-filter", json={}).status_code == 404
+
+
+def test_filter_states_from_the_ui_pass_validation() -> None:
+    """Verify that every state the filter UI produces is accepted.
+
+    Returns:
+        None.
+    """
+    ui_extras = {
+        "priceUpperBound": 10000,
+        "listedRange": 0,
+        "locationText": ["Echo Park"],
+        "nearbyZip": False,
+        "zipBoundary": {"zip_codes": [], "features": [], "error": "place_not_found"},
+    }
+    for base, variants in ((LEASE_BASE_STATE, LEASE_STATE_VARIANTS), (BUY_BASE_STATE, BUY_STATE_VARIANTS)):
+        for variant in variants:
+            validate_listing_filter_state({**base, **ui_extras, **variant})
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {"priceRange": ["a", None]},
+        {"priceRange": 5},
+        {"priceRange": [0, float("inf")]},
+        {"bedroomsRange": [1, 2, 3]},
+        {"sqftMissing": "yes"},
+        {"terms": "12M"},
+        {"dateStart": "not a date"},
+        {"pets": "maybe"},
+        {"zipBoundary": "90012"},
+        {"zipBoundary": {"zips": ["90012"]}},
+        {"zipBoundary": {"zip_codes": ["LA"]}},
+        {"zipBoundary": {"features": [{"type": "Feature"}]}},
+        {"pricerange": [0, 100]},
+    ],
+)
+def test_filter_endpoint_rejects_malformed_filters(filters: dict[str, Any]) -> None:
+    """Verify that malformed filter values get a 400 instead of silently matching.
+
+    Args:
+        filters: Filter state that the UI could never produce.
+
+    Returns:
+        None.
+    """
+    encoded = encode_listing_payload(_synthetic_payload("lease", count=5), page_type="lease", version="v1")
+    server = Flask(__name__)
+    register_listing_payload_routes(server, payload_sources={"lease": lambda: encoded})
+
+    response = server.test_client().post("/api/lease/listings-filter", json={"filters": filters})
+
+    assert response.status_code == 400
@@ -0,0 +1,344 @@
+from collections.abc import Iterator
+import gzip
+import mmap
+from pathlib import Path
+
+import brotli
+from flask import Flask
+import orjson
+import pytest
+
+from api.listing_payload import register_listing_payload_routes
+from functions import listing_payload_cache
+from functions.listing_payload_cache import (
+    EncodedListingPayload,
+    encode_listing_payload,
+    get_encoded_listing_payload,
+    listing_payload_url,
+    load_listing_payload_artifacts,
+    load_listing_payload_delta,
+    write_listing_payload_artifacts,
+)
+
+
+PAYLOAD = {
+    "type": "FeatureCollection",
+    "features": [
+        {
+            "type": "Feature",
+            "properties": {"mls_number": "MLS-1", "list_price": 2500.0},
+            "geometry": {"type": "Point", "coordinates": [-118.25, 34.05]},
+        }
+    ],
+}
+
+
+@pytest.fixture(autouse=True)
+def clear_payload_cache() -> Iterator[None]:
+    """Reset the module-level encoded payload cache around each test.
+
+    Yields:
+        None while the test runs.
+    """
+    listing_payload_cache.clear_encoded_listing_payloads()
+    yield
+    listing_payload_cache.clear_encoded_listing_payloads()
+
+
+def _client_for(encoded: EncodedListingPayload, artifact_dir: Path | None = None) -> object:
+    """Build a Flask test client serving one encoded lease payload.
+
+    Args:
+        encoded: Encoded payload returned by the fake lease source.
+        artifact_dir: Optional directory holding published change logs.
+
+    Returns:
+        A Flask test client.
+    """
+    server = Flask(__name__)
+    register_listing_payload_routes(
+        server,
+        payload_sources={"lease": lambda: encoded},
+        **({"artifact_dir": artifact_dir} if artifact_dir is not None else {}),
+    )
+    return server.test_client()
+
+
+def _listing_feature(mls_number: str, list_price: float) -> dict:
+    """Build a minimal listing feature for delta tests.
+
+    Args:
+        mls_number: Listing id stored in the feature properties.
+        list_price: Price stored in the feature properties.
+
+    Returns:
+        A GeoJSON Feature dict.
+    """
+    return {
+        "type": "Feature",
+        "properties": {"mls_number": mls_number, "list_price": list_price},
+        "geometry": {"type": "Point", "coordinates": [-118.25, 34.05]},
+    }
+
+
+def _publish_versions(artifact_dir: Path, versions: list[list[dict]]) -> list[EncodedListingPayload]:
+    """Publish successive lease payload versions named ``"1"``, ``"2"``, ...
+
+    Args:
+        artifact_dir: Directory receiving the artifacts and change log.
+        versions: Feature lists for each successive version.
+
+    Returns:
+        The encoded payloads in publish order.
+    """
+    published = []
+    for index, features in enumerate(versions, start=1):
+        encoded = encode_listing_payload(
+            {"type": "FeatureCollection", "features": features},
+            page_type="lease",
+            version=str(index),
+        )
+        write_listing_payload_artifacts(encoded, artifact_dir)
+        published.append(encoded)
+    return published
+
+
+def test_encode_listing_payload_round_trips_every_variant() -> None:
+    """Verify that every stored encoding decodes to the original payload.
+
+    Returns:
+        None.
+    """
+    encoded = encode_listing_payload(PAYLOAD, page_type="lease", version="7")
+
+    assert orjson.loads(encoded.identity) == PAYLOAD
+    assert orjson.loads(gzip.decompress(encoded.gzip)) == PAYLOAD
+    assert orjson.loads(brotli.decompress(encoded.brotli)) == PAYLOAD
+    assert encoded.etag_for("br") != encoded.etag_for("gzip") != encoded.etag_for(None)
+    assert listing_payload_url("lease", "7") == "/api/lease/listings-payload?v=7"
+
+
+def test_get_encoded_listing_payload_builds_once_per_version() -> None:
+    """Verify that the encoded payload is rebuilt only when the version changes.
+
+    Returns:
+        None.
+    """
+    calls: list[int] = []
+
+    def build() -> bytes:
+        """Return the encoded sample payload while counting invocations.
+
+        Returns:
+            The sample GeoJSON payload bytes.
+        """
+        calls.append(1)
+        return orjson.dumps(PAYLOAD)
+
+    first = get_encoded_listing_payload("lease", "1", build)
+    second = get_encoded_listing_payload("lease", "1", build)
+    third = get_encoded_listing_payload("lease", "2", build)
+
+    assert first is second
+    assert third.version == "2"
+    assert len(calls) == 2
+
+
+def test_route_serves_precompressed_body_and_revalidates() -> None:
+    """Verify that the route negotiates encodings and answers If-None-Match with 304.
+
+    Returns:
+        None.
+    """
+    encoded = encode_listing_payload(PAYLOAD, page_type="lease", version="9")
+    client = _client_for(encoded)
+
+    response = client.get(
+        "/api/lease/listings-payload?v=9",
+        headers={"Accept-Encoding": "gzip, br"},
+    )
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "br"
+    assert "immutable" in response.headers["Cache-Control"]
+    assert orjson.loads(brotli.decompress(response.get_data())) == PAYLOAD
+
+    identity = client.get("/api/lease/listings-payload?v=old")
+    assert "Content-Encoding" not in identity.headers
+    assert identity.headers["Cache-Control"] == "public, no-cache"
+    assert orjson.loads(identity.get_data()) == PAYLOAD
+
+    revalidated = client.get(
+        "/api/lease/listings-payload?v=9",
+        headers={
+            "Accept-Encoding": "gzip",
+            "If-None-Match": response.headers["ETag"],
+        },
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.get_data() == b""
+
+
+def test_route_rejects_unknown_page_type() -> None:
+    """Verify that unknown page types return 404.
+
+    Returns:
+        None.
+    """
+    encoded = encode_listing_payload(PAYLOAD, page_type="lease", version="1")
+    client = _client_for(encoded)
+
+    assert client.get("/api/rent/listings-payload").status_code == 404
+
+
+def test_published_artifacts_are_mapped_instead_of_rebuilt(tmp_path: Path) -> None:
+    """Verify that workers map matching artifacts and a rebuild is published for all.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    published = encode_listing_payload(PAYLOAD, page_type="lease", version="5")
+    write_listing_payload_artifacts(published, tmp_path)
+    calls: list[int] = []
+
+    def build() -> bytes:
+        """Record unexpected rebuilds of the sample payload.
+
+        Returns:
+            The sample GeoJSON payload bytes.
+        """
+        calls.append(1)
+        return orjson.dumps(PAYLOAD)
+
+    mapped = get_encoded_listing_payload("lease", "5", build, artifact_dir=tmp_path)
+
+    assert calls == []
+    assert isinstance(mapped.identity, mmap.mmap)
+    assert mapped.digest == published.digest
+    assert orjson.loads(mapped.identity[:]) == PAYLOAD
+    assert load_listing_payload_artifacts("lease", "6", tmp_path) is None
+
+    rebuilt = get_encoded_listing_payload("lease", "6", build, artifact_dir=tmp_path)
+    assert calls == [1]
+    assert isinstance(rebuilt.identity, mmap.mmap)
+
+    # Another worker starting on version 6 maps the artifacts the builder published.
+    listing_payload_cache.clear_encoded_listing_payloads()
+    get_encoded_listing_payload("lease", "6", build, artifact_dir=tmp_path)
+    assert calls == [1]
+
+
+def test_route_streams_mapped_artifact_and_prunes_old_digests(tmp_path: Path) -> None:
+    """Verify that mapped artifacts stream intact and superseded files are removed.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    old_payload = {"type": "FeatureCollection", "features": []}
+    write_listing_payload_artifacts(
+        encode_listing_payload(old_payload, page_type="lease", version="1"),
+        tmp_path,
+    )
+    write_listing_payload_artifacts(
+        encode_listing_payload(PAYLOAD, page_type="lease", version="2"),
+        tmp_path,
+    )
+    mapped = load_listing_payload_artifacts("lease", "2", tmp_path)
+    assert mapped is not None
+    assert len(list(tmp_path.glob("lease-*"))) == 3
+
+    response = _client_for(mapped).get(
+        "/api/lease/listings-payload?v=2",
+        headers={"Accept-Encoding": "br"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["Content-Length"] == str(len(mapped.brotli))
+    assert orjson.loads(brotli.decompress(response.get_data())) == PAYLOAD
+
+
+def test_delta_chains_published_versions_by_mls_number(tmp_path: Path) -> None:
+    """Verify that deltas combine change log entries across several publishes.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    unchanged = [_listing_feature(f"KEEP-{index}", 1000.0 + index) for index in range(10)]
+    _publish_versions(
+        tmp_path,
+        [
+            [*unchanged, _listing_feature("A", 2000.0), _listing_feature("B", 3000.0)],
+            [*unchanged, _listing_feature("A", 2100.0), _listing_feature("C", 4000.0)],
+            [*unchanged, _listing_feature("A", 2100.0), _listing_feature("B", 3100.0)],
+        ],
+    )
+
+    delta = load_listing_payload_delta("lease", "1", "3", tmp_path)
+
+    assert delta is not None
+    assert {feature["properties"]["mls_number"]: feature["properties"]["list_price"] for feature in delta["upserted"]} == {
+        "A": 2100.0,
+        "B": 3100.0,
+    }
+    # C appeared and vanished after version 1; removing an unknown id is a no-op.
+    assert delta["removed"] == ["C"]
+    assert load_listing_payload_delta("lease", "2", "3", tmp_path)["removed"] == ["C"]
+    assert load_listing_payload_delta("lease", "3", "3", tmp_path)["upserted"] == []
+    assert load_listing_payload_delta("lease", "unknown", "3", tmp_path) is None
+
+
+def test_delta_spans_a_version_bump_with_unchanged_content(tmp_path: Path) -> None:
+    """Verify that a republish with identical content still links the change log chain.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    features = [_listing_feature(str(index), 1000.0) for index in range(10)]
+    _publish_versions(
+        tmp_path,
+        [features, features, [*features[:-1], _listing_feature("9", 1500.0)]],
+    )
+
+    assert load_listing_payload_delta("lease", "1", "2", tmp_path) == {
+        "from": "1", "version": "2", "upserted": [], "removed": [],
+    }
+    delta = load_listing_payload_delta("lease", "1", "3", tmp_path)
+    assert delta is not None
+    assert [feature["properties"]["list_price"] for feature in delta["upserted"]] == [1500.0]
+
+
+def test_delta_route_falls_back_to_full_payload_for_large_changes(tmp_path: Path) -> None:
+    """Verify that the delta route returns a delta when small and a full pointer otherwise.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    _, second, third = _publish_versions(
+        tmp_path,
+        [
+            [_listing_feature(str(index), 1000.0) for index in range(10)],
+            [_listing_feature(str(index), 1000.0 + (index == 0)) for index in range(10)],
+            [_listing_feature(str(index), 5000.0) for index in range(10)],
+        ],
+    )
+
+    small = _client_for(second, tmp_path).get("/api/lease/listings-delta?since=1").get_json()
+    assert small["type"] == "delta"
+    assert [feature["properties"]["mls_number"] for feature in small["upserted"]] == ["0"]
+
+    large = _client_for(third, tmp_path).get("/api/lease/listings-delta?since=2").get_json()
+    assert large == {"type": "full", "version": "3", "url": "/api/lease/listings-payload?v=3"}
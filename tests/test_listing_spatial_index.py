@@ -0,0 +1,194 @@
+from collections.abc import Iterator
+import random
+from typing import Any
+
+from flask import Flask
+import numpy as np
+import pytest
+
+from api.listing_payload import register_listing_payload_routes
+from functions import listing_filters, listing_spatial_index
+from functions.listing_filters import build_listing_filter_index
+from functions.listing_payload_cache import encode_listing_payload
+from functions.listing_spatial_index import (
+    LISTING_VIEWPORT_FULL_DETAIL_ZOOM,
+    LISTING_VIEWPORT_SUMMARY_PROPERTIES,
+    BoundingBox,
+    build_listing_grid_index,
+    build_viewport_feature_collection,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_indexes() -> Iterator[None]:
+    """Reset the module-level listing index caches around each test.
+
+    Yields:
+        None while the test runs.
+    """
+    listing_filters.clear_listing_filter_indexes()
+    listing_spatial_index.clear_listing_grid_indexes()
+    yield
+    listing_filters.clear_listing_filter_indexes()
+    listing_spatial_index.clear_listing_grid_indexes()
+
+
+def _scattered_payload(count: int = 2000, seed: int = 5) -> dict[str, Any]:
+    """Build listing points scattered across a SoCal-sized area.
+
+    Args:
+        count: Number of listings.
+        seed: Random seed.
+
+    Returns:
+        A GeoJSON FeatureCollection.
+    """
+    rng = random.Random(seed)
+    features: list[dict[str, Any]] = []
+    for position in range(count):
+        coordinates = [round(rng.uniform(-119.5, -116.0), 5), round(rng.uniform(32.5, 35.0), 5)]
+        features.append(
+            {
+                "type": "Feature",
+                "properties": {
+                    "mls_number": f"MLS-{position}",
+                    "list_price": 1000 + position,
+                    "bedrooms": position % 5,
+                    "total_bathrooms": 1,
+                    "subtype": "Apartment",
+                    "sqft": 900,
+                },
+                "geometry": {"type": "Point", "coordinates": coordinates},
+            }
+        )
+    features.append({"type": "Feature", "properties": {"mls_number": "NO-GEOMETRY"}, "geometry": None})
+    return {"type": "FeatureCollection", "features": features}
+
+
+def _brute_force(payload: dict[str, Any], bbox: BoundingBox) -> list[int]:
+    """Return the positions inside ``bbox`` by scanning every feature.
+
+    Args:
+        payload: Listing FeatureCollection.
+        bbox: Query bounds.
+
+    Returns:
+        Matching positions in feature order.
+    """
+    matches = []
+    for position, feature in enumerate(payload["features"]):
+        if not feature["geometry"]:
+            continue
+        lon, lat = feature["geometry"]["coordinates"]
+        if bbox.west <= lon <= bbox.east and bbox.south <= lat <= bbox.north:
+            matches.append(position)
+    return matches
+
+
+def test_grid_query_matches_a_linear_scan() -> None:
+    """Verify that grid queries return exactly the points a full scan finds.
+
+    Returns:
+        None.
+    """
+    payload = _scattered_payload()
+    grid = build_listing_grid_index(build_listing_filter_index(payload, page_type="lease", version="v1"))
+    rng = random.Random(9)
+
+    boxes = [
+        BoundingBox(-118.7, 33.7, -117.6, 34.4),
+        BoundingBox(-118.3, 34.0, -118.25, 34.05),
+        BoundingBox(-125.0, 30.0, -110.0, 40.0),
+        BoundingBox(-100.0, 40.0, -99.0, 41.0),
+    ]
+    for _ in range(20):
+        west, south = rng.uniform(-119.6, -116.5), rng.uniform(32.4, 34.5)
+        boxes.append(BoundingBox(west, south, west + rng.uniform(0, 0.6), south + rng.uniform(0, 0.4)))
+
+    for bbox in boxes:
+        assert grid.query(bbox).tolist() == _brute_force(payload, bbox), bbox
+
+
+def test_grid_query_includes_points_on_the_bbox_edge() -> None:
+    """Verify that points exactly on the viewport edge are returned.
+
+    Returns:
+        None.
+    """
+    payload = {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "properties": {"mls_number": "A"}, "geometry": {"type": "Point", "coordinates": [-118.2, 34.0]}},
+            {"type": "Feature", "properties": {"mls_number": "B"}, "geometry": {"type": "Point", "coordinates": [-118.1, 34.1]}},
+        ],
+    }
+    grid = build_listing_grid_index(build_listing_filter_index(payload, page_type="lease", version="v1"))
+
+    assert grid.query(BoundingBox(-118.2, 34.0, -118.1, 34.1)).tolist() == [0, 1]
+    assert grid.query(BoundingBox(-118.19, 34.01, -118.11, 34.09)).size == 0
+
+
+def test_viewport_detail_depends_on_zoom() -> None:
+    """Verify that zoomed-out viewports get capped summary features.
+
+    Returns:
+        None.
+    """
+    payload = _scattered_payload()
+    grid = build_listing_grid_index(build_listing_filter_index(payload, page_type="lease", version="v1"))
+    bbox = BoundingBox(-120.0, 32.0, -115.0, 36.0)
+
+    summary = build_viewport_feature_collection(grid, bbox, zoom=9, limit=100)
+    full = build_viewport_feature_collection(grid, bbox, zoom=LISTING_VIEWPORT_FULL_DETAIL_ZOOM)
+
+    assert summary["detail"] == "summary"
+    assert summary["total"] == 2000
+    assert summary["truncated"] is True
+    assert len(summary["features"]) == 100
+    assert set(summary["features"][0]["properties"]) == set(LISTING_VIEWPORT_SUMMARY_PROPERTIES)
+    assert full["detail"] == "full"
+    assert full["truncated"] is False
+    assert len(full["features"]) == 2000
+    assert full["features"][0] is payload["features"][0]
+
+
+def test_bbox_parse_rejects_malformed_bounds() -> None:
+    """Verify that malformed or inverted viewport bounds are rejected.
+
+    Returns:
+        None.
+    """
+    assert BoundingBox.parse("-118.5, 33.9, -118.1, 34.2") == BoundingBox(-118.5, 33.9, -118.1, 34.2)
+    for value in ("", "1,2,3", "a,b,c,d", "-118,34,-119,35", "nan,1,2,3"):
+        with pytest.raises(ValueError):
+            BoundingBox.parse(value)
+
+
+def test_bbox_endpoint_serves_the_viewport_slice() -> None:
+    """Verify that the viewport route returns the grid query and validates input.
+
+    Returns:
+        None.
+    """
+    payload = _scattered_payload(count=300)
+    encoded = encode_listing_payload(payload, page_type="lease", version="v7")
+    server = Flask(__name__)
+    register_listing_payload_routes(server, payload_sources={"lease": lambda: encoded})
+    client = server.test_client()
+    bbox = BoundingBox(-118.7, 33.7, -117.6, 34.4)
+
+    response = client.get("/api/lease/listings-bbox?bbox=-118.7,33.7,-117.6,34.4&zoom=15")
+
+    assert response.status_code == 200
+    assert response.headers["X-Listing-Payload-Version"] == "v7"
+    body = response.get_json()
+    assert body["version"] == "v7"
+    assert [feature["properties"]["mls_number"] for feature in body["features"]] == [
+        payload["features"][position]["properties"]["mls_number"] for position in _brute_force(payload, bbox)
+    ]
+    assert isinstance(listing_spatial_index._grid_indexes["lease"].positions, np.ndarray)
+    assert client.get("/api/lease/listings-bbox?bbox=1,2,3&zoom=10").status_code == 400
+    assert client.get("/api/lease/listings-bbox?bbox=1,2,3,4&zoom=inf").status_code == 400
+    assert client.get("/api/lease/listings-bbox?bbox=1,2,3,4&zoom=nan").status_code == 400
+    assert client.get("/api/lease/listings-bbox?bbox=1,2,3,4&zoom=10&limit=0").status_code == 400
+    assert client.get("/api/rent/listings-bbox?bbox=1,2,3,4&zoom=10").status_code == 404
@@ -0,0 +1,191 @@
+from collections.abc import Iterator
+import random
+from typing import Any
+
+from flask import Flask
+import pytest
+import shapely
+from shapely.geometry import Polygon
+
+from api.layers import register_layer_routes
+from functions import marker_clusters
+from functions.layers import LayersClass
+from functions.listing_spatial_index import BoundingBox
+from functions.marker_clusters import abbreviate_point_count, build_cluster_anchor_layer, build_cluster_pyramid
+
+
+@pytest.fixture(autouse=True)
+def clear_pyramids() -> Iterator[None]:
+    """Reset the module-level cluster cache around each test.
+
+    Yields:
+        None while the test runs.
+    """
+    marker_clusters.clear_cluster_pyramids()
+    yield
+    marker_clusters.clear_cluster_pyramids()
+
+
+def _points(count: int = 3000, seed: int = 2) -> dict[str, Any]:
+    """Build clustered-looking point features around a few LA-area centers.
+
+    Args:
+        count: Number of points.
+        seed: Random seed.
+
+    Returns:
+        A GeoJSON FeatureCollection.
+    """
+    rng = random.Random(seed)
+    centers = [(-118.25, 34.05), (-118.45, 34.0), (-117.9, 33.8), (-118.6, 34.2)]
+    features = []
+    for position in range(count):
+        center_lon, center_lat = rng.choice(centers)
+        features.append(
+            {
+                "type": "Feature",
+                "properties": {"mls_number": f"P-{position}"},
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [center_lon + rng.gauss(0, 0.05), center_lat + rng.gauss(0, 0.05)],
+                },
+            }
+        )
+    features.append({"type": "Feature", "properties": {"mls_number": "NO-GEOMETRY"}, "geometry": None})
+    return {"type": "FeatureCollection", "features": features}
+
+
+def test_every_zoom_accounts_for_every_point() -> None:
+    """Verify that each zoom level's entries sum to the number of input points.
+
+    Returns:
+        None.
+    """
+    pyramid = build_cluster_pyramid(_points(), version="v1", options={"radius": 160, "minZoom": 3})
+
+    previous_entries = 0
+    for zoom in range(3, 18):
+        collection = pyramid.feature_collection(zoom)
+        entries = collection["features"]
+        assert sum(feature["properties"].get("point_count", 1) for feature in entries) == 3000
+        assert len(entries) >= previous_entries
+        previous_entries = len(entries)
+    assert previous_entries == 3000
+    assert pyramid.feature_collection(3)["features"][0]["properties"]["point_count"] == 3000
+
+
+def test_cluster_hulls_cover_their_leaves() -> None:
+    """Verify that precomputed hulls contain every leaf and the centroid of their cluster.
+
+    Returns:
+        None.
+    """
+    pyramid = build_cluster_pyramid(_points(), version="v1", options={"radius": 160, "minZoom": 3})
+    level = pyramid.levels[10]
+    hull_entries = [entry for entry, hull in enumerate(level.hulls) if hull is not None]
+    assert hull_entries
+
+    for entry in hull_entries:
+        hull = Polygon(level.hulls[entry]).buffer(1e-5)
+        members = level.leaf_labels == entry
+        assert int(members.sum()) == int(level.counts[entry])
+        assert shapely.contains_xy(hull, pyramid.longitude[members], pyramid.latitude[members]).all()
+        assert hull.contains(shapely.Point(level.longitude[entry], level.latitude[entry]))
+
+
+def test_single_points_are_returned_as_original_features_with_viewport_filtering() -> None:
+    """Verify that unclustered points keep their properties and bbox filtering applies.
+
+    Returns:
+        None.
+    """
+    payload = _points(count=400)
+    pyramid = build_cluster_pyramid(payload, version="v1", options={"radius": 160, "minZoom": 3})
+    bbox = BoundingBox(-118.35, 33.95, -118.15, 34.15)
+
+    street_level = pyramid.feature_collection(18, bbox)
+    clustered = pyramid.feature_collection(11.7, bbox)
+
+    assert street_level["zoom"] == 18
+    assert clustered["zoom"] == 11
+    assert all("mls_number" in feature["properties"] for feature in street_level["features"])
+    assert {feature["properties"]["mls_number"] for feature in street_level["features"]} == {
+        feature["properties"]["mls_number"]
+        for feature in payload["features"][:400]
+        if bbox.west <= feature["geometry"]["coordinates"][0] <= bbox.east
+        and bbox.south <= feature["geometry"]["coordinates"][1] <= bbox.north
+    }
+    cluster = next(feature for feature in clustered["features"] if feature["properties"].get("cluster"))
+    assert cluster["properties"]["cluster_id"] % 32 == 12
+    assert cluster["properties"]["point_count_abbreviated"] == abbreviate_point_count(
+        cluster["properties"]["point_count"]
+    )
+
+
+def test_abbreviated_counts_match_supercluster() -> None:
+    """Verify that cluster labels match supercluster's abbreviations.
+
+    Returns:
+        None.
+    """
+    assert abbreviate_point_count(999) == 999
+    assert abbreviate_point_count(1000) == "1k"
+    assert abbreviate_point_count(1250) == "1.3k"
+    assert abbreviate_point_count(25_400) == "25k"
+
+
+def test_layer_cluster_route_serves_cached_pyramids(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verify that the layer cluster route serves a cached pyramid and validates zoom.
+
+    Args:
+        monkeypatch: Pytest fixture used to stub the layer loader.
+
+    Returns:
+        None.
+    """
+    layer_payload = _points(count=200, seed=4)
+    monkeypatch.setitem(
+        LayersClass.geojson_cache, LayersClass.LAYER_CONFIGS["oil_well"].dataset, (123.0, layer_payload)
+    )
+    server = Flask(__name__)
+    register_layer_routes(server)
+    client = server.test_client()
+
+    layer_response = client.get("/api/layers/oil_well/clusters?zoom=9")
+
+    assert layer_response.status_code == 200
+    assert layer_response.get_json()["version"] == "123.0"
+    assert sum(feature["properties"].get("point_count", 1) for feature in layer_response.get_json()["features"]) == 200
+    assert set(marker_clusters._cluster_pyramids) == {"layer:oil_well"}
+    assert client.get("/api/layers/oil_well/clusters?zoom=9&bbox=-119,33,-117,35").status_code == 200
+    for zoom in ("", "inf", "-inf", "nan"):
+        assert client.get(f"/api/layers/oil_well/clusters?zoom={zoom}").status_code == 400
+    assert client.get("/api/layers/parking_tickets_density/clusters?zoom=9").status_code == 404
+    assert client.get("/api/layers/unknown/clusters?zoom=9").status_code == 404
+
+
+def test_server_clustered_layers_load_an_anchor_instead_of_their_points() -> None:
+    """Verify that server-clustered overlays render an anchor pointing at the cluster route.
+
+    Returns:
+        None.
+    """
+    spec = LayersClass.LAYER_CONFIGS["oil_well"]
+    layer = LayersClass.create_geojson_layer("oil_well", component_id="oil")
+    anchor = build_cluster_anchor_layer(
+        "/api/layers/oil_well/clusters?v=1",
+        point_to_layer=spec.point_to_layer,
+        cluster_to_layer=spec.cluster_to_layer,
+    )
+
+    assert spec.server_clusters
+    assert layer.cluster is False
+    assert layer.pointToLayer["variable"].endswith("drawServerClusterLayer")
+    assert [feature["properties"] for feature in anchor["features"]] == [
+        {
+            "layer_role": "server_cluster_anchor",
+            "clusters_url": "/api/layers/oil_well/clusters?v=1",
+            "point_to_layer": "drawOilIcon",
+            "cluster_to_layer": "drawOilCluster",
+        }
+    ]
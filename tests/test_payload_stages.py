@@ -0,0 +1,185 @@
+from collections.abc import Iterator
+import gzip
+from pathlib import Path
+import sqlite3
+from typing import Any
+from unittest.mock import patch
+
+import orjson
+import pandas as pd
+import pytest
+
+from functions import listing_payload_cache, rso
+from pages import component_base, lease_components
+from pages.component_models import PayloadStage
+from pages.lease_components import LeaseComponents
+
+
+@pytest.fixture(autouse=True)
+def clear_payload_caches() -> Iterator[None]:
+    """Reset the payload build and encoding caches around each test.
+
+    Yields:
+        None while the test runs.
+    """
+    component_base._build_cached_geojson_bytes.cache_clear()
+    listing_payload_cache.clear_encoded_listing_payloads()
+    rso._load_lookup.cache_clear()
+    yield
+    component_base._build_cached_geojson_bytes.cache_clear()
+    listing_payload_cache.clear_encoded_listing_payloads()
+    rso._load_lookup.cache_clear()
+
+
+@pytest.fixture
+def lease_db(tmp_path: Path) -> Iterator[Path]:
+    """Point the page loaders at a two-listing lease database.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+
+    Yields:
+        The database path while the patch is active.
+    """
+    db_path = tmp_path / "larentals-test.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(
+            """
+            CREATE TABLE lease (
+              mls_number TEXT, latitude REAL, longitude REAL, list_price INTEGER,
+              full_street_address TEXT, laundry TEXT, listed_date TEXT
+            );
+            INSERT INTO lease VALUES
+              ('L-1', 34.05, -118.25, 3000, '123 Main St #4', 'In Unit', '2026-03-20'),
+              ('L-2', 34.06, -118.26, 2500, '789 Side St', NULL, '2026-03-21');
+            CREATE TABLE lease_provider_options (listing_id TEXT, MaxAdDn REAL, MaxAdUp REAL);
+            """
+        )
+    with (
+        patch("pages.component_base.DB_PATH", str(db_path)),
+        patch("pages.lease_components._db_cache_token", lambda: 7),
+        patch("pages.component_base._db_cache_token", lambda: 7),
+    ):
+        yield db_path
+
+
+def _write_rso_artifact(path: Path) -> Path:
+    """Write a one-property RSO inventory artifact.
+
+    Args:
+        path: Destination artifact path.
+
+    Returns:
+        The artifact path.
+    """
+    payload = {
+        "records": [
+            {"apn": "1", "address": "123 MAIN STREET", "rso_units": 2, "unit_range": "2 units", "rso_year": 2026}
+        ]
+    }
+    with gzip.open(path, "wb") as artifact_file:
+        artifact_file.write(orjson.dumps(payload))
+    return path
+
+
+def test_rso_status_column_returns_a_new_frame(tmp_path: Path) -> None:
+    """Verify that the RSO stage derives statuses without touching its input.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    artifact = _write_rso_artifact(tmp_path / "rso.json.gz")
+    listings = pd.DataFrame({"full_street_address": ["123 Main St #4", "789 Side St", None]})
+    original = listings.copy()
+
+    enriched = rso.add_rso_status_column(listings, artifact)
+
+    assert enriched["rent_control_status"].tolist() == ["all", "unknown", "unknown"]
+    assert "rent_control_status" not in listings.columns
+    pd.testing.assert_frame_equal(listings, original)
+
+
+def test_stages_run_once_per_database_and_artifact_version(lease_db: Path, tmp_path: Path) -> None:
+    """Verify that payload stages are computed at build time, not per request.
+
+    Args:
+        lease_db: Patched lease database fixture.
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    calls: list[str] = []
+    stage_version = {"value": "a"}
+
+    def mark_listings(frame: pd.DataFrame) -> pd.DataFrame:
+        """Add a derived column and record the call.
+
+        Args:
+            frame: Loaded listing frame.
+
+        Returns:
+            A copy of the frame with a ``derived`` column.
+        """
+        calls.append(stage_version["value"])
+        return frame.assign(derived=stage_version["value"])
+
+    stage = PayloadStage(name="mark", version=lambda: stage_version["value"], apply=mark_listings)
+    with (
+        patch.object(LeaseComponents, "PAYLOAD_STAGES", (stage,)),
+        patch("pages.component_base.LISTING_PAYLOAD_ARTIFACT_DIR", tmp_path / "listing_payloads"),
+    ):
+        first = LeaseComponents.get_cached_geojson_bytes()
+        LeaseComponents.get_cached_geojson_payload()
+        LeaseComponents.get_cached_encoded_payload()
+        assert LeaseComponents.get_payload_version() == "7-a"
+
+        stage_version["value"] = "b"
+        second = LeaseComponents.get_cached_geojson_bytes()
+
+    assert calls == ["a", "b"]
+    assert {feature["properties"]["derived"] for feature in orjson.loads(first)["features"]} == {"a"}
+    assert {feature["properties"]["derived"] for feature in orjson.loads(second)["features"]} == {"b"}
+
+
+def test_published_lease_payload_is_never_mutated(lease_db: Path, tmp_path: Path) -> None:
+    """Verify that callers cannot alter the cached payload after it is published.
+
+    Args:
+        lease_db: Patched lease database fixture.
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    artifact = _write_rso_artifact(tmp_path / "rso.json.gz")
+    stage = PayloadStage(
+        name="rso_status",
+        version=lambda: rso.rso_property_lookup_version(artifact),
+        apply=lambda frame: rso.add_rso_status_column(frame, artifact),
+    )
+    with (
+        patch.object(LeaseComponents, "PAYLOAD_STAGES", (stage,)),
+        patch("pages.component_base.LISTING_PAYLOAD_ARTIFACT_DIR", tmp_path / "listing_payloads"),
+    ):
+        published = LeaseComponents.get_cached_geojson_bytes()
+        snapshot = bytes(published)
+
+        payload: dict[str, Any] = LeaseComponents.get_cached_geojson_payload()
+        payload["features"][0]["properties"]["rent_control_status"] = "tampered"
+        payload["features"].clear()
+        encoded = LeaseComponents.get_cached_encoded_payload()
+
+        assert LeaseComponents.get_cached_geojson_bytes() is published
+        assert published == snapshot
+        assert bytes(encoded.identity) == snapshot
+        statuses = [
+            feature["properties"]["rent_control_status"]
+            for feature in LeaseComponents.get_cached_geojson_payload()["features"]
+        ]
+
+    assert statuses == ["all", "unknown"]
+    assert lease_components.LeaseComponents.PAYLOAD_STAGES[0].name == "rso_status"
@@ -0,0 +1,147 @@
+from dataclasses import replace
+import random
+from typing import Any
+
+import orjson
+import pytest
+
+from functions.layers import LayersClass
+from functions.point_layers import PointLayerTable, prepare_point_layer
+from scripts.benchmark_layer_loading import build_synthetic_points, legacy_filter_to_bounds
+
+BOUNDS = (-125.0, -113.0, 32.0, 35.5)
+
+
+def _point(lon: Any, lat: Any, **properties: Any) -> dict[str, Any]:
+    """Build a Point feature.
+
+    Args:
+        lon: Longitude value, possibly malformed.
+        lat: Latitude value, possibly malformed.
+        **properties: Feature properties.
+
+    Returns:
+        A GeoJSON Point feature.
+    """
+    return {"type": "Feature", "geometry": {"type": "Point", "coordinates": [lon, lat]}, "properties": properties}
+
+
+def _loop_clean(geojson_data: dict[str, Any], bounds: tuple[float, float, float, float]) -> dict[str, Any]:
+    """Validate, bounds-filter and deduplicate with a per-feature Python loop.
+
+    Args:
+        geojson_data: GeoJSON FeatureCollection payload to clean.
+        bounds: Tuple of ``(min_lon, max_lon, min_lat, max_lat)``.
+
+    Returns:
+        A copy of the payload without invalid, out-of-bounds or repeated points.
+    """
+    min_lon, max_lon, min_lat, max_lat = bounds
+    kept_features = []
+    seen: set[bytes] = set()
+    for feature in geojson_data.get("features", []):
+        geometry = feature.get("geometry") or {}
+        if geometry.get("type") != "Point":
+            kept_features.append(feature)
+            continue
+        coords = geometry.get("coordinates") or []
+        if len(coords) < 2 or not all(isinstance(value, (int, float)) for value in coords[:2]):
+            continue
+        lon, lat = coords[0], coords[1]
+        if not (min_lon <= lon <= max_lon and min_lat <= lat <= max_lat):
+            continue
+        key = orjson.dumps(feature, option=orjson.OPT_SORT_KEYS)
+        if key in seen:
+            continue
+        seen.add(key)
+        kept_features.append(feature)
+    return {**geojson_data, "features": kept_features}
+
+
+def test_columnar_cleaning_matches_the_feature_loop() -> None:
+    """Verify that the columnar pass keeps exactly the features the per-feature loop keeps.
+
+    Returns:
+        None.
+    """
+    rng = random.Random(7)
+    layer = build_synthetic_points(3000, seed=4)
+    layer["features"] += [
+        _point(rng.choice([-118.2, 200.0, None, "x"]), rng.choice([34.1, 95.0, float("nan")]), i=index)
+        for index in range(200)
+    ]
+    layer["features"] += [dict(feature) for feature in layer["features"][:50]]
+    rng.shuffle(layer["features"])
+
+    cleaned = prepare_point_layer(layer, bounds=BOUNDS)
+    assert cleaned["features"] == _loop_clean(layer, BOUNDS)["features"]
+    assert all(actual is expected for actual, expected in zip(cleaned["features"], _loop_clean(layer, BOUNDS)["features"]))
+
+    bounded = LayersClass.filter_geojson_to_bounds(build_synthetic_points(500), BOUNDS)
+    assert bounded["features"] == legacy_filter_to_bounds(build_synthetic_points(500), BOUNDS)["features"]
+
+
+def test_cleaning_keeps_non_points_and_distinct_colocated_points() -> None:
+    """Verify that non-Point features survive, colocated distinct points stay and clean layers are not copied.
+
+    Returns:
+        None.
+    """
+    polygon = {"type": "Feature", "geometry": {"type": "Polygon", "coordinates": [[[0, 0], [1, 0], [0, 1], [0, 0]]]}}
+    features = [
+        _point(-118.3, 34.0, ref="a"),
+        polygon,
+        _point(-118.3, 34.0, ref="b"),
+        {"type": "Feature", "geometry": None, "properties": {}},
+        _point(-118.3, 34.0, ref="a"),
+        _point(-118.3, 34.0),
+        {"type": "Feature", "geometry": {"type": "Point", "coordinates": [-118.3, 34.0, 12.0]}, "properties": {}},
+        _point(-118.3, 34.0),
+    ]
+    layer = {"type": "FeatureCollection", "name": "cams", "features": features}
+
+    table = PointLayerTable.from_geojson(layer)
+    assert table.is_point.tolist() == [True, False, True, False, True, True, True, True]
+    assert table.duplicate_mask().tolist() == [False, False, False, False, True, False, False, True]
+
+    cleaned = prepare_point_layer(layer)
+    assert cleaned["name"] == "cams"
+    assert cleaned["features"] == [features[index] for index in (0, 1, 2, 3, 5, 6)]
+
+    clean_layer = {"type": "FeatureCollection", "features": features[:3]}
+    assert prepare_point_layer(clean_layer, bounds=BOUNDS) is clean_layer
+    assert prepare_point_layer({"type": "FeatureCollection", "features": []}) == {
+        "type": "FeatureCollection",
+        "features": [],
+    }
+
+
+def test_build_layer_data_cleans_only_what_the_layer_configures(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verify that loading clips to ``valid_bounds`` and only validates and dedups ``clean_points`` layers.
+
+    Args:
+        monkeypatch: Pytest fixture used to patch the layer registry.
+
+    Returns:
+        None.
+    """
+    features = [_point(-118.2, 34.1, n=1), _point(-118.2, 34.1, n=1), _point(0.0, 0.0), _point(None, 34.1)]
+    layer = {"type": "FeatureCollection", "features": features}
+    spec = replace(LayersClass.LAYER_CONFIGS["oil_well"], filepath=None, loader=lambda: layer)
+
+    def build(**changes: Any) -> dict[str, Any]:
+        """Build the test layer under a modified oil-well config.
+
+        Args:
+            **changes: ``LayerConfig`` fields to override.
+
+        Returns:
+            The built layer payload.
+        """
+        monkeypatch.setitem(LayersClass.LAYER_CONFIGS, "oil_well", replace(spec, **changes))
+        return LayersClass.build_layer_data("oil_well")
+
+    assert build(valid_bounds=None, clean_points=False) is layer
+    assert build(clean_points=False)["features"] == features[:2]
+    assert build(clean_points=True)["features"] == [features[0]]
+    assert build(valid_bounds=None, clean_points=True)["features"] == [features[0], features[2]]
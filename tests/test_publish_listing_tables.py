@@ -1,8 +1,11 @@
+import os
+import shutil
 import sqlite3
 from pathlib import Path
 
 import pytest
 
+from functions.listing_data_version import read_listing_data_version
 from scripts.publish_listing_tables import publish_listing_tables
 
 
@@ -89,3 +92,36 @@ def test_publish_does_not_change_destination_when_a_stage_is_invalid(
     with sqlite3.connect(destination) as connection:
         assert connection.execute("SELECT * FROM buy").fetchall() == [("old-buy", 1)]
         assert connection.execute("SELECT * FROM lease").fetchall() == [("old-lease", 2)]
+
+
+def test_publish_stores_a_data_version_that_survives_copying_the_database(
+    tmp_path: Path,
+) -> None:
+    """Verify that each publish stores a new data version that a copied database keeps.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    destination = tmp_path / "larentals.db"
+    buy_stage = tmp_path / "buy-stage.db"
+    lease_stage = tmp_path / "lease-stage.db"
+    _create_table(destination, "buy", [("old-buy", 1)])
+    _create_table(destination, "lease", [("old-lease", 2)])
+    _create_table(buy_stage, "buy", [("new-buy", 100)])
+    _create_table(lease_stage, "lease", [("new-lease", 200)])
+
+    publish_listing_tables(db_path=destination, buy_stage_path=buy_stage, lease_stage_path=lease_stage)
+    first = read_listing_data_version(destination)
+    assert first is not None
+
+    serving_copy = tmp_path / "serving" / "larentals.db"
+    serving_copy.parent.mkdir()
+    shutil.copyfile(destination, serving_copy)
+    os.utime(serving_copy, ns=(1, 1))
+    assert read_listing_data_version(serving_copy) == first
+
+    publish_listing_tables(db_path=destination, buy_stage_path=buy_stage, lease_stage_path=lease_stage)
+    assert read_listing_data_version(destination) not in {None, first}
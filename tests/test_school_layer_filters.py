@@ -0,0 +1,163 @@
+from collections.abc import Iterator
+from dataclasses import replace
+import random
+from typing import Any
+
+import pytest
+
+from functions.layers import LayersClass, filter_school_layer_geojson
+from functions.school_layer_filters import (
+    SchoolLayerFilters,
+    build_school_layer_index,
+    clear_school_layer_index,
+    filter_school_layer,
+    filter_school_layer_positions,
+    school_filter_result_cache,
+)
+
+LEVELS = ("High", "Elementary", "Secondary", "Preschool", None, " middle ")
+SPANS = ("9-12", "K-5", "6-12", "K-8", "", None)
+FUNDING = ("Directly funded", "Locally funded", None)
+BANDS = (["High"], ["Elementary"], ["Middle", "High"], [], None, ["Elementary", " middle"])
+ENROLLMENT = (1800, 450, None, "", "Unknown", "2400", "n/a", 0, 12500)
+FLAGS = (0, 1, "Y", "N", True, None, "yes")
+WORDS = ("franklin", "maple", "pasadena", "unified", "academy", "charter", "élan", "STRASSE")
+
+
+def _schools(count: int = 400, seed: int = 11) -> dict[str, Any]:
+    """Build a school FeatureCollection covering every attribute variant the filters read.
+
+    Args:
+        count: Number of schools.
+        seed: Random seed for reproducible attributes.
+
+    Returns:
+        A school-layer GeoJSON FeatureCollection.
+    """
+    rng = random.Random(seed)
+    features = []
+    for index in range(count):
+        name = f"{rng.choice(WORDS)} {rng.choice(WORDS)} {index}"
+        features.append(
+            {
+                "type": "Feature",
+                "properties": {
+                    "school_name": name.title(),
+                    "school_level": rng.choice(LEVELS),
+                    "grade_span_display": rng.choice(SPANS),
+                    "grade_bands": rng.choice(BANDS),
+                    "offers_tk_flag": rng.random() < 0.3,
+                    "offers_kindergarten_flag": rng.random() < 0.4,
+                    "funding_type": rng.choice(FUNDING),
+                    "recently_opened_flag": rng.random() < 0.2,
+                    "enrollment_total": rng.choice(ENROLLMENT),
+                    "charter_flag": rng.choice(FLAGS),
+                    "magnet_flag": rng.choice(FLAGS),
+                    "title_i_flag": rng.choice(FLAGS),
+                    "search_text": None if index % 17 == 0 else name,
+                },
+                "geometry": {"type": "Point", "coordinates": [-118.2 + index / 10000, 34.1]},
+            }
+        )
+    return {"type": "FeatureCollection", "name": "schools", "features": features}
+
+
+def _random_controls(rng: random.Random) -> dict[str, Any]:
+    """Draw a random state of the school controls.
+
+    Args:
+        rng: Random source.
+
+    Returns:
+        Keyword arguments accepted by both filter implementations.
+    """
+    return {
+        "search_text": rng.choice([None, "", "  ", "unified", "MAPLE", "ademy", "élan", "strasse", "zzz", "1"]),
+        "school_levels": rng.sample(["High", "Elementary", "Secondary", "Middle", " ", "Other"], rng.randint(0, 3)),
+        "grade_bands": rng.choice([None, [], ["High"], ["Middle"], ["Elementary", "High"], ["Elementary", "Middle", "High"]]),
+        "campus_configurations": rng.sample(["9-12", "K-5", "6-12", "PK-12"], rng.randint(0, 2)),
+        "early_grades": rng.choice([None, [], ["TK"], ["Kindergarten"], ["tk", "kindergarten"]]),
+        "funding_types": rng.sample(["Directly funded", "Locally funded"], rng.randint(0, 2)),
+        "enrollment_range": rng.choice([None, [], [0, 12000], [0, 20000], [100, 2000], [500, 500], [2000, 12000]]),
+        "charter_only": rng.random() < 0.2,
+        "magnet_only": rng.random() < 0.2,
+        "title_i_only": rng.random() < 0.2,
+        "recently_opened_only": rng.random() < 0.2,
+    }
+
+
+def test_indexed_filters_match_the_reference_filter() -> None:
+    """Verify that the vectorized school filters return exactly the reference filter's schools.
+
+    Returns:
+        None.
+    """
+    geojson = _schools()
+    index = build_school_layer_index(geojson, version="v1")
+    rng = random.Random(5)
+
+    for _ in range(400):
+        controls = _random_controls(rng)
+        expected = filter_school_layer_geojson(geojson, **controls)
+        actual = index.feature_collection(
+            filter_school_layer_positions(index, SchoolLayerFilters.from_controls(**controls))
+        )
+        assert actual == expected, controls
+
+    empty = build_school_layer_index(None, version="v0")
+    assert filter_school_layer_positions(empty, SchoolLayerFilters(search="x")).tolist() == []
+
+
+@pytest.fixture
+def school_layer(monkeypatch: pytest.MonkeyPatch) -> Iterator[dict[str, Any]]:
+    """Serve a synthetic school layer through the shared layer cache.
+
+    Args:
+        monkeypatch: Pytest fixture used to seed the layer cache.
+
+    Yields:
+        The synthetic school FeatureCollection.
+    """
+    geojson = _schools(count=50)
+    monkeypatch.setitem(LayersClass.geojson_cache, "schools", (1000.0, geojson))
+    # Keep the seeded entry from expiring so the loader never reads the real artifact.
+    monkeypatch.setitem(
+        LayersClass.LAYER_CONFIGS, "schools", replace(LayersClass.LAYER_CONFIGS["schools"], cache_ttl_seconds=None)
+    )
+    clear_school_layer_index()
+    yield geojson
+    clear_school_layer_index()
+
+
+def test_school_layer_results_are_memoized_per_version(
+    school_layer: dict[str, Any], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Verify that repeated control states reuse results until the school layer is reloaded.
+
+    Args:
+        school_layer: Synthetic school layer seeded in the layer cache.
+        monkeypatch: Pytest fixture used to simulate a reload.
+
+    Returns:
+        None.
+    """
+    first = filter_school_layer(SchoolLayerFilters.from_controls(search_text=" Unified ", enrollment_range=[0, 12000]))
+    again = filter_school_layer(SchoolLayerFilters.from_controls(search_text="unified", enrollment_range=(0.0, 12000.0)))
+
+    assert again is first
+    assert (school_filter_result_cache.hits, school_filter_result_cache.misses) == (1, 1)
+    assert first["name"] == "schools"
+    assert first["features"] and all("search_text" not in feature["properties"] for feature in first["features"])
+    assert [feature["properties"]["school_name"] for feature in first["features"]] == [
+        feature["properties"]["school_name"]
+        for feature in filter_school_layer_geojson(school_layer, search_text="unified", enrollment_range=[0, 12000])[
+            "features"
+        ]
+    ]
+
+    monkeypatch.setitem(LayersClass.geojson_cache, "schools", (2000.0, _schools(count=5, seed=3)))
+    reloaded = filter_school_layer(SchoolLayerFilters.from_controls(search_text="unified", enrollment_range=[0, 12000]))
+
+    assert reloaded is not first
+    assert school_filter_result_cache.misses == 2
+    assert len(reloaded["features"]) <= 5
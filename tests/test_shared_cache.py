@@ -0,0 +1,39 @@
+from pathlib import Path
+
+import pytest
+
+from functions.shared_cache import atomic_write_bytes, exclusive_build_lock
+
+
+def test_build_lock_waits_are_bounded_and_released(tmp_path: Path) -> None:
+    """Verify that a held build lock times out a bounded waiter and is free again once released.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    lock_path = tmp_path / "locks" / ".lookup.lock"
+    with exclusive_build_lock(lock_path):
+        with pytest.raises(TimeoutError):
+            with exclusive_build_lock(lock_path, timeout_seconds=0.1):
+                pass
+    with exclusive_build_lock(lock_path, timeout_seconds=0.1):
+        assert lock_path.exists()
+
+
+def test_atomic_write_replaces_the_file_without_leftovers(tmp_path: Path) -> None:
+    """Verify that an atomic write replaces the destination and removes its temporary file.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    path = tmp_path / "lookup.columns"
+    atomic_write_bytes(path, b"old")
+    atomic_write_bytes(path, b"new")
+    assert path.read_bytes() == b"new"
+    assert [child.name for child in tmp_path.iterdir()] == ["lookup.columns"]
@@ -0,0 +1,282 @@
+from contextlib import closing
+from pathlib import Path
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from functions import lahd, shared_ttl_cache
+from functions.shared_cache import exclusive_build_lock
+from functions.shared_ttl_cache import SharedTtlCache
+
+
+def _wait_for_refreshes(cache: SharedTtlCache) -> None:
+    """Wait until the cache's background refresh threads have finished.
+
+    Args:
+        cache: Cache whose refreshes are awaited.
+
+    Returns:
+        None.
+    """
+    deadline = time.monotonic() + 5
+    while cache._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_concurrent_misses_are_coalesced_and_stale_values_refresh_in_background(tmp_path: Path) -> None:
+    """Verify that one fetch serves concurrent misses and expired values are served while refreshed.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    fetches: list[int] = []
+
+    def fetch() -> dict[str, int]:
+        """Return a numbered value after a slow upstream call.
+
+        Returns:
+            The fetch number.
+        """
+        time.sleep(0.05)
+        fetches.append(len(fetches))
+        return {"fetch": len(fetches)}
+
+    cache = SharedTtlCache(tmp_path / "cache.sqlite3", namespace="test", ttl_seconds=60, stale_seconds=60)
+    results: list[dict[str, int]] = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch("k", fetch))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [{"fetch": 1}] * 8 and len(fetches) == 1
+    assert cache.get_or_fetch("k", fetch) == {"fetch": 1}
+    assert cache.stats() == {
+        "hits": 1, "stale_hits": 0, "misses": 1, "coalesced": 7, "refreshes": 0, "errors": 0, "lock_timeouts": 0,
+        "entries": 1,
+    }
+
+    # Another worker sees the same file; expire its view and read the stale value.
+    other_worker = SharedTtlCache(tmp_path / "cache.sqlite3", namespace="test", ttl_seconds=0, stale_seconds=60)
+    other_worker.get_or_fetch("expired", fetch)
+    assert other_worker.get_or_fetch("expired", fetch) == {"fetch": 2}
+    _wait_for_refreshes(other_worker)
+    assert len(fetches) == 3
+    assert other_worker.stats()["stale_hits"] == 1 and other_worker.stats()["refreshes"] == 1
+
+    cache.clear()
+    assert cache.stats()["entries"] == 0 and cache.stats()["hits"] == 0
+
+
+def test_failures_are_not_cached_and_unusable_files_fall_back(tmp_path: Path) -> None:
+    """Verify that fetch errors propagate uncached and a cache that cannot be opened fetches directly.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    cache = SharedTtlCache(tmp_path / "cache.sqlite3", namespace="test", ttl_seconds=60, stale_seconds=60)
+
+    def fail() -> dict[str, int]:
+        """Simulate an upstream outage.
+
+        Returns:
+            Never returns.
+
+        Raises:
+            RuntimeError: Always.
+        """
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_fetch("k", fail)
+    assert cache.get_or_fetch("k", lambda: {"ok": 1}) == {"ok": 1}
+    assert cache.stats()["errors"] == 1 and cache.stats()["misses"] == 2
+
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    unusable = SharedTtlCache(blocker / "cache.sqlite3", namespace="test", ttl_seconds=60, stale_seconds=60)
+    assert unusable.get_or_fetch("k", lambda: {"ok": 2}) == {"ok": 2}
+
+
+def test_hits_are_counted_in_memory_until_the_flush_interval(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Verify that serving a cached value does not write its hit count to SQLite every time.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+        monkeypatch: Pytest fixture used to shorten the flush interval.
+
+    Returns:
+        None.
+    """
+    path = tmp_path / "cache.sqlite3"
+    cache = SharedTtlCache(path, namespace="test", ttl_seconds=60, stale_seconds=60)
+
+    def stored_hits() -> int:
+        """Read the hit counter straight from the cache file.
+
+        Returns:
+            The stored hit count, or 0 when none has been written.
+        """
+        with closing(sqlite3.connect(path)) as conn:
+            row = conn.execute("SELECT count FROM stats WHERE namespace = 'test' AND name = 'hits'").fetchone()
+        return row[0] if row else 0
+
+    cache.get_or_fetch("k", lambda: {"ok": 1})
+    for _ in range(5):
+        cache.get_or_fetch("k", lambda: {"ok": 2})
+    assert stored_hits() == 0
+
+    cache.get_or_fetch("other", lambda: {"ok": 3})
+    assert stored_hits() == 5
+
+    monkeypatch.setattr(shared_ttl_cache, "SHARED_TTL_CACHE_STATS_FLUSH_SECONDS", 0.0)
+    cache.get_or_fetch("k", lambda: {"ok": 4})
+    assert stored_hits() == 6
+    assert cache.stats()["hits"] == 6 and cache.stats()["misses"] == 2
+
+
+def test_unlockable_misses_fetch_directly(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verify that a miss whose key lock cannot be taken still returns a fetched value.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+        monkeypatch: Pytest fixture used to break the lock.
+
+    Returns:
+        None.
+    """
+
+    def failing_lock(lock_path: Path, timeout_seconds: float | None = None) -> None:
+        """Fail like a lock directory that cannot be created.
+
+        Args:
+            lock_path: Lock file the caller asked for.
+            timeout_seconds: Wait bound the caller asked for.
+
+        Returns:
+            None; it always raises.
+
+        Raises:
+            OSError: Always.
+        """
+        raise OSError(f"permission denied: {lock_path}")
+
+    monkeypatch.setattr(shared_ttl_cache, "exclusive_build_lock", failing_lock)
+    cache = SharedTtlCache(tmp_path / "cache.sqlite3", namespace="test", ttl_seconds=60, stale_seconds=60)
+
+    assert cache.get_or_fetch("k", lambda: {"ok": 1}) == {"ok": 1}
+    assert cache.get_or_fetch("k", lambda: {"ok": 2}) == {"ok": 2}
+    assert cache.stats()["entries"] == 0
+
+
+def test_slow_fetches_only_block_their_own_key_and_waits_are_bounded(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Verify that a held key lock delays neither other keys nor its own key past the wait bound.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+        monkeypatch: Pytest fixture used to shorten the lock wait.
+
+    Returns:
+        None.
+    """
+    monkeypatch.setattr(shared_ttl_cache, "SHARED_TTL_CACHE_LOCK_WAIT_SECONDS", 0.2)
+    cache = SharedTtlCache(tmp_path / "cache.sqlite3", namespace="test", ttl_seconds=0, stale_seconds=0)
+    cache.get_or_fetch("old", lambda: {"stored": 1})
+
+    with exclusive_build_lock(cache._lock_path("slow")), exclusive_build_lock(cache._lock_path("old")):
+        assert cache.get_or_fetch("old", lambda: {"unused": 1}) == {"stored": 1}
+        assert cache.get_or_fetch("slow", lambda: {"direct": 1}) == {"direct": 1}
+
+        started_at = time.monotonic()
+        assert cache.get_or_fetch("other", lambda: {"other": 1}) == {"other": 1}
+        assert time.monotonic() - started_at < 0.2
+
+    assert cache.stats()["lock_timeouts"] == 2
+
+
+def test_failed_reads_under_the_lock_fetch_directly(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verify that a locked database during the coalescing re-read falls back to a direct fetch.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+        monkeypatch: Pytest fixture used to fail the second read.
+
+    Returns:
+        None.
+    """
+    cache = SharedTtlCache(tmp_path / "cache.sqlite3", namespace="test", ttl_seconds=60, stale_seconds=60)
+    reads: list[str] = []
+
+    def read(conn: sqlite3.Connection, key: str) -> None:
+        """Miss on the first read and fail like a busy database on the next.
+
+        Args:
+            conn: Open cache connection.
+            key: Cache key.
+
+        Returns:
+            None for the first read.
+
+        Raises:
+            sqlite3.OperationalError: On every later read.
+        """
+        reads.append(key)
+        if len(reads) > 1:
+            raise sqlite3.OperationalError("database is locked")
+        return None
+
+    monkeypatch.setattr(cache, "_read", read)
+
+    assert cache.get_or_fetch("k", lambda: {"ok": 1}) == {"ok": 1}
+    assert reads == ["k", "k"]
+
+
+def test_lahd_record_details_share_one_entry_per_apn(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Verify that LAHD record details are cached by normalized APN and snapshot fallbacks expire sooner.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+        monkeypatch: Pytest fixture used to stub the Socrata requests.
+
+    Returns:
+        None.
+    """
+    requested: list[str] = []
+
+    def fake_request(url: str, params: dict[str, object]) -> list[dict[str, object]]:
+        """Record a Socrata request and return no rows.
+
+        Args:
+            url: Dataset URL requested.
+            params: Query parameters included with the request.
+
+        Returns:
+            An empty row list.
+        """
+        requested.append(str(params["apn"]))
+        return []
+
+    monkeypatch.setattr(lahd, "_request_socrata_rows", fake_request)
+    monkeypatch.setattr(lahd, "LAHD_RECORD_DETAIL_CACHE_PATH", tmp_path / "details.sqlite3")
+
+    first = lahd.fetch_lahd_property_record_details("5046-034-015")
+    assert lahd.fetch_lahd_property_record_details("5046034015") == first
+    assert requested == ["5046034015", "5046034015"]
+    assert lahd.fetch_lahd_property_record_details.cache_info()["hits"] == 1
+
+    assert lahd._lahd_record_detail_cache_ttl(first) == lahd.LAHD_RECORD_DETAIL_CACHE_TTL_SECONDS
+    assert lahd._lahd_record_detail_cache_ttl({"detail_status": {"live_records_available": False}}) == (
+        lahd.LAHD_RECORD_DETAIL_FALLBACK_TTL_SECONDS
+    )
@@ -0,0 +1,189 @@
+import os
+from pathlib import Path
+import sqlite3
+import threading
+
+from loguru import logger
+import pytest
+
+from functions.sqlite_read_pool import ReadOnlyConnectionPool
+from scripts.publish_listing_tables import publish_listing_tables
+
+
+def _create_table(db_path: Path, table_name: str, rows: list[tuple[str, int]]) -> None:
+    """Create a two-column listing table.
+
+    Args:
+        db_path: Filesystem path to the SQLite database.
+        table_name: SQLite table to create.
+        rows: Records to insert.
+
+    Returns:
+        None.
+    """
+    with sqlite3.connect(db_path) as connection:
+        connection.execute(f'CREATE TABLE "{table_name}" (mls_number TEXT, list_price INTEGER)')
+        connection.executemany(f'INSERT INTO "{table_name}" VALUES (?, ?)', rows)
+
+
+@pytest.fixture
+def listing_db(tmp_path: Path) -> Path:
+    """Create a database with buy and lease tables.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        The database path.
+    """
+    db_path = tmp_path / "larentals.db"
+    _create_table(db_path, "buy", [("old-buy", 1)])
+    _create_table(db_path, "lease", [("old-lease", 2)])
+    return db_path
+
+
+def test_connection_is_reused_and_tuned(listing_db: Path) -> None:
+    """Verify that a thread reuses one read-only connection with the configured pragmas.
+
+    Args:
+        listing_db: Temporary listing database fixture.
+
+    Returns:
+        None.
+    """
+    pool = ReadOnlyConnectionPool(mmap_size=1 << 20, cache_size_kib=4096)
+
+    with pool.connection(listing_db) as first:
+        assert first.execute("SELECT mls_number FROM lease").fetchone()["mls_number"] == "old-lease"
+        assert first.execute("PRAGMA query_only").fetchone()[0] == 1
+        assert first.execute("PRAGMA cache_size").fetchone()[0] == -4096
+        with pytest.raises(sqlite3.OperationalError):
+            first.execute("DELETE FROM lease")
+    with pool.connection(str(listing_db)) as second:
+        assert second is first
+
+    assert pool.stats() == {"checkouts": 2, "opened": 1, "reused": 1, "reopened": 0, "closed": 0, "open": 1}
+
+
+def test_publish_and_file_replacement_reopen_connections(listing_db: Path, tmp_path: Path) -> None:
+    """Verify that publishing tables or swapping the file reopens pooled connections.
+
+    Args:
+        listing_db: Temporary listing database fixture.
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    pool = ReadOnlyConnectionPool()
+    with pool.connection(listing_db) as connection:
+        original = connection
+    buy_stage = tmp_path / "buy-stage.db"
+    lease_stage = tmp_path / "lease-stage.db"
+    _create_table(buy_stage, "buy", [("new-buy", 100)])
+    _create_table(lease_stage, "lease", [("new-lease", 200)])
+    os.utime(listing_db, ns=(0, 0))
+
+    publish_listing_tables(db_path=listing_db, buy_stage_path=buy_stage, lease_stage_path=lease_stage)
+
+    with pool.connection(listing_db) as connection:
+        assert connection is not original
+        assert connection.execute("SELECT * FROM lease").fetchall()[0]["mls_number"] == "new-lease"
+        published = connection
+
+    replacement = tmp_path / "replacement.db"
+    _create_table(replacement, "lease", [("swapped", 3)])
+    os.replace(replacement, listing_db)
+
+    with pool.connection(listing_db) as connection:
+        assert connection is not published
+        assert connection.execute("SELECT mls_number FROM lease").fetchone()[0] == "swapped"
+
+    stats = pool.stats()
+    assert (stats["opened"], stats["reopened"], stats["closed"], stats["open"]) == (1, 2, 2, 1)
+
+
+def test_threads_get_their_own_connections(listing_db: Path) -> None:
+    """Verify that each thread checks out a separate connection.
+
+    Args:
+        listing_db: Temporary listing database fixture.
+
+    Returns:
+        None.
+    """
+    pool = ReadOnlyConnectionPool()
+    seen: list[int] = []
+
+    def read_in_thread() -> None:
+        """Check out the pool twice from a worker thread.
+
+        Returns:
+            None.
+        """
+        for _ in range(2):
+            with pool.connection(listing_db) as connection:
+                connection.execute("SELECT COUNT(*) FROM lease").fetchone()
+                seen.append(id(connection))
+
+    threads = [threading.Thread(target=read_in_thread) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert pool.stats()["opened"] == 3
+    assert pool.stats()["reused"] == 3
+    assert len(seen) == 6
+
+
+def test_reset_and_missing_database(listing_db: Path, tmp_path: Path) -> None:
+    """Verify that reset retires connections and missing files are not created.
+
+    Args:
+        listing_db: Temporary listing database fixture.
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    pool = ReadOnlyConnectionPool()
+    with pool.connection(listing_db) as connection:
+        before_reset = connection
+    pool.reset()
+    with pool.connection(listing_db) as connection:
+        assert connection is not before_reset
+
+    missing = tmp_path / "missing.db"
+    with pytest.raises(sqlite3.OperationalError):
+        with pool.connection(missing):
+            pass
+    assert not missing.exists()
+
+
+def test_pool_counters_are_logged_at_most_once_per_interval(listing_db: Path) -> None:
+    """Verify that checkouts log the pool counters only after the logging interval has elapsed.
+
+    Args:
+        listing_db: Temporary listing database fixture.
+
+    Returns:
+        None.
+    """
+    messages: list[str] = []
+    sink_id = logger.add(messages.append, level="INFO", format="{message}")
+    try:
+        quiet = ReadOnlyConnectionPool()
+        for _ in range(3):
+            with quiet.connection(listing_db):
+                pass
+        assert not [message for message in messages if "read pool stats" in message]
+
+        chatty = ReadOnlyConnectionPool(stats_log_seconds=0.0)
+        with chatty.connection(listing_db):
+            pass
+    finally:
+        logger.remove(sink_id)
+    logged = [message for message in messages if "read pool stats" in message]
+    assert len(logged) == 1
+    assert "'checkouts': 1" in logged[0] and "'opened': 1" in logged[0]
@@ -0,0 +1,195 @@
+from datetime import date
+from pathlib import Path
+import os
+import sqlite3
+from unittest.mock import patch
+
+import pandas as pd
+
+from functions import warm_start
+from functions.warm_start import warm_start_session, warm_start_snapshot
+from pages.component_base import BaseClass
+
+
+def test_snapshot_is_reused_until_versions_change(tmp_path: Path) -> None:
+    """Verify that snapshots load on matching versions and rebuild otherwise.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    builds: list[int] = []
+
+    def build() -> dict[str, int]:
+        """Build a prepared object while recording the call.
+
+        Returns:
+            The prepared object.
+        """
+        builds.append(len(builds))
+        return {"build": len(builds)}
+
+    assert warm_start_snapshot("lookup", {"source": "1"}, build) == {"build": 1}
+    assert not any(tmp_path.iterdir())
+
+    with warm_start_session(tmp_path) as session:
+        with session.stage("first_boot"):
+            first = warm_start_snapshot("lookup", {"source": "1"}, build)
+        with session.stage("second_boot"):
+            second = warm_start_snapshot("lookup", {"source": "1"}, build)
+        with session.stage("changed_source"):
+            changed = warm_start_snapshot("lookup", {"source": "2"}, build)
+        with session.stage("unrelated"):
+            pass
+
+    assert (first, second, changed) == ({"build": 2}, {"build": 2}, {"build": 3})
+    assert len(builds) == 3
+    assert [stage.source for stage in session.stages] == ["built", "snapshot", "built", "-"]
+    breakdown = session.breakdown().splitlines()
+    assert [line.split()[0] for line in breakdown] == [
+        "first_boot",
+        "second_boot",
+        "changed_source",
+        "unrelated",
+        "total",
+    ]
+
+
+def test_snapshot_is_rebuilt_after_a_pickled_library_upgrade(tmp_path: Path) -> None:
+    """Verify that a numpy, pandas or geopandas upgrade invalidates snapshots.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    installed = warm_start.pickled_library_versions()
+    assert set(installed) == {"numpy", "pandas", "geopandas"}
+
+    with warm_start_session(tmp_path):
+        assert warm_start_snapshot("lookup", {"source": "1"}, lambda: "old") == "old"
+        assert warm_start_snapshot("lookup", {"source": "1"}, lambda: "unused") == "old"
+        upgraded = {**installed, "pandas": "99.0"}
+        with patch("functions.warm_start.pickled_library_versions", return_value=upgraded):
+            assert warm_start_snapshot("lookup", {"source": "1"}, lambda: "new") == "new"
+
+
+def test_failed_builds_and_corrupt_snapshots_are_not_reused(tmp_path: Path) -> None:
+    """Verify that ``None`` results are not stored and unreadable snapshots are rebuilt.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    with warm_start_session(tmp_path) as session:
+        assert warm_start_snapshot("boundary", {"source": "1"}, lambda: None) is None
+        assert not session.snapshot_path("boundary").exists()
+
+        session.snapshot_path("boundary").write_bytes(b"not a pickle")
+        assert warm_start_snapshot("boundary", {"source": "1"}, lambda: "rebuilt") == "rebuilt"
+        assert warm_start_snapshot("boundary", {"source": "1"}, lambda: "unused") == "rebuilt"
+
+
+def test_listing_frame_is_restored_from_snapshot(tmp_path: Path) -> None:
+    """Verify that a warm-start boot reuses the prepared frame until the database changes.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    db_path = tmp_path / "larentals.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(
+            """
+            CREATE TABLE lease (
+              mls_number TEXT, latitude REAL, longitude REAL, list_price TEXT,
+              listed_date TEXT, subtype TEXT, date_processed TEXT
+            );
+            INSERT INTO lease VALUES
+              ('L-1', 34.05, -118.25, '3000', '2026-01-02', NULL, '2026-01-03'),
+              ('L-2', 34.15, -118.35, '2800', '2026-01-01', 'Apartment', '2026-01-03');
+            CREATE TABLE lease_provider_options (listing_id TEXT, MaxAdDn REAL, MaxAdUp REAL);
+            INSERT INTO lease_provider_options VALUES ('L-1', 1000, 50);
+            """
+        )
+    snapshot_dir = tmp_path / "warm_start"
+
+    def boot() -> tuple[BaseClass, str]:
+        """Construct the lease loader inside a warm-start session.
+
+        Returns:
+            The loader and where its frame came from.
+        """
+        with warm_start_session(snapshot_dir) as session:
+            with session.stage("lease_frame"):
+                loader = BaseClass(table_name="lease", page_type="lease")
+        return loader, session.stages[0].source
+
+    with patch("pages.component_base.DB_PATH", str(db_path)):
+        cold, cold_source = boot()
+        with patch("pages.component_base.BaseClass._prepare_frame", side_effect=AssertionError("rebuilt")):
+            warm, warm_source = boot()
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("UPDATE lease SET list_price = '3100' WHERE mls_number = 'L-1'")
+        os.utime(db_path, ns=(2_000_000_000_000_000_000, 2_000_000_000_000_000_000))
+        refreshed, refreshed_source = boot()
+
+    assert (cold_source, warm_source, refreshed_source) == ("built", "snapshot", "built")
+    pd.testing.assert_frame_equal(warm.df, cold.df)
+    assert warm.df.geometry.equals(cold.df.geometry)
+    assert (warm.earliest_date, warm.last_updated) == (cold.earliest_date, cold.last_updated)
+    assert warm.page_type == "lease"
+    assert refreshed.df.set_index("mls_number").loc["L-1", "list_price"] == 3100
+
+
+def test_empty_listed_date_fallback_is_not_snapshotted(tmp_path: Path) -> None:
+    """Verify that the "today" fallback for a table without listed dates is resolved per boot.
+
+    Args:
+        tmp_path: Temporary directory supplied by pytest.
+
+    Returns:
+        None.
+    """
+    db_path = tmp_path / "larentals.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(
+            """
+            CREATE TABLE lease (mls_number TEXT, latitude REAL, longitude REAL, listed_date TEXT);
+            INSERT INTO lease VALUES ('L-1', 34.05, -118.25, NULL);
+            CREATE TABLE lease_provider_options (listing_id TEXT, MaxAdDn REAL, MaxAdUp REAL);
+            """
+        )
+
+    class FixedDate(date):
+        """Date whose ``today`` is pinned by the test."""
+
+        current = date(2026, 1, 1)
+
+        @classmethod
+        def today(cls) -> date:
+            """Return the pinned date.
+
+            Returns:
+                The date set on ``current``.
+            """
+            return cls.current
+
+    with (
+        patch("pages.component_base.DB_PATH", str(db_path)),
+        patch("pages.component_base.date", FixedDate),
+        warm_start_session(tmp_path / "warm_start"),
+    ):
+        first = BaseClass(table_name="lease", page_type="lease", include_last_updated=False)
+        FixedDate.current = date(2026, 2, 1)
+        with patch("pages.component_base.BaseClass._prepare_frame", side_effect=AssertionError("rebuilt")):
+            second = BaseClass(table_name="lease", page_type="lease", include_last_updated=False)
+
+    assert (first.earliest_date, second.earliest_date) == (date(2026, 1, 1), date(2026, 2, 1))